@@ -0,0 +1,101 @@
+"""Колонка clinics.location_normalized для баз, созданных до ее появления.
+
+create_all не добавляет колонки в существующие таблицы, поэтому команда сама добавляет
+колонку и индексы, если их нет, заполняет normalize_location(location) батчами по id,
+увеличивает версию каталога и только затем делает колонку NOT NULL. Повторный запуск безопасен.
+
+Запуск: python -m src.commands.backfill_location_normalized [--batch-size 1000] [--all]
+"""
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import inspect, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.entity.clinics.clinic_entity import normalize_location
+from src.infrastructure.repository.database import async_session_maker, init_db
+from src.infrastructure.repository.schemas.clinic_orm import ClinicOrm
+from src.infrastructure.services.clinics.catalog import clinic_catalog
+
+LOCATION_INDEXES = ('ix_clinics_location_normalized', 'ix_clinics_location_trgm')
+
+logger = logging.getLogger(__name__)
+
+
+async def ensure_column(session: AsyncSession) -> bool:
+    """Добавить колонку (допускающую NULL) и ее индексы, если их нет; True - колонка добавлена"""
+    def inspect_clinics(sync_session):
+        inspector = inspect(sync_session.connection())
+        return (
+            {column['name'] for column in inspector.get_columns('clinics')},
+            {index['name'] for index in inspector.get_indexes('clinics')}
+        )
+
+    columns, indexes = await session.run_sync(inspect_clinics)
+    added = 'location_normalized' not in columns
+    if added:
+        await session.execute(text("ALTER TABLE clinics ADD COLUMN location_normalized VARCHAR(100)"))
+    dialect = session.bind.dialect.name
+    for index in ClinicOrm.__table__.indexes:
+        if index.name not in LOCATION_INDEXES or index.name in indexes:
+            continue
+        if index.name == 'ix_clinics_location_trgm' and dialect != 'postgresql':
+            continue
+        await session.run_sync(lambda sync_session, index=index: index.create(sync_session.connection()))
+    await session.commit()
+    return added
+
+
+async def backfill_location_normalized(session: AsyncSession, batch_size: int = 1000, only_missing: bool = True) -> int:
+    """Заполнить location_normalized; only_missing=False пересчитывает все строки (после смены правил нормализации)"""
+    filled = 0
+    last_id = 0
+    while True:
+        stmt = select(ClinicOrm.id, ClinicOrm.location).where(ClinicOrm.id > last_id)
+        if only_missing:
+            stmt = stmt.where(ClinicOrm.location_normalized.is_(None))
+        rows = (await session.execute(stmt.order_by(ClinicOrm.id).limit(batch_size))).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        await session.execute(update(ClinicOrm), [
+            {"id": row.id, "location_normalized": normalize_location(row.location)} for row in rows
+        ])
+        # Версия каталога в той же транзакции: воркеры API перечитают снимок и индекс городов
+        await clinic_catalog.bump_version(session)
+        await session.commit()
+        filled += len(rows)
+    return filled
+
+
+async def enforce_not_null(session: AsyncSession):
+    # SQLite не меняет ограничения колонок через ALTER; там колонка остается допускающей NULL
+    if session.bind.dialect.name != 'postgresql':
+        return
+    await session.execute(text("ALTER TABLE clinics ALTER COLUMN location_normalized SET NOT NULL"))
+    await session.commit()
+
+
+async def run(batch_size: int, only_missing: bool) -> int:
+    await init_db()
+    async with async_session_maker() as session:
+        if await ensure_column(session):
+            logger.info("Added clinics.location_normalized")
+        filled = await backfill_location_normalized(session, batch_size, only_missing)
+        await enforce_not_null(session)
+    return filled
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--all", action="store_true", help="пересчитать все строки, а не только пустые")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    filled = asyncio.run(run(args.batch_size, only_missing=not args.all))
+    logger.info(f"Filled location_normalized for {filled} clinics")
+
+
+if __name__ == "__main__":
+    main()
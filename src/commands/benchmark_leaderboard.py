@@ -0,0 +1,61 @@
+"""Нагрузочная проверка рейтингов на синтетических данных (без БД).
+
+Запуск: python -m src.commands.benchmark_leaderboard [--targets 100000] [--scopes 50]
+"""
+import argparse
+import logging
+import random
+import time
+
+from src.domain.entity.clinics.reviews import ReviewTargetType
+from src.infrastructure.services.ratings.leaderboard import RatingLeaderboard
+
+
+def _timed(label: str, fn, repeat: int = 1):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = time.perf_counter() - started
+    logging.getLogger(__name__).info(
+        f"{label}: {elapsed * 1000:.1f} ms total, {elapsed / repeat * 1e6:.1f} us per op"
+    )
+
+
+def run(targets: int, scopes: int, updates: int, reads: int, seed: int = 42):
+    rng = random.Random(seed)
+    scope_names = [f"city-{index}" for index in range(scopes)]
+    stats, target_scopes = [], []
+    for target_id in range(1, targets + 1):
+        target_type = ReviewTargetType.CLINIC if target_id % 2 else ReviewTargetType.SPECIALIST
+        count = rng.randint(1, 300)
+        stats.append((target_type, target_id, count, sum(rng.randint(1, 10) for _ in range(count))))
+        target_scopes.append((target_type, target_id, rng.sample(scope_names, rng.randint(1, 3))))
+
+    leaderboard = RatingLeaderboard()
+    _timed(f"full load of {targets} targets", lambda: leaderboard.load(stats, target_scopes))
+
+    def update():
+        target_type, target_id, count, rate_sum = stats[rng.randrange(targets)]
+        leaderboard.update_stats(target_type, target_id, count + 1, rate_sum + rng.randint(1, 10))
+
+    _timed(f"{updates} incremental updates", update, repeat=updates)
+
+    def read():
+        leaderboard.top(ReviewTargetType.CLINIC, rng.choice(scope_names), offset=rng.randrange(0, 200), limit=20)
+
+    _timed(f"{reads} page reads", read, repeat=reads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--targets", type=int, default=100_000)
+    parser.add_argument("--scopes", type=int, default=50)
+    parser.add_argument("--updates", type=int, default=10_000)
+    parser.add_argument("--reads", type=int, default=10_000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    run(args.targets, args.scopes, args.updates, args.reads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Проверка "открыта в момент T" по недельным битовым картам на синтетических клиниках (без БД).
+
+Запуск: python -m src.commands.benchmark_open_hours [--clinics 50000]
+"""
+import argparse
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+
+from src.domain.entity.clinics.clinic_entity import WEEKDAY_KEYS, compile_open_hours, is_open_in, minute_of_week
+from src.infrastructure.services.clinics.geo_index import ClinicGeoIndex
+
+
+def _schedule(rng: random.Random) -> dict:
+    schedule = {}
+    for keys in WEEKDAY_KEYS:
+        if rng.random() < 0.2:
+            continue
+        opens = rng.randint(6, 11)
+        closes = rng.randint(opens + 4, 23)
+        hours = {"open": f"{opens:02d}:00", "close": f"{closes:02d}:30"}
+        if rng.random() < 0.5:
+            hours.update(break_start=f"{opens + 3:02d}:00", break_end=f"{opens + 3:02d}:45")
+        schedule[keys[0]] = hours
+    return schedule
+
+
+def run(clinics: int, queries: int, seed: int = 42):
+    logger = logging.getLogger(__name__)
+    rng = random.Random(seed)
+    schedules = [(_schedule(rng), rng.random() < 0.05) for _ in range(clinics)]
+
+    started = time.perf_counter()
+    bitmaps = [compile_open_hours(work_hours, is_24_7) for work_hours, is_24_7 in schedules]
+    logger.info(f"compiled {clinics} schedules: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    index = ClinicGeoIndex()
+    index.load(
+        (clinic_id, 55 + rng.random(), 37 + rng.random(), is_24_7, bitmap)
+        for clinic_id, ((_, is_24_7), bitmap) in enumerate(zip(schedules, bitmaps), start=1)
+    )
+
+    moments = [datetime(2024, 1, 1) + timedelta(minutes=rng.randrange(7 * 24 * 60)) for _ in range(queries)]
+    started = time.perf_counter()
+    for moment in moments:
+        index.within(55.5, 37.5, 200, open_minute=minute_of_week(moment))
+    elapsed = (time.perf_counter() - started) / queries
+    logger.info(f"open-at filter over {clinics} clinics (incl. distance): {elapsed * 1000:.1f} ms per query")
+
+    started = time.perf_counter()
+    for moment in moments:
+        minute = minute_of_week(moment)
+        [clinic_id for clinic_id, bitmap in enumerate(bitmaps) if is_open_in(bitmap, minute)]
+    elapsed = (time.perf_counter() - started) / queries
+    logger.info(f"open-at bitmap test over {clinics} clinics: {elapsed * 1000:.1f} ms per query")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clinics", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    run(args.clinics, args.queries)
+
+
+if __name__ == "__main__":
+    main()
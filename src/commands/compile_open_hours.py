@@ -0,0 +1,55 @@
+"""Пересборка битовых карт open_hours из work_hours/is_24_7 для всех клиник.
+
+Нужна после добавления колонки и после ручных правок графиков в обход API.
+
+Запуск: python -m src.commands.compile_open_hours [--batch-size 1000]
+"""
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import select, update
+
+from src.domain.entity.clinics.clinic_entity import compile_open_hours
+from src.infrastructure.repository.database import async_session_maker, init_db
+from src.infrastructure.repository.schemas.clinic_orm import ClinicOrm
+from src.infrastructure.services.clinics.catalog import clinic_catalog
+
+
+async def compile_all_open_hours(batch_size: int) -> int:
+    await init_db()
+    compiled = 0
+    last_id = 0
+    async with async_session_maker() as session:
+        while True:
+            result = await session.execute(
+                select(ClinicOrm.id, ClinicOrm.work_hours, ClinicOrm.is_24_7)
+                .where(ClinicOrm.id > last_id)
+                .order_by(ClinicOrm.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            await session.execute(update(ClinicOrm), [
+                {"id": row.id, "open_hours": compile_open_hours(row.work_hours, row.is_24_7)} for row in rows
+            ])
+            # Версия каталога в той же транзакции: воркеры API перечитают снимок клиник
+            await clinic_catalog.bump_version(session)
+            await session.commit()
+            compiled += len(rows)
+    return compiled
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    compiled = asyncio.run(compile_all_open_hours(args.batch_size))
+    logging.getLogger(__name__).info(f"Compiled open hours for {compiled} clinics")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Ограничение uq_reviews_order_sender_target для баз, созданных до его появления.
+
+create_all не добавляет ограничения в существующую таблицу, а дубликаты отзывов помешали бы
+его создать. Команда в одной транзакции удаляет повторные отзывы (остается самый ранний
+по id), создает ограничение и пересчитывает review_stats. Повторный запуск безопасен.
+
+Запуск: python -m src.commands.dedupe_reviews
+"""
+import asyncio
+import logging
+from typing import Tuple
+
+from sqlalchemy import delete, func, inspect, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.infrastructure.adapters.orm_entity_adapter import ReviewOrmEntityAdapter
+from src.infrastructure.repository.clinics.postgres_reviews_repo import PostgresReviewRepo
+from src.infrastructure.repository.database import async_session_maker, init_db
+from src.infrastructure.repository.schemas.review_orm import ReviewOrm
+
+REVIEW_UNIQUE_CONSTRAINT = 'uq_reviews_order_sender_target'
+
+logger = logging.getLogger(__name__)
+
+
+async def dedupe_reviews(session: AsyncSession) -> Tuple[int, bool]:
+    """(удалено дубликатов, True - ограничение создано сейчас)"""
+    def has_constraint(sync_session) -> bool:
+        inspector = inspect(sync_session.connection())
+        names = {constraint['name'] for constraint in inspector.get_unique_constraints('reviews')}
+        names |= {index['name'] for index in inspector.get_indexes('reviews') if index['unique']}
+        return REVIEW_UNIQUE_CONSTRAINT in names
+
+    postgres = session.bind.dialect.name == 'postgresql'
+    try:
+        if postgres:
+            # Новые отзывы ждут окончания транзакции и не успевают создать дубликат до ограничения
+            await session.execute(text("LOCK TABLE reviews IN SHARE ROW EXCLUSIVE MODE"))
+        first_ids = select(func.min(ReviewOrm.id)).group_by(
+            ReviewOrm.order_id, ReviewOrm.sender_id, ReviewOrm.target_id
+        )
+        result = await session.execute(delete(ReviewOrm).where(ReviewOrm.id.not_in(first_ids)))
+        removed = result.rowcount or 0
+
+        created = not await session.run_sync(has_constraint)
+        if created:
+            if postgres:
+                await session.execute(text(
+                    f"ALTER TABLE reviews ADD CONSTRAINT {REVIEW_UNIQUE_CONSTRAINT} UNIQUE (order_id, sender_id, target_id)"
+                ))
+            else:
+                # SQLite не добавляет ограничения через ALTER; уникальный индекс сообщает те же колонки
+                await session.execute(text(
+                    f"CREATE UNIQUE INDEX {REVIEW_UNIQUE_CONSTRAINT} ON reviews (order_id, sender_id, target_id)"
+                ))
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+
+    if removed:
+        # Удаленные отзывы были учтены в агрегатах
+        await PostgresReviewRepo(session=session, adapter=ReviewOrmEntityAdapter()).rebuild_review_stats()
+    return removed, created
+
+
+async def run() -> Tuple[int, bool]:
+    await init_db()
+    async with async_session_maker() as session:
+        return await dedupe_reviews(session)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    removed, created = asyncio.run(run())
+    logger.info(f"Removed {removed} duplicate reviews, constraint {'created' if created else 'already present'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Заполнение координат клиник по локальному справочнику адрес -> координаты.
+
+Справочник - JSON {"адрес": [широта, долгота]} или CSV с колонками address,latitude,longitude.
+Адрес ищется сначала как "город, адрес", затем как просто адрес; сравнение без учета
+регистра и пунктуации.
+
+Запуск: python -m src.commands.geocode_clinics path/to/fixture.json [--batch-size 500]
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.entity.clinics.clinic_entity import normalize_location
+from src.infrastructure.repository.database import async_session_maker, init_db
+from src.infrastructure.repository.schemas.clinic_orm import ClinicOrm
+from src.infrastructure.services.clinics.catalog import clinic_catalog
+
+Coordinates = Tuple[float, float]
+
+logger = logging.getLogger(__name__)
+
+
+def load_fixture(path: Path) -> Dict[str, Coordinates]:
+    if path.suffix.lower() == ".csv":
+        with path.open(newline="", encoding="utf-8") as file:
+            rows = [(row["address"], row["latitude"], row["longitude"]) for row in csv.DictReader(file)]
+    else:
+        rows = [(address, *coordinates) for address, coordinates in json.loads(path.read_text("utf-8")).items()]
+    return {normalize_location(address): (float(latitude), float(longitude)) for address, latitude, longitude in rows}
+
+
+def lookup(fixture: Dict[str, Coordinates], location: str, address: str) -> Optional[Coordinates]:
+    return fixture.get(normalize_location(f"{location}, {address}")) or fixture.get(normalize_location(address))
+
+
+async def backfill_coordinates(
+        session: AsyncSession,
+        fixture: Dict[str, Coordinates],
+        batch_size: int = 500
+) -> Tuple[int, int]:
+    """Проставляет координаты клиникам без них; возвращает (обновлено, не найдено в справочнике)"""
+    updated = missing = 0
+    last_id = 0
+    while True:
+        result = await session.execute(
+            select(ClinicOrm.id, ClinicOrm.location, ClinicOrm.address)
+            .where(ClinicOrm.latitude.is_(None), ClinicOrm.id > last_id)
+            .order_by(ClinicOrm.id)
+            .limit(batch_size)
+        )
+        rows = result.all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        values = []
+        for row in rows:
+            coordinates = lookup(fixture, row.location, row.address)
+            if coordinates is None:
+                missing += 1
+                continue
+            values.append({"id": row.id, "latitude": coordinates[0], "longitude": coordinates[1]})
+
+        if values:
+            # Пакетный UPDATE по первичному ключу - одна команда executemany на батч
+            await session.execute(update(ClinicOrm), values)
+            # Версия каталога в той же транзакции: воркеры API перечитают снимок и индексы клиник
+            await clinic_catalog.bump_version(session)
+            await session.commit()
+            updated += len(values)
+    return updated, missing
+
+
+async def geocode_clinics(fixture_path: Path, batch_size: int) -> Tuple[int, int]:
+    fixture = load_fixture(fixture_path)
+    await init_db()
+    async with async_session_maker() as session:
+        return await backfill_coordinates(session, fixture, batch_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill clinic coordinates from an address fixture")
+    parser.add_argument("fixture", type=Path)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    updated, missing = asyncio.run(geocode_clinics(args.fixture, args.batch_size))
+    logger.info(f"Geocoded {updated} clinics, {missing} addresses not found in fixture")
+
+
+if __name__ == "__main__":
+    main()
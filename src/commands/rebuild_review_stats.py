@@ -0,0 +1,27 @@
+"""Пересчет агрегатов review_stats по таблице отзывов.
+
+Запуск: python -m src.commands.rebuild_review_stats
+"""
+import asyncio
+import logging
+
+from src.infrastructure.adapters.orm_entity_adapter import ReviewOrmEntityAdapter
+from src.infrastructure.repository.clinics.postgres_reviews_repo import PostgresReviewRepo
+from src.infrastructure.repository.database import async_session_maker, init_db
+
+
+async def rebuild_review_stats() -> int:
+    await init_db()
+    async with async_session_maker() as session:
+        repo = PostgresReviewRepo(session=session, adapter=ReviewOrmEntityAdapter())
+        return await repo.rebuild_review_stats()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    targets = asyncio.run(rebuild_review_stats())
+    logging.getLogger(__name__).info(f"Rebuilt review stats for {targets} targets")
+
+
+if __name__ == "__main__":
+    main()
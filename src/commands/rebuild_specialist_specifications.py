@@ -0,0 +1,59 @@
+"""Заполнение specialist_specifications по JSON-колонке specialists.specifications.
+
+Нужно один раз после добавления таблицы и после правок спецификаций в обход API.
+
+Запуск: python -m src.commands.rebuild_specialist_specifications [--batch-size 1000]
+"""
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import delete, insert, select
+
+from src.infrastructure.repository.database import async_session_maker, init_db
+from src.infrastructure.repository.schemas.user_orm import SpecialistOrm, SpecialistSpecificationOrm
+from src.infrastructure.services.matching.specification_index import normalize_specifications
+
+
+async def rebuild_specialist_specifications(batch_size: int) -> int:
+    await init_db()
+    rebuilt = 0
+    last_id = 0
+    async with async_session_maker() as session:
+        while True:
+            result = await session.execute(
+                select(SpecialistOrm.user_id, SpecialistOrm.specifications)
+                .where(SpecialistOrm.user_id > last_id)
+                .order_by(SpecialistOrm.user_id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            last_id = rows[-1].user_id
+            await session.execute(delete(SpecialistSpecificationOrm).where(
+                SpecialistSpecificationOrm.specialist_id.in_([row.user_id for row in rows])
+            ))
+            values = [
+                {"specification": spec, "specialist_id": row.user_id}
+                for row in rows
+                for spec in sorted(normalize_specifications(row.specifications))
+            ]
+            if values:
+                await session.execute(insert(SpecialistSpecificationOrm), values)
+            await session.commit()
+            rebuilt += len(rows)
+    return rebuilt
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    rebuilt = asyncio.run(rebuild_specialist_specifications(args.batch_size))
+    logging.getLogger(__name__).info(f"Rebuilt specifications for {rebuilt} specialists")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from fastapi import Depends
 from src.infrastructure.repository.database import async_session_maker
 from src.infrastructure.adapters.orm_entity_adapter import (
     UserOrmEntityAdapter, ChatOrmEntityAdapter, ClinicOrmEntityAdapter, ResponseOrmEntityAdapter,
-    ReviewOrmEntityAdapter, OrderOrmEntityAdapter, AdminOrmEntityAdapter, MessageOrmEntityAdapter)
+    ReviewOrmEntityAdapter, OrderOrmEntityAdapter, AdminOrmEntityAdapter, MessageOrmEntityAdapter,
+    AppointmentOrmEntityAdapter)
 from src.infrastructure.repository.schemas.user_orm import (
     UserOrm, SpecialistOrm, PatientOrm, OrganizationOrm, AdminOrm, BlockedUserOrm
 )
@@ -29,6 +30,7 @@ from src.use_cases.repository.clinics_usecases import ClinicUseCase
 from src.use_cases.repository.reviews_usecases import ReviewUseCases
 from src.use_cases.repository.orders_usecases import OrderUseCase
 from src.use_cases.repository.responses_usecases import ResponseUseCase
+from src.use_cases.repository.appointments_usecases import AppointmentUseCase
 from src.infrastructure.repository.user.postgres_user_repo import PostgresUserRepo
 from src.infrastructure.repository.user.postgres_admin_repo import PostgresAdminRepo
 from src.infrastructure.repository.user.postgres_organization_repo import PostgresOrganizationRepo
@@ -36,9 +38,22 @@ from src.infrastructure.repository.user.postgres_patient_repo import PostgresPat
 from src.infrastructure.repository.user.postgres_specialist_repo import PostgresSpecialistRepo
 from src.infrastructure.repository.clinics.postgres_clinics_repo import PostgresClinicsRepo
 from src.infrastructure.repository.clinics.postgres_reviews_repo import PostgresReviewRepo
+from src.infrastructure.repository.clinics.postgres_appointments_repo import PostgresAppointmentsRepo
 from src.infrastructure.repository.orders.postgres_orders_repo import PostgresOrdersRepo
 from src.infrastructure.repository.orders.postgres_responses_repo import PostgresResponsesRepo
 from src.infrastructure.repository.chats.postgres_chats_repo import PostgresChatsRepo
+from src.infrastructure.services.matching.specification_index import SpecificationMatchIndex, specification_index
+from src.infrastructure.services.events.order_events import OrderEventHub, order_event_hub
+from src.infrastructure.services.ratings.leaderboard import RatingLeaderboard, rating_leaderboard
+from src.infrastructure.services.clinics.location_index import LocationIndex, location_index
+from src.infrastructure.services.clinics.geo_index import ClinicGeoIndex, clinic_geo_index
+from src.infrastructure.services.clinics.catalog import ClinicCatalog, clinic_catalog
+from src.infrastructure.services.appointments.availability import AvailabilityIndex, availability_index
+from src.infrastructure.repository.loaders import EntityLoaders
+from src.infrastructure.services.users.profile_cards import ProfileCardCache, profile_card_cache
+from src.infrastructure.services.users.identity_filter import UserIdentityFilter, user_identity_filter
+from src.infrastructure.services.users.provisioning import UserProvisioner, provisioning_jobs
+from src.infrastructure.services.users.user_export import UserExporter
 
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import HTTPException, status
@@ -57,6 +72,56 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+async def get_specification_index(db: AsyncSession = Depends(get_db)) -> SpecificationMatchIndex:
+    """Индекс совпадений заказов и специалистов (строится из БД при первом обращении)"""
+    await specification_index.ensure_loaded(db)
+    return specification_index
+
+
+async def get_rating_leaderboard(db: AsyncSession = Depends(get_db)) -> RatingLeaderboard:
+    """Рейтинги клиник и специалистов (строятся из review_stats при первом обращении)"""
+    await rating_leaderboard.ensure_loaded(db)
+    return rating_leaderboard
+
+
+async def get_location_index(db: AsyncSession = Depends(get_db)) -> LocationIndex:
+    """Префиксное дерево городов клиник (строится из БД при первом обращении)"""
+    await location_index.ensure_loaded(db)
+    return location_index
+
+
+async def get_clinic_geo_index(db: AsyncSession = Depends(get_db)) -> ClinicGeoIndex:
+    """Сетка координат активных клиник (строится из БД при первом обращении)"""
+    await clinic_geo_index.ensure_loaded(db)
+    return clinic_geo_index
+
+
+async def get_clinic_catalog(db: AsyncSession = Depends(get_db)) -> ClinicCatalog:
+    """Снимок клиник в памяти (строится из БД при первом обращении, сверяется по версии)"""
+    await clinic_catalog.ensure_loaded(db)
+    return clinic_catalog
+
+
+async def get_availability_index(db: AsyncSession = Depends(get_db)) -> AvailabilityIndex:
+    """Свободные слоты записи (занятые слоты читаются из БД при первом обращении)"""
+    await availability_index.ensure_loaded(db)
+    return availability_index
+
+
+async def get_order_event_hub() -> OrderEventHub:
+    return order_event_hub
+
+
+async def get_profile_card_cache() -> ProfileCardCache:
+    return profile_card_cache
+
+
+async def get_user_identity_filter(db: AsyncSession = Depends(get_db)) -> UserIdentityFilter:
+    """Фильтры Блума никнеймов и email (строятся из БД при первом обращении)"""
+    await user_identity_filter.ensure_loaded(db)
+    return user_identity_filter
+
+
 # Адаптеры
 
 # users
@@ -90,6 +155,10 @@ async def get_review_adapter() -> ReviewOrmEntityAdapter:
     return ReviewOrmEntityAdapter(orm_model=ReviewOrm, entity_model=Review)
 
 
+async def get_appointment_adapter() -> AppointmentOrmEntityAdapter:
+    return AppointmentOrmEntityAdapter()
+
+
 # orders & responses
 async def get_order_adapter() -> OrderOrmEntityAdapter:
     return OrderOrmEntityAdapter(orm_model=OrderOrm, entity_model=Order)
@@ -107,30 +176,55 @@ async def get_message_adapter() -> MessageOrmEntityAdapter:
     return MessageOrmEntityAdapter()
 
 
+# Загрузчики сущностей: FastAPI кэширует зависимость на запрос, репозитории одного запроса делят пакеты и память
+async def get_entity_loaders(
+        db: AsyncSession = Depends(get_db),
+        user_adapter: UserOrmEntityAdapter = Depends(get_user_adapter),
+        clinic_adapter: ClinicOrmEntityAdapter = Depends(get_clinic_adapter),
+        order_adapter: OrderOrmEntityAdapter = Depends(get_order_adapter)
+) -> EntityLoaders:
+    return EntityLoaders(
+        session=db, user_adapter=user_adapter, clinic_adapter=clinic_adapter, order_adapter=order_adapter
+    )
+
+
 # Репозитории
 # users
 async def get_user_repository(
         db: AsyncSession = Depends(get_db),
-        adapter: UserOrmEntityAdapter = Depends(get_user_adapter)
+        adapter: UserOrmEntityAdapter = Depends(get_user_adapter),
+        loaders: EntityLoaders = Depends(get_entity_loaders),
+        profile_cache: ProfileCardCache = Depends(get_profile_card_cache),
+        identity_filter: UserIdentityFilter = Depends(get_user_identity_filter),
+        matching_index: SpecificationMatchIndex = Depends(get_specification_index)
 ) -> PostgresUserRepo:
     from src.infrastructure.repository.user.postgres_user_repo import PostgresUserRepo
-    return PostgresUserRepo(session=db, adapter=adapter)
+    return PostgresUserRepo(
+        session=db, adapter=adapter, loaders=loaders, profile_cache=profile_cache, identity_filter=identity_filter,
+        matching_index=matching_index
+    )
 
 
 async def get_specialist_repository(
         db: AsyncSession = Depends(get_db),
-        adapter: UserOrmEntityAdapter = Depends(get_specialist_adapter)
+        adapter: UserOrmEntityAdapter = Depends(get_specialist_adapter),
+        matching_index: SpecificationMatchIndex = Depends(get_specification_index),
+        leaderboard: RatingLeaderboard = Depends(get_rating_leaderboard),
+        profile_cache: ProfileCardCache = Depends(get_profile_card_cache)
 ) -> PostgresSpecialistRepo:
     from src.infrastructure.repository.user.postgres_specialist_repo import PostgresSpecialistRepo
-    return PostgresSpecialistRepo(session=db, adapter=adapter)
+    return PostgresSpecialistRepo(
+        session=db, adapter=adapter, matching_index=matching_index, leaderboard=leaderboard, profile_cache=profile_cache
+    )
 
 
 async def get_patient_repository(
         db: AsyncSession = Depends(get_db),
-        adapter: UserOrmEntityAdapter = Depends(get_patient_adapter)
+        adapter: UserOrmEntityAdapter = Depends(get_patient_adapter),
+        profile_cache: ProfileCardCache = Depends(get_profile_card_cache)
 ) -> PostgresPatientRepo:
     from src.infrastructure.repository.user.postgres_patient_repo import PostgresPatientRepo
-    return PostgresPatientRepo(session=db, adapter=adapter)
+    return PostgresPatientRepo(session=db, adapter=adapter, profile_cache=profile_cache)
 
 
 async def get_organization_repository(
@@ -144,25 +238,53 @@ async def get_organization_repository(
 async def get_admin_repository(
         db: AsyncSession = Depends(get_db),
         user_adapter: UserOrmEntityAdapter = Depends(get_admin_adapter),
-        admin_adapter: AdminOrmEntityAdapter = Depends(get_admin_adapter)
+        admin_adapter: AdminOrmEntityAdapter = Depends(get_admin_adapter),
+        matching_index: SpecificationMatchIndex = Depends(get_specification_index),
+        identity_filter: UserIdentityFilter = Depends(get_user_identity_filter),
+        profile_cache: ProfileCardCache = Depends(get_profile_card_cache)
 ) -> PostgresAdminRepo:
     from src.infrastructure.repository.user.postgres_admin_repo import PostgresAdminRepo
-    return PostgresAdminRepo(session=db, user_adapter=user_adapter, admin_adapter=admin_adapter)
+    return PostgresAdminRepo(
+        session=db, user_adapter=user_adapter, admin_adapter=admin_adapter, matching_index=matching_index,
+        identity_filter=identity_filter, profile_cache=profile_cache
+    )
 
 
 # clinics & reviews
 async def get_clinic_repository(
     db: AsyncSession = Depends(get_db),
-    adapter: ClinicOrmEntityAdapter = Depends(get_clinic_adapter)
+    adapter: ClinicOrmEntityAdapter = Depends(get_clinic_adapter),
+    leaderboard: RatingLeaderboard = Depends(get_rating_leaderboard),
+    locations: LocationIndex = Depends(get_location_index),
+    geo_index: ClinicGeoIndex = Depends(get_clinic_geo_index),
+    catalog: ClinicCatalog = Depends(get_clinic_catalog),
+    loaders: EntityLoaders = Depends(get_entity_loaders)
 ) -> PostgresClinicsRepo:
-    return PostgresClinicsRepo(session=db, adapter=adapter)
+    return PostgresClinicsRepo(
+        session=db,
+        adapter=adapter,
+        leaderboard=leaderboard,
+        location_index=locations,
+        geo_index=geo_index,
+        catalog=catalog,
+        loaders=loaders
+    )
 
 
 async def get_review_repository(
         db: AsyncSession = Depends(get_db),
-        adapter: ReviewOrmEntityAdapter = Depends(get_review_adapter)
+        adapter: ReviewOrmEntityAdapter = Depends(get_review_adapter),
+        leaderboard: RatingLeaderboard = Depends(get_rating_leaderboard)
 ) -> PostgresReviewRepo:
-    return PostgresReviewRepo(session=db, adapter=adapter)
+    return PostgresReviewRepo(session=db, adapter=adapter, leaderboard=leaderboard)
+
+
+async def get_appointment_repository(
+        db: AsyncSession = Depends(get_db),
+        adapter: AppointmentOrmEntityAdapter = Depends(get_appointment_adapter),
+        availability: AvailabilityIndex = Depends(get_availability_index)
+) -> PostgresAppointmentsRepo:
+    return PostgresAppointmentsRepo(session=db, adapter=adapter, availability=availability)
 
 
 # chats
@@ -176,9 +298,14 @@ async def get_chat_repository(
 # orders & responses
 async def get_order_repository(
         db: AsyncSession = Depends(get_db),
-        adapter: OrderOrmEntityAdapter = Depends(get_order_adapter)
+        adapter: OrderOrmEntityAdapter = Depends(get_order_adapter),
+        matching_index: SpecificationMatchIndex = Depends(get_specification_index),
+        event_hub: OrderEventHub = Depends(get_order_event_hub),
+        loaders: EntityLoaders = Depends(get_entity_loaders)
 ) -> PostgresOrdersRepo:
-    return PostgresOrdersRepo(session=db, adapter=adapter)
+    return PostgresOrdersRepo(
+        session=db, adapter=adapter, matching_index=matching_index, event_hub=event_hub, loaders=loaders
+    )
 
 
 async def get_response_repository(
@@ -188,6 +315,28 @@ async def get_response_repository(
     return PostgresResponsesRepo(session=db, adapter=adapter)
 
 
+
+async def get_user_provisioner(
+        db: AsyncSession = Depends(get_db),
+        identity_filter: UserIdentityFilter = Depends(get_user_identity_filter),
+        matching_index: SpecificationMatchIndex = Depends(get_specification_index),
+        leaderboard: RatingLeaderboard = Depends(get_rating_leaderboard)
+) -> UserProvisioner:
+    # Фоновая задача переживает запрос, поэтому открывает свои сессии на том же подключении к БД
+    return UserProvisioner(
+        session_factory=async_sessionmaker(db.bind, class_=AsyncSession, expire_on_commit=False),
+        registry=provisioning_jobs,
+        identity_filter=identity_filter,
+        matching_index=matching_index,
+        leaderboard=leaderboard
+    )
+
+
+
+async def get_user_exporter(db: AsyncSession = Depends(get_db)) -> UserExporter:
+    return UserExporter(session_factory=async_sessionmaker(db.bind, class_=AsyncSession, expire_on_commit=False))
+
+
 # Use Cases
 async def get_registration_use_case(
         user_repo: PostgresUserRepo = Depends(get_user_repository),
@@ -250,15 +399,35 @@ async def get_settings_use_case(
 
 async def get_clinic_use_case(
     clinic_repo: PostgresClinicsRepo = Depends(get_clinic_repository),
-    adapter: ClinicOrmEntityAdapter = Depends(get_clinic_adapter)
+    adapter: ClinicOrmEntityAdapter = Depends(get_clinic_adapter),
+    review_repo: PostgresReviewRepo = Depends(get_review_repository)
 ) -> ClinicUseCase:
-    return ClinicUseCase(clinic_repo=clinic_repo, adapter=adapter)
+    return ClinicUseCase(clinic_repo=clinic_repo, adapter=adapter, review_repo=review_repo)
+
+
+async def get_appointment_use_case(
+    appointment_repo: PostgresAppointmentsRepo = Depends(get_appointment_repository),
+    clinic_repo: PostgresClinicsRepo = Depends(get_clinic_repository),
+    availability: AvailabilityIndex = Depends(get_availability_index),
+    user_repo: PostgresUserRepo = Depends(get_user_repository)
+) -> AppointmentUseCase:
+    return AppointmentUseCase(
+        appointment_repo=appointment_repo, clinic_repo=clinic_repo, availability=availability, user_repo=user_repo
+    )
 
 
 async def get_orders_use_case(
     order_repo: PostgresOrdersRepo = Depends(get_order_repository),
+    matching_index: SpecificationMatchIndex = Depends(get_specification_index),
+    response_repo: PostgresResponsesRepo = Depends(get_response_repository),
+    user_repo: PostgresUserRepo = Depends(get_user_repository)
 ) -> OrderUseCase:
-    return OrderUseCase(orders_repo=order_repo)
+    return OrderUseCase(
+        orders_repo=order_repo,
+        matching_index=matching_index,
+        response_repo=response_repo,
+        user_repo=user_repo
+    )
 
 
 async def get_review_use_case(
@@ -283,10 +452,11 @@ async def get_responses_use_case(
 
 async def get_chats_use_case(
     chat_repo: PostgresChatsRepo = Depends(get_chat_repository),
-    user_adapter: UserOrmEntityAdapter = Depends(get_user_adapter)
+    user_adapter: UserOrmEntityAdapter = Depends(get_user_adapter),
+    user_repo: PostgresUserRepo = Depends(get_user_repository)
 ) -> ChatUseCase:
     """ Создает и возвращает экземпляр ChatUseCase """
-    return ChatUseCase(chats_repo=chat_repo, adapter=user_adapter)
+    return ChatUseCase(chats_repo=chat_repo, adapter=user_adapter, user_repo=user_repo)
 
 load_dotenv()
 
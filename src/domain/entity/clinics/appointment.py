@@ -0,0 +1,99 @@
+from pydantic import BaseModel, Field
+from datetime import date, datetime, timedelta
+from enum import Enum
+from typing import Any, Dict, List, Optional
+from zoneinfo import ZoneInfo
+import os
+
+from src.domain.entity.clinics.clinic_entity import MINUTES_PER_DAY, open_hours_mask
+
+# Часовой пояс, в котором заданы графики клиник (IANA, например Europe/Moscow).
+# Не задан - используется пояс сервера
+CLINIC_TIMEZONE = os.getenv("CLINIC_TIMEZONE")
+
+
+class AppointmentStatus(str, Enum):
+    BOOKED = "booked"
+    CANCELLED = "cancelled"
+
+
+class Appointment(BaseModel):
+    id: Optional[int] = None
+    clinic_id: int = Field(..., gt=0, description="ID клиники")
+    specialist_id: Optional[int] = Field(None, gt=0, description="ID специалиста, None - прием без специалиста")
+    patient_id: int = Field(..., gt=0, description="ID пациента")
+    starts_at: datetime = Field(..., description="Начало слота (местное время клиники)")
+    ends_at: datetime = Field(..., description="Конец слота")
+    status: AppointmentStatus = AppointmentStatus.BOOKED
+    created_at: datetime = Field(default_factory=datetime.now)
+
+
+class AvailableSlot(BaseModel):
+    clinic_id: int
+    specialist_id: Optional[int] = None
+    starts_at: datetime
+    ends_at: datetime
+
+
+def require_local_time(moment: datetime, field: str) -> datetime:
+    """Слоты - в местном времени клиники без смещения: часовой пояс клиник не хранится,
+    перевести время с UTC-смещением однозначно нельзя
+    """
+    if moment.tzinfo is not None:
+        raise ValueError(f"{field} must be clinic-local time without a UTC offset")
+    return moment
+
+
+def clinic_local_now() -> datetime:
+    """Текущее время для open_now и слотов по умолчанию: местное время клиник без смещения"""
+    if not CLINIC_TIMEZONE:
+        return datetime.now()
+    return datetime.now(ZoneInfo(CLINIC_TIMEZONE)).replace(tzinfo=None)
+
+
+def slots_per_day(slot_minutes: int) -> int:
+    return MINUTES_PER_DAY // slot_minutes
+
+
+def slot_index(moment: datetime, slot_minutes: int) -> Optional[int]:
+    """Номер слота в сутках; None - время не совпадает с началом слота"""
+    minute = moment.hour * 60 + moment.minute
+    if moment.second or moment.microsecond or minute % slot_minutes:
+        return None
+    return minute // slot_minutes
+
+
+def slot_start(day: date, index: int, slot_minutes: int) -> datetime:
+    return datetime.combine(day, datetime.min.time()) + timedelta(minutes=index * slot_minutes)
+
+
+def weekly_slot_masks(work_hours: Optional[Dict[str, Any]], is_24_7: bool, slot_minutes: int) -> List[int]:
+    """Битовые маски открытых слотов по дням недели (понедельник - 0).
+
+    Бит N установлен, если клиника открыта все минуты слота N, включая перерывы графика.
+    """
+    minutes = open_hours_mask(work_hours, is_24_7)
+    full = (1 << slot_minutes) - 1
+    per_day = slots_per_day(slot_minutes)
+    masks = []
+    for weekday in range(7):
+        day = minutes >> (weekday * MINUTES_PER_DAY)
+        mask = 0
+        for index in range(per_day):
+            if (day >> (index * slot_minutes)) & full == full:
+                mask |= 1 << index
+        masks.append(mask)
+    return masks
+
+
+def iter_slot_bits(mask: int, first: int = 0):
+    """Номера установленных бит маски по возрастанию, начиная с first"""
+    mask >>= first
+    index = first
+    while mask:
+        low = mask & -mask
+        shift = low.bit_length() - 1
+        index += shift
+        yield index
+        mask >>= shift + 1
+        index += 1
@@ -1,6 +1,25 @@
 from pydantic import BaseModel, Field, field_validator
 from datetime import datetime, time
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
+import re
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+# Допустимые ключи дней в work_hours, индекс - datetime.weekday()
+WEEKDAY_KEYS = (
+    ("monday", "mon", "пн", "понедельник"),
+    ("tuesday", "tue", "вт", "вторник"),
+    ("wednesday", "wed", "ср", "среда"),
+    ("thursday", "thu", "чт", "четверг"),
+    ("friday", "fri", "пт", "пятница"),
+    ("saturday", "sat", "сб", "суббота"),
+    ("sunday", "sun", "вс", "воскресенье"),
+)
+
+
+def normalize_location(location: Optional[str]) -> str:
+    """Город/регион для поиска: нижний регистр, ё -> е, пунктуация и лишние пробелы схлопываются"""
+    return _NON_WORD.sub(" ", (location or "").casefold().replace("ё", "е")).strip()
 
 
 class WorkHours(BaseModel):
@@ -25,6 +44,62 @@ class WorkHours(BaseModel):
         return v
 
 
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+OPEN_HOURS_BYTES = MINUTES_PER_WEEK // 8
+
+
+def find_day_hours(work_hours: Optional[Dict[str, Any]], weekday: int) -> Optional[Any]:
+    """Часы работы дня недели по любому из допустимых ключей WEEKDAY_KEYS"""
+    for key in WEEKDAY_KEYS[weekday]:
+        for day, hours in (work_hours or {}).items():
+            if day.strip().casefold() == key:
+                return hours
+    return None
+
+
+def minute_of_week(moment: datetime) -> int:
+    """Номер минуты недели, понедельник 00:00 - 0"""
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+def _minute(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def open_hours_mask(work_hours: Optional[Dict[str, Any]], is_24_7: bool) -> int:
+    """Недельный график как целое: бит N установлен, если клиника открыта в минуту недели N"""
+    if is_24_7:
+        return (1 << MINUTES_PER_WEEK) - 1
+    mask = 0
+    for weekday in range(7):
+        hours = find_day_hours(work_hours, weekday)
+        if not hours:
+            continue
+        if isinstance(hours, dict):
+            hours = WorkHours(**hours)
+        day_start = weekday * MINUTES_PER_DAY
+        open_minute, close_minute = _minute(hours.open), _minute(hours.close)
+        mask |= ((1 << (close_minute - open_minute)) - 1) << (day_start + open_minute)
+        if hours.break_start and hours.break_end:
+            break_start, break_end = _minute(hours.break_start), _minute(hours.break_end)
+            mask &= ~(((1 << (break_end - break_start)) - 1) << (day_start + break_start))
+    return mask
+
+
+def compile_open_hours(work_hours: Optional[Dict[str, Any]], is_24_7: bool) -> bytes:
+    """Битовая карта недели по минутам (1260 байт). Порядок бит совпадает с get_bit() Postgres:
+    минута N - бит N % 8 (от младшего) байта N // 8
+    """
+    return open_hours_mask(work_hours, is_24_7).to_bytes(OPEN_HOURS_BYTES, 'little')
+
+
+def is_open_in(open_hours: Optional[bytes], minute: int) -> bool:
+    if not open_hours:
+        return False
+    return bool(open_hours[minute // 8] >> (minute % 8) & 1)
+
+
 class Clinic(BaseModel):
     id: int = Field(..., gt=0, description="Уникальный идентификатор клиники")
     organization_id: int = Field(..., gt=0, description="ID организации-владельца")
@@ -38,6 +113,8 @@ class Clinic(BaseModel):
         description="График работы по дням недели (пн-вс)"
     )
     is_24_7: bool = Field(default=False, description="Работает круглосуточно без выходных")
+    latitude: Optional[float] = Field(None, ge=-90, le=90, description="Широта")
+    longitude: Optional[float] = Field(None, ge=-180, le=180, description="Долгота")
 
     @field_validator('name')
     @classmethod
@@ -52,3 +129,7 @@ class Clinic(BaseModel):
         if values.data.get('is_24_7') and any(v.values()):
             raise ValueError("Для круглосуточной клиники не нужно указывать часы работы")
         return v
+
+
+class NearbyClinic(Clinic):
+    distance_km: float = Field(..., ge=0, description="Расстояние до точки поиска")
@@ -0,0 +1,44 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import Dict, List, Optional, Tuple
+
+from src.domain.entity.clinics.clinic_entity import WorkHours
+from src.domain.entity.imports import ImportRowError
+
+
+class ClinicImportRow(BaseModel):
+    """Строка импорта филиалов; ключ upsert - (organization_id, name, address)"""
+    organization_id: int = Field(..., gt=0)
+    name: str = Field(..., min_length=2, max_length=100)
+    location: str = Field(..., min_length=2, max_length=100)
+    address: str = Field(..., min_length=5, max_length=200)
+    # is_24_7 объявлен до work_hours - валидатору графика нужно уже разобранное значение
+    is_24_7: bool = False
+    work_hours: Dict[str, Optional[WorkHours]] = Field(default_factory=dict)
+    is_active: bool = True
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+
+    @field_validator('name', 'location', 'address')
+    @classmethod
+    def strip_text(cls, v: str) -> str:
+        if not v.strip():
+            raise ValueError("Поле не может быть пустым")
+        return v.strip()
+
+    @field_validator('work_hours')
+    @classmethod
+    def validate_work_hours(cls, v: Dict[str, Optional[WorkHours]], values) -> Dict[str, Optional[WorkHours]]:
+        if values.data.get('is_24_7') and any(v.values()):
+            raise ValueError("Для круглосуточной клиники не нужно указывать часы работы")
+        return v
+
+    @property
+    def key(self) -> Tuple[int, str, str]:
+        return self.organization_id, self.name, self.address
+
+
+class ClinicImportReport(BaseModel):
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = Field(default_factory=list)
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field, field_validator, model_validator
+from pydantic import BaseModel, Field, computed_field, field_validator, model_validator
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 from src.domain.entity.users.user import Role  # Импорт ролей пользователей
 from enum import Enum
 
@@ -11,6 +11,13 @@ class ReviewTargetType(str, Enum):
     CLINIC = "clinic"
 
 
+class ReviewSort(str, Enum):
+    NEWEST = "newest"
+    HIGHEST = "highest"
+    LOWEST = "lowest"
+    WITH_RESPONSE_FIRST = "with_response_first"
+
+
 class Review(BaseModel):
     id: Optional[int] = None
     sender_id: int = Field(..., gt=0, description="ID пользователя, оставившего отзыв")
@@ -35,3 +42,39 @@ class Review(BaseModel):
         if not 1 <= v <= 10:
             raise ValueError("Оценка должна быть от 1 до 10")
         return v
+
+
+class ReviewStats(BaseModel):
+    """Агрегат оценок цели: количество, сумма и гистограмма 1-10"""
+    target_type: ReviewTargetType
+    target_id: int
+    count: int = Field(0, ge=0)
+    rate_sum: int = Field(0, ge=0)
+    histogram: Dict[int, int] = Field(default_factory=lambda: {rate: 0 for rate in range(1, 11)})
+
+    @computed_field
+    @property
+    def average(self) -> float:
+        return round(self.rate_sum / self.count, 1) if self.count else 0.0
+
+    def within(self, min_rate: Optional[int] = None, max_rate: Optional[int] = None) -> "ReviewStats":
+        """Агрегат только по оценкам из диапазона - считается по гистограмме, без чтения отзывов"""
+        histogram = {
+            rate: count if (min_rate or 1) <= rate <= (max_rate or 10) else 0
+            for rate, count in self.histogram.items()
+        }
+        return ReviewStats(
+            target_type=self.target_type,
+            target_id=self.target_id,
+            count=sum(histogram.values()),
+            rate_sum=sum(rate * count for rate, count in histogram.items()),
+            histogram=histogram
+        )
+
+
+class LeaderboardEntry(BaseModel):
+    rank: int = Field(..., ge=1)
+    target_id: int
+    score: float = Field(..., description="Байесовское среднее")
+    average: float
+    count: int
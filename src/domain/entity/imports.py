@@ -0,0 +1,12 @@
+from enum import Enum
+from pydantic import BaseModel, Field
+
+
+class ImportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class ImportRowError(BaseModel):
+    row: int = Field(..., description="Номер строки во входных данных (с 1, без заголовка CSV)")
+    error: str
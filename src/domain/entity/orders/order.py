@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
-from src.domain.entity.users.user import Role
+from src.domain.entity.users.user import Role, UserProfileCard
+from src.domain.entity.orders.response import Response
 from datetime import datetime
 from typing import List, Optional
 from enum import Enum
@@ -35,3 +36,12 @@ class Order(OrderBase):
     patient_id: Optional[int] = Field(None, description="ID пациента (если применимо)")
     specialist_id: Optional[int] = Field(None, description="ID специалиста (если применимо)")
     clinic_id: Optional[int] = Field(None, description="ID клиники (если применимо)")
+
+
+class OrderResponseDetails(Response):
+    responser: Optional[UserProfileCard] = Field(None, description="Карточка откликнувшегося")
+
+
+class OrderDetails(BaseModel):
+    order: Order
+    responses: List[OrderResponseDetails] = Field(default_factory=list)
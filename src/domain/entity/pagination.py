@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+MAX_PAGE_SIZE = 100
+
+
+class PageRequest(BaseModel):
+    limit: int = Field(20, ge=1, le=MAX_PAGE_SIZE, description="Размер страницы")
+    cursor: Optional[str] = Field(None, description="Непрозрачный курсор следующей страницы")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
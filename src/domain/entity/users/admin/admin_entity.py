@@ -1,6 +1,9 @@
 from src.domain.entity.users.user import User
 from src.infrastructure.repository.schemas.user_orm import Role
 from enum import Enum
+from datetime import datetime
+from pydantic import BaseModel
+from typing import Optional
 
 
 class AdminRoles(Enum):
@@ -14,3 +17,28 @@ class Admin(User):
     role: Role = Role.ADMIN
     admin_role: AdminRoles
     is_superadmin: bool = False
+
+
+class AdminUserFilter(BaseModel):
+    """Фильтры списка пользователей в админке; None - без ограничения"""
+    role: Optional[Role] = None
+    is_blocked: Optional[bool] = None
+    country: Optional[str] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    nickname_prefix: Optional[str] = None
+
+
+class AdminUserRow(BaseModel):
+    """Строка списка и выгрузки пользователей: только колонки users и блокировка, без профилей"""
+    id: int
+    nickname: str
+    name: str
+    role: Role
+    photo_path: Optional[str] = None
+    country: Optional[str] = None
+    email: str
+    phone_number: Optional[str] = None
+    created_at: Optional[datetime] = None
+    is_blocked: bool = False
+    blocked_reason: Optional[str] = None
@@ -0,0 +1,83 @@
+from datetime import datetime
+from enum import Enum
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Any, Dict, List, Optional
+import json
+
+from src.domain.entity.users.user import Role
+
+
+class UserProvisioningRow(BaseModel):
+    """Строка массового создания пользователей; поля как при регистрации.
+
+    В CSV specifications и locations - JSON-массив или значения через ';'.
+    """
+    nickname: str = Field(..., pattern='^[a-zA-Z0-9_]+$', min_length=4, max_length=20)
+    name: str = Field(..., min_length=2, max_length=30)
+    password: str = Field(..., min_length=8, max_length=30)
+    email: str = Field(..., pattern=r'^[^@\s]+@[^@\s]+$', max_length=254)
+    role: Role
+    country: str = ""
+    phone_number: str = Field(..., min_length=5, max_length=20)
+    photo_path: Optional[str] = None
+    city: Optional[str] = Field(None, min_length=1)
+    specifications: Optional[List[str]] = None
+    qualification: Optional[str] = Field(None, max_length=100)
+    experience_years: int = Field(0, ge=0, le=80)
+    locations: Optional[List[str]] = None
+
+    @field_validator('specifications', 'locations', mode='before')
+    @classmethod
+    def split_list(cls, v: Any) -> Any:
+        if isinstance(v, str):
+            if v.lstrip().startswith('['):
+                return json.loads(v)
+            return [part.strip() for part in v.split(';') if part.strip()]
+        return v
+
+    @model_validator(mode='after')
+    def check_profile(self) -> 'UserProvisioningRow':
+        if self.role == Role.ADMIN:
+            raise ValueError("Admins can not be provisioned in bulk")
+        if self.role == Role.SPECIALIST and not self.specifications:
+            raise ValueError("specifications are required for specialists")
+        if self.role == Role.PATIENT and not self.city:
+            raise ValueError("city is required for patients")
+        if self.role == Role.ORGANIZATION and not self.locations:
+            raise ValueError("locations are required for organizations")
+        return self
+
+    def profile_data(self) -> Dict[str, Any]:
+        return self.model_dump(include={'city', 'specifications', 'qualification', 'experience_years', 'locations'})
+
+
+class ProvisioningJobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ProvisionedUserResult(BaseModel):
+    row: int = Field(..., description="Номер строки во входных данных (с 1, без заголовка CSV)")
+    nickname: Optional[str] = None
+    user_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class ProvisioningJob(BaseModel):
+    id: str
+    owner_id: int
+    status: ProvisioningJobStatus = ProvisioningJobStatus.PENDING
+    total: int = 0
+    processed: int = 0
+    created: int = 0
+    failed: int = 0
+    error: Optional[str] = Field(None, description="Ошибка, прервавшая задачу целиком")
+    results: List[ProvisionedUserResult] = Field(default_factory=list)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (ProvisioningJobStatus.COMPLETED, ProvisioningJobStatus.FAILED)
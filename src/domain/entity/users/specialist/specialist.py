@@ -1,4 +1,4 @@
-from pydantic import Field
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from src.domain.entity.users.user import User
 from src.infrastructure.repository.schemas.user_orm import Role
@@ -9,3 +9,16 @@ class Specialist(User):
     specifications: List[str] = Field(..., min_items=1)
     qualification: Optional[str] = Field(None, max_length=100)
     experience_years: int = Field(0, ge=0)
+
+
+class SpecialistDirectoryCard(BaseModel):
+    """Карточка каталога специалистов: только колонки списка, без загрузки профиля целиком"""
+    id: int
+    nickname: str
+    name: str
+    photo_path: Optional[str] = None
+    country: Optional[str] = None
+    specifications: List[str] = Field(default_factory=list)
+    qualification: Optional[str] = None
+    experience_years: int = 0
+    is_verified: bool = False
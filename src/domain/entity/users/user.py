@@ -1,7 +1,7 @@
 from src.infrastructure.repository.schemas.user_orm import Role
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional, Union
+from typing import List, Optional, Union
 
 
 
@@ -33,3 +33,17 @@ class UserPrivate(UserInput):
 
 class UserFull(UserPrivate):
     created_at: datetime
+
+
+class UserProfileCard(BaseModel):
+    """Публичная карточка пользователя для списков (без приватных полей)"""
+    id: int
+    nickname: str
+    name: str
+    role: Role
+    photo_path: Optional[str] = None
+    country: Optional[str] = None
+    specifications: Optional[List[str]] = None
+    qualification: Optional[str] = None
+    experience_years: Optional[int] = None
+    city: Optional[str] = None
@@ -0,0 +1,27 @@
+from abc import ABC, abstractmethod
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.domain.entity.clinics.appointment import Appointment
+from typing import List, Optional
+
+
+class IAppointmentsRepository(ABC):
+    @property
+    @abstractmethod
+    def session(self) -> AsyncSession:
+        pass
+
+    @abstractmethod
+    async def get_appointment(self, appointment_id: int) -> Optional[Appointment]:
+        pass
+
+    @abstractmethod
+    async def book(self, appointment: Appointment) -> Appointment:
+        pass
+
+    @abstractmethod
+    async def cancel(self, appointment_id: int) -> Optional[Appointment]:
+        pass
+
+    @abstractmethod
+    async def get_patient_appointments(self, patient_id: int, upcoming_only: bool = True) -> List[Appointment]:
+        pass
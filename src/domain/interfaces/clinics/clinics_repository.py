@@ -1,6 +1,10 @@
 from abc import ABC, abstractmethod
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.domain.entity.clinics.clinic_entity import Clinic
+from src.domain.entity.clinics.clinic_entity import Clinic, NearbyClinic
+from src.domain.entity.clinics.clinic_import import ClinicImportRow
+from src.domain.entity.pagination import Page, PageRequest
+from datetime import datetime
+from typing import List, Optional, Tuple
 
 
 class IClinicsRepository(ABC):
@@ -14,11 +18,30 @@ class IClinicsRepository(ABC):
         pass
 
     @abstractmethod
-    def get_clinics_by_location(self, location: str) -> list[Clinic]:
+    def get_clinics_by_location(
+            self,
+            location: str,
+            page: Optional[PageRequest] = None,
+            *,
+            open_at: Optional[datetime] = None
+    ) -> Page[Clinic]:
         pass
 
     @abstractmethod
-    def get_clinics_by_organization(self, organization_id: int) -> list[Clinic]:
+    def get_clinics_by_organization(self, organization_id: int, page: Optional[PageRequest] = None) -> Page[Clinic]:
+        pass
+
+    @abstractmethod
+    def get_nearest_clinics(
+            self,
+            latitude: float,
+            longitude: float,
+            radius_km: float,
+            *,
+            is_24_7: Optional[bool] = None,
+            open_at: Optional[datetime] = None,
+            page: Optional[PageRequest] = None
+    ) -> Page[NearbyClinic]:
         pass
 
     @abstractmethod
@@ -29,6 +52,10 @@ class IClinicsRepository(ABC):
     def update_clinic(self, clinic: Clinic) -> bool:
         pass
 
+    @abstractmethod
+    def upsert_clinics(self, rows: List[ClinicImportRow]) -> Tuple[int, int]:
+        pass
+
     @abstractmethod
     def delete_clinic(self, clinic_id: int) -> bool:
         pass
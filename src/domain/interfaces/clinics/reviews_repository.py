@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.domain.entity.clinics.reviews import Review, ReviewTargetType
-from typing import Optional, List
+from src.domain.entity.clinics.reviews import Review, ReviewTargetType, ReviewStats, ReviewSort
+from typing import Dict, Iterable, Optional, List, Tuple
+from src.domain.entity.pagination import Page, PageRequest
 
 
 class IReviewRepository(ABC):
@@ -37,8 +38,10 @@ class IReviewRepository(ABC):
             target_type: ReviewTargetType,
             *,
             min_rating: Optional[int] = None,
-            max_rating: Optional[int] = None
-    ) -> List[Review]:
+            max_rating: Optional[int] = None,
+            sort: ReviewSort = ReviewSort.NEWEST,
+            page: Optional[PageRequest] = None
+    ) -> Page[Review]:
         pass
 
     @abstractmethod
@@ -57,3 +60,18 @@ class IReviewRepository(ABC):
             target_id: int
     ) -> bool:
         pass
+
+    @abstractmethod
+    async def get_review_stats(self, target_type: ReviewTargetType, target_id: int) -> ReviewStats:
+        pass
+
+    @abstractmethod
+    async def get_review_stats_batch(
+            self,
+            targets: Iterable[Tuple[ReviewTargetType, int]]
+    ) -> Dict[Tuple[ReviewTargetType, int], ReviewStats]:
+        pass
+
+    @abstractmethod
+    async def rebuild_review_stats(self) -> int:
+        pass
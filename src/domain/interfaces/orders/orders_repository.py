@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.domain.entity.orders.order import Order, OrderStatus, OrderCreate
-from src.domain.entity.users.user import Role
+from src.infrastructure.repository.schemas.order_orm import OrderCreatorRole
+from datetime import datetime
+from src.domain.entity.pagination import Page, PageRequest
 from typing import List, Optional
 
 
@@ -15,30 +17,42 @@ class IOrdersRepository(ABC):
     async def get_order(self, order_id: int) -> Optional[Order]:
         pass
 
+    @abstractmethod
+    async def get_order_status(self, order_id: int) -> Optional[OrderStatus]:
+        pass
+
     @abstractmethod
     async def create_order(self, order_data: OrderCreate) -> Order:
         pass
 
     @abstractmethod
-    async def get_orders_by_creator(self, creator_id: int) -> List[Order]:
+    async def get_orders_by_ids(self, order_ids: List[int]) -> List[Order]:
+        pass
+
+    @abstractmethod
+    async def get_orders_by_creator(self, creator_id: int, page: Optional[PageRequest] = None) -> Page[Order]:
         pass
 
     @abstractmethod
-    async def get_orders_for_patient(self, patient_id: int) -> List[Order]:
+    async def get_orders_for_patient(self, patient_id: int, page: Optional[PageRequest] = None) -> Page[Order]:
         pass
 
     @abstractmethod
-    async def get_orders_for_specialist(self, specialist_id: int) -> List[Order]:
+    async def get_orders_for_specialist(self, specialist_id: int, page: Optional[PageRequest] = None) -> Page[Order]:
         pass
 
     @abstractmethod
-    async def get_orders_for_clinic(self, clinic_id: int) -> List[Order]:
+    async def get_orders_for_clinic(self, clinic_id: int, page: Optional[PageRequest] = None) -> Page[Order]:
         pass
 
     @abstractmethod
     async def update_order_status(self, order_id: int, status: OrderStatus) -> bool:
         pass
 
+    @abstractmethod
+    async def expire_overdue_orders(self, now: datetime, batch_size: int = 500) -> List[int]:
+        pass
+
     @abstractmethod
     async def update_order_responses_count(self, order_id: int, increment: int = 1) -> bool:
         pass
@@ -54,3 +68,17 @@ class IOrdersRepository(ABC):
     @abstractmethod
     async def get_orders_by_status(self, status: OrderStatus) -> List[Order]:
         pass
+
+    @abstractmethod
+    async def get_active_orders_feed(
+            self,
+            viewer_id: int,
+            *,
+            service_type: Optional[str] = None,
+            specifications: Optional[List[str]] = None,
+            date_from: Optional[datetime] = None,
+            date_to: Optional[datetime] = None,
+            creator_role: Optional[OrderCreatorRole] = None,
+            page: Optional[PageRequest] = None
+    ) -> Page[Order]:
+        pass
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.domain.entity.orders.response import Response, ResponseStatus, ResponseCreate
+from src.domain.entity.pagination import Page, PageRequest
 from typing import List, Optional
 from src.domain.entity.users.user import Role
 
@@ -31,8 +32,9 @@ class IResponseRepository(ABC):
     async def get_order_responses(
             self,
             order_id: int,
-            status: Optional[ResponseStatus] = None
-    ) -> List[Response]:
+            status: Optional[ResponseStatus] = None,
+            page: Optional[PageRequest] = None
+    ) -> Page[Response]:
         pass
 
     @abstractmethod
@@ -40,8 +42,9 @@ class IResponseRepository(ABC):
             self,
             user_id: int,
             role: Optional[Role] = None,
-            status: Optional[ResponseStatus] = None
-    ) -> List[Response]:
+            status: Optional[ResponseStatus] = None,
+            page: Optional[PageRequest] = None
+    ) -> Page[Response]:
         pass
 
     @abstractmethod
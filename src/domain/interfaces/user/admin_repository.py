@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
-from src.domain.entity.users.admin.admin_entity import Admin, AdminRoles
-from typing import Optional
+from src.domain.entity.users.admin.admin_entity import Admin, AdminRoles, AdminUserFilter, AdminUserRow
+from src.domain.entity.pagination import Page, PageRequest
+from typing import AsyncIterator, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -31,3 +32,19 @@ class IAdminRepository(ABC):
             is_superadmin: bool
     ) -> Admin:
         pass
+
+    @abstractmethod
+    async def get_all_users(
+            self,
+            page: Optional[PageRequest] = None,
+            filters: Optional[AdminUserFilter] = None
+    ) -> Page[AdminUserRow]:
+        pass
+
+    @abstractmethod
+    def stream_users(self, filters: Optional[AdminUserFilter] = None) -> AsyncIterator[AdminUserRow]:
+        pass
+
+    @abstractmethod
+    async def set_specialist_verified(self, user_id: int, is_verified: bool) -> bool:
+        pass
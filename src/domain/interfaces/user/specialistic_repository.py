@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
-from src.domain.entity.users.specialist.specialist import Specialist
-from typing import Optional, List
+from src.domain.entity.users.specialist.specialist import Specialist, SpecialistDirectoryCard
+from src.domain.entity.pagination import Page, PageRequest
+from typing import Optional, List, Iterable
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -20,6 +21,10 @@ class ISpecialistRepository(ABC):
     ) -> Specialist:
         pass
 
+    @abstractmethod
+    def index_specialist(self, user_id: int, specifications: List[str]):
+        pass
+
     @abstractmethod
     async def get_specialist_profile(self, user_id: int) -> Optional[Specialist]:
         pass
@@ -39,3 +44,15 @@ class ISpecialistRepository(ABC):
             qualification: str
     ) -> Specialist:
         pass
+
+    @abstractmethod
+    async def search_directory(
+            self,
+            *,
+            specifications: Optional[Iterable[str]] = None,
+            min_experience: Optional[int] = None,
+            is_verified: Optional[bool] = None,
+            country: Optional[str] = None,
+            page: Optional[PageRequest] = None
+    ) -> Page[SpecialistDirectoryCard]:
+        pass
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
-from src.domain.entity.users.user import UserInput, User, UserFull
-from typing import Optional, ClassVar
+from src.domain.entity.users.user import UserInput, User, UserFull, UserProfileCard
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, ClassVar
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 from src.infrastructure.repository.schemas.user_orm import Role
@@ -31,14 +31,57 @@ class IUserRepository(ABC):
     async def create(self, user: UserInput) -> str | Exception:
         pass
 
+    @abstractmethod
+    async def create_with_profile(self, user_input: UserInput, profile_data: Dict[str, Any]) -> User:
+        pass
+
+    @abstractmethod
+    async def get_settings_state(self, user_id: int) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    async def patch_settings(
+            self,
+            user_id: int,
+            role: Role,
+            user_fields: Dict[str, Any],
+            profile_fields: Dict[str, Any],
+            previous: Optional[Dict[str, str]] = None
+    ):
+        pass
+
+    @abstractmethod
+    async def find_taken_identities(self, nicknames: Iterable[str], emails: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+        pass
+
+    @abstractmethod
+    async def provision_users(
+            self,
+            users: List[Tuple[UserInput, Dict[str, Any]]],
+            organization_id: Optional[int] = None
+    ) -> Dict[str, int]:
+        pass
+
     @abstractmethod
     async def get_by_id(self, id: int) -> Optional[User]:
         pass
 
+    @abstractmethod
+    async def get_by_ids(self, user_ids: Iterable[int]) -> Dict[int, User]:
+        pass
+
     @abstractmethod
     async def get_by_nickname(self, nickname: str) -> Optional[User]:
         pass
 
+    @abstractmethod
+    async def get_profile_cards(self, user_ids_by_role: Dict[Role, Iterable[int]]) -> Dict[int, UserProfileCard]:
+        pass
+
+    @abstractmethod
+    async def get_profile_cards_by_ids(self, user_ids: Iterable[int]) -> Dict[int, UserProfileCard]:
+        pass
+
     @abstractmethod
     async def update(self, user_id: int, update_data: dict) -> bool:
         pass
@@ -78,3 +121,11 @@ class IUserRepository(ABC):
     @abstractmethod
     async def check_email_exists(self, mail: str) -> bool:
         pass
+
+    @abstractmethod
+    async def is_nickname_available(self, nickname: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def is_email_available(self, email: str) -> bool:
+        pass
@@ -14,4 +14,17 @@ class InvalidResponseActionError(Exception):
     """Недопустимое действие с откликом"""
     def __init__(self, message="Invalid response action"):
         self.message = message
-        super().__init__(self.message)
\ No newline at end of file
+        super().__init__(self.message)
+
+class InvalidCursorError(ValueError):
+    """Курсор пагинации поврежден, подделан или выдан для другой сортировки"""
+    def __init__(self, message="Invalid pagination cursor"):
+        self.message = message
+        super().__init__(self.message)
+
+
+class SlotUnavailableError(Exception):
+    """Слот записи уже занят или клиника в это время не работает"""
+    def __init__(self, message="Appointment slot is not available"):
+        self.message = message
+        super().__init__(self.message)
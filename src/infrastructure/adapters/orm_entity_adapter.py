@@ -8,6 +8,7 @@ from src.domain.entity.chats.chat_entity import Chat, Message, MessageType, Voic
     ImageMessage
 from src.domain.entity.clinics.clinic_entity import Clinic, WorkHours
 from src.domain.entity.clinics.reviews import Review, ReviewTargetType
+from src.domain.entity.clinics.appointment import Appointment
 from src.domain.entity.orders.order import Order, OrderStatus
 from src.domain.entity.orders.response import Response, ResponseStatus, ResponseCreate
 from src.infrastructure.repository.schemas.enums import ResponseStatusEnum
@@ -22,6 +23,7 @@ from src.infrastructure.repository.schemas.clinic_orm import ClinicOrm
 from src.infrastructure.repository.schemas.order_orm import OrderOrm, OrderCreatorRole
 from src.infrastructure.repository.schemas.responses_orm import ResponseOrm
 from src.infrastructure.repository.schemas.review_orm import ReviewOrm
+from src.infrastructure.repository.schemas.appointment_orm import AppointmentOrm
 from src.infrastructure.repository.schemas.user_orm import UserOrm, SpecialistOrm, AdminOrm, PatientOrm, \
     OrganizationOrm, BlockedUserOrm, RoleEnum
 from enum import Enum
@@ -80,6 +82,7 @@ class UserOrmEntityAdapter:
                     'legal_name': getattr(user_orm.organization, 'legal_name', None),
                     'locations': getattr(user_orm.organization, 'locations', []),
                     'clinics': clinics,
+                    'members': list(getattr(user_orm.organization, 'members', None) or []),
                     'appointments': getattr(user_orm.organization, 'appointments', []),
                 }
             elif user_orm.role == Role.ADMIN.value and user_orm.admin:
@@ -181,7 +184,9 @@ class ClinicOrmEntityAdapter:
                 created_at=clinic_orm.created_at,
                 is_active=clinic_orm.is_active,
                 work_hours=work_hours,
-                is_24_7=clinic_orm.is_24_7
+                is_24_7=clinic_orm.is_24_7,
+                latitude=clinic_orm.latitude,
+                longitude=clinic_orm.longitude
             )
         except ValidationError as e:
             self._logger.error(f"Validation error: {e}")
@@ -206,7 +211,9 @@ class ClinicOrmEntityAdapter:
                 created_at=clinic.created_at,
                 is_active=clinic.is_active,
                 work_hours=work_hours,
-                is_24_7=clinic.is_24_7
+                is_24_7=clinic.is_24_7,
+                latitude=clinic.latitude,
+                longitude=clinic.longitude
             )
         except Exception as e:
             self._logger.error(f"Entity to ORM error: {e}", exc_info=True)
@@ -357,6 +364,46 @@ class ReviewOrmEntityAdapter:
             raise
 
 
+class AppointmentOrmEntityAdapter:
+    def __init__(self, **kwargs):
+        self._logger = logging.getLogger(__name__)
+
+    async def to_entity(self, appointment_orm: AppointmentOrm) -> Appointment:
+        try:
+            return Appointment(
+                id=appointment_orm.id,
+                clinic_id=appointment_orm.clinic_id,
+                specialist_id=appointment_orm.specialist_id,
+                patient_id=appointment_orm.patient_id,
+                starts_at=appointment_orm.starts_at,
+                ends_at=appointment_orm.ends_at,
+                status=appointment_orm.status,
+                created_at=appointment_orm.created_at
+            )
+        except ValidationError as e:
+            self._logger.error(f"Validation error: {e}")
+            raise
+        except Exception as e:
+            self._logger.error(f"ORM to Entity error: {e}", exc_info=True)
+            raise
+
+    async def to_orm(self, appointment: Appointment) -> AppointmentOrm:
+        try:
+            return AppointmentOrm(
+                id=appointment.id,
+                clinic_id=appointment.clinic_id,
+                specialist_id=appointment.specialist_id,
+                patient_id=appointment.patient_id,
+                starts_at=appointment.starts_at,
+                ends_at=appointment.ends_at,
+                status=appointment.status,
+                created_at=appointment.created_at
+            )
+        except Exception as e:
+            self._logger.error(f"Entity to ORM error: {e}", exc_info=True)
+            raise
+
+
 class ChatOrmEntityAdapter:
     def __init__(self, **kwargs):
         self._logger = logging.getLogger(__name__)
@@ -0,0 +1,104 @@
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.domain.entity.clinics.appointment import Appointment, AppointmentStatus, clinic_local_now
+from src.domain.interfaces.clinics.appointments_repository import IAppointmentsRepository
+from src.infrastructure.adapters.orm_entity_adapter import AppointmentOrmEntityAdapter
+from src.infrastructure.repository.schemas.appointment_orm import AppointmentOrm
+from src.infrastructure.services.appointments.availability import AvailabilityIndex
+from src.infrastructure.repository.errors import violated_constraint
+from src.exceptions import SlotUnavailableError
+from datetime import datetime
+from typing import List, Optional
+import logging
+
+# Уникальные индексы слотов и их колонки (SQLite сообщает колонки, а не имя индекса)
+SLOT_INDEXES = {
+    'uq_appointments_clinic_slot': ('appointments.clinic_id', 'appointments.starts_at'),
+    'uq_appointments_specialist_slot': ('appointments.specialist_id', 'appointments.starts_at'),
+}
+
+
+class PostgresAppointmentsRepo(IAppointmentsRepository):
+    def __init__(
+            self,
+            session: AsyncSession,
+            adapter: AppointmentOrmEntityAdapter,
+            availability: Optional[AvailabilityIndex] = None
+    ):
+        self._session = session
+        self._adapter = adapter
+        self._availability = availability
+        self._logger = logging.getLogger(__name__)
+
+    @property
+    def session(self) -> AsyncSession:
+        return self._session
+
+    async def get_appointment(self, appointment_id: int) -> Optional[Appointment]:
+        try:
+            appointment_orm = await self._session.get(AppointmentOrm, appointment_id)
+            return await self._adapter.to_entity(appointment_orm) if appointment_orm else None
+        except Exception as e:
+            self._logger.error(f"Error getting appointment: {e}", exc_info=True)
+            raise
+
+    async def book(self, appointment: Appointment) -> Appointment:
+        """Одна вставка: занятость слота проверяет частичный уникальный индекс, а не SELECT перед INSERT"""
+        try:
+            appointment_orm = await self._adapter.to_orm(appointment)
+            appointment_orm.status = AppointmentStatus.BOOKED
+            self._session.add(appointment_orm)
+            await self._session.commit()
+        except IntegrityError as e:
+            await self._session.rollback()
+            if violated_constraint(e, SLOT_INDEXES) is not None:
+                # Слот занял другой воркер - отмечаем и у себя, чтобы не предлагать его до пересборки
+                self._sync_booked(appointment)
+                raise SlotUnavailableError("Appointment slot is already booked")
+            self._logger.error(f"Error booking appointment: {e}", exc_info=True)
+            raise
+        except Exception as e:
+            self._logger.error(f"Error booking appointment: {e}", exc_info=True)
+            await self._session.rollback()
+            raise
+        booked = await self._adapter.to_entity(appointment_orm)
+        self._sync_booked(booked)
+        return booked
+
+    async def cancel(self, appointment_id: int) -> Optional[Appointment]:
+        try:
+            appointment_orm = await self._session.get(AppointmentOrm, appointment_id)
+            if appointment_orm is None:
+                return None
+            if appointment_orm.status == AppointmentStatus.BOOKED:
+                appointment_orm.status = AppointmentStatus.CANCELLED
+                appointment_orm.cancelled_at = datetime.utcnow()
+                await self._session.commit()
+                if self._availability is not None:
+                    self._availability.release(
+                        appointment_orm.clinic_id, appointment_orm.specialist_id, appointment_orm.starts_at
+                    )
+            return await self._adapter.to_entity(appointment_orm)
+        except Exception as e:
+            self._logger.error(f"Error cancelling appointment: {e}", exc_info=True)
+            await self._session.rollback()
+            raise
+
+    async def get_patient_appointments(self, patient_id: int, upcoming_only: bool = True) -> List[Appointment]:
+        try:
+            stmt = select(AppointmentOrm).where(AppointmentOrm.patient_id == patient_id)
+            if upcoming_only:
+                stmt = stmt.where(
+                    AppointmentOrm.status == AppointmentStatus.BOOKED,
+                    AppointmentOrm.starts_at >= clinic_local_now()
+                )
+            result = await self._session.execute(stmt.order_by(AppointmentOrm.starts_at, AppointmentOrm.id))
+            return [await self._adapter.to_entity(appointment_orm) for appointment_orm in result.scalars().all()]
+        except Exception as e:
+            self._logger.error(f"Error getting patient appointments: {e}", exc_info=True)
+            raise
+
+    def _sync_booked(self, appointment: Appointment):
+        if self._availability is not None:
+            self._availability.book(appointment.clinic_id, appointment.specialist_id, appointment.starts_at)
@@ -2,14 +2,52 @@ from src.domain.interfaces.clinics.clinics_repository import IClinicsRepository
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.infrastructure.adapters.orm_entity_adapter import ClinicOrmEntityAdapter
 from src.infrastructure.repository.schemas.clinic_orm import ClinicOrm
-from sqlalchemy import select
+from src.domain.entity.clinics.clinic_entity import Clinic
+from src.domain.entity.pagination import Page, PageRequest
+from src.infrastructure.repository.pagination import SortKey, paginate, encode_cursor, decode_cursor
+from src.infrastructure.services.ratings.leaderboard import RatingLeaderboard
+from src.infrastructure.services.clinics.location_index import (
+    LocationIndex, RANK_EXACT, RANK_PREFIX, RANK_WORD_PREFIX, RANK_FUZZY
+)
+from src.infrastructure.services.clinics.geo_index import ClinicGeoIndex
+from src.infrastructure.services.clinics.catalog import ClinicCatalog
+from src.infrastructure.repository.loaders import EntityLoaders
+from src.domain.entity.clinics.clinic_entity import (
+    normalize_location, minute_of_week, compile_open_hours, NearbyClinic
+)
+from src.domain.entity.clinics.clinic_import import ClinicImportRow
+from src.domain.entity.clinics.reviews import ReviewTargetType
+from sqlalchemy import select, insert, update, case, cast, func, or_, tuple_, Integer
+from datetime import datetime
+from typing import List, Optional, Tuple
+from bisect import bisect_right
 import logging
 
+CLINIC_SORT_KEYS = (SortKey(ClinicOrm.id),)
+# Курсор поиска ближайших: расстояние до точки зависит от запроса, колонка задается в самом запросе
+NEAREST_SORT_KEYS = (SortKey(None, name='distance_km'), SortKey(ClinicOrm.id))
+# Курсор поиска по городу одинаков для БД и для снимка каталога
+LOCATION_SORT_KEYS = (SortKey(None, descending=True, name='rank'), SortKey(ClinicOrm.id))
+
 
 class PostgresClinicsRepo(IClinicsRepository):
-    def __init__(self, session: AsyncSession, adapter: ClinicOrmEntityAdapter):
+    def __init__(
+            self,
+            session: AsyncSession,
+            adapter: ClinicOrmEntityAdapter,
+            leaderboard: Optional[RatingLeaderboard] = None,
+            location_index: Optional[LocationIndex] = None,
+            geo_index: Optional[ClinicGeoIndex] = None,
+            catalog: Optional[ClinicCatalog] = None,
+            loaders: Optional[EntityLoaders] = None
+    ):
         self._session = session
         self._adapter = adapter
+        self._leaderboard = leaderboard
+        self._location_index = location_index
+        self._geo_index = geo_index
+        self._catalog = catalog
+        self._loaders = loaders
         self._logger = logging.getLogger(__name__)
 
     @property
@@ -18,6 +56,13 @@ class PostgresClinicsRepo(IClinicsRepository):
 
     async def get_clinic(self, clinic_id: int):
         try:
+            if self._catalog_ready:
+                clinic = self._catalog.get(clinic_id)
+                if clinic is not None:
+                    return clinic
+            # Промах снимка - клиника могла появиться в другом воркере до очередной сверки версии
+            if self._loaders:
+                return await self._loaders.clinics.load(int(clinic_id))
             clinic_orm = await self._session.get(ClinicOrm, clinic_id)
             if clinic_orm:
                 return await self._adapter.to_entity(clinic_orm)
@@ -26,32 +71,206 @@ class PostgresClinicsRepo(IClinicsRepository):
             self._logger.error(f"Error getting clinic: {e}", exc_info=True)
             raise
 
-    async def get_clinics_by_location(self, location: str, limit: int = 100, offset: int = 0):
+    async def get_clinics_by_location(
+            self,
+            location: str,
+            page: Optional[PageRequest] = None,
+            *,
+            open_at: Optional[datetime] = None
+    ) -> Page[Clinic]:
+        """Поиск по городу с учетом опечаток: точное совпадение, префикс, начало слова, похожие названия"""
         try:
-            stmt = (
-                select(ClinicOrm)
-                .where(ClinicOrm.location.ilike(f"%{location}%"))
-                .limit(limit)
-                .offset(offset)
+            query = normalize_location(location)
+            open_minute = minute_of_week(open_at) if open_at is not None else None
+            # Снимок отстал от чужих записей (или не загружен) - ищем в БД до ближайшей сверки версии
+            if self._catalog is not None and self._catalog.is_current and self._location_index is not None:
+                return self._catalog_clinics_by_location(query, page, open_minute)
+
+            rank = self._location_rank(query)
+            if rank is None:
+                return Page(items=[], next_cursor=None)
+
+            rank_expr, condition = rank
+            stmt = select(ClinicOrm, rank_expr.label('rank'), ClinicOrm.id).where(
+                condition, ClinicOrm.is_active.is_(True)
             )
-            result = await self._session.execute(stmt)
-            clinics = result.scalars().all()
-            return [await self._adapter.to_entity(clinic) for clinic in clinics]
+            if open_minute is not None:
+                stmt = stmt.where(self._open_at_condition(open_minute))
+            sort_keys = (SortKey(rank_expr, descending=True, name='rank'), SortKey(ClinicOrm.id))
+
+            async def to_item(row):
+                return await self._adapter.to_entity(row.ClinicOrm)
+
+            return await paginate(self._session, stmt, sort_keys, page, to_item=to_item, scalars=False)
         except Exception as e:
             self._logger.error(f"Error getting clinics by location: {e}", exc_info=True)
             raise
 
-    async def get_clinics_by_organization(self, organization_id: int, limit: int = 100, offset: int = 0):
-        try:
-            stmt = (
-                select(ClinicOrm)
-                .where(ClinicOrm.organization_id == organization_id)
-                .limit(limit)
-                .offset(offset)
+    def _catalog_clinics_by_location(
+            self, query: str, page: Optional[PageRequest], open_minute: Optional[int] = None
+    ) -> Page[Clinic]:
+        """Тот же порядок (ранг по убыванию, id), что и в БД, но по снимку каталога"""
+        ranks = self._location_index.search(query) if query else {}
+        open_ids = self._catalog.open_clinic_ids(open_minute) if open_minute is not None else None
+        candidates = sorted(
+            (-rank, clinic_id)
+            for location, rank in ranks.items()
+            for clinic_id in self._catalog.location_clinic_ids(location)
+            if open_ids is None or clinic_id in open_ids
+        )
+        if page is None:
+            return Page(items=[self._catalog.get(clinic_id) for _, clinic_id in candidates], next_cursor=None)
+
+        if page.cursor:
+            after_rank, after_id = decode_cursor(page.cursor, LOCATION_SORT_KEYS)
+            candidates = candidates[bisect_right(candidates, (-after_rank, after_id)):]
+        next_cursor = None
+        if len(candidates) > page.limit:
+            candidates = candidates[:page.limit]
+            negative_rank, last_id = candidates[-1]
+            next_cursor = encode_cursor(LOCATION_SORT_KEYS, [-negative_rank, last_id])
+        return Page(items=[self._catalog.get(clinic_id) for _, clinic_id in candidates], next_cursor=next_cursor)
+
+    def _location_rank(self, query: str):
+        """(выражение ранга, условие отбора) для текущего диалекта; None - совпадений заведомо нет"""
+        if not query:
+            return None
+        column = ClinicOrm.location_normalized
+        prefix = column.startswith(query, autoescape=True)
+        word_prefix = column.contains(f" {query}", autoescape=True)
+
+        if self._session.bind.dialect.name == 'postgresql':
+            # Все условия обслуживает GIN-индекс gin_trgm_ops
+            rank = case(
+                (column == query, RANK_EXACT),
+                (prefix, RANK_PREFIX),
+                (word_prefix, RANK_WORD_PREFIX),
+                else_=cast(func.similarity(column, query) * RANK_FUZZY, Integer)
             )
-            result = await self._session.execute(stmt)
-            clinics = result.scalars().all()
-            return [await self._adapter.to_entity(clinic) for clinic in clinics]
+            return rank, or_(prefix, word_prefix, column.op('%')(query))
+
+        if self._location_index is None:
+            # Без индекса в памяти - только префикс по btree, без опечаток
+            return case((column == query, RANK_EXACT), else_=RANK_PREFIX), prefix
+
+        ranks = self._location_index.search(query)
+        if not ranks:
+            return None
+        return case(ranks, value=column, else_=0), column.in_(list(ranks))
+
+    async def get_nearest_clinics(
+            self,
+            latitude: float,
+            longitude: float,
+            radius_km: float,
+            *,
+            is_24_7: Optional[bool] = None,
+            open_at: Optional[datetime] = None,
+            page: Optional[PageRequest] = None
+    ) -> Page[NearbyClinic]:
+        """Активные клиники в радиусе по возрастанию расстояния, keyset по (distance_km, id).
+
+        open_at проверяется по битовой карте open_hours до загрузки строк, а не по JSON графика.
+        """
+        try:
+            after = decode_cursor(page.cursor, NEAREST_SORT_KEYS) if page and page.cursor else None
+            limit = page.limit + 1 if page else None
+            open_minute = minute_of_week(open_at) if open_at is not None else None
+
+            if self._session.bind.dialect.name == 'postgresql':
+                rows = await self._nearest_earthdistance(
+                    latitude, longitude, radius_km, is_24_7, open_minute, after, limit
+                )
+            elif self._geo_index is not None:
+                rows = await self._nearest_grid(latitude, longitude, radius_km, is_24_7, open_minute, after, limit)
+            else:
+                raise RuntimeError("Nearest clinic search requires earthdistance or the in-memory geo index")
+
+            next_cursor = None
+            if page is not None and len(rows) > page.limit:
+                rows = rows[:page.limit]
+                # В ответе расстояние округлено, курсору нужно исходное
+                distance, last = rows[-1]
+                next_cursor = encode_cursor(NEAREST_SORT_KEYS, [distance, last.id])
+
+            items = []
+            for distance, clinic_orm in rows:
+                clinic = await self._adapter.to_entity(clinic_orm)
+                items.append(NearbyClinic(**clinic.model_dump(), distance_km=round(distance, 3)))
+            return Page(items=items, next_cursor=next_cursor)
+        except Exception as e:
+            self._logger.error(f"Error getting nearest clinics: {e}", exc_info=True)
+            raise
+
+    async def _nearest_earthdistance(
+            self, latitude, longitude, radius_km, is_24_7, open_minute, after, limit
+    ) -> List[Tuple[float, ClinicOrm]]:
+        origin = func.ll_to_earth(latitude, longitude)
+        position = func.ll_to_earth(ClinicOrm.latitude, ClinicOrm.longitude)
+        distance = func.earth_distance(origin, position) / 1000.0
+        stmt = select(ClinicOrm, distance.label('distance_km')).where(
+            ClinicOrm.is_active.is_(True),
+            ClinicOrm.latitude.isnot(None),
+            func.earth_box(origin, radius_km * 1000.0).op('@>')(position),
+            distance <= radius_km
+        )
+        if is_24_7 is not None:
+            stmt = stmt.where(ClinicOrm.is_24_7.is_(is_24_7))
+        if open_minute is not None:
+            stmt = stmt.where(self._open_at_condition(open_minute))
+        if after is not None:
+            stmt = stmt.where(tuple_(distance, ClinicOrm.id) > tuple_(*after))
+        stmt = stmt.order_by(distance, ClinicOrm.id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        result = await self._session.execute(stmt)
+        return [(row.distance_km, row.ClinicOrm) for row in result.all()]
+
+    def _open_at_condition(self, open_minute: int):
+        """Бит минуты в open_hours; в SQLite нет get_bit - байт карты сравнивается со всеми значениями с этим битом"""
+        if self._session.bind.dialect.name == 'postgresql':
+            return func.get_bit(ClinicOrm.open_hours, open_minute) == 1
+        bit = 1 << open_minute % 8
+        return func.substr(ClinicOrm.open_hours, open_minute // 8 + 1, 1).in_(
+            [bytes([value]) for value in range(256) if value & bit]
+        )
+
+    async def _nearest_grid(
+            self, latitude, longitude, radius_km, is_24_7, open_minute, after, limit
+    ) -> List[Tuple[float, ClinicOrm]]:
+        candidates = self._geo_index.within(
+            latitude, longitude, radius_km, is_24_7=is_24_7, open_minute=open_minute
+        )
+        if after is not None:
+            candidates = [candidate for candidate in candidates if candidate > tuple(after)]
+        candidates = candidates[:limit]
+        if not candidates:
+            return []
+        result = await self._session.execute(
+            select(ClinicOrm).where(ClinicOrm.id.in_([clinic_id for _, clinic_id in candidates]))
+        )
+        clinics = {clinic_orm.id: clinic_orm for clinic_orm in result.scalars().all()}
+        return [(distance, clinics[clinic_id]) for distance, clinic_id in candidates if clinic_id in clinics]
+
+    async def get_clinics_by_organization(
+            self,
+            organization_id: int,
+            page: Optional[PageRequest] = None
+    ) -> Page[Clinic]:
+        try:
+            if self._catalog_ready:
+                after_id = decode_cursor(page.cursor, CLINIC_SORT_KEYS)[0] if page and page.cursor else 0
+                clinics = self._catalog.organization_clinics(
+                    organization_id, after_id, page.limit + 1 if page else None
+                )
+                next_cursor = None
+                if page is not None and len(clinics) > page.limit:
+                    clinics = clinics[:page.limit]
+                    next_cursor = encode_cursor(CLINIC_SORT_KEYS, [clinics[-1].id])
+                return Page(items=clinics, next_cursor=next_cursor)
+
+            stmt = select(ClinicOrm).where(ClinicOrm.organization_id == organization_id)
+            return await paginate(self._session, stmt, CLINIC_SORT_KEYS, page, to_item=self._adapter.to_entity)
         except Exception as e:
             self._logger.error(f"Error getting clinics by organization: {e}", exc_info=True)
             raise
@@ -59,10 +278,18 @@ class PostgresClinicsRepo(IClinicsRepository):
     async def create_clinic(self, clinic_data: dict):
         try:
             clinic_orm = ClinicOrm(**clinic_data)
+            clinic_orm.refresh_open_hours()
             self._session.add(clinic_orm)
+            version = await self._bump_catalog_version()
             await self._session.commit()
             await self._session.refresh(clinic_orm)
-            return await self._adapter.to_entity(clinic_orm)
+            if self._location_index is not None:
+                self._location_index.add(clinic_orm.location_normalized)
+            self._sync_leaderboard(clinic_orm)
+            self._sync_geo_index(clinic_orm)
+            clinic = await self._adapter.to_entity(clinic_orm)
+            self._sync_catalog(clinic, version)
+            return clinic
         except Exception as e:
             self._logger.error(f"Error creating clinic: {e}", exc_info=True)
             await self._session.rollback()
@@ -74,26 +301,156 @@ class PostgresClinicsRepo(IClinicsRepository):
             if not clinic_orm:
                 return None
 
+            previous_location = clinic_orm.location_normalized
             for key, value in update_data.items():
                 setattr(clinic_orm, key, value)
+            if {'work_hours', 'is_24_7'} & update_data.keys():
+                clinic_orm.refresh_open_hours()
 
+            version = await self._bump_catalog_version()
             await self._session.commit()
             await self._session.refresh(clinic_orm)
-            return await self._adapter.to_entity(clinic_orm)
+            if self._location_index is not None and previous_location != clinic_orm.location_normalized:
+                self._location_index.remove(previous_location)
+                self._location_index.add(clinic_orm.location_normalized)
+            self._sync_leaderboard(clinic_orm)
+            self._sync_geo_index(clinic_orm)
+            clinic = await self._adapter.to_entity(clinic_orm)
+            self._sync_catalog(clinic, version)
+            return clinic
         except Exception as e:
             self._logger.error(f"Error updating clinic: {e}", exc_info=True)
             await self._session.rollback()
             raise
 
+    async def upsert_clinics(self, rows: List[ClinicImportRow]) -> Tuple[int, int]:
+        """Батч импорта одной транзакцией по ключу (organization_id, name, address).
+
+        Возвращает (создано, обновлено). Ключи батча уникальны (повторы отсеивает import_clinics),
+        несколько существующих клиник с одним ключом - обновляется первая по id.
+        """
+        try:
+            by_key = {row.key: row for row in rows}
+            result = await self._session.execute(
+                select(ClinicOrm.id, ClinicOrm.organization_id, ClinicOrm.name, ClinicOrm.address,
+                       ClinicOrm.location_normalized)
+                .where(tuple_(ClinicOrm.organization_id, ClinicOrm.name, ClinicOrm.address).in_(list(by_key)))
+                .order_by(ClinicOrm.id)
+            )
+            existing = {}
+            for row in result.all():
+                existing.setdefault((row.organization_id, row.name, row.address), row)
+
+            inserts, updates = [], []
+            for key, row in by_key.items():
+                values = self._import_values(row)
+                if key in existing:
+                    updates.append({'id': existing[key].id, **values})
+                else:
+                    inserts.append(values)
+
+            # Массовые INSERT/UPDATE в обход ORM-объектов: location_normalized и open_hours заданы явно
+            inserted_ids = []
+            if inserts:
+                result = await self._session.execute(insert(ClinicOrm).returning(ClinicOrm.id), inserts)
+                inserted_ids = list(result.scalars().all())
+            if updates:
+                await self._session.execute(update(ClinicOrm), updates)
+            version = await self._bump_catalog_version()
+            await self._session.commit()
+
+            previous_locations = {row.id: row.location_normalized for row in existing.values()}
+            await self._sync_imported(inserted_ids + [values['id'] for values in updates], previous_locations, version)
+            return len(inserts), len(updates)
+        except Exception as e:
+            self._logger.error(f"Error upserting clinics: {e}", exc_info=True)
+            await self._session.rollback()
+            raise
+
+    @staticmethod
+    def _import_values(row: ClinicImportRow) -> dict:
+        values = row.model_dump(mode='json')
+        values['location_normalized'] = normalize_location(row.location)
+        values['open_hours'] = compile_open_hours(values['work_hours'], row.is_24_7)
+        return values
+
+    async def _sync_imported(self, clinic_ids: List[int], previous_locations: dict, version: Optional[int]):
+        if not clinic_ids:
+            return
+        result = await self._session.execute(select(ClinicOrm).where(ClinicOrm.id.in_(clinic_ids)))
+        clinics = []
+        for clinic_orm in result.scalars().all():
+            previous_location = previous_locations.get(clinic_orm.id)
+            if self._location_index is not None and previous_location != clinic_orm.location_normalized:
+                if previous_location is not None:
+                    self._location_index.remove(previous_location)
+                self._location_index.add(clinic_orm.location_normalized)
+            self._sync_leaderboard(clinic_orm)
+            self._sync_geo_index(clinic_orm)
+            clinics.append(await self._adapter.to_entity(clinic_orm))
+            self._forget(clinic_orm.id)
+        if self._catalog is not None:
+            self._catalog.put_many(clinics, version)
+
     async def delete_clinic(self, clinic_id: int) -> bool:
         try:
             clinic_orm = await self._session.get(ClinicOrm, clinic_id)
             if clinic_orm:
+                location = clinic_orm.location_normalized
                 await self._session.delete(clinic_orm)
+                version = await self._bump_catalog_version()
                 await self._session.commit()
+                if self._catalog is not None:
+                    self._catalog.remove(clinic_id, version)
+                self._forget(clinic_id)
+                if self._location_index is not None:
+                    self._location_index.remove(location)
+                if self._geo_index is not None:
+                    self._geo_index.remove_clinic(clinic_id)
+                if self._leaderboard is not None:
+                    self._leaderboard.set_scopes(ReviewTargetType.CLINIC, clinic_id, None)
                 return True
             return False
         except Exception as e:
             self._logger.error(f"Error deleting clinic: {e}", exc_info=True)
             await self._session.rollback()
             raise
+
+    @property
+    def _catalog_ready(self) -> bool:
+        return self._catalog is not None and self._catalog.is_loaded
+
+    async def _bump_catalog_version(self) -> Optional[int]:
+        """Версия каталога растет в транзакции записи - остальные воркеры увидят ее вместе с данными"""
+        if self._catalog is None:
+            return None
+        return await self._catalog.bump_version(self._session)
+
+    def _sync_catalog(self, clinic: Clinic, version: Optional[int]):
+        if self._catalog is not None:
+            self._catalog.put(clinic, version)
+        self._forget(clinic.id)
+
+    def _forget(self, clinic_id: int):
+        # Запомненная за запрос клиника после записи устарела
+        if self._loaders:
+            self._loaders.clinics.clear(clinic_id)
+
+    def _sync_leaderboard(self, clinic_orm: ClinicOrm):
+        """Клиника участвует в рейтинге своего города, пока активна"""
+        if self._leaderboard is None:
+            return
+        scopes = [clinic_orm.location] if clinic_orm.is_active else None
+        self._leaderboard.set_scopes(ReviewTargetType.CLINIC, clinic_orm.id, scopes)
+
+    def _sync_geo_index(self, clinic_orm: ClinicOrm):
+        if self._geo_index is None:
+            return
+        self._geo_index.set_clinic(
+            clinic_orm.id,
+            clinic_orm.latitude,
+            clinic_orm.longitude,
+            clinic_orm.is_active,
+            clinic_orm.is_24_7,
+            clinic_orm.open_hours
+        )
@@ -1,17 +1,53 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
-from src.domain.entity.clinics.reviews import Review, ReviewTargetType
+from sqlalchemy import select, and_, or_, update, delete, insert, func, case
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from src.domain.entity.clinics.reviews import Review, ReviewTargetType, ReviewStats, ReviewSort
 from src.domain.interfaces.clinics.reviews_repository import IReviewRepository
 from src.infrastructure.adapters.orm_entity_adapter import ReviewOrmEntityAdapter
-from src.infrastructure.repository.schemas.review_orm import ReviewOrm
+from src.infrastructure.repository.schemas.review_orm import ReviewOrm, ReviewStatsOrm, RATE_COLUMNS
+from src.domain.entity.pagination import Page, PageRequest
+from src.infrastructure.repository.pagination import SortKey, paginate
+from src.infrastructure.repository.errors import violated_constraint
+from src.infrastructure.services.ratings.leaderboard import RatingLeaderboard
 import logging
-from typing import List, Optional
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Один отзыв отправителя на цель в рамках заказа
+REVIEW_UNIQUE_CONSTRAINTS = {
+    'uq_reviews_order_sender_target': ('reviews.order_id', 'reviews.sender_id', 'reviews.target_id'),
+}
+
+REVIEW_SORT_KEYS = (
+    SortKey(ReviewOrm.created_at, descending=True),
+    SortKey(ReviewOrm.id, descending=True),
+)
+
+# Сортировки отзывов цели; рейтинговые опираются на ix_reviews_target_rate, остальные на ix_reviews_target_created
+TARGET_REVIEW_SORT_KEYS = {
+    ReviewSort.NEWEST: REVIEW_SORT_KEYS,
+    ReviewSort.HIGHEST: (SortKey(ReviewOrm.rate, descending=True), *REVIEW_SORT_KEYS),
+    ReviewSort.LOWEST: (SortKey(ReviewOrm.rate), *REVIEW_SORT_KEYS),
+    ReviewSort.WITH_RESPONSE_FIRST: (
+        SortKey(case((ReviewOrm.response.isnot(None), 1), else_=0), descending=True, name='has_response'),
+        *REVIEW_SORT_KEYS
+    ),
+}
 
 
 class PostgresReviewRepo(IReviewRepository):
-    def __init__(self, session: AsyncSession, adapter: ReviewOrmEntityAdapter):
+    def __init__(
+            self,
+            session: AsyncSession,
+            adapter: ReviewOrmEntityAdapter,
+            leaderboard: Optional[RatingLeaderboard] = None
+    ):
         self._session = session
         self._adapter = adapter
+        self._leaderboard = leaderboard
         self._logger = logging.getLogger(__name__)
 
     @property
@@ -35,9 +71,17 @@ class PostgresReviewRepo(IReviewRepository):
         try:
             review_orm = await self._adapter.to_orm(review)
             self._session.add(review_orm)
+            totals = await self._change_stats(review.target_type, review.target_id, added_rate=review.rate)
             await self._session.commit()
+            self._publish_stats(review.target_type, review.target_id, totals)
             await self._session.refresh(review_orm)
             return await self._adapter.to_entity(review_orm)
+        except IntegrityError as e:
+            await self._session.rollback()
+            if violated_constraint(e, REVIEW_UNIQUE_CONSTRAINTS) is not None:
+                raise ValueError("Review already exists for this order and target")
+            self._logger.error(f"Error creating review: {e}", exc_info=True)
+            raise
         except Exception as e:
             self._logger.error(f"Error creating review: {e}", exc_info=True)
             await self._session.rollback()
@@ -45,9 +89,22 @@ class PostgresReviewRepo(IReviewRepository):
 
     async def update_review(self, review: Review) -> Review:
         try:
+            # Строка блокируется до commit: параллельное изменение того же отзыва ждет
+            # и вычитает из агрегата уже новую оценку, а не ту же старую
+            previous_rate = (await self._session.execute(
+                select(ReviewOrm.rate).where(ReviewOrm.id == review.id).with_for_update()
+            )).scalar_one_or_none()
+
             review_orm = await self._adapter.to_orm(review)
             merged_orm = await self._session.merge(review_orm)
+            totals = None
+            if previous_rate is not None and previous_rate != review.rate:
+                totals = await self._change_stats(
+                    review.target_type, review.target_id,
+                    removed_rate=previous_rate, added_rate=review.rate
+                )
             await self._session.commit()
+            self._publish_stats(review.target_type, review.target_id, totals)
             return await self._adapter.to_entity(merged_orm)
         except Exception as e:
             self._logger.error(f"Error updating review: {e}", exc_info=True)
@@ -56,13 +113,18 @@ class PostgresReviewRepo(IReviewRepository):
 
     async def delete_review(self, review_id: int) -> bool:
         try:
+            # Под блокировкой второе параллельное удаление увидит, что строки уже нет
             result = await self._session.execute(
                 select(ReviewOrm).where(ReviewOrm.id == review_id)
+                .with_for_update().execution_options(populate_existing=True)
             )
             review_orm = result.scalar_one_or_none()
             if review_orm:
+                target_type, target_id = review_orm.target_type, review_orm.target_id
+                totals = await self._change_stats(target_type, target_id, removed_rate=review_orm.rate)
                 await self._session.delete(review_orm)
                 await self._session.commit()
+                self._publish_stats(target_type, target_id, totals)
                 return True
             return False
         except Exception as e:
@@ -93,8 +155,10 @@ class PostgresReviewRepo(IReviewRepository):
             target_type: ReviewTargetType,
             *,
             min_rating: Optional[int] = None,
-            max_rating: Optional[int] = None
-    ) -> List[Review]:
+            max_rating: Optional[int] = None,
+            sort: ReviewSort = ReviewSort.NEWEST,
+            page: Optional[PageRequest] = None
+    ) -> Page[Review]:
         try:
             query = select(ReviewOrm).where(
                 and_(
@@ -109,9 +173,9 @@ class PostgresReviewRepo(IReviewRepository):
             if max_rating is not None:
                 query = query.where(ReviewOrm.rate <= max_rating)
 
-            result = await self._session.execute(query)
-            reviews_orm = result.scalars().all()
-            return [await self._adapter.to_entity(review) for review in reviews_orm]
+            return await paginate(
+                self._session, query, TARGET_REVIEW_SORT_KEYS[sort], page, to_item=self._adapter.to_entity
+            )
         except Exception as e:
             self._logger.error(f"Error getting reviews for target: {e}", exc_info=True)
             raise
@@ -158,3 +222,149 @@ class PostgresReviewRepo(IReviewRepository):
         except Exception as e:
             self._logger.error(f"Error checking review existence: {e}", exc_info=True)
             raise
+
+    async def get_review_stats(self, target_type: ReviewTargetType, target_id: int) -> ReviewStats:
+        try:
+            result = await self._session.execute(
+                select(ReviewStatsOrm).where(
+                    ReviewStatsOrm.target_type == target_type,
+                    ReviewStatsOrm.target_id == target_id
+                )
+            )
+            stats_orm = result.scalar_one_or_none()
+            if not stats_orm:
+                return ReviewStats(target_type=target_type, target_id=target_id)
+            return self._to_stats(stats_orm)
+        except Exception as e:
+            self._logger.error(f"Error getting review stats: {e}", exc_info=True)
+            raise
+
+    async def get_review_stats_batch(
+            self,
+            targets: Iterable[Tuple[ReviewTargetType, int]]
+    ) -> Dict[Tuple[ReviewTargetType, int], ReviewStats]:
+        """Агрегаты для набора целей одним запросом; для целей без отзывов - нулевые"""
+        try:
+            ids_by_type = defaultdict(set)
+            for target_type, target_id in targets:
+                ids_by_type[ReviewTargetType(target_type.value)].add(target_id)
+            stats = {
+                (target_type, target_id): ReviewStats(target_type=target_type, target_id=target_id)
+                for target_type, target_ids in ids_by_type.items()
+                for target_id in target_ids
+            }
+            if not stats:
+                return stats
+
+            result = await self._session.execute(
+                select(ReviewStatsOrm).where(or_(*(
+                    and_(ReviewStatsOrm.target_type == target_type, ReviewStatsOrm.target_id.in_(target_ids))
+                    for target_type, target_ids in ids_by_type.items()
+                )))
+            )
+            for stats_orm in result.scalars():
+                item = self._to_stats(stats_orm)
+                stats[(item.target_type, item.target_id)] = item
+            return stats
+        except Exception as e:
+            self._logger.error(f"Error getting review stats batch: {e}", exc_info=True)
+            raise
+
+    async def rebuild_review_stats(self) -> int:
+        """Пересчитывает агрегаты по всем отзывам одним INSERT ... SELECT"""
+        try:
+            aggregate = select(
+                ReviewOrm.target_type,
+                ReviewOrm.target_id,
+                func.count(),
+                func.sum(ReviewOrm.rate),
+                *(func.sum(case((ReviewOrm.rate == rate, 1), else_=0)) for rate in RATE_COLUMNS),
+                func.max(ReviewOrm.created_at)
+            ).group_by(ReviewOrm.target_type, ReviewOrm.target_id)
+
+            await self._session.execute(delete(ReviewStatsOrm))
+            result = await self._session.execute(
+                insert(ReviewStatsOrm).from_select(
+                    ['target_type', 'target_id', 'reviews_count', 'rate_sum', *RATE_COLUMNS.values(), 'updated_at'],
+                    aggregate
+                )
+            )
+            await self._session.commit()
+            return result.rowcount
+        except Exception as e:
+            self._logger.error(f"Error rebuilding review stats: {e}", exc_info=True)
+            await self._session.rollback()
+            raise
+
+    async def _change_stats(
+            self,
+            target_type: ReviewTargetType,
+            target_id: int,
+            *,
+            removed_rate: Optional[int] = None,
+            added_rate: Optional[int] = None
+    ) -> Optional[Tuple[int, int]]:
+        """Сдвигает агрегат цели в текущей транзакции: removed_rate вычитается, added_rate добавляется.
+
+        Возвращает новые (reviews_count, rate_sum) цели, если строка агрегата была затронута.
+        """
+        deltas = defaultdict(int)
+        for rate, sign in ((removed_rate, -1), (added_rate, 1)):
+            if rate is None:
+                continue
+            deltas['reviews_count'] += sign
+            deltas['rate_sum'] += sign * rate
+            deltas[RATE_COLUMNS[rate]] += sign
+        deltas = {column: delta for column, delta in deltas.items() if delta}
+        if not deltas:
+            return None
+
+        target_type = ReviewTargetType(target_type.value)
+        if removed_rate is None:
+            # Новый отзыв: строка агрегата создается или сдвигается одним upsert без чтения
+            stmt = self._stats_insert().values(target_type=target_type, target_id=target_id, **deltas)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ReviewStatsOrm.target_type, ReviewStatsOrm.target_id],
+                set_={
+                    **{column: getattr(ReviewStatsOrm, column) + stmt.excluded[column] for column in deltas},
+                    'updated_at': datetime.utcnow()
+                }
+            )
+        else:
+            stmt = (
+                update(ReviewStatsOrm)
+                .where(ReviewStatsOrm.target_type == target_type, ReviewStatsOrm.target_id == target_id)
+                .values(
+                    **{column: getattr(ReviewStatsOrm, column) + delta for column, delta in deltas.items()},
+                    updated_at=datetime.utcnow()
+                )
+            )
+        result = await self._session.execute(
+            stmt.returning(ReviewStatsOrm.reviews_count, ReviewStatsOrm.rate_sum)
+        )
+        row = result.one_or_none()
+        return (row.reviews_count, row.rate_sum) if row else None
+
+    def _publish_stats(self, target_type: ReviewTargetType, target_id: int, totals: Optional[Tuple[int, int]]):
+        if self._leaderboard is None or totals is None:
+            return
+        try:
+            self._leaderboard.update_stats(target_type, target_id, *totals)
+        except Exception as e:
+            # Рейтинг догонит периодическая пересборка, запись отзыва уже зафиксирована
+            self._logger.error(f"Error updating leaderboard: {e}", exc_info=True)
+
+    def _stats_insert(self):
+        if self._session.bind.dialect.name == 'postgresql':
+            return postgresql_insert(ReviewStatsOrm)
+        return sqlite_insert(ReviewStatsOrm)
+
+    @staticmethod
+    def _to_stats(stats_orm: ReviewStatsOrm) -> ReviewStats:
+        return ReviewStats(
+            target_type=ReviewTargetType(stats_orm.target_type.value),
+            target_id=stats_orm.target_id,
+            count=stats_orm.reviews_count,
+            rate_sum=stats_orm.rate_sum,
+            histogram={rate: getattr(stats_orm, column) for rate, column in RATE_COLUMNS.items()}
+        )
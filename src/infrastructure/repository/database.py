@@ -29,11 +29,12 @@ async_session_maker = async_sessionmaker(
 
 async def init_db():
     from src.infrastructure.repository.schemas.chat_orm import (ChatOrm, MessageOrm, MessageType, TextMessageOrm, FileMessageOrm, ImageMessageOrm, VoiceMessageOrm)
-    from src.infrastructure.repository.schemas.clinic_orm import ClinicOrm
+    from src.infrastructure.repository.schemas.clinic_orm import ClinicOrm, CatalogVersionOrm
+    from src.infrastructure.repository.schemas.appointment_orm import AppointmentOrm
     from src.infrastructure.repository.schemas.order_orm import OrderOrm, OrderStatus
     from src.infrastructure.repository.schemas.responses_orm import ResponseOrm
-    from src.infrastructure.repository.schemas.review_orm import ReviewOrm
-    from src.infrastructure.repository.schemas.user_orm import Role, AdminRoles, UserOrm, SpecialistOrm, PatientOrm, OrganizationOrm, AdminOrm,BlockedUserOrm, AdminRolesEnum
+    from src.infrastructure.repository.schemas.review_orm import ReviewOrm, ReviewStatsOrm
+    from src.infrastructure.repository.schemas.user_orm import Role, AdminRoles, UserOrm, SpecialistOrm, SpecialistSpecificationOrm, PatientOrm, OrganizationOrm, AdminOrm,BlockedUserOrm, AdminRolesEnum
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
         if "postgresql" in DATABASE_URL:
@@ -0,0 +1,33 @@
+from typing import Iterable, Mapping, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+
+def _constraint_name(orig) -> Optional[str]:
+    # asyncpg кладет исходную ошибку в __cause__ обертки DBAPI, psycopg - в diag
+    for error in (orig, getattr(orig, '__cause__', None)):
+        name = getattr(error, 'constraint_name', None) or getattr(getattr(error, 'diag', None), 'constraint_name', None)
+        if name:
+            return name
+    return None
+
+
+def violated_constraint(error: IntegrityError, constraints: Mapping[str, Iterable[str]]) -> Optional[str]:
+    """Какое из constraints нарушено; None - другое нарушение целостности.
+
+    constraints - {имя ограничения: колонки "таблица.колонка"}. Postgres сообщает имя ограничения,
+    SQLite - только колонки ("UNIQUE constraint failed: users.email"), поэтому сверяются оба.
+    """
+    name = _constraint_name(error.orig)
+    if name is not None:
+        return name if name in constraints else None
+
+    message = str(error.orig)
+    prefix = "UNIQUE constraint failed:"
+    if not message.startswith(prefix):
+        return None
+    columns = {column.strip() for column in message[len(prefix):].split(",")}
+    for constraint, constraint_columns in constraints.items():
+        if columns == set(constraint_columns):
+            return constraint
+    return None
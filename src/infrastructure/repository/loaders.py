@@ -0,0 +1,151 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Optional, Set, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from src.domain.entity.clinics.clinic_entity import Clinic
+from src.domain.entity.orders.order import Order
+from src.domain.entity.users.user import User
+from src.infrastructure.adapters.orm_entity_adapter import (
+    ClinicOrmEntityAdapter, OrderOrmEntityAdapter, UserOrmEntityAdapter
+)
+from src.infrastructure.repository.schemas.clinic_orm import ClinicOrm
+from src.infrastructure.repository.schemas.order_orm import OrderOrm
+from src.infrastructure.repository.schemas.user_orm import UserOrm, OrganizationOrm
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+MAX_BATCH_SIZE = 500
+
+# Связи пользователя, которые читает UserOrmEntityAdapter; без них адаптер обращается к ленивым атрибутам
+USER_LOAD_OPTIONS = (
+    selectinload(UserOrm.specialist),
+    selectinload(UserOrm.patient),
+    selectinload(UserOrm.organization).selectinload(OrganizationOrm.clinics),
+    selectinload(UserOrm.admin),
+    selectinload(UserOrm.blocked_user),
+)
+
+
+class BatchLoader(Generic[K, V]):
+    """Склеивает load(key), вызванные в одном тике цикла событий, в один вызов batch_fn(keys).
+
+    Результаты запоминаются на время жизни загрузчика (один запрос): повторный load того же
+    ключа не идет в БД. Отсутствующий ключ - None. Записи, меняющие сущность, сбрасывают
+    ключ через clear().
+    """
+
+    def __init__(
+            self,
+            batch_fn: Callable[[List[K]], Awaitable[Dict[K, V]]],
+            max_batch_size: int = MAX_BATCH_SIZE
+    ):
+        self._batch_fn = batch_fn
+        self._max_batch_size = max_batch_size
+        self._cache: Dict[K, asyncio.Future] = {}
+        self._queue: List[K] = []
+        # Цикл событий держит задачи по слабым ссылкам: без своей ссылки пакет может собрать GC
+        self._tasks: Set[asyncio.Task] = set()
+        self._logger = logging.getLogger(__name__)
+
+    async def load(self, key: K) -> Optional[V]:
+        future = self._cache.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._cache[key] = loop.create_future()
+            if not self._queue:
+                # Все load() текущего тика успеют встать в очередь до отправки
+                loop.call_soon(self._dispatch)
+            self._queue.append(key)
+        # shield: отмена одного ожидающего не отменяет результат для остальных
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[K]) -> List[Optional[V]]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: K, value: Optional[V]):
+        """Положить уже загруженное значение, чтобы load(key) не ходил в БД"""
+        if key not in self._cache:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._cache[key] = future
+
+    def clear(self, key: K):
+        future = self._cache.get(key)
+        if future is not None and future.done():
+            del self._cache[key]
+
+    def clear_all(self):
+        for key in [key for key, future in self._cache.items() if future.done()]:
+            del self._cache[key]
+
+    def _dispatch(self):
+        keys, self._queue = self._queue, []
+        for start in range(0, len(keys), self._max_batch_size):
+            task = asyncio.ensure_future(self._run(keys[start:start + self._max_batch_size]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, keys: List[K]):
+        try:
+            values = await self._batch_fn(keys)
+        except Exception as e:
+            self._logger.error(f"Batch load of {len(keys)} keys failed: {e}", exc_info=True)
+            for key in keys:
+                # Ошибку не запоминаем: следующий load повторит запрос
+                future = self._cache.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+        for key in keys:
+            future = self._cache.get(key)
+            if future is not None and not future.done():
+                future.set_result(values.get(key))
+
+
+class EntityLoaders:
+    """Загрузчики пользователей, клиник и заказов на один запрос (одна сессия).
+
+    Пакеты разных типов, отправленные в одном тике, выполняются по очереди: AsyncSession
+    не допускает параллельных запросов. Загруженные строки удерживаются до конца запроса:
+    identity map сессии хранит их по слабым ссылкам, а session.get() в репозиториях
+    рассчитывает найти там строку с уже загруженными связями.
+    """
+
+    def __init__(
+            self,
+            session: AsyncSession,
+            user_adapter: Optional[UserOrmEntityAdapter] = None,
+            clinic_adapter: Optional[ClinicOrmEntityAdapter] = None,
+            order_adapter: Optional[OrderOrmEntityAdapter] = None
+    ):
+        self._session = session
+        self._user_adapter = user_adapter or UserOrmEntityAdapter()
+        self._clinic_adapter = clinic_adapter or ClinicOrmEntityAdapter()
+        self._order_adapter = order_adapter or OrderOrmEntityAdapter()
+        self._lock = asyncio.Lock()
+        self._rows: List[object] = []
+        self.users: BatchLoader[int, User] = BatchLoader(self._load_users)
+        self.clinics: BatchLoader[int, Clinic] = BatchLoader(self._load_clinics)
+        self.orders: BatchLoader[int, Order] = BatchLoader(self._load_orders)
+
+    async def _load_users(self, user_ids: List[int]) -> Dict[int, User]:
+        stmt = select(UserOrm).where(UserOrm.id.in_(user_ids)).options(*USER_LOAD_OPTIONS)
+        return await self._load(stmt, self._user_adapter.to_entity)
+
+    async def _load_clinics(self, clinic_ids: List[int]) -> Dict[int, Clinic]:
+        return await self._load(select(ClinicOrm).where(ClinicOrm.id.in_(clinic_ids)), self._clinic_adapter.to_entity)
+
+    async def _load_orders(self, order_ids: List[int]) -> Dict[int, Order]:
+        return await self._load(select(OrderOrm).where(OrderOrm.id.in_(order_ids)), self._order_adapter.to_entity)
+
+    async def _load(self, stmt, to_entity) -> Dict[int, object]:
+        async with self._lock:
+            result = await self._session.execute(stmt)
+            rows = result.scalars().all()
+        self._rows.extend(rows)
+        return {row.id: await to_entity(row) for row in rows}
@@ -1,23 +1,51 @@
 from src.domain.interfaces.orders.orders_repository import IOrdersRepository
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import select, update, exists, func, literal, cast
+from sqlalchemy.dialects.postgresql import JSONB, array
 from src.infrastructure.adapters.orm_entity_adapter import OrderOrmEntityAdapter
 from src.domain.entity.orders.order import Order, OrderStatus
-from src.infrastructure.repository.schemas.order_orm import OrderOrm
+from src.infrastructure.repository.schemas.order_orm import OrderOrm, OrderCreatorRole
+from src.infrastructure.repository.schemas.responses_orm import ResponseOrm
 from src.domain.entity.orders.order import OrderCreate
+from src.domain.entity.users.user import Role
+from src.infrastructure.services.matching.specification_index import SpecificationMatchIndex
+from src.infrastructure.services.events.order_events import OrderEventHub
+from src.infrastructure.repository.pagination import SortKey, paginate
+from src.infrastructure.repository.loaders import EntityLoaders
+from src.domain.entity.pagination import Page, PageRequest
+from collections import defaultdict
+from datetime import datetime
 from typing import List, Optional
 
+# Новые заказы первыми; id делает порядок строгим при одинаковом created_at
+ORDER_SORT_KEYS = (
+    SortKey(OrderOrm.created_at, descending=True),
+    SortKey(OrderOrm.id, descending=True),
+)
+
 
 class PostgresOrdersRepo(IOrdersRepository):
-    def __init__(self, session: AsyncSession, adapter: OrderOrmEntityAdapter):
+    def __init__(
+            self,
+            session: AsyncSession,
+            adapter: OrderOrmEntityAdapter,
+            matching_index: Optional[SpecificationMatchIndex] = None,
+            event_hub: Optional[OrderEventHub] = None,
+            loaders: Optional[EntityLoaders] = None
+    ):
         self._session = session
         self._adapter = adapter
+        self._matching_index = matching_index
+        self._event_hub = event_hub
+        self._loaders = loaders
 
     @property
     def session(self) -> AsyncSession:
         return self._session
 
     async def get_order(self, order_id: int) -> Optional[Order]:
+        if self._loaders:
+            return await self._loaders.orders.load(int(order_id))
         stmt = select(OrderOrm).where(OrderOrm.id == order_id)
         result = await self._session.execute(stmt)
         order_orm = result.scalar_one_or_none()
@@ -25,6 +53,12 @@ class PostgresOrdersRepo(IOrdersRepository):
             return None
         return await self._adapter.to_entity(order_orm)
 
+    async def get_order_status(self, order_id: int) -> Optional[OrderStatus]:
+        """Только статус заказа - без загрузки и адаптации всей строки"""
+        result = await self._session.execute(select(OrderOrm.status).where(OrderOrm.id == order_id))
+        status = result.scalar_one_or_none()
+        return OrderStatus(status.value) if status is not None else None
+
     async def create_order(self, order_data: OrderCreate) -> Order:
         # Преобразуем доменную модель в словарь для ORM
         order_dict = order_data.dict()
@@ -33,31 +67,37 @@ class PostgresOrdersRepo(IOrdersRepository):
         self._session.add(order_orm)
         await self._session.commit()
         await self._session.refresh(order_orm)
-        return await self._adapter.to_entity(order_orm)
-
-    async def get_orders_by_creator(self, creator_id: int) -> List[Order]:
-        stmt = select(OrderOrm).where(OrderOrm.creator_id == creator_id)
+        order = await self._adapter.to_entity(order_orm)
+
+        if self._matching_index and order.status == OrderStatus.ACTIVE:
+            self._matching_index.add_order(order.id, order.specifications, order.creator_id)
+        if self._event_hub and order.status == OrderStatus.ACTIVE:
+            self._event_hub.publish_order_created(order)
+        return order
+
+    async def get_orders_by_ids(self, order_ids: List[int]) -> List[Order]:
+        if not order_ids:
+            return []
+        stmt = select(OrderOrm).where(OrderOrm.id.in_(order_ids))
         result = await self._session.execute(stmt)
         orders = result.scalars().all()
         return [await self._adapter.to_entity(order) for order in orders]
 
-    async def get_orders_for_patient(self, patient_id: int) -> List[Order]:
+    async def get_orders_by_creator(self, creator_id: int, page: Optional[PageRequest] = None) -> Page[Order]:
+        stmt = select(OrderOrm).where(OrderOrm.creator_id == creator_id)
+        return await paginate(self._session, stmt, ORDER_SORT_KEYS, page, to_item=self._adapter.to_entity)
+
+    async def get_orders_for_patient(self, patient_id: int, page: Optional[PageRequest] = None) -> Page[Order]:
         stmt = select(OrderOrm).where(OrderOrm.patient_id == patient_id)
-        result = await self._session.execute(stmt)
-        orders = result.scalars().all()
-        return [await self._adapter.to_entity(order) for order in orders]
+        return await paginate(self._session, stmt, ORDER_SORT_KEYS, page, to_item=self._adapter.to_entity)
 
-    async def get_orders_for_specialist(self, specialist_id: int) -> List[Order]:
+    async def get_orders_for_specialist(self, specialist_id: int, page: Optional[PageRequest] = None) -> Page[Order]:
         stmt = select(OrderOrm).where(OrderOrm.specialist_id == specialist_id)
-        result = await self._session.execute(stmt)
-        orders = result.scalars().all()
-        return [await self._adapter.to_entity(order) for order in orders]
+        return await paginate(self._session, stmt, ORDER_SORT_KEYS, page, to_item=self._adapter.to_entity)
 
-    async def get_orders_for_clinic(self, clinic_id: int) -> List[Order]:
+    async def get_orders_for_clinic(self, clinic_id: int, page: Optional[PageRequest] = None) -> Page[Order]:
         stmt = select(OrderOrm).where(OrderOrm.clinic_id == clinic_id)
-        result = await self._session.execute(stmt)
-        orders = result.scalars().all()
-        return [await self._adapter.to_entity(order) for order in orders]
+        return await paginate(self._session, stmt, ORDER_SORT_KEYS, page, to_item=self._adapter.to_entity)
 
     async def update_order_status(self, order_id: int, status: OrderStatus) -> bool:
         stmt = (
@@ -67,8 +107,66 @@ class PostgresOrdersRepo(IOrdersRepository):
         )
         await self._session.execute(stmt)
         await self._session.commit()
+        self._forget(order_id)
+
+        if self._matching_index:
+            if status == OrderStatus.ACTIVE:
+                row = (await self._session.execute(
+                    select(OrderOrm.specifications, OrderOrm.creator_id).where(OrderOrm.id == order_id)
+                )).one_or_none()
+                if row:
+                    self._matching_index.add_order(order_id, row.specifications, row.creator_id)
+            else:
+                self._matching_index.remove_order(order_id)
+        await self._publish_status_changed([order_id], status)
         return True
 
+    def _forget(self, *order_ids: int):
+        # Запомненный за запрос заказ после записи устарел
+        if self._loaders:
+            for order_id in order_ids:
+                self._loaders.orders.clear(order_id)
+
+    async def _publish_status_changed(self, order_ids: List[int], status: OrderStatus):
+        # Откликнувшихся ищем только если кто-то слушает поток событий
+        if not self._event_hub or not self._event_hub.has_subscribers or not order_ids:
+            return
+        result = await self._session.execute(
+            select(ResponseOrm.order_id, ResponseOrm.responser_id).where(ResponseOrm.order_id.in_(order_ids))
+        )
+        responders = defaultdict(set)
+        for order_id, responser_id in result.all():
+            responders[order_id].add(responser_id)
+        for order_id in order_ids:
+            self._event_hub.publish_order_status_changed(order_id, status, responders[order_id])
+
+    async def expire_overdue_orders(self, now: datetime, batch_size: int = 500) -> List[int]:
+        # SKIP LOCKED: параллельные воркеры разбирают разные пачки и не ждут друг друга
+        candidates = (
+            select(OrderOrm.id)
+            .where(OrderOrm.status == OrderStatus.ACTIVE, OrderOrm.preferred_date < now)
+            .order_by(OrderOrm.preferred_date, OrderOrm.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(OrderOrm)
+            .where(OrderOrm.id.in_(candidates), OrderOrm.status == OrderStatus.ACTIVE)
+            .values(status=OrderStatus.INACTIVE, updated_at=now)
+            .returning(OrderOrm.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self._session.execute(stmt)
+        expired_ids = list(result.scalars().all())
+        await self._session.commit()
+        self._forget(*expired_ids)
+
+        if self._matching_index:
+            for order_id in expired_ids:
+                self._matching_index.remove_order(order_id)
+        await self._publish_status_changed(expired_ids, OrderStatus.INACTIVE)
+        return expired_ids
+
     async def update_order_responses_count(self, order_id: int, increment: int = 1) -> bool:
         stmt = (
             update(OrderOrm)
@@ -77,6 +175,7 @@ class PostgresOrdersRepo(IOrdersRepository):
         )
         await self._session.execute(stmt)
         await self._session.commit()
+        self._forget(order_id)
         return True
 
     async def delete_order(self, order_id: int) -> bool:
@@ -86,6 +185,10 @@ class PostgresOrdersRepo(IOrdersRepository):
 
         await self._session.delete(order)
         await self._session.commit()
+        self._forget(order_id)
+
+        if self._matching_index:
+            self._matching_index.remove_order(order_id)
         return True
 
     async def get_orders_by_service_type(self, service_type: str) -> List[Order]:
@@ -99,3 +202,48 @@ class PostgresOrdersRepo(IOrdersRepository):
         result = await self._session.execute(stmt)
         orders = result.scalars().all()
         return [await self._adapter.to_entity(order) for order in orders]
+
+    async def get_active_orders_feed(
+            self,
+            viewer_id: int,
+            *,
+            service_type: Optional[str] = None,
+            specifications: Optional[List[str]] = None,
+            date_from: Optional[datetime] = None,
+            date_to: Optional[datetime] = None,
+            creator_role: Optional[OrderCreatorRole] = None,
+            page: Optional[PageRequest] = None
+    ) -> Page[Order]:
+        # Anti-join: заказы, на которые пользователь уже откликнулся, не показываем
+        already_responded = exists().where(
+            ResponseOrm.order_id == OrderOrm.id,
+            ResponseOrm.responser_id == viewer_id
+        )
+        stmt = (
+            select(OrderOrm)
+            .where(
+                OrderOrm.status == OrderStatus.ACTIVE,
+                OrderOrm.creator_id != viewer_id,
+                ~already_responded
+            )
+        )
+
+        if service_type:
+            stmt = stmt.where(OrderOrm.service_type == service_type)
+        if specifications:
+            stmt = stmt.where(self._specifications_overlap(specifications))
+        if date_from:
+            stmt = stmt.where(OrderOrm.preferred_date >= date_from)
+        if date_to:
+            stmt = stmt.where(OrderOrm.preferred_date <= date_to)
+        if creator_role:
+            stmt = stmt.where(OrderOrm.creator_role == creator_role)
+
+        return await paginate(self._session, stmt, ORDER_SORT_KEYS, page, to_item=self._adapter.to_entity)
+
+    def _specifications_overlap(self, specifications: List[str]):
+        if self._session.bind.dialect.name == 'postgresql':
+            return cast(OrderOrm.specifications, JSONB).op('?|')(array(specifications))
+
+        values = func.json_each(OrderOrm.specifications).table_valued('value')
+        return exists(select(literal(1)).select_from(values).where(values.c.value.in_(specifications)))
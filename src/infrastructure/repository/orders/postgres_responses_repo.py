@@ -6,8 +6,15 @@ from typing import List, Optional
 from sqlalchemy import select, delete, func
 from src.infrastructure.repository.schemas.responses_orm import ResponseOrm
 from src.domain.entity.users.user import Role
+from src.domain.entity.pagination import Page, PageRequest
+from src.infrastructure.repository.pagination import SortKey, paginate
 import logging
 
+RESPONSE_SORT_KEYS = (
+    SortKey(ResponseOrm.created_at, descending=True),
+    SortKey(ResponseOrm.response_id, descending=True),
+)
+
 
 class PostgresResponsesRepo(IResponseRepository):
     def __init__(self, session: AsyncSession, adapter: ResponseOrmEntityAdapter):
@@ -80,18 +87,16 @@ class PostgresResponsesRepo(IResponseRepository):
     async def get_order_responses(
             self,
             order_id: int,
-            status: Optional[ResponseStatus] = None
-    ) -> List[Response]:
+            status: Optional[ResponseStatus] = None,
+            page: Optional[PageRequest] = None
+    ) -> Page[Response]:
         try:
             stmt = select(ResponseOrm).where(ResponseOrm.order_id == order_id)
 
             if status:
                 stmt = stmt.where(ResponseOrm.status == status.value)
 
-            result = await self._session.execute(stmt)
-            responses_orm = result.scalars().all()
-
-            return [await self._adapter.to_entity(resp) for resp in responses_orm]
+            return await paginate(self._session, stmt, RESPONSE_SORT_KEYS, page, to_item=self._adapter.to_entity)
         except Exception as e:
             self._logger.error(f"Error getting order responses: {e}", exc_info=True)
             raise
@@ -100,8 +105,9 @@ class PostgresResponsesRepo(IResponseRepository):
             self,
             user_id: int,
             role: Optional[Role] = None,
-            status: Optional[ResponseStatus] = None
-    ) -> List[Response]:
+            status: Optional[ResponseStatus] = None,
+            page: Optional[PageRequest] = None
+    ) -> Page[Response]:
         try:
             stmt = select(ResponseOrm).where(ResponseOrm.responser_id == user_id)
 
@@ -111,10 +117,7 @@ class PostgresResponsesRepo(IResponseRepository):
             if status:
                 stmt = stmt.where(ResponseOrm.status == status.value)
 
-            result = await self._session.execute(stmt)
-            responses_orm = result.scalars().all()
-
-            return [await self._adapter.to_entity(resp) for resp in responses_orm]
+            return await paginate(self._session, stmt, RESPONSE_SORT_KEYS, page, to_item=self._adapter.to_entity)
         except Exception as e:
             self._logger.error(f"Error getting user responses: {e}", exc_info=True)
             raise
@@ -0,0 +1,135 @@
+import base64
+import hashlib
+import hmac
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from os import getenv
+from typing import Any, Awaitable, Callable, List, Optional, Sequence
+
+from dotenv import load_dotenv
+from sqlalchemy import Select, and_, or_, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.entity.pagination import Page, PageRequest
+from src.exceptions import InvalidCursorError
+
+load_dotenv()
+
+CURSOR_SECRET = (getenv('CURSOR_SECRET_KEY') or getenv('JWT_SECRET_KEY') or 'test-secret').encode()
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """Колонка (или выражение) сортировки; name - атрибут строки, из которого берется значение курсора"""
+    column: Any
+    descending: bool = False
+    name: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return self.name or self.column.key
+
+    @property
+    def token(self) -> str:
+        """Ключ с направлением: курсор сортировки по возрастанию не подходит для сортировки по убыванию"""
+        return f"-{self.key}" if self.descending else self.key
+
+    def order_by(self):
+        return self.column.desc() if self.descending else self.column.asc()
+
+
+def _dump_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _load_value(value):
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def _signature(payload: bytes) -> str:
+    digest = hmac.new(CURSOR_SECRET, payload, hashlib.sha256).digest()[:16]
+    return base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+
+def encode_cursor(sort_keys: Sequence[SortKey], values: Sequence) -> str:
+    payload = json.dumps(
+        {"k": [key.token for key in sort_keys], "v": [_dump_value(value) for value in values]},
+        separators=(",", ":")
+    ).encode()
+    body = base64.urlsafe_b64encode(payload).decode().rstrip("=")
+    return f"{body}.{_signature(payload)}"
+
+
+def decode_cursor(cursor: str, sort_keys: Sequence[SortKey]) -> List:
+    try:
+        body, signature = cursor.split(".", 1)
+        payload = base64.urlsafe_b64decode(body + "=" * (-len(body) % 4))
+        if not hmac.compare_digest(signature, _signature(payload)):
+            raise InvalidCursorError()
+        data = json.loads(payload)
+    except InvalidCursorError:
+        raise
+    except (ValueError, TypeError):
+        raise InvalidCursorError()
+
+    # Курсор привязан к набору ключей сортировки: чужой курсор не подходит
+    if data.get("k") != [key.token for key in sort_keys] or len(data.get("v", [])) != len(sort_keys):
+        raise InvalidCursorError()
+    try:
+        return [_load_value(value) for value in data["v"]]
+    except ValueError:
+        raise InvalidCursorError()
+
+
+def keyset_condition(sort_keys: Sequence[SortKey], values: Sequence):
+    """Условие "строго после values" в порядке sort_keys"""
+    directions = {key.descending for key in sort_keys}
+    if len(directions) == 1:
+        # Однонаправленная сортировка - сравнение кортежей, которое использует составной индекс
+        left = tuple_(*(key.column for key in sort_keys))
+        right = tuple_(*values)
+        return left < right if sort_keys[0].descending else left > right
+
+    # Смешанные направления: (k1 > v1) OR (k1 = v1 AND k2 < v2) OR ...
+    clauses = []
+    for i, key in enumerate(sort_keys):
+        equal_prefix = [prev.column == value for prev, value in zip(sort_keys[:i], values[:i])]
+        step = key.column < values[i] if key.descending else key.column > values[i]
+        clauses.append(and_(*equal_prefix, step))
+    return or_(*clauses)
+
+
+async def paginate(
+        session: AsyncSession,
+        stmt: Select,
+        sort_keys: Sequence[SortKey],
+        page: Optional[PageRequest] = None,
+        *,
+        to_item: Optional[Callable[[Any], Awaitable[Any]]] = None,
+        scalars: bool = True
+) -> Page:
+    """Keyset-пагинация запроса; без page возвращает все строки в том же порядке"""
+    stmt = stmt.order_by(*(key.order_by() for key in sort_keys))
+    if page is not None:
+        if page.cursor:
+            stmt = stmt.where(keyset_condition(sort_keys, decode_cursor(page.cursor, sort_keys)))
+        stmt = stmt.limit(page.limit + 1)
+
+    result = await session.execute(stmt)
+    rows = list(result.scalars().all() if scalars else result.all())
+
+    next_cursor = None
+    if page is not None and len(rows) > page.limit:
+        rows = rows[:page.limit]
+        next_cursor = encode_cursor(sort_keys, [getattr(rows[-1], key.key) for key in sort_keys])
+
+    items = [await to_item(row) for row in rows] if to_item else rows
+    return Page(items=items, next_cursor=next_cursor)
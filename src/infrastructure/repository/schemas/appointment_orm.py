@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Enum, Index
+from datetime import datetime
+from src.infrastructure.repository.database import Base
+from src.domain.entity.clinics.appointment import AppointmentStatus
+
+
+class AppointmentOrm(Base):
+    __tablename__ = 'appointments'
+
+    id = Column(Integer, primary_key=True)
+    clinic_id = Column(Integer, ForeignKey('clinics.id'), nullable=False)
+    specialist_id = Column(Integer, ForeignKey('specialists.user_id'), nullable=True)
+    patient_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    starts_at = Column(DateTime, nullable=False)
+    ends_at = Column(DateTime, nullable=False)
+    status = Column(Enum(AppointmentStatus), nullable=False, default=AppointmentStatus.BOOKED)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    cancelled_at = Column(DateTime, nullable=True)
+
+    # Двойную запись на слот отсекают частичные уникальные индексы: вставка атомарна без блокировок,
+    # отмененные записи слот не занимают
+    __table_args__ = (
+        Index(
+            'uq_appointments_clinic_slot', clinic_id, starts_at,
+            unique=True,
+            postgresql_where=(specialist_id.is_(None)) & (status == AppointmentStatus.BOOKED),
+            sqlite_where=(specialist_id.is_(None)) & (status == AppointmentStatus.BOOKED)
+        ),
+        Index(
+            'uq_appointments_specialist_slot', specialist_id, starts_at,
+            unique=True,
+            postgresql_where=(specialist_id.isnot(None)) & (status == AppointmentStatus.BOOKED),
+            sqlite_where=(specialist_id.isnot(None)) & (status == AppointmentStatus.BOOKED)
+        ),
+        Index('ix_appointments_patient', patient_id, starts_at),
+        Index(
+            'ix_appointments_booked_starts_at', starts_at,
+            postgresql_where=status == AppointmentStatus.BOOKED,
+            sqlite_where=status == AppointmentStatus.BOOKED
+        ),
+    )
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Boolean, ForeignKey, JSON, Index, DDL, Float, LargeBinary, event, func
+from sqlalchemy.orm import relationship, validates
 from datetime import datetime
 from src.infrastructure.repository.database import Base
 from src.infrastructure.repository.schemas.enums import (
@@ -9,7 +9,15 @@ from src.infrastructure.repository.schemas.enums import (
     OrderStatusEnum,
     MessageTypeEnum
 )
+from src.domain.entity.clinics.clinic_entity import normalize_location, compile_open_hours
 
+# Триграммный индекс поиска по городу требует pg_trgm, геоиндекс - earthdistance (поверх cube)
+for _extension in ('pg_trgm', 'cube', 'earthdistance'):
+    event.listen(
+        Base.metadata,
+        'before_create',
+        DDL(f'CREATE EXTENSION IF NOT EXISTS {_extension}').execute_if(dialect='postgresql')
+    )
 
 
 class ClinicOrm(Base):
@@ -18,11 +26,57 @@ class ClinicOrm(Base):
     organization_id = Column(Integer, ForeignKey('organizations.user_id'))
     name = Column(String(100), nullable=False)
     location = Column(String(100), nullable=False)
+    # Заполняется автоматически при записи location. В базах, созданных до появления колонки,
+    # ее добавляет и заполняет src.commands.backfill_location_normalized, она же ставит NOT NULL
+    location_normalized = Column(String(100), nullable=True)
     address = Column(String(200), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
     work_hours = Column(JSON, nullable=False)
     is_24_7 = Column(Boolean, default=False, nullable=False)
+    # Недельная битовая карта по минутам, собирается из work_hours/is_24_7 (см. compile_open_hours)
+    open_hours = Column(LargeBinary, nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
 
     # Отношение к организации
     organization = relationship("OrganizationOrm", back_populates="clinics")
+
+    __table_args__ = (
+        Index('ix_clinics_organization_id', organization_id, id),
+        # Ключ upsert пакетного импорта; не уникальный - одноименные филиалы по одному адресу уже возможны
+        Index('ix_clinics_import_key', organization_id, name, address),
+        # Префиксный LIKE 'город%' по btree (text_pattern_ops - независимо от collation)
+        Index(
+            'ix_clinics_location_normalized', location_normalized, id,
+            postgresql_ops={'location_normalized': 'text_pattern_ops'}
+        ),
+        Index(
+            'ix_clinics_location_trgm', location_normalized,
+            postgresql_using='gin', postgresql_ops={'location_normalized': 'gin_trgm_ops'}
+        ).ddl_if(dialect='postgresql'),
+        # earth_box(...) @> ll_to_earth(latitude, longitude) ищет по GiST
+        Index(
+            'ix_clinics_earth', func.ll_to_earth(latitude, longitude),
+            postgresql_using='gist', postgresql_where=latitude.isnot(None)
+        ).ddl_if(dialect='postgresql'),
+    )
+
+    def refresh_open_hours(self):
+        self.open_hours = compile_open_hours(self.work_hours, bool(self.is_24_7))
+
+    @validates('location')
+    def _normalize_location(self, key, value):
+        self.location_normalized = normalize_location(value)
+        return value
+
+
+class CatalogVersionOrm(Base):
+    """Версии in-memory каталогов: запись в каталог увеличивает версию в той же транзакции,
+    воркеры сравнивают ее со своей копией и перечитывают снимок при расхождении
+    """
+    __tablename__ = 'catalog_versions'
+
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Index
 from datetime import datetime
 from src.infrastructure.repository.database import Base
 from sqlalchemy import Enum as SQLAlchemyEnum
@@ -35,3 +35,30 @@ class OrderOrm(Base):
     patient_id = Column(Integer, ForeignKey('users.id'), nullable=True)
     specialist_id = Column(Integer, ForeignKey('users.id'), nullable=True)
     clinic_id = Column(Integer, ForeignKey('clinics.id'), nullable=True)
+
+    # Частичные индексы для ленты активных заказов: историю (1M+ строк) не трогаем
+    __table_args__ = (
+        Index(
+            'ix_orders_active_feed',
+            created_at, id,
+            postgresql_where=status == OrderStatus.ACTIVE,
+            sqlite_where=status == OrderStatus.ACTIVE
+        ),
+        Index(
+            'ix_orders_active_preferred_date',
+            preferred_date,
+            postgresql_where=status == OrderStatus.ACTIVE,
+            sqlite_where=status == OrderStatus.ACTIVE
+        ),
+        Index(
+            'ix_orders_active_service_type',
+            service_type, created_at, id,
+            postgresql_where=status == OrderStatus.ACTIVE,
+            sqlite_where=status == OrderStatus.ACTIVE
+        ),
+        # Keyset-пагинация списков "мои заказы" по (created_at, id)
+        Index('ix_orders_creator_created', creator_id, created_at, id),
+        Index('ix_orders_patient_created', patient_id, created_at, id),
+        Index('ix_orders_specialist_created', specialist_id, created_at, id),
+        Index('ix_orders_clinic_created', clinic_id, created_at, id),
+    )
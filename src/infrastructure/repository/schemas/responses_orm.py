@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from datetime import datetime
 from src.infrastructure.repository.database import Base
 from src.domain.entity.users.user import Role
@@ -29,4 +29,10 @@ class ResponseOrm(Base):
         default='proposed',
         nullable=False
     )
-    updated_at = Column(DateTime, onupdate=datetime.utcnow)
\ No newline at end of file
+    updated_at = Column(DateTime, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_responses_responser_order', responser_id, order_id),
+        Index('ix_responses_order_created', order_id, created_at, response_id),
+        Index('ix_responses_responser_created', responser_id, created_at, response_id),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, CheckConstraint, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, CheckConstraint, Enum, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from src.infrastructure.repository.database import Base
@@ -23,4 +23,36 @@ class ReviewOrm(Base):
 
     __table_args__ = (
         CheckConstraint('rate >= 1 AND rate <= 10', name='ck_review_rate_range'),
+        UniqueConstraint(order_id, sender_id, target_id, name='uq_reviews_order_sender_target'),
+        Index('ix_reviews_target_created', target_type, target_id, created_at, id),
+        Index('ix_reviews_target_rate', target_type, target_id, rate, created_at, id),
     )
+
+    @property
+    def has_response(self) -> int:
+        """Значение ключа сортировки with_response_first для курсора"""
+        return int(self.response is not None)
+
+
+RATE_COLUMNS = {rate: f"rate_{rate}" for rate in range(1, 11)}
+
+
+class ReviewStatsOrm(Base):
+    """Агрегат оценок по цели, обновляется в одной транзакции с отзывами"""
+    __tablename__ = 'review_stats'
+
+    target_type = Column(Enum(ReviewTargetType), primary_key=True)
+    target_id = Column(Integer, primary_key=True)
+    reviews_count = Column(Integer, nullable=False, default=0)
+    rate_sum = Column(Integer, nullable=False, default=0)
+    rate_1 = Column(Integer, nullable=False, default=0)
+    rate_2 = Column(Integer, nullable=False, default=0)
+    rate_3 = Column(Integer, nullable=False, default=0)
+    rate_4 = Column(Integer, nullable=False, default=0)
+    rate_5 = Column(Integer, nullable=False, default=0)
+    rate_6 = Column(Integer, nullable=False, default=0)
+    rate_7 = Column(Integer, nullable=False, default=0)
+    rate_8 = Column(Integer, nullable=False, default=0)
+    rate_9 = Column(Integer, nullable=False, default=0)
+    rate_10 = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from enum import Enum as PyEnum
@@ -45,11 +45,14 @@ class UserOrm(Base):
     phone_number = Column(String(20), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    specialist = relationship("SpecialistOrm", uselist=False, back_populates="user")
-    patient = relationship("PatientOrm", uselist=False, back_populates="user")
-    organization = relationship("OrganizationOrm", uselist=False, back_populates="user")
-    admin = relationship("AdminOrm", uselist=False, back_populates="user")
-    blocked_user = relationship("BlockedUserOrm", uselist=False, back_populates="user")
+    # Профиль принадлежит пользователю: удаление пользователя удаляет и его профиль
+    specialist = relationship("SpecialistOrm", uselist=False, back_populates="user", cascade="all, delete-orphan")
+    patient = relationship("PatientOrm", uselist=False, back_populates="user", cascade="all, delete-orphan")
+    organization = relationship(
+        "OrganizationOrm", uselist=False, back_populates="user", cascade="all, delete-orphan"
+    )
+    admin = relationship("AdminOrm", uselist=False, back_populates="user", cascade="all, delete-orphan")
+    blocked_user = relationship("BlockedUserOrm", uselist=False, back_populates="user", cascade="all, delete-orphan")
 
     __mapper_args__ = {
         'polymorphic_on': 'role'
@@ -64,6 +67,7 @@ class SpecialistOrm(Base):
     specifications = Column(JSON, nullable=False)
     qualification = Column(String(100), nullable=True)
     experience_years = Column(Integer, default=0)
+    is_verified = Column(Boolean, default=False, nullable=False)
 
     user = relationship("UserOrm", back_populates="specialist")
 
@@ -72,6 +76,21 @@ class SpecialistOrm(Base):
     }
 
 
+class SpecialistSpecificationOrm(Base):
+    """Нормализованные спецификации специалистов для фильтра каталога; синхронизируется с
+    SpecialistOrm.specifications в той же транзакции
+    """
+    __tablename__ = 'specialist_specifications'
+
+    # Порядок ключа: поиск по спецификации сразу отдает специалистов по возрастанию id
+    specification = Column(String(100), primary_key=True)
+    specialist_id = Column(Integer, ForeignKey('specialists.user_id', ondelete='CASCADE'), primary_key=True)
+
+    __table_args__ = (
+        Index('ix_specialist_specifications_specialist', specialist_id),
+    )
+
+
 class PatientOrm(Base):
     """ORM модель пациента"""
     __tablename__ = 'patients'
@@ -1,20 +1,48 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update, Select
 from src.domain.interfaces.user.admin_repository import IAdminRepository
 from src.infrastructure.adapters.orm_entity_adapter import UserOrmEntityAdapter, AdminOrmEntityAdapter
 from src.infrastructure.repository.schemas.user_orm import UserOrm, AdminOrm, BlockedUserOrm, PatientOrm, \
     OrganizationOrm, SpecialistOrm
 import logging
-from src.domain.entity.users.admin.admin_entity import Admin, AdminRoles
+from src.domain.entity.users.admin.admin_entity import Admin, AdminRoles, AdminUserFilter, AdminUserRow
 from sqlalchemy.orm import selectinload
+from src.domain.entity.pagination import Page, PageRequest
+from src.infrastructure.repository.pagination import SortKey, paginate
+from src.infrastructure.services.matching.specification_index import SpecificationMatchIndex
+from src.infrastructure.services.users.identity_filter import UserIdentityFilter
+from src.infrastructure.services.users.profile_cards import ProfileCardCache
+from typing import AsyncIterator, Optional
+import os
+
+USER_SORT_KEYS = (SortKey(UserOrm.id),)
+# Строк за одну выборку серверного курсора при выгрузке
+USER_EXPORT_CHUNK_SIZE = int(os.getenv("USER_EXPORT_CHUNK_SIZE", 1000))
+
+ADMIN_USER_COLUMNS = (
+    UserOrm.id, UserOrm.nickname, UserOrm.name, UserOrm.role, UserOrm.photo_path, UserOrm.country,
+    UserOrm.email, UserOrm.phone_number, UserOrm.created_at,
+    BlockedUserOrm.id.is_not(None).label('is_blocked'), BlockedUserOrm.reason.label('blocked_reason')
+)
 
 
 class PostgresAdminRepo(IAdminRepository):
-    def __init__(self, session: AsyncSession, user_adapter: UserOrmEntityAdapter, admin_adapter: AdminOrmEntityAdapter):
+    def __init__(
+            self,
+            session: AsyncSession,
+            user_adapter: UserOrmEntityAdapter,
+            admin_adapter: AdminOrmEntityAdapter,
+            matching_index: Optional[SpecificationMatchIndex] = None,
+            identity_filter: Optional[UserIdentityFilter] = None,
+            profile_cache: Optional[ProfileCardCache] = None
+    ):
         self._session = session
         self._adapter = user_adapter
         self._logger = logging.getLogger(__name__)
         self._admin_adapter = admin_adapter
+        self._matching_index = matching_index
+        self._identity_filter = identity_filter
+        self._profile_cache = profile_cache
 
     @property
     def session(self) -> AsyncSession:
@@ -81,19 +109,57 @@ class PostgresAdminRepo(IAdminRepository):
             self._logger.error(f"Error getting admin profile: {e}", exc_info=True)
             raise
 
-    async def get_all_users(self, page: int, page_size: int):
-        offset = (page - 1) * page_size
-        stmt = select(UserOrm).options(
-            selectinload(UserOrm.patient),
-            selectinload(UserOrm.specialist),
-            selectinload(UserOrm.organization),
-            selectinload(UserOrm.admin),
-            selectinload(UserOrm.blocked_user)
-        ).limit(page_size).offset(offset)
+    async def get_all_users(
+            self,
+            page: Optional[PageRequest] = None,
+            filters: Optional[AdminUserFilter] = None
+    ) -> Page[AdminUserRow]:
+        """Пользователи по фильтрам, keyset по id; только колонки списка, профили не загружаются"""
+        try:
+            return await paginate(
+                self._session, self._users_query(filters), USER_SORT_KEYS, page,
+                to_item=self._to_row, scalars=False
+            )
+        except Exception as e:
+            self._logger.error(f"Error getting users: {e}", exc_info=True)
+            raise
 
-        result = await self._session.execute(stmt)
-        user_orms = result.scalars().unique().all()
-        return [await self._admin_adapter.to_entity(orm) for orm in user_orms]
+    async def stream_users(self, filters: Optional[AdminUserFilter] = None) -> AsyncIterator[AdminUserRow]:
+        """Все пользователи по фильтрам в порядке id через серверный курсор - память не растет с таблицей"""
+        stmt = (
+            self._users_query(filters)
+            .order_by(*(key.order_by() for key in USER_SORT_KEYS))
+            .execution_options(yield_per=USER_EXPORT_CHUNK_SIZE)
+        )
+        result = await self._session.stream(stmt)
+        try:
+            async for row in result:
+                yield AdminUserRow(**row._mapping)
+        finally:
+            await result.close()
+
+    @staticmethod
+    def _users_query(filters: Optional[AdminUserFilter]) -> Select:
+        stmt = select(*ADMIN_USER_COLUMNS).outerjoin(BlockedUserOrm, BlockedUserOrm.user_id == UserOrm.id)
+        if filters is None:
+            return stmt
+        if filters.role is not None:
+            stmt = stmt.where(UserOrm.role == filters.role)
+        if filters.is_blocked is not None:
+            stmt = stmt.where(BlockedUserOrm.id.is_not(None) if filters.is_blocked else BlockedUserOrm.id.is_(None))
+        if filters.country:
+            stmt = stmt.where(func.lower(UserOrm.country) == filters.country.strip().lower())
+        if filters.created_from is not None:
+            stmt = stmt.where(UserOrm.created_at >= filters.created_from)
+        if filters.created_to is not None:
+            stmt = stmt.where(UserOrm.created_at < filters.created_to)
+        if filters.nickname_prefix:
+            stmt = stmt.where(UserOrm.nickname.startswith(filters.nickname_prefix, autoescape=True))
+        return stmt
+
+    @staticmethod
+    async def _to_row(row) -> AdminUserRow:
+        return AdminUserRow(**row._mapping)
 
     async def update_admin_privileges(
             self,
@@ -143,6 +209,7 @@ class PostgresAdminRepo(IAdminRepository):
             blocked_user_orm = BlockedUserOrm(user_id=user_id, reason=reason)
             self._session.add(blocked_user_orm)
             await self._session.commit()
+            self._forget(user_id)
             return True
         except Exception as e:
             self._logger.error(f"Error blocking user: {e}", exc_info=True)
@@ -161,6 +228,7 @@ class PostgresAdminRepo(IAdminRepository):
 
             await self._session.delete(blocked_user)
             await self._session.commit()
+            self._forget(user_id)
             return True
         except Exception as e:
             self._logger.error(f"Error unblocking user: {e}", exc_info=True)
@@ -172,14 +240,41 @@ class PostgresAdminRepo(IAdminRepository):
             user_orm = await self._session.get(UserOrm, user_id)
             if not user_orm:
                 raise ValueError("User not found")
+            nickname, email = user_orm.nickname, user_orm.email
             await self._session.delete(user_orm)
             await self._session.commit()
+            self._forget(user_id)
+            if self._identity_filter is not None:
+                self._identity_filter.remove(nickname=nickname, email=email)
+            if self._matching_index is not None:
+                self._matching_index.remove_specialist(user_id)
             return True
         except Exception as e:
             self._logger.error(f"Error deleting user: {e}", exc_info=True)
             await self._session.rollback()
             return e
 
+    async def set_specialist_verified(self, user_id: int, is_verified: bool) -> bool:
+        """Отметка проверки специалиста для фильтра каталога; False - специалиста нет"""
+        try:
+            result = await self._session.execute(
+                update(SpecialistOrm).where(SpecialistOrm.user_id == user_id).values(is_verified=is_verified)
+            )
+            if not result.rowcount:
+                return False
+            await self._session.commit()
+            self._forget(user_id)
+            return True
+        except Exception as e:
+            self._logger.error(f"Error setting specialist verification: {e}", exc_info=True)
+            await self._session.rollback()
+            raise
+
+    def _forget(self, user_id: int):
+        # Закэшированная карточка пользователя после блокировки, удаления или проверки устарела
+        if self._profile_cache is not None:
+            self._profile_cache.invalidate(user_id)
+
     async def get_statisctics(self) -> dict:
         try:
             total_users_stmt = select(func.count()).select_from(UserOrm)
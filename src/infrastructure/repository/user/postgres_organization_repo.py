@@ -58,7 +58,10 @@ class PostgresOrganizationRepo(IOrganizationRepository):
         stmt = (
             select(OrganizationOrm)
             .where(OrganizationOrm.user_id == user_id)
-            .options(selectinload(OrganizationOrm.clinics))
+            .options(
+                selectinload(OrganizationOrm.clinics),
+                selectinload(OrganizationOrm.user).selectinload(UserOrm.blocked_user)
+            )
         )
         result = await self._session.execute(stmt)
         organization_orm = result.scalars().first()
@@ -7,14 +7,21 @@ from src.infrastructure.adapters.orm_entity_adapter import UserOrmEntityAdapter
 from src.domain.entity.users.patient.patient import Patient
 from src.infrastructure.repository.schemas.user_orm import UserOrm
 from sqlalchemy.orm import selectinload
-from typing import Dict, Any
+from src.infrastructure.services.users.profile_cards import ProfileCardCache
+from typing import Dict, Any, Optional
 import logging
 
 
 class PostgresPatientRepo(IPatientRepository):
-    def __init__(self, session: AsyncSession, adapter: UserOrmEntityAdapter):
+    def __init__(
+            self,
+            session: AsyncSession,
+            adapter: UserOrmEntityAdapter,
+            profile_cache: Optional[ProfileCardCache] = None
+    ):
         self._session = session
         self._adapter = adapter
+        self._profile_cache = profile_cache
         self._logger = logging.getLogger(__name__)
 
     @property
@@ -40,6 +47,7 @@ class PostgresPatientRepo(IPatientRepository):
             patient_orm = PatientOrm(user_id=user_id, city=city)
             self._session.add(patient_orm)
             await self._session.commit()
+            self._forget_card(user_id)
 
             await self._session.refresh(user_orm, attribute_names=['patient', 'blocked_user'])
 
@@ -52,7 +60,7 @@ class PostgresPatientRepo(IPatientRepository):
 
     async def get_patient_profile(self, user_id: int) -> Patient:
         stmt = select(PatientOrm).where(PatientOrm.user_id == user_id).options(
-            selectinload(PatientOrm.user)
+            selectinload(PatientOrm.user).selectinload(UserOrm.blocked_user)
         )
         result = await self.session.execute(stmt)
         patient_orm = result.scalar_one_or_none()
@@ -65,10 +73,11 @@ class PostgresPatientRepo(IPatientRepository):
         stmt = sa.update(PatientOrm).where(PatientOrm.user_id == user_id).values(**update_data)
         await self._session.execute(stmt)
         await self._session.commit()
+        self._forget_card(user_id)
 
         result = await self._session.execute(
             select(PatientOrm)
-            .options(selectinload(PatientOrm.user))
+            .options(selectinload(PatientOrm.user).selectinload(UserOrm.blocked_user))
             .where(PatientOrm.user_id == user_id)
         )
         updated_patient_orm = result.scalar_one_or_none()
@@ -84,6 +93,7 @@ class PostgresPatientRepo(IPatientRepository):
 
             patient_orm.city = new_city
             await self._session.commit()
+            self._forget_card(user_id)
 
             # Получаем обновленные данные
             user_orm = await self._session.get(UserOrm, user_id)
@@ -92,4 +102,8 @@ class PostgresPatientRepo(IPatientRepository):
         except Exception as e:
             self._logger.error(f"Error updating city: {e}", exc_info=True)
             await self._session.rollback()
-            raise
\ No newline at end of file
+            raise
+
+    def _forget_card(self, user_id: int):
+        if self._profile_cache is not None:
+            self._profile_cache.invalidate(user_id)
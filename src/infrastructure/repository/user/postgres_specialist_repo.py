@@ -1,18 +1,40 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.domain.interfaces.user.specialistic_repository import ISpecialistRepository
 from src.infrastructure.adapters.orm_entity_adapter import UserOrmEntityAdapter
-from typing import List
-from sqlalchemy import select
-from src.infrastructure.repository.schemas.user_orm import UserOrm, SpecialistOrm
-from src.domain.entity.users.specialist.specialist import Specialist
+from typing import List, Optional, Iterable
+from sqlalchemy import select, delete, insert, exists, func
+from src.infrastructure.repository.schemas.user_orm import (
+    UserOrm, SpecialistOrm, SpecialistSpecificationOrm, BlockedUserOrm
+)
+from src.domain.entity.users.specialist.specialist import Specialist, SpecialistDirectoryCard
+from src.domain.entity.pagination import Page, PageRequest
+from src.infrastructure.repository.pagination import SortKey, paginate
 from sqlalchemy.orm import selectinload
+from src.infrastructure.services.matching.specification_index import (
+    SpecificationMatchIndex, normalize_specifications
+)
+from src.infrastructure.services.ratings.leaderboard import RatingLeaderboard
+from src.infrastructure.services.users.profile_cards import ProfileCardCache
+from src.domain.entity.clinics.reviews import ReviewTargetType
 import logging
 
+DIRECTORY_SORT_KEYS = (SortKey(SpecialistOrm.user_id, name='id'),)
+
 
 class PostgresSpecialistRepo(ISpecialistRepository):
-    def __init__(self, session: AsyncSession, adapter: UserOrmEntityAdapter):
+    def __init__(
+            self,
+            session: AsyncSession,
+            adapter: UserOrmEntityAdapter,
+            matching_index: Optional[SpecificationMatchIndex] = None,
+            leaderboard: Optional[RatingLeaderboard] = None,
+            profile_cache: Optional[ProfileCardCache] = None
+    ):
         self._session = session
         self._adapter = adapter
+        self._matching_index = matching_index
+        self._leaderboard = leaderboard
+        self._profile_cache = profile_cache
         self._logger = logging.getLogger(__name__)
 
     @property
@@ -49,7 +71,11 @@ class PostgresSpecialistRepo(ISpecialistRepository):
             )
 
             self._session.add(specialist_orm)
+            await self._session.flush()
+            await self._replace_specifications(user_id, specifications)
             await self._session.commit()
+            self._forget_card(user_id)
+            self.index_specialist(user_id, specifications)
 
             await self._session.refresh(user_orm, attribute_names=['specialist', 'blocked_user'])
 
@@ -62,7 +88,7 @@ class PostgresSpecialistRepo(ISpecialistRepository):
 
     async def get_specialist_profile(self, user_id: int) -> Specialist:
         stmt = select(SpecialistOrm).where(SpecialistOrm.user_id == user_id).options(
-            selectinload(SpecialistOrm.user)
+            selectinload(SpecialistOrm.user).selectinload(UserOrm.blocked_user)
         )
         result = await self.session.execute(stmt)
         specialist_orm = result.scalar_one_or_none()
@@ -78,7 +104,14 @@ class PostgresSpecialistRepo(ISpecialistRepository):
                 raise ValueError("Specialist not found")
 
             specialist_orm.specifications = new_specs
+            await self._replace_specifications(user_id, new_specs)
             await self._session.commit()
+            self._forget_card(user_id)
+
+            if self._matching_index:
+                self._matching_index.set_specialist(user_id, new_specs)
+            if self._leaderboard:
+                self._leaderboard.set_scopes(ReviewTargetType.SPECIALIST, user_id, new_specs)
 
             # Получаем обновленные данные
             user_orm = await self._session.get(UserOrm, user_id)
@@ -89,6 +122,83 @@ class PostgresSpecialistRepo(ISpecialistRepository):
             await self._session.rollback()
             raise
 
+    async def search_directory(
+            self,
+            *,
+            specifications: Optional[Iterable[str]] = None,
+            min_experience: Optional[int] = None,
+            is_verified: Optional[bool] = None,
+            country: Optional[str] = None,
+            page: Optional[PageRequest] = None
+    ) -> Page[SpecialistDirectoryCard]:
+        """Каталог: специалисты со всеми указанными спецификациями, keyset по id.
+
+        Заблокированные пользователи в каталог не попадают.
+        """
+        try:
+            stmt = (
+                select(
+                    SpecialistOrm.user_id.label('id'),
+                    UserOrm.nickname,
+                    UserOrm.name,
+                    UserOrm.photo_path,
+                    UserOrm.country,
+                    SpecialistOrm.specifications,
+                    SpecialistOrm.qualification,
+                    SpecialistOrm.experience_years,
+                    SpecialistOrm.is_verified
+                )
+                .join(UserOrm, UserOrm.id == SpecialistOrm.user_id)
+                .where(~exists().where(BlockedUserOrm.user_id == SpecialistOrm.user_id))
+            )
+            specs = normalize_specifications(specifications)
+            if specs:
+                # Каждая спецификация - поиск по первичному ключу specialist_specifications
+                matching = (
+                    select(SpecialistSpecificationOrm.specialist_id)
+                    .where(SpecialistSpecificationOrm.specification.in_(specs))
+                    .group_by(SpecialistSpecificationOrm.specialist_id)
+                    .having(func.count() == len(specs))
+                )
+                stmt = stmt.where(SpecialistOrm.user_id.in_(matching))
+            if min_experience is not None:
+                stmt = stmt.where(SpecialistOrm.experience_years >= min_experience)
+            if is_verified is not None:
+                stmt = stmt.where(SpecialistOrm.is_verified.is_(is_verified))
+            if country:
+                stmt = stmt.where(func.lower(UserOrm.country) == country.strip().lower())
+
+            async def to_item(row):
+                return SpecialistDirectoryCard(**row._mapping)
+
+            return await paginate(self._session, stmt, DIRECTORY_SORT_KEYS, page, to_item=to_item, scalars=False)
+        except Exception as e:
+            self._logger.error(f"Error searching specialists: {e}", exc_info=True)
+            raise
+
+    def index_specialist(self, user_id: int, specifications: List[str]):
+        """Добавить специалиста, профиль которого записан вне этого репозитория, в индексы процесса"""
+        if self._matching_index:
+            self._matching_index.set_specialist(user_id, specifications)
+        if self._leaderboard:
+            self._leaderboard.set_scopes(ReviewTargetType.SPECIALIST, user_id, specifications)
+
+    def _forget_card(self, user_id: int):
+        if self._profile_cache is not None:
+            self._profile_cache.invalidate(user_id)
+
+    async def _replace_specifications(self, user_id: int, specifications: Iterable[str]):
+        """Строки specialist_specifications в транзакции вызывающего (без commit)"""
+        await self._session.execute(
+            delete(SpecialistSpecificationOrm).where(SpecialistSpecificationOrm.specialist_id == user_id)
+        )
+        specs = normalize_specifications(specifications)
+        if specs:
+            await self._session.execute(
+                insert(SpecialistSpecificationOrm),
+                [{'specification': spec, 'specialist_id': user_id} for spec in sorted(specs)]
+            )
+
     async def add_qualification(self, user_id: int, qualification: str) -> Specialist:
         try:
             specialist_orm = await self._session.get(SpecialistOrm, user_id)
@@ -97,6 +207,7 @@ class PostgresSpecialistRepo(ISpecialistRepository):
 
             specialist_orm.qualification = qualification
             await self._session.commit()
+            self._forget_card(user_id)
 
             # Получаем обновленные данные
             user_orm = await self._session.get(UserOrm, user_id)
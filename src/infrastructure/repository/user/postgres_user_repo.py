@@ -1,13 +1,22 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, exists, insert, update, delete, or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 from src.domain.interfaces.user.user_repositiry import IUserRepository
 from src.infrastructure.adapters.orm_entity_adapter import UserOrmEntityAdapter
-from src.infrastructure.repository.schemas.user_orm import UserOrm, OrganizationOrm
-from src.domain.entity.users.user import User, UserFull
+from src.infrastructure.repository.loaders import EntityLoaders
+from src.infrastructure.repository.errors import violated_constraint
+from src.infrastructure.services.users.profile_cards import ProfileCardCache
+from src.infrastructure.services.users.identity_filter import UserIdentityFilter
+from src.infrastructure.services.matching.specification_index import SpecificationMatchIndex
+from src.infrastructure.repository.schemas.user_orm import (
+    UserOrm, OrganizationOrm, SpecialistOrm, SpecialistSpecificationOrm, PatientOrm, AdminOrm, AdminRoles, Role
+)
+from src.infrastructure.services.matching.specification_index import normalize_specifications
+from src.domain.entity.users.user import User, UserInput, UserFull, UserProfileCard
 from src.domain.interfaces.user.user_repositiry import SettingsUserData
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 import bcrypt
 import jwt
 from dotenv import load_dotenv
@@ -20,11 +29,46 @@ JWT_SECRET = getenv('JWT_SECRET_KEY', 'test-secret')
 JWT_ALGORITHM = getenv('JWT_ALGORITHM', 'HS256')
 JWT_EXPIRATION = int(getenv('JWT_EXPIRATION', '60'))
 
+# Таблица профиля каждой роли; первичный ключ - user_id
+PROFILE_TABLES = {
+    Role.SPECIALIST: SpecialistOrm,
+    Role.PATIENT: PatientOrm,
+    Role.ORGANIZATION: OrganizationOrm,
+    Role.ADMIN: AdminOrm,
+}
+
+# Ограничения уникальности пользователя: имя в Postgres -> колонки в сообщении SQLite
+USER_UNIQUE_CONSTRAINTS = {
+    'users_nickname_key': ('users.nickname',),
+    'users_email_key': ('users.email',),
+}
+DUPLICATE_MESSAGES = {
+    'users_nickname_key': "Nickname already exists",
+    'users_email_key': "Email already exists",
+}
+
+PROFILE_CARD_COLUMNS = (
+    UserOrm.id, UserOrm.nickname, UserOrm.name, UserOrm.role,
+    UserOrm.photo_path, UserOrm.country
+)
+
 
 class PostgresUserRepo(IUserRepository):
-    def __init__(self, session: AsyncSession, adapter: UserOrmEntityAdapter):
+    def __init__(
+            self,
+            session: AsyncSession,
+            adapter: UserOrmEntityAdapter,
+            loaders: Optional[EntityLoaders] = None,
+            profile_cache: Optional[ProfileCardCache] = None,
+            identity_filter: Optional[UserIdentityFilter] = None,
+            matching_index: Optional[SpecificationMatchIndex] = None
+    ):
         self._session = session
         self._adapter = adapter
+        self._loaders = loaders
+        self._profile_cache = profile_cache
+        self._identity_filter = identity_filter
+        self._matching_index = matching_index
         self._logger = logging.getLogger(__name__)
 
     @property
@@ -37,6 +81,8 @@ class PostgresUserRepo(IUserRepository):
         try:
             self.session.add(user_orm)
             await self.session.commit()
+            if self._identity_filter is not None:
+                self._identity_filter.add(nickname=user_orm.nickname, email=user_orm.email)
 
             await self.session.refresh(user_orm, attribute_names=[
                 'specialist', 'patient', 'organization', 'admin', 'blocked_user'
@@ -49,8 +95,173 @@ class PostgresUserRepo(IUserRepository):
             logging.error(f"Error creating user: {e}")
             raise
 
+    async def create_with_profile(self, user_input: UserInput, profile_data: Dict[str, Any]) -> User:
+        """Пользователь и профиль его роли одной транзакцией.
+
+        Занятость никнейма и email определяется нарушением уникальности при вставке (ValueError),
+        без предварительных запросов. Сущность собирается из записанных объектов без перечитывания.
+        """
+        user_orm = await self._adapter.to_orm(user_input)
+        role = Role(user_orm.role)
+        profile_orm = self._build_profile(role, profile_data)
+        # Все связи выставлены явно: адаптер прочитает их после commit без ленивой загрузки
+        user_orm.specialist = profile_orm if role == Role.SPECIALIST else None
+        user_orm.patient = profile_orm if role == Role.PATIENT else None
+        user_orm.organization = profile_orm if role == Role.ORGANIZATION else None
+        user_orm.admin = profile_orm if role == Role.ADMIN else None
+        user_orm.blocked_user = None
+
+        try:
+            self._session.add(user_orm)
+            if role == Role.SPECIALIST:
+                specs = normalize_specifications(profile_orm.specifications)
+                if specs:
+                    # id пользователя нужен строкам спецификаций; flush не завершает транзакцию
+                    await self._session.flush()
+                    await self._session.execute(
+                        insert(SpecialistSpecificationOrm),
+                        [{'specification': spec, 'specialist_id': user_orm.id} for spec in sorted(specs)]
+                    )
+            await self._session.commit()
+        except IntegrityError as e:
+            await self._session.rollback()
+            message = self._duplicate_message(e)
+            if message is None:
+                self._logger.error(f"Integrity error writing user: {e}", exc_info=True)
+                raise
+            raise ValueError(message) from e
+        except Exception as e:
+            self._logger.error(f"Error creating user with profile: {e}", exc_info=True)
+            await self._session.rollback()
+            raise
+
+        if self._identity_filter is not None:
+            self._identity_filter.add(nickname=user_orm.nickname, email=user_orm.email)
+        user = await self._adapter.to_entity(user_orm)
+        if self._loaders:
+            self._loaders.users.prime(user.id, user)
+        return user
+
+    async def find_taken_identities(self, nicknames: Iterable[str], emails: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+        """Какие из никнеймов и email уже заняты - один запрос на весь набор"""
+        nicknames, emails = set(nicknames), set(emails)
+        if not nicknames and not emails:
+            return set(), set()
+        try:
+            result = await self._session.execute(
+                select(UserOrm.nickname, UserOrm.email)
+                .where(or_(UserOrm.nickname.in_(nicknames), UserOrm.email.in_(emails)))
+            )
+            taken_nicknames, taken_emails = set(), set()
+            for nickname, email in result.all():
+                if nickname in nicknames:
+                    taken_nicknames.add(nickname)
+                if email in emails:
+                    taken_emails.add(email)
+            return taken_nicknames, taken_emails
+        except Exception as e:
+            self._logger.error(f"Error finding taken identities: {e}", exc_info=True)
+            raise
+
+    async def provision_users(
+            self,
+            users: List[Tuple[UserInput, Dict[str, Any]]],
+            organization_id: Optional[int] = None
+    ) -> Dict[str, int]:
+        """Пакет пользователей с профилями (как при регистрации, _build_profile): пакетные INSERT, одна транзакция.
+
+        Возвращает {никнейм: id}. organization_id задан - созданные специалисты добавляются в
+        сотрудники организации. Дубликат никнейма или email откатывает весь пакет (ValueError).
+        """
+        if not users:
+            return {}
+        try:
+            result = await self._session.execute(
+                insert(UserOrm).returning(UserOrm.id, UserOrm.nickname),
+                [
+                    {
+                        'nickname': user.nickname, 'name': user.name, 'role': Role(user.role),
+                        'photo_path': user.photo_path, 'country': user.country, 'email': user.email,
+                        'phone_number': user.phone_number, 'password_hash': user.password_hash
+                    }
+                    for user, _ in users
+                ]
+            )
+            ids = {nickname: user_id for user_id, nickname in result.all()}
+
+            profiles, specifications, staff_ids = [], [], []
+            for user, data in users:
+                user_id, role = ids[user.nickname], Role(user.role)
+                profile_orm = self._build_profile(role, data)
+                if profile_orm is None:
+                    continue
+                profile_orm.user_id = user_id
+                profiles.append(profile_orm)
+                if role == Role.SPECIALIST:
+                    staff_ids.append(user_id)
+                    specifications.extend(
+                        {'specification': spec, 'specialist_id': user_id}
+                        for spec in sorted(normalize_specifications(profile_orm.specifications))
+                    )
+            # Профили одной таблицы flush пишет одним пакетом; строки спецификаций ссылаются на профили
+            self._session.add_all(profiles)
+            await self._session.flush()
+            if specifications:
+                await self._session.execute(insert(SpecialistSpecificationOrm), specifications)
+
+            if organization_id is not None and staff_ids:
+                organization_orm = await self._session.get(OrganizationOrm, organization_id)
+                if organization_orm is not None:
+                    organization_orm.members = list(organization_orm.members or []) + staff_ids
+            await self._session.commit()
+        except IntegrityError as e:
+            await self._session.rollback()
+            message = self._duplicate_message(e)
+            if message is None:
+                self._logger.error(f"Integrity error writing user: {e}", exc_info=True)
+                raise
+            raise ValueError(message) from e
+        except Exception as e:
+            self._logger.error(f"Error provisioning users: {e}", exc_info=True)
+            await self._session.rollback()
+            raise
+
+        if self._identity_filter is not None:
+            for user, _ in users:
+                self._identity_filter.add(nickname=user.nickname, email=user.email)
+        return ids
+
+    @staticmethod
+    def _build_profile(role: Role, data: Dict[str, Any]):
+        if role == Role.SPECIALIST:
+            return SpecialistOrm(
+                specifications=data['specifications'],
+                qualification=data.get('qualification'),
+                experience_years=data.get('experience_years', 0),
+                is_verified=False
+            )
+        if role == Role.PATIENT:
+            return PatientOrm(city=data['city'])
+        if role == Role.ORGANIZATION:
+            return OrganizationOrm(locations=data['locations'], clinics=[], members=[])
+        if role == Role.ADMIN:
+            admin_role = data['admin_role']
+            return AdminOrm(
+                admin_role=AdminRoles(getattr(admin_role, 'value', admin_role)),
+                is_superadmin=data.get('is_superadmin', False)
+            )
+        return None
+
+    @staticmethod
+    def _duplicate_message(error: IntegrityError) -> Optional[str]:
+        """Текст для клиента, если занят никнейм или email; None - другое нарушение целостности"""
+        constraint = violated_constraint(error, USER_UNIQUE_CONSTRAINTS)
+        return DUPLICATE_MESSAGES.get(constraint)
+
     async def get_by_id(self, id: int):
         try:
+            if self._loaders:
+                return await self._loaders.users.load(int(id))
             stmt = (
                 select(UserOrm)
                 .where(UserOrm.id == id)
@@ -71,6 +282,87 @@ class PostgresUserRepo(IUserRepository):
             self._logger.error(f"Error getting user by id: {e}", exc_info=True)
             raise
 
+    async def get_by_ids(self, user_ids: Iterable[int]) -> Dict[int, User]:
+        # Без загрузчиков - один IN-запрос; с ними - через общий пакет и память запроса
+        user_ids = list(dict.fromkeys(int(user_id) for user_id in user_ids))
+        if not user_ids:
+            return {}
+        try:
+            if self._loaders:
+                users = await self._loaders.users.load_many(user_ids)
+                return {user.id: user for user in users if user is not None}
+            stmt = select(UserOrm).where(UserOrm.id.in_(user_ids)).options(
+                selectinload(UserOrm.specialist),
+                selectinload(UserOrm.patient),
+                selectinload(UserOrm.organization).selectinload(OrganizationOrm.clinics),
+                selectinload(UserOrm.admin),
+                selectinload(UserOrm.blocked_user),
+            )
+            result = await self._session.execute(stmt)
+            return {user_orm.id: await self._adapter.to_entity(user_orm) for user_orm in result.scalars().all()}
+        except Exception as e:
+            self._logger.error(f"Error getting users by ids: {e}", exc_info=True)
+            raise
+
+    async def get_profile_cards(self, user_ids_by_role: Dict[Role, Iterable[int]]) -> Dict[int, UserProfileCard]:
+        # Один IN-запрос на роль, только нужные колонки без загрузки ORM-объектов
+        try:
+            profile_columns = {
+                Role.SPECIALIST: (
+                    SpecialistOrm,
+                    SpecialistOrm.specifications, SpecialistOrm.qualification, SpecialistOrm.experience_years
+                ),
+                Role.PATIENT: (PatientOrm, PatientOrm.city),
+            }
+
+            cards = {}
+            for role, user_ids in user_ids_by_role.items():
+                user_ids = set(user_ids)
+                if not user_ids:
+                    continue
+                stmt = select(*PROFILE_CARD_COLUMNS).where(UserOrm.id.in_(user_ids), UserOrm.role == role)
+                if role in profile_columns:
+                    profile_orm, *columns = profile_columns[role]
+                    stmt = stmt.add_columns(*columns).outerjoin(profile_orm, profile_orm.user_id == UserOrm.id)
+                result = await self._session.execute(stmt)
+                for row in result.mappings():
+                    cards[row["id"]] = UserProfileCard(**row)
+            return cards
+        except Exception as e:
+            self._logger.error(f"Error getting profile cards: {e}", exc_info=True)
+            raise
+
+    async def get_profile_cards_by_ids(self, user_ids: Iterable[int]) -> Dict[int, UserProfileCard]:
+        # Роль заранее неизвестна: промахи кэша читаются одним запросом с внешними соединениями к профилям
+        user_ids = list(dict.fromkeys(int(user_id) for user_id in user_ids))
+        if not user_ids:
+            return {}
+        try:
+            if self._profile_cache is not None:
+                cards, missing = self._profile_cache.get_many(user_ids)
+            else:
+                cards, missing = {}, user_ids
+            if missing:
+                stmt = (
+                    select(
+                        *PROFILE_CARD_COLUMNS,
+                        SpecialistOrm.specifications, SpecialistOrm.qualification, SpecialistOrm.experience_years,
+                        PatientOrm.city
+                    )
+                    .outerjoin(SpecialistOrm, SpecialistOrm.user_id == UserOrm.id)
+                    .outerjoin(PatientOrm, PatientOrm.user_id == UserOrm.id)
+                    .where(UserOrm.id.in_(missing))
+                )
+                result = await self._session.execute(stmt)
+                loaded = [UserProfileCard(**row) for row in result.mappings()]
+                if self._profile_cache is not None:
+                    self._profile_cache.put_many(loaded)
+                cards.update((card.id, card) for card in loaded)
+            return cards
+        except Exception as e:
+            self._logger.error(f"Error getting profile cards by ids: {e}", exc_info=True)
+            raise
+
     async def update(self, user_id: int, update_data: dict) -> bool:
         try:
             stmt = select(UserOrm).where(UserOrm.id == user_id)
@@ -81,12 +373,19 @@ class PostgresUserRepo(IUserRepository):
                 raise ValueError(f"User with id {user_id} not found")
 
             allowed_fields = ['nickname', 'name', 'photo_path', 'country', 'email', 'phone_number', 'password_hash']
+            previous = {'nickname': user_orm.nickname, 'email': user_orm.email}
             for field, value in update_data.items():
                 if field in allowed_fields:
                     setattr(user_orm, field, value)
 
             self._session.add(user_orm)
             await self._session.commit()
+            self._forget(user_id)
+            if self._identity_filter is not None:
+                released = {field: old for field, old in previous.items() if getattr(user_orm, field) != old}
+                if released:
+                    self._identity_filter.remove(**released)
+                    self._identity_filter.add(**{field: getattr(user_orm, field) for field in released})
             return True
 
         except Exception as e:
@@ -94,6 +393,80 @@ class PostgresUserRepo(IUserRepository):
             await self._session.rollback()
             raise
 
+    async def get_settings_state(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Роль, никнейм, email и уровень админа - все, что нужно для проверки изменения настроек"""
+        try:
+            result = await self._session.execute(
+                select(UserOrm.role, UserOrm.nickname, UserOrm.email, AdminOrm.admin_role)
+                .outerjoin(AdminOrm, AdminOrm.user_id == UserOrm.id)
+                .where(UserOrm.id == user_id)
+            )
+            row = result.one_or_none()
+            return dict(row._mapping) if row else None
+        except Exception as e:
+            self._logger.error(f"Error getting settings state: {e}", exc_info=True)
+            raise
+
+    async def patch_settings(
+            self,
+            user_id: int,
+            role: Role,
+            user_fields: Dict[str, Any],
+            profile_fields: Dict[str, Any],
+            previous: Optional[Dict[str, str]] = None
+    ):
+        """Частичное обновление пользователя и профиля его роли: по одному UPDATE на таблицу, одна транзакция.
+
+        previous - прежние никнейм и email, чтобы освободить их в фильтре занятости.
+        Дубликат никнейма или email откатывает все изменения (ValueError).
+        """
+        role = Role(role)
+        try:
+            if user_fields:
+                result = await self._session.execute(
+                    update(UserOrm).where(UserOrm.id == user_id).values(**user_fields)
+                )
+                if result.rowcount == 0:
+                    raise ValueError(f"User with id {user_id} not found")
+            if profile_fields:
+                profile_orm = PROFILE_TABLES[role]
+                if 'admin_role' in profile_fields:
+                    profile_fields = {**profile_fields, 'admin_role': AdminRoles(profile_fields['admin_role'])}
+                result = await self._session.execute(
+                    update(profile_orm).where(profile_orm.user_id == user_id).values(**profile_fields)
+                )
+                if result.rowcount == 0:
+                    raise ValueError(f"{role.value.capitalize()} profile not found")
+                if role == Role.SPECIALIST and 'specifications' in profile_fields:
+                    await self._session.execute(
+                        delete(SpecialistSpecificationOrm).where(SpecialistSpecificationOrm.specialist_id == user_id)
+                    )
+                    specs = normalize_specifications(profile_fields['specifications'])
+                    if specs:
+                        await self._session.execute(
+                            insert(SpecialistSpecificationOrm),
+                            [{'specification': spec, 'specialist_id': user_id} for spec in sorted(specs)]
+                        )
+            await self._session.commit()
+        except IntegrityError as e:
+            await self._session.rollback()
+            message = self._duplicate_message(e)
+            if message is None:
+                self._logger.error(f"Integrity error writing user: {e}", exc_info=True)
+                raise
+            raise ValueError(message) from e
+        except Exception as e:
+            self._logger.error(f"Error patching settings: {e}", exc_info=True)
+            await self._session.rollback()
+            raise
+
+        self._forget(user_id)
+        if self._identity_filter is not None and previous:
+            released = {field: old for field, old in previous.items() if field in user_fields}
+            if released:
+                self._identity_filter.remove(**released)
+                self._identity_filter.add(**{field: user_fields[field] for field in released})
+
     async def get_by_nickname(self, nickname: str) -> Optional[UserOrm]:
         try:
             stmt = (
@@ -126,8 +499,14 @@ class PostgresUserRepo(IUserRepository):
         try:
             user_orm = await self._session.get(UserOrm, user.id)
             if user_orm:
+                nickname, email = user_orm.nickname, user_orm.email
                 await self._session.delete(user_orm)
                 await self._session.commit()
+                self._forget(user.id)
+                if self._identity_filter is not None:
+                    self._identity_filter.remove(nickname=nickname, email=email)
+                if self._matching_index is not None:
+                    self._matching_index.remove_specialist(user.id)
                 return True
             return False
         except Exception as e:
@@ -135,6 +514,13 @@ class PostgresUserRepo(IUserRepository):
             await self._session.rollback()
             raise
 
+    def _forget(self, user_id: int):
+        # Запомненный за запрос пользователь и его карточка после записи устарели
+        if self._loaders:
+            self._loaders.users.clear(user_id)
+        if self._profile_cache is not None:
+            self._profile_cache.invalidate(user_id)
+
     async def _verify_password(self, password: str, hashed_password: str) -> bool:
         return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
 
@@ -171,6 +557,7 @@ class PostgresUserRepo(IUserRepository):
 
             user_orm.settings = user.settings
             await self._session.commit()
+            self._forget(user.id)
             return True
         except Exception as e:
             self._logger.error(f"Error setting user settings: {e}", exc_info=True)
@@ -179,16 +566,25 @@ class PostgresUserRepo(IUserRepository):
 
     async def check_nickname_exists(self, nickname: str) -> bool:
         try:
-            return await self.get_by_nickname(nickname) is not None
+            return await self._session.scalar(select(exists().where(UserOrm.nickname == nickname)))
         except Exception as e:
             self._logger.error(f"Error checking nickname existence: {e}", exc_info=True)
             raise
 
     async def check_email_exists(self, email: str) -> bool:
         try:
-            stmt = select(UserOrm).where(UserOrm.email == email)
-            result = await self._session.execute(stmt)
-            return result.scalar_one_or_none() is not None
+            return await self._session.scalar(select(exists().where(UserOrm.email == email)))
         except Exception as e:
             self._logger.error(f"Error checking email existence: {e}", exc_info=True)
             raise
+
+    async def is_nickname_available(self, nickname: str) -> bool:
+        # Промах фильтра - никнейм точно свободен, в БД идем только при попадании
+        if self._identity_filter is not None and not self._identity_filter.might_contain_nickname(nickname):
+            return True
+        return not await self.check_nickname_exists(nickname)
+
+    async def is_email_available(self, email: str) -> bool:
+        if self._identity_filter is not None and not self._identity_filter.might_contain_email(email):
+            return True
+        return not await self.check_email_exists(email)
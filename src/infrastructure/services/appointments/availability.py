@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.entity.clinics.appointment import (
+    AppointmentStatus, AvailableSlot, iter_slot_bits, slot_index, slot_start, slots_per_day, weekly_slot_masks
+)
+from src.domain.entity.clinics.clinic_entity import Clinic
+from src.infrastructure.repository.database import async_session_maker
+from src.infrastructure.repository.schemas.appointment_orm import AppointmentOrm
+from src.infrastructure.services.clinics.catalog import ClinicCatalog, clinic_catalog
+
+APPOINTMENT_SLOT_MINUTES = int(os.getenv("APPOINTMENT_SLOT_MINUTES", 30))
+APPOINTMENT_HORIZON_DAYS = int(os.getenv("APPOINTMENT_HORIZON_DAYS", 60))
+AVAILABILITY_REBUILD_INTERVAL = float(os.getenv("AVAILABILITY_REBUILD_INTERVAL", 60))
+
+# ('clinic', id) - прием без специалиста, ('specialist', id) - слот специалиста в любой клинике
+Resource = Tuple[str, int]
+
+
+def appointment_resource(clinic_id: int, specialist_id: Optional[int]) -> Resource:
+    return ('specialist', specialist_id) if specialist_id is not None else ('clinic', clinic_id)
+
+
+class AvailabilityIndex:
+    """Свободные слоты как битовые маски по дням: открытые слоты графика минус занятые.
+
+    Маски графика считаются один раз на версию клиники в снимке каталога, занятые слоты
+    патчатся при записи и отмене. Источник истины - уникальные индексы appointments:
+    индекс только отвечает на вопрос "что свободно", бронирование проверяет БД.
+    """
+
+    def __init__(self, catalog: ClinicCatalog, slot_minutes: int = APPOINTMENT_SLOT_MINUTES):
+        self._catalog = catalog
+        self._slot_minutes = slot_minutes
+        self._booked: Dict[Resource, Dict[date, int]] = defaultdict(dict)
+        # clinic_id -> (объект клиники из снимка, маски по дням недели); объект сменился - маски пересчитываются
+        self._weekly: Dict[int, Tuple[Clinic, List[int]]] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._logger = logging.getLogger(__name__)
+
+    @property
+    def slot_minutes(self) -> int:
+        return self._slot_minutes
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    async def ensure_loaded(self, session: AsyncSession):
+        if self._loaded:
+            return
+        async with self._lock:
+            if not self._loaded:
+                await self.rebuild(session)
+
+    async def rebuild(self, session: AsyncSession):
+        await self._catalog.ensure_loaded(session)
+        result = await session.execute(
+            select(AppointmentOrm.clinic_id, AppointmentOrm.specialist_id, AppointmentOrm.starts_at).where(
+                AppointmentOrm.status == AppointmentStatus.BOOKED,
+                AppointmentOrm.starts_at >= datetime.combine(date.today(), datetime.min.time())
+            )
+        )
+        self.load(result.all())
+
+    def load(self, rows: Iterable[Tuple[int, Optional[int], datetime]]):
+        self._booked = defaultdict(dict)
+        for clinic_id, specialist_id, starts_at in rows:
+            self.book(clinic_id, specialist_id, starts_at)
+        self._loaded = True
+        self._logger.info(f"Availability index rebuilt: {len(self._booked)} booked resources")
+
+    def book(self, clinic_id: int, specialist_id: Optional[int], starts_at: datetime):
+        index = slot_index(starts_at, self._slot_minutes)
+        if index is None:
+            return
+        days = self._booked[appointment_resource(clinic_id, specialist_id)]
+        days[starts_at.date()] = days.get(starts_at.date(), 0) | 1 << index
+
+    def release(self, clinic_id: int, specialist_id: Optional[int], starts_at: datetime):
+        index = slot_index(starts_at, self._slot_minutes)
+        days = self._booked.get(appointment_resource(clinic_id, specialist_id))
+        if index is None or not days or starts_at.date() not in days:
+            return
+        days[starts_at.date()] &= ~(1 << index)
+        if not days[starts_at.date()]:
+            del days[starts_at.date()]
+
+    def open_mask(self, clinic_id: int, day: date) -> int:
+        clinic = self._catalog.get(clinic_id)
+        if clinic is None or not clinic.is_active:
+            return 0
+        cached = self._weekly.get(clinic_id)
+        if cached is None or cached[0] is not clinic:
+            cached = clinic, weekly_slot_masks(clinic.work_hours, clinic.is_24_7, self._slot_minutes)
+            self._weekly[clinic_id] = cached
+        return cached[1][day.weekday()]
+
+    def free_mask(self, clinic_id: int, specialist_id: Optional[int], day: date) -> int:
+        booked = self._booked.get(appointment_resource(clinic_id, specialist_id), {}).get(day, 0)
+        return self.open_mask(clinic_id, day) & ~booked
+
+    def is_free(self, clinic_id: int, specialist_id: Optional[int], starts_at: datetime) -> bool:
+        index = slot_index(starts_at, self._slot_minutes)
+        return index is not None and bool(self.free_mask(clinic_id, specialist_id, starts_at.date()) >> index & 1)
+
+    def free_slots(
+            self,
+            clinic_id: int,
+            specialist_id: Optional[int],
+            after: datetime,
+            days: int,
+            limit: Optional[int] = None
+    ) -> List[AvailableSlot]:
+        """Свободные слоты клиники (или специалиста в ней), начинающиеся не раньше after"""
+        slots = []
+        for day, first in self._days(after, days):
+            for index in iter_slot_bits(self.free_mask(clinic_id, specialist_id, day), first):
+                slots.append(self._slot(clinic_id, specialist_id, day, index))
+                if limit is not None and len(slots) >= limit:
+                    return slots
+        return slots
+
+    def location_clinic_ids(self, location: str) -> List[int]:
+        """Активные клиники города по снимку каталога"""
+        return self._catalog.location_clinic_ids(location)
+
+    def next_free_slots(self, clinic_ids: Iterable[int], after: datetime, limit: int) -> List[AvailableSlot]:
+        """Ближайшие свободные слоты без специалиста в любой из клиник, по времени, затем по id клиники"""
+        clinic_ids = list(clinic_ids)
+        slots = []
+        for day, first in self._days(after, APPOINTMENT_HORIZON_DAYS):
+            candidates = []
+            for clinic_id in clinic_ids:
+                for count, index in enumerate(iter_slot_bits(self.free_mask(clinic_id, None, day), first)):
+                    if count >= limit - len(slots):
+                        break
+                    candidates.append((index, clinic_id))
+            for index, clinic_id in sorted(candidates)[:limit - len(slots)]:
+                slots.append(self._slot(clinic_id, None, day, index))
+            if len(slots) >= limit:
+                break
+        return slots
+
+    def _days(self, after: datetime, days: int):
+        """(день, первый допустимый слот); слоты, начавшиеся до after, пропускаются"""
+        minute = after.hour * 60 + after.minute + (1 if after.second or after.microsecond else 0)
+        first = -(-minute // self._slot_minutes)
+        for offset in range(min(days, APPOINTMENT_HORIZON_DAYS)):
+            if first < slots_per_day(self._slot_minutes):
+                yield after.date() + timedelta(days=offset), first
+            first = 0
+
+    def _slot(self, clinic_id: int, specialist_id: Optional[int], day: date, index: int) -> AvailableSlot:
+        starts_at = slot_start(day, index, self._slot_minutes)
+        return AvailableSlot(
+            clinic_id=clinic_id,
+            specialist_id=specialist_id,
+            starts_at=starts_at,
+            ends_at=starts_at + timedelta(minutes=self._slot_minutes)
+        )
+
+
+availability_index = AvailabilityIndex(clinic_catalog)
+
+
+async def rebuild_availability_index():
+    """Периодическая сверка с БД: подхватывает записи, сделанные другими воркерами"""
+    async with async_session_maker() as session:
+        await availability_index.rebuild(session)
@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import os
+from bisect import bisect_right, insort
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, FrozenSet, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.entity.clinics.clinic_entity import Clinic, compile_open_hours, normalize_location
+from src.infrastructure.adapters.orm_entity_adapter import ClinicOrmEntityAdapter
+from src.infrastructure.repository.database import async_session_maker
+from src.infrastructure.repository.schemas.clinic_orm import CatalogVersionOrm, ClinicOrm
+from src.infrastructure.services.clinics.geo_index import clinic_geo_index
+from src.infrastructure.services.clinics.location_index import location_index
+from src.infrastructure.services.clinics.open_hours import OpenHoursGroups
+
+CLINIC_CATALOG_NAME = 'clinics'
+CLINIC_CATALOG_POLL_INTERVAL = float(os.getenv("CLINIC_CATALOG_POLL_INTERVAL", 5))
+
+
+class ClinicCatalog:
+    """Снимок клиник в памяти процесса с индексами по id, организации и городу.
+
+    В индексы по городу и по графику (публичный поиск) попадают только активные клиники, по id и
+    организации - все, как и в выборках из БД. Записи через PostgresClinicsRepo патчат снимок сразу и увеличивают версию каталога
+    в catalog_versions в той же транзакции. Воркеры периодически сверяют версию и
+    перечитывают снимок, если его изменил кто-то другой.
+    """
+
+    def __init__(self, name: str = CLINIC_CATALOG_NAME):
+        self._name = name
+        self._clinics: Dict[int, Clinic] = {}
+        self._by_organization: Dict[int, List[int]] = defaultdict(list)
+        self._by_location: Dict[str, List[int]] = defaultdict(list)
+        self._open_hours = OpenHoursGroups()
+        self._version: Optional[int] = None
+        self._stale = False
+        self._lock = asyncio.Lock()
+        self._logger = logging.getLogger(__name__)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._version is not None
+
+    @property
+    def is_current(self) -> bool:
+        """Снимок загружен и нет признаков чужих записей, которых он еще не видел"""
+        return self.is_loaded and not self._stale
+
+    @property
+    def version(self) -> Optional[int]:
+        return self._version
+
+    async def ensure_loaded(self, session: AsyncSession):
+        if self.is_loaded:
+            return
+        async with self._lock:
+            if not self.is_loaded:
+                await self.rebuild(session)
+
+    async def rebuild(self, session: AsyncSession):
+        version = await self.read_version(session)
+        result = await session.execute(select(ClinicOrm))
+        adapter = ClinicOrmEntityAdapter()
+        clinics = [await adapter.to_entity(clinic_orm) for clinic_orm in result.scalars().all()]
+        self.load(clinics, version)
+
+    def load(self, clinics: List[Clinic], version: int):
+        self._clinics = {}
+        self._by_organization = defaultdict(list)
+        self._by_location = defaultdict(list)
+        self._open_hours.clear()
+        for clinic in sorted(clinics, key=lambda item: item.id):
+            self._index(clinic)
+        self._version = version
+        self._stale = False
+        self._logger.info(f"Clinic catalog loaded: {len(self._clinics)} clinics, version {version}")
+
+    async def refresh(self, session: AsyncSession) -> bool:
+        """Перечитывает снимок, если версия в БД ушла вперед; True - снимок обновлен"""
+        if self.is_loaded and not self._stale and await self.read_version(session) == self._version:
+            return False
+        async with self._lock:
+            await self.rebuild(session)
+        return True
+
+    async def read_version(self, session: AsyncSession) -> int:
+        result = await session.execute(
+            select(CatalogVersionOrm.version).where(CatalogVersionOrm.name == self._name)
+        )
+        return result.scalar_one_or_none() or 0
+
+    async def bump_version(self, session: AsyncSession) -> int:
+        """Увеличивает версию в текущей транзакции вызывающего (без commit)"""
+        insert = postgresql_insert if session.bind.dialect.name == 'postgresql' else sqlite_insert
+        stmt = insert(CatalogVersionOrm).values(name=self._name, version=1, updated_at=datetime.utcnow())
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CatalogVersionOrm.name],
+            set_={'version': CatalogVersionOrm.version + 1, 'updated_at': stmt.excluded.updated_at}
+        ).returning(CatalogVersionOrm.version)
+        return (await session.execute(stmt)).scalar_one()
+
+    def put(self, clinic: Clinic, version: int):
+        if not self.is_loaded:
+            return
+        self._unindex(clinic.id)
+        self._index(clinic)
+        self._advance(version)
+
+    def put_many(self, clinics: List[Clinic], version: int):
+        """Патч пакетной записи: одна версия на весь батч"""
+        if not self.is_loaded:
+            return
+        for clinic in clinics:
+            self._unindex(clinic.id)
+            self._index(clinic)
+        self._advance(version)
+
+    def remove(self, clinic_id: int, version: int):
+        if not self.is_loaded:
+            return
+        self._unindex(clinic_id)
+        self._advance(version)
+
+    def get(self, clinic_id: int) -> Optional[Clinic]:
+        return self._clinics.get(clinic_id)
+
+    def organization_clinics(self, organization_id: int, after_id: int = 0, limit: Optional[int] = None) -> List[Clinic]:
+        ids = self._by_organization.get(organization_id, [])
+        start = bisect_right(ids, after_id)
+        end = None if limit is None else start + limit
+        return [self._clinics[clinic_id] for clinic_id in ids[start:end]]
+
+    def location_clinic_ids(self, location: str) -> List[int]:
+        return self._by_location.get(normalize_location(location), [])
+
+    def open_clinic_ids(self, minute: int) -> FrozenSet[int]:
+        """Активные клиники, открытые в минуту недели minute"""
+        return self._open_hours.open_at(minute)
+
+    def _advance(self, version: int):
+        # Версия старше ожидаемой - в промежутке писал другой воркер, снимок перечитает опрос
+        if version != self._version + 1:
+            self._stale = True
+        self._version = max(self._version, version)
+
+    def _index(self, clinic: Clinic):
+        self._clinics[clinic.id] = clinic
+        insort(self._by_organization[clinic.organization_id], clinic.id)
+        if clinic.is_active:
+            insort(self._by_location[normalize_location(clinic.location)], clinic.id)
+            self._open_hours.set(clinic.id, compile_open_hours(clinic.work_hours, clinic.is_24_7))
+
+    def _unindex(self, clinic_id: int):
+        clinic = self._clinics.pop(clinic_id, None)
+        if clinic is None:
+            return
+        self._open_hours.remove(clinic_id)
+        for index, key in (
+                (self._by_organization, clinic.organization_id),
+                (self._by_location, normalize_location(clinic.location))
+        ):
+            ids = index.get(key)
+            if ids and clinic_id in ids:
+                ids.remove(clinic_id)
+                if not ids:
+                    del index[key]
+
+
+clinic_catalog = ClinicCatalog()
+
+
+async def refresh_clinic_catalog():
+    """Периодическая сверка версии каталога с БД.
+
+    Снимок устарел - перечитываются и остальные индексы клиник процесса: их тоже
+    патчат только записи этого воркера.
+    """
+    async with async_session_maker() as session:
+        if await clinic_catalog.refresh(session):
+            await location_index.rebuild(session)
+            await clinic_geo_index.rebuild(session)
@@ -0,0 +1,73 @@
+import logging
+import os
+from typing import AsyncIterable, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+
+from src.domain.entity.clinics.clinic_import import ClinicImportReport, ClinicImportRow
+from src.domain.entity.imports import ImportFormat, ImportRowError
+from src.domain.interfaces.clinics.clinics_repository import IClinicsRepository
+from src.infrastructure.services.imports import iter_lines, parse_rows, validation_message, write_batch
+
+CLINIC_IMPORT_BATCH_SIZE = int(os.getenv("CLINIC_IMPORT_BATCH_SIZE", 500))
+MAX_CLINIC_IMPORT_BATCH_SIZE = 5000
+# Ошибки сверх лимита только считаются, чтобы отчет по битому файлу не рос без границ
+MAX_REPORTED_ERRORS = 1000
+
+logger = logging.getLogger(__name__)
+
+
+async def import_clinics(
+        repo: IClinicsRepository,
+        lines: AsyncIterable[str],
+        fmt: ImportFormat,
+        *,
+        organization_id: Optional[int] = None,
+        batch_size: int = CLINIC_IMPORT_BATCH_SIZE
+) -> ClinicImportReport:
+    """Потоковый импорт: строки валидируются по одной и пишутся батчами по batch_size,
+    каждый батч - отдельная транзакция. Ошибка строки попадает в отчет и не прерывает импорт,
+    повтор ключа (organization_id, name, address) в файле - тоже ошибка строки.
+
+    organization_id задан - все строки принадлежат этой организации (импорт от ее имени).
+    """
+    report = ClinicImportReport()
+    batch: List[Tuple[int, ClinicImportRow]] = []
+    seen_keys: Set[Tuple[int, str, str]] = set()
+
+    def add_error(row: int, message: str):
+        report.failed += 1
+        if len(report.errors) < MAX_REPORTED_ERRORS:
+            report.errors.append(ImportRowError(row=row, error=message))
+
+    async def flush():
+        results = await write_batch(batch, repo.upsert_clinics, lambda number, _, message: add_error(number, message))
+        for created, updated in results:
+            report.created += created
+            report.updated += updated
+        batch.clear()
+
+    async for number, fields in parse_rows(lines, fmt, json_columns=('work_hours',)):
+        if isinstance(fields, str):
+            add_error(number, fields)
+            continue
+        if organization_id is not None:
+            if fields.setdefault("organization_id", organization_id) not in (organization_id, str(organization_id)):
+                add_error(number, "Organization can only import clinics for itself")
+                continue
+        try:
+            row = ClinicImportRow(**fields)
+        except ValidationError as e:
+            add_error(number, validation_message(e))
+            continue
+        if row.key in seen_keys:
+            add_error(number, "Duplicate clinic in file")
+            continue
+        seen_keys.add(row.key)
+        batch.append((number, row))
+        if len(batch) >= batch_size:
+            await flush()
+    await flush()
+
+    logger.info(f"Clinic import: {report.created} created, {report.updated} updated, {report.failed} failed")
+    return report
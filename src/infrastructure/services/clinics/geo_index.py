@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.infrastructure.repository.schemas.clinic_orm import ClinicOrm
+from src.infrastructure.services.clinics.open_hours import OpenHoursGroups
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+GRID_CELL_DEGREES = 0.25
+
+Cell = Tuple[int, int]
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi, d_lambda = phi2 - phi1, math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+@dataclass(frozen=True)
+class _GeoEntry:
+    latitude: float
+    longitude: float
+    is_24_7: bool
+
+
+class ClinicGeoIndex:
+    """Сетка широта/долгота с ячейкой GRID_CELL_DEGREES для поиска ближайших активных клиник.
+
+    Используется там, где нет earthdistance (SQLite в тестах): кандидаты берутся из ячеек,
+    покрывающих квадрат радиуса, и отсекаются точным расстоянием по гаверсинусу.
+    """
+
+    def __init__(self, cell_degrees: float = GRID_CELL_DEGREES):
+        self._cell_degrees = cell_degrees
+        self._cells: Dict[Cell, Set[int]] = defaultdict(set)
+        self._entries: Dict[int, _GeoEntry] = {}
+        self._open_hours = OpenHoursGroups()
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._logger = logging.getLogger(__name__)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    async def ensure_loaded(self, session: AsyncSession):
+        if self._loaded:
+            return
+        async with self._lock:
+            if not self._loaded:
+                await self.rebuild(session)
+
+    async def rebuild(self, session: AsyncSession):
+        result = await session.execute(
+            select(
+                ClinicOrm.id, ClinicOrm.latitude, ClinicOrm.longitude, ClinicOrm.is_24_7, ClinicOrm.open_hours
+            ).where(
+                ClinicOrm.is_active.is_(True),
+                ClinicOrm.latitude.isnot(None),
+                ClinicOrm.longitude.isnot(None)
+            )
+        )
+        self.load(result.all())
+
+    def load(self, rows: Iterable[Tuple[int, float, float, bool, Optional[bytes]]]):
+        self._cells = defaultdict(set)
+        self._entries = {}
+        self._open_hours.clear()
+        for clinic_id, latitude, longitude, is_24_7, open_hours in rows:
+            self._put(clinic_id, _GeoEntry(latitude, longitude, bool(is_24_7)), open_hours)
+        self._loaded = True
+        self._logger.info(f"Clinic geo index rebuilt: {len(self._entries)} clinics")
+
+    def set_clinic(
+            self,
+            clinic_id: int,
+            latitude: Optional[float],
+            longitude: Optional[float],
+            is_active: bool = True,
+            is_24_7: bool = False,
+            open_hours: Optional[bytes] = None
+    ):
+        """Неактивные клиники и клиники без координат в индекс не попадают"""
+        self.remove_clinic(clinic_id)
+        if is_active and latitude is not None and longitude is not None:
+            self._put(clinic_id, _GeoEntry(latitude, longitude, bool(is_24_7)), open_hours)
+
+    def remove_clinic(self, clinic_id: int):
+        self._open_hours.remove(clinic_id)
+        entry = self._entries.pop(clinic_id, None)
+        if entry is not None:
+            cell = self._cell(entry.latitude, entry.longitude)
+            self._cells[cell].discard(clinic_id)
+            if not self._cells[cell]:
+                del self._cells[cell]
+
+    def within(
+            self,
+            latitude: float,
+            longitude: float,
+            radius_km: float,
+            is_24_7: Optional[bool] = None,
+            open_minute: Optional[int] = None
+    ) -> List[Tuple[float, int]]:
+        """(расстояние в км, id) всех клиник в радиусе, по возрастанию расстояния"""
+        lat_span = radius_km / KM_PER_DEGREE
+        # У полюсов долгота вырождается - берем всю окружность
+        cos_lat = math.cos(math.radians(min(89.0, abs(latitude) + lat_span)))
+        lon_span = 180.0 if cos_lat <= 0 else min(180.0, radius_km / (KM_PER_DEGREE * cos_lat))
+
+        cell = self._cell_degrees
+        rows = range(math.floor((latitude - lat_span) / cell), math.floor((latitude + lat_span) / cell) + 1)
+        cols = {
+            self._wrap_col(col)
+            for col in range(math.floor((longitude - lon_span) / cell), math.floor((longitude + lon_span) / cell) + 1)
+        }
+        # Открытые в минуту - одно множество на запрос, а не проверка карты каждой клиники
+        open_ids = self._open_hours.open_at(open_minute) if open_minute is not None else None
+        found = []
+        for row in rows:
+            for col in cols:
+                for clinic_id in self._cells.get((row, col), ()):
+                    entry = self._entries[clinic_id]
+                    if is_24_7 is not None and entry.is_24_7 != is_24_7:
+                        continue
+                    if open_ids is not None and clinic_id not in open_ids:
+                        continue
+                    distance = haversine_km(latitude, longitude, entry.latitude, entry.longitude)
+                    if distance <= radius_km:
+                        found.append((distance, clinic_id))
+        found.sort()
+        return found
+
+    def _put(self, clinic_id: int, entry: _GeoEntry, open_hours: Optional[bytes]):
+        self._entries[clinic_id] = entry
+        self._open_hours.set(clinic_id, open_hours)
+        self._cells[self._cell(entry.latitude, entry.longitude)].add(clinic_id)
+
+    def _cell(self, latitude: float, longitude: float) -> Cell:
+        return math.floor(latitude / self._cell_degrees), self._wrap_col(math.floor(longitude / self._cell_degrees))
+
+    def _wrap_col(self, col: int) -> int:
+        # Переход через 180-й меридиан
+        cols = round(360 / self._cell_degrees)
+        return (col + cols // 2) % cols - cols // 2
+
+
+clinic_geo_index = ClinicGeoIndex()
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.entity.clinics.clinic_entity import normalize_location
+from src.infrastructure.repository.schemas.clinic_orm import ClinicOrm
+
+# Ранги совпадений (больше - выше в выдаче); одинаковая шкала для pg_trgm и для префиксного дерева
+RANK_EXACT = 1000
+RANK_PREFIX = 900
+RANK_WORD_PREFIX = 800
+RANK_FUZZY = 700
+RANK_PER_TYPO = 100
+
+MAX_LOCATION_MATCHES = 200
+
+
+def max_typos(query: str) -> int:
+    """Допустимое число опечаток растет с длиной запроса: короткие запросы ищутся только по префиксу"""
+    if len(query) <= 3:
+        return 0
+    return 1 if len(query) <= 6 else 2
+
+
+class _Node:
+    __slots__ = ('children', 'locations')
+
+    def __init__(self):
+        self.children: Dict[str, _Node] = {}
+        # Полное название города -> ключ является началом названия (а не следующего слова)
+        self.locations: Dict[str, bool] = {}
+
+
+class LocationIndex:
+    """Префиксное дерево нормализованных городов клиник для поиска с опечатками.
+
+    В дерево попадает название целиком и каждое его слово, поэтому "петербург" находит
+    "санкт петербург". Поиск возвращает подходящие названия с рангами, сами клиники
+    выбираются по индексу location_normalized. На Postgres используется pg_trgm, дерево -
+    для остальных диалектов (SQLite в тестах).
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self._counts: Counter = Counter()
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._logger = logging.getLogger(__name__)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    async def ensure_loaded(self, session: AsyncSession):
+        if self._loaded:
+            return
+        async with self._lock:
+            if not self._loaded:
+                await self.rebuild(session)
+
+    async def rebuild(self, session: AsyncSession):
+        result = await session.execute(
+            select(ClinicOrm.location_normalized, func.count()).group_by(ClinicOrm.location_normalized)
+        )
+        self.load(dict(result.all()))
+
+    def load(self, counts: Dict[str, int]):
+        self._root = _Node()
+        self._counts = Counter()
+        for location, count in counts.items():
+            self.add(location, count)
+        self._loaded = True
+        self._logger.info(f"Location index rebuilt: {len(self._counts)} locations")
+
+    def add(self, location: str, count: int = 1):
+        location = normalize_location(location)
+        if not location or count <= 0:
+            return
+        if not self._counts[location]:
+            for key, is_start in self._keys(location):
+                self._node(key, create=True).locations[location] = is_start
+        self._counts[location] += count
+
+    def remove(self, location: str):
+        location = normalize_location(location)
+        if self._counts[location] > 1:
+            self._counts[location] -= 1
+            return
+        self._counts.pop(location, None)
+        for key, _ in self._keys(location):
+            node = self._node(key)
+            if node is not None:
+                node.locations.pop(location, None)
+
+    def search(self, query: str, limit: int = MAX_LOCATION_MATCHES) -> Dict[str, int]:
+        """Названия городов, подходящих под запрос, с рангами"""
+        query = normalize_location(query)
+        if not query:
+            return {}
+        typos = max_typos(query)
+        ranks: Dict[str, int] = {}
+        self._walk(self._root, list(range(len(query) + 1)), len(query), query, typos, ranks)
+        best = sorted(ranks.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return dict(best)
+
+    def _walk(self, node: _Node, row: List[int], best: int, query: str, typos: int, ranks: Dict[str, int]):
+        # row - строка матрицы Левенштейна для пути до node; best - лучшее расстояние запроса до префикса пути
+        best = min(best, row[-1])
+        if best <= typos:
+            self._record(node, best, query, ranks)
+        for char, child in node.children.items():
+            next_row = [row[0] + 1]
+            for i, query_char in enumerate(query, start=1):
+                next_row.append(min(next_row[i - 1] + 1, row[i] + 1, row[i - 1] + (query_char != char)))
+            if min(next_row) <= typos:
+                self._walk(child, next_row, best, query, typos, ranks)
+            elif best <= typos:
+                # Дальше расстояние только растет - все поддерево совпадает с уже найденным префиксом
+                self._collect(child, best, query, ranks)
+
+    def _collect(self, node: _Node, distance: int, query: str, ranks: Dict[str, int]):
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            self._record(current, distance, query, ranks)
+            stack.extend(current.children.values())
+
+    @staticmethod
+    def _record(node: _Node, distance: int, query: str, ranks: Dict[str, int]):
+        for location, is_start in node.locations.items():
+            if location == query:
+                rank = RANK_EXACT
+            elif distance == 0:
+                rank = RANK_PREFIX if is_start else RANK_WORD_PREFIX
+            else:
+                rank = RANK_FUZZY - RANK_PER_TYPO * distance
+            if rank > ranks.get(location, -1):
+                ranks[location] = rank
+
+    def _node(self, key: str, create: bool = False) -> Optional[_Node]:
+        node = self._root
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[char] = _Node()
+            node = child
+        return node
+
+    @staticmethod
+    def _keys(location: str) -> Iterable:
+        words = location.split(" ")
+        yield location, True
+        for i in range(1, len(words)):
+            yield " ".join(words[i:]), False
+
+
+location_index = LocationIndex()
@@ -0,0 +1,49 @@
+from collections import defaultdict
+from typing import Dict, FrozenSet, Optional, Set
+
+from src.domain.entity.clinics.clinic_entity import is_open_in
+
+
+class OpenHoursGroups:
+    """Клиники, сгруппированные по недельной карте open_hours.
+
+    Разных графиков намного меньше, чем клиник: минута проверяется один раз на график,
+    а кандидаты отбираются проверкой вхождения в готовое множество. Множество открытых
+    в последнюю запрошенную минуту запоминается до изменения групп (open_now весь интервал
+    минуты отвечает из него).
+    """
+
+    def __init__(self):
+        self._groups: Dict[bytes, Set[int]] = defaultdict(set)
+        self._schedules: Dict[int, bytes] = {}
+        self._cached: Optional[tuple] = None
+
+    def clear(self):
+        self._groups = defaultdict(set)
+        self._schedules = {}
+        self._cached = None
+
+    def set(self, clinic_id: int, open_hours: Optional[bytes]):
+        self.remove(clinic_id)
+        if open_hours:
+            self._schedules[clinic_id] = open_hours
+            self._groups[open_hours].add(clinic_id)
+            self._cached = None
+
+    def remove(self, clinic_id: int):
+        open_hours = self._schedules.pop(clinic_id, None)
+        if open_hours is None:
+            return
+        ids = self._groups[open_hours]
+        ids.discard(clinic_id)
+        if not ids:
+            del self._groups[open_hours]
+        self._cached = None
+
+    def open_at(self, minute: int) -> FrozenSet[int]:
+        """id клиник, открытых в минуту недели minute"""
+        if self._cached is not None and self._cached[0] == minute:
+            return self._cached[1]
+        ids = frozenset().union(*(ids for open_hours, ids in self._groups.items() if is_open_in(open_hours, minute)))
+        self._cached = (minute, ids)
+        return ids
@@ -0,0 +1,104 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Set
+
+from src.domain.entity.orders.order import Order, OrderStatus
+from src.infrastructure.services.matching.specification_index import normalize_specifications
+
+
+@dataclass
+class OrderEvent:
+    event: str
+    order_id: int
+    data: dict = field(default_factory=dict)
+
+    def to_sse(self) -> str:
+        payload = json.dumps({"order_id": self.order_id, **self.data}, default=str)
+        return f"event: {self.event}\ndata: {payload}\n\n"
+
+
+class OrderSubscription:
+    """Ограниченная очередь событий одного клиента: при переполнении выбрасываются самые старые"""
+
+    def __init__(self, user_id: int, specifications: Iterable[str], max_queue_size: int):
+        self.user_id = user_id
+        self.specifications = normalize_specifications(specifications)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.dropped = 0
+
+    def push(self, event: OrderEvent):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self) -> OrderEvent:
+        return await self.queue.get()
+
+
+class OrderEventHub:
+    """Внутрипроцессный pub/sub для событий заказов"""
+
+    def __init__(self, max_queue_size: int = 100):
+        self._max_queue_size = max_queue_size
+        self._by_spec: Dict[str, Set[OrderSubscription]] = defaultdict(set)
+        self._by_user: Dict[int, Set[OrderSubscription]] = defaultdict(set)
+        self._logger = logging.getLogger(__name__)
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._by_user)
+
+    def subscribe(self, user_id: int, specifications: Optional[Iterable[str]] = None) -> OrderSubscription:
+        subscription = OrderSubscription(user_id, specifications or [], self._max_queue_size)
+        self._by_user[user_id].add(subscription)
+        for spec in subscription.specifications:
+            self._by_spec[spec].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: OrderSubscription):
+        self._discard(self._by_user, subscription.user_id, subscription)
+        for spec in subscription.specifications:
+            self._discard(self._by_spec, spec, subscription)
+        if subscription.dropped:
+            self._logger.info(
+                f"Order stream of user {subscription.user_id} closed, {subscription.dropped} events dropped"
+            )
+
+    @staticmethod
+    def _discard(index: dict, key, subscription: OrderSubscription):
+        subscriptions = index.get(key)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del index[key]
+
+    def publish_order_created(self, order: Order):
+        if not self._by_spec:
+            return
+        recipients: Set[OrderSubscription] = set()
+        for spec in normalize_specifications(order.specifications):
+            recipients.update(self._by_spec.get(spec, ()))
+
+        event = OrderEvent("order_created", order.id, {"order": order.model_dump(mode="json")})
+        for subscription in recipients:
+            if subscription.user_id != order.creator_id:
+                subscription.push(event)
+
+    def publish_order_status_changed(self, order_id: int, status: OrderStatus, user_ids: Iterable[int]):
+        event = OrderEvent(
+            "order_status_changed",
+            order_id,
+            {"status": status.value, "changed_at": datetime.utcnow().isoformat()}
+        )
+        for user_id in set(user_ids):
+            for subscription in self._by_user.get(user_id, ()):
+                subscription.push(event)
+
+
+order_event_hub = OrderEventHub()
@@ -0,0 +1,100 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, List, Optional, Sequence, Tuple, TypeVar, Union
+
+from pydantic import ValidationError
+
+from src.domain.entity.imports import ImportFormat
+
+R = TypeVar("R")
+T = TypeVar("T")
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Строки UTF-8 из потока байт произвольной нарезки (тело запроса, файл)"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    tail = ""
+    async for chunk in chunks:
+        tail += decoder.decode(chunk)
+        *lines, tail = tail.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail.rstrip("\r")
+
+
+async def parse_rows(
+        lines: AsyncIterable[str],
+        fmt: ImportFormat,
+        json_columns: Iterable[str] = ()
+) -> AsyncIterator[Tuple[int, Union[dict, str]]]:
+    """(номер строки, поля) или (номер строки, текст ошибки разбора); пустые строки пропускаются.
+
+    CSV - с заголовком, колонки из json_columns - JSON в ячейке, пустая ячейка - значение по умолчанию.
+    Переводы строк внутри ячеек не поддерживаются: строка файла - одна запись.
+    """
+    json_columns = tuple(json_columns)
+    header: Optional[List[str]] = None
+    number = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        if fmt == ImportFormat.CSV and header is None:
+            header = [column.strip() for column in next(csv.reader([line]))]
+            continue
+        number += 1
+        try:
+            if fmt == ImportFormat.NDJSON:
+                fields = json.loads(line)
+                if not isinstance(fields, dict):
+                    raise ValueError("Expected a JSON object")
+            else:
+                cells = next(csv.reader([line]))
+                if len(cells) != len(header):
+                    raise ValueError(f"Expected {len(header)} columns, got {len(cells)}")
+                fields = {column: value for column, value in zip(header, cells) if value.strip()}
+                for column in json_columns:
+                    if column in fields:
+                        fields[column] = json.loads(fields[column])
+        except ValueError as e:
+            yield number, f"Invalid {fmt.value} row: {e}"
+            continue
+        yield number, fields
+
+
+def validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}" for item in error.errors()
+    )
+
+
+def error_message(error: Exception) -> str:
+    # У ошибок БД после первой строки идут SQL и параметры
+    text = str(error)
+    return text.splitlines()[0] if text else type(error).__name__
+
+
+async def write_batch(
+        batch: Sequence[Tuple[int, R]],
+        write: Callable[[List[R]], Awaitable[T]],
+        on_error: Callable[[int, R, str], None]
+) -> List[T]:
+    """Записать (номер строки, строка) одним вызовом write; упал весь батч - повторить построчно.
+
+    Возвращает результаты успешных вызовов write, ошибка строки уходит в on_error(номер, строка, текст).
+    """
+    if not batch:
+        return []
+    try:
+        return [await write([row for _, row in batch])]
+    except Exception:
+        # Батч откатился целиком - повторяем построчно, чтобы найти виноватые строки
+        results = []
+        for number, row in batch:
+            try:
+                results.append(await write([row]))
+            except Exception as e:
+                on_error(number, row, error_message(e))
+        return results
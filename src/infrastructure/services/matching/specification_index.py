@@ -0,0 +1,186 @@
+import asyncio
+import heapq
+import logging
+import os
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.infrastructure.repository.database import async_session_maker
+from src.infrastructure.repository.schemas.order_orm import OrderOrm, OrderStatus
+from src.infrastructure.repository.schemas.user_orm import SpecialistOrm
+
+SPECIFICATION_INDEX_REBUILD_INTERVAL = float(os.getenv("SPECIFICATION_INDEX_REBUILD_INTERVAL", 600))
+
+
+def normalize_specifications(specifications: Optional[Iterable[str]]) -> FrozenSet[str]:
+    return frozenset(
+        spec.strip().casefold()
+        for spec in (specifications or [])
+        if spec and spec.strip()
+    )
+
+
+class SpecificationMatchIndex:
+    """Инвертированные индексы: спецификация -> активные заказы и спецификация -> специалисты.
+
+    Оценка совпадения - доля спецификаций заказа, которые покрывает специалист.
+    """
+
+    def __init__(self):
+        self._orders_by_spec: Dict[str, Set[int]] = defaultdict(set)
+        self._order_specs: Dict[int, FrozenSet[str]] = {}
+        self._order_creators: Dict[int, int] = {}
+        self._specialists_by_spec: Dict[str, Set[int]] = defaultdict(set)
+        self._specialist_specs: Dict[int, FrozenSet[str]] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._logger = logging.getLogger(__name__)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    async def ensure_loaded(self, session: AsyncSession):
+        if self._loaded:
+            return
+        async with self._lock:
+            if not self._loaded:
+                await self.rebuild(session)
+
+    async def rebuild(self, session: AsyncSession):
+        orders = await session.execute(
+            select(OrderOrm.id, OrderOrm.specifications, OrderOrm.creator_id)
+            .where(OrderOrm.status == OrderStatus.ACTIVE)
+        )
+        specialists = await session.execute(
+            select(SpecialistOrm.user_id, SpecialistOrm.specifications)
+        )
+
+        order_rows = orders.all()
+        orders_by_spec, order_specs = self._build((row.id, row.specifications) for row in order_rows)
+        specialists_by_spec, specialist_specs = self._build(specialists.all())
+
+        self._orders_by_spec, self._order_specs = orders_by_spec, order_specs
+        self._order_creators = {row.id: row.creator_id for row in order_rows}
+        self._specialists_by_spec, self._specialist_specs = specialists_by_spec, specialist_specs
+        self._loaded = True
+        self._logger.info(
+            f"Specification index rebuilt: {len(order_specs)} active orders, {len(specialist_specs)} specialists"
+        )
+
+    @staticmethod
+    def _build(rows) -> Tuple[Dict[str, Set[int]], Dict[int, FrozenSet[str]]]:
+        postings: Dict[str, Set[int]] = defaultdict(set)
+        specs_by_id: Dict[int, FrozenSet[str]] = {}
+        for item_id, specifications in rows:
+            specs = normalize_specifications(specifications)
+            if not specs:
+                continue
+            specs_by_id[item_id] = specs
+            for spec in specs:
+                postings[spec].add(item_id)
+        return postings, specs_by_id
+
+    @staticmethod
+    def _put(postings, specs_by_id, item_id: int, specifications: Optional[Iterable[str]]):
+        SpecificationMatchIndex._discard(postings, specs_by_id, item_id)
+        specs = normalize_specifications(specifications)
+        if not specs:
+            return
+        specs_by_id[item_id] = specs
+        for spec in specs:
+            postings[spec].add(item_id)
+
+    @staticmethod
+    def _discard(postings, specs_by_id, item_id: int):
+        for spec in specs_by_id.pop(item_id, ()):
+            ids = postings.get(spec)
+            if ids is None:
+                continue
+            ids.discard(item_id)
+            if not ids:
+                del postings[spec]
+
+    def add_order(self, order_id: int, specifications: Optional[Iterable[str]], creator_id: Optional[int] = None):
+        self._put(self._orders_by_spec, self._order_specs, order_id, specifications)
+        if creator_id is not None and order_id in self._order_specs:
+            self._order_creators[order_id] = creator_id
+
+    def remove_order(self, order_id: int):
+        self._discard(self._orders_by_spec, self._order_specs, order_id)
+        self._order_creators.pop(order_id, None)
+
+    def set_specialist(self, specialist_id: int, specifications: Optional[Iterable[str]]):
+        self._put(self._specialists_by_spec, self._specialist_specs, specialist_id, specifications)
+
+    def remove_specialist(self, specialist_id: int):
+        self._discard(self._specialists_by_spec, self._specialist_specs, specialist_id)
+
+    def get_specialist_specifications(self, specialist_id: int) -> FrozenSet[str]:
+        return self._specialist_specs.get(specialist_id, frozenset())
+
+    def match_orders(
+            self,
+            specifications: Iterable[str],
+            limit: Optional[int] = None,
+            exclude_creator: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """Активные заказы, подходящие под спецификации специалиста: [(order_id, score)]"""
+        overlap = self._count_overlap(self._orders_by_spec, normalize_specifications(specifications), None)
+        if exclude_creator is not None:
+            overlap = {
+                order_id: hits for order_id, hits in overlap.items()
+                if self._order_creators.get(order_id) != exclude_creator
+            }
+        scored = (
+            (order_id, hits / len(self._order_specs[order_id]))
+            for order_id, hits in overlap.items()
+        )
+        return self._top(scored, limit)
+
+    def match_specialists(
+            self,
+            order_specifications: Iterable[str],
+            limit: Optional[int] = None,
+            exclude: Optional[Set[int]] = None
+    ) -> List[Tuple[int, float]]:
+        """Специалисты, подходящие под спецификации заказа: [(specialist_id, score)]"""
+        order_specs = normalize_specifications(order_specifications)
+        if not order_specs:
+            return []
+        overlap = self._count_overlap(self._specialists_by_spec, order_specs, exclude)
+        scored = ((specialist_id, hits / len(order_specs)) for specialist_id, hits in overlap.items())
+        return self._top(scored, limit)
+
+    @staticmethod
+    def _count_overlap(postings, specs: FrozenSet[str], exclude: Optional[Set[int]]) -> Dict[int, int]:
+        overlap: Dict[int, int] = defaultdict(int)
+        for spec in specs:
+            for item_id in postings.get(spec, ()):
+                overlap[item_id] += 1
+        if exclude:
+            for item_id in exclude:
+                overlap.pop(item_id, None)
+        return overlap
+
+    @staticmethod
+    def _top(scored, limit: Optional[int]) -> List[Tuple[int, float]]:
+        # Сначала лучшие совпадения, при равной оценке - более новые записи
+        key = lambda item: (-item[1], -item[0])
+        if limit is None:
+            return sorted(scored, key=key)
+        return heapq.nsmallest(limit, scored, key=key)
+
+
+specification_index = SpecificationMatchIndex()
+
+
+async def rebuild_specification_index():
+    """Периодическая пересборка: индекс патчат только записи этого воркера, заказы и специалисты
+    других воркеров появляются в нем только так
+    """
+    async with async_session_maker() as session:
+        await specification_index.rebuild(session)
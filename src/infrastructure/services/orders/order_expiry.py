@@ -0,0 +1,23 @@
+import os
+
+from src.infrastructure.adapters.orm_entity_adapter import OrderOrmEntityAdapter
+from src.infrastructure.repository.database import async_session_maker
+from src.infrastructure.repository.orders.postgres_orders_repo import PostgresOrdersRepo
+from src.infrastructure.services.events.order_events import order_event_hub
+from src.infrastructure.services.matching.specification_index import specification_index
+from src.use_cases.repository.orders_usecases import OrderUseCase
+
+ORDER_EXPIRY_INTERVAL = float(os.getenv("ORDER_EXPIRY_INTERVAL", 300))
+ORDER_EXPIRY_BATCH_SIZE = int(os.getenv("ORDER_EXPIRY_BATCH_SIZE", 500))
+
+
+async def expire_overdue_orders() -> int:
+    """Переводит просроченные активные заказы в INACTIVE, возвращает число обработанных"""
+    async with async_session_maker() as session:
+        repo = PostgresOrdersRepo(
+            session=session,
+            adapter=OrderOrmEntityAdapter(),
+            matching_index=specification_index,
+            event_hub=order_event_hub
+        )
+        return await OrderUseCase(orders_repo=repo).expire_overdue_orders(batch_size=ORDER_EXPIRY_BATCH_SIZE)
@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import os
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.entity.clinics.clinic_entity import normalize_location
+from src.domain.entity.clinics.reviews import LeaderboardEntry, ReviewTargetType
+from src.infrastructure.repository.database import async_session_maker
+from src.infrastructure.repository.schemas.clinic_orm import ClinicOrm
+from src.infrastructure.repository.schemas.review_orm import ReviewStatsOrm
+from src.infrastructure.repository.schemas.user_orm import SpecialistOrm
+from src.infrastructure.services.matching.specification_index import normalize_specifications
+
+LEADERBOARD_PRIOR_WEIGHT = float(os.getenv("LEADERBOARD_PRIOR_WEIGHT", 5))
+LEADERBOARD_REBUILD_INTERVAL = float(os.getenv("LEADERBOARD_REBUILD_INTERVAL", 3600))
+
+Target = Tuple[ReviewTargetType, int]
+
+
+def normalize_scope(target_type: ReviewTargetType, scope: Optional[str]) -> str:
+    """Город клиники - как в поиске по локации, спецификация - как в индексе совпадений"""
+    if target_type == ReviewTargetType.CLINIC:
+        return normalize_location(scope)
+    return (scope or "").strip().casefold()
+
+
+class _Board:
+    """Отсортированный список ключей (-score, -count, target_id) с удалением по target_id"""
+
+    def __init__(self):
+        self.keys: List[Tuple[float, int, int]] = []
+        self.key_by_target: Dict[int, Tuple[float, int, int]] = {}
+
+    def put(self, target_id: int, score: float, count: int):
+        self.remove(target_id)
+        key = (-score, -count, target_id)
+        insort(self.keys, key)
+        self.key_by_target[target_id] = key
+
+    def remove(self, target_id: int):
+        key = self.key_by_target.pop(target_id, None)
+        if key is not None:
+            del self.keys[bisect_left(self.keys, key)]
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class RatingLeaderboard:
+    """Рейтинги целей отзывов по (тип цели, город клиники / спецификация специалиста).
+
+    Оценка - байесовское среднее (C*m + sum) / (C + n), где m - средняя оценка по типу цели
+    на момент последней полной пересборки, C - вес априорного среднего. Цели с парой
+    отзывов не обгоняют цели с сотнями стабильных оценок.
+    """
+
+    SUPPORTED_TYPES = (ReviewTargetType.CLINIC, ReviewTargetType.SPECIALIST)
+
+    def __init__(self, prior_weight: float = LEADERBOARD_PRIOR_WEIGHT):
+        self._prior_weight = prior_weight
+        self._boards: Dict[Tuple[ReviewTargetType, str], _Board] = defaultdict(_Board)
+        self._scopes: Dict[Target, FrozenSet[str]] = {}
+        self._stats: Dict[Target, Tuple[int, int]] = {}
+        self._means: Dict[ReviewTargetType, float] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._logger = logging.getLogger(__name__)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    async def ensure_loaded(self, session: AsyncSession):
+        if self._loaded:
+            return
+        async with self._lock:
+            if not self._loaded:
+                await self.rebuild(session)
+
+    async def rebuild(self, session: AsyncSession):
+        stats = await session.execute(
+            select(
+                ReviewStatsOrm.target_type, ReviewStatsOrm.target_id,
+                ReviewStatsOrm.reviews_count, ReviewStatsOrm.rate_sum
+            ).where(
+                ReviewStatsOrm.target_type.in_(self.SUPPORTED_TYPES),
+                ReviewStatsOrm.reviews_count > 0
+            )
+        )
+        clinics = await session.execute(
+            select(ClinicOrm.id, ClinicOrm.location).where(ClinicOrm.is_active.is_(True))
+        )
+        specialists = await session.execute(select(SpecialistOrm.user_id, SpecialistOrm.specifications))
+
+        scopes = [(ReviewTargetType.CLINIC, clinic_id, [location]) for clinic_id, location in clinics.all()]
+        scopes += [
+            (ReviewTargetType.SPECIALIST, specialist_id, specifications)
+            for specialist_id, specifications in specialists.all()
+        ]
+        self.load(
+            [(ReviewTargetType(row.target_type.value), row.target_id, row.reviews_count, row.rate_sum)
+             for row in stats.all()],
+            scopes
+        )
+
+    def load(
+            self,
+            stats: Iterable[Tuple[ReviewTargetType, int, int, int]],
+            scopes: Iterable[Tuple[ReviewTargetType, int, Iterable[str]]]
+    ):
+        """Полная пересборка из агрегатов и областей целей; пересчитывает априорные средние"""
+        stats_by_target = {(target_type, target_id): (count, rate_sum) for target_type, target_id, count, rate_sum in stats}
+        scopes_by_target = {
+            (target_type, target_id): self._normalize_scopes(target_type, values)
+            for target_type, target_id, values in scopes
+        }
+
+        totals: Dict[ReviewTargetType, List[int]] = defaultdict(lambda: [0, 0])
+        for (target_type, _), (count, rate_sum) in stats_by_target.items():
+            totals[target_type][0] += count
+            totals[target_type][1] += rate_sum
+        means = {target_type: rate_sum / count for target_type, (count, rate_sum) in totals.items() if count}
+
+        # Ключи собираются списком и сортируются один раз - дешевле, чем insort по одному
+        keys: Dict[Tuple[ReviewTargetType, str], List[Tuple[float, int, int]]] = defaultdict(list)
+        for target, (count, rate_sum) in stats_by_target.items():
+            if count <= 0:
+                continue
+            score = self._score(means.get(target[0], 0.0), count, rate_sum)
+            for scope in scopes_by_target.get(target, ()):
+                keys[(target[0], scope)].append((-score, -count, target[1]))
+
+        boards: Dict[Tuple[ReviewTargetType, str], _Board] = defaultdict(_Board)
+        for board_key, board_keys in keys.items():
+            board = boards[board_key]
+            board.keys = sorted(board_keys)
+            board.key_by_target = {key[2]: key for key in board.keys}
+
+        self._boards, self._scopes, self._stats, self._means = boards, scopes_by_target, stats_by_target, means
+        self._loaded = True
+        self._logger.info(f"Leaderboard rebuilt: {len(stats_by_target)} rated targets, {len(boards)} boards")
+
+    def update_stats(self, target_type: ReviewTargetType, target_id: int, count: int, rate_sum: int):
+        """Инкрементальное обновление после записи отзыва"""
+        target_type = ReviewTargetType(target_type.value)
+        if target_type not in self.SUPPORTED_TYPES:
+            return
+        target = (target_type, target_id)
+        if count > 0:
+            self._stats[target] = (count, rate_sum)
+        else:
+            self._stats.pop(target, None)
+        self._place(target)
+
+    def set_scopes(self, target_type: ReviewTargetType, target_id: int, scopes: Optional[Iterable[str]]):
+        """Город клиники или спецификации специалиста изменились; пустой список убирает цель из рейтингов"""
+        target = (ReviewTargetType(target_type.value), target_id)
+        self._unplace(target)
+        normalized = self._normalize_scopes(target[0], scopes)
+        if normalized:
+            self._scopes[target] = normalized
+        else:
+            self._scopes.pop(target, None)
+        self._place(target)
+
+    def top(
+            self,
+            target_type: ReviewTargetType,
+            scope: str,
+            offset: int = 0,
+            limit: int = 20
+    ) -> Tuple[List[LeaderboardEntry], int]:
+        target_type = ReviewTargetType(target_type.value)
+        board = self._boards.get((target_type, normalize_scope(target_type, scope)))
+        if not board:
+            return [], 0
+        entries = []
+        for rank, (neg_score, neg_count, target_id) in enumerate(board.keys[offset:offset + limit], start=offset + 1):
+            count, rate_sum = self._stats[(target_type, target_id)]
+            entries.append(LeaderboardEntry(
+                rank=rank,
+                target_id=target_id,
+                score=round(-neg_score, 3),
+                average=round(rate_sum / count, 1),
+                count=count
+            ))
+        return entries, len(board)
+
+    def _place(self, target: Target):
+        target_type, target_id = target
+        stats = self._stats.get(target)
+        for scope in self._scopes.get(target, ()):
+            board = self._boards[(target_type, scope)]
+            if stats:
+                count, rate_sum = stats
+                board.put(target_id, self._score(self._means.get(target_type, rate_sum / count), count, rate_sum), count)
+            else:
+                board.remove(target_id)
+
+    def _unplace(self, target: Target):
+        for scope in self._scopes.get(target, ()):
+            board = self._boards.get((target[0], scope))
+            if board:
+                board.remove(target[1])
+
+    def _score(self, mean: float, count: int, rate_sum: int) -> float:
+        return (self._prior_weight * mean + rate_sum) / (self._prior_weight + count)
+
+    @staticmethod
+    def _normalize_scopes(target_type: ReviewTargetType, scopes: Optional[Iterable[str]]) -> FrozenSet[str]:
+        if target_type == ReviewTargetType.SPECIALIST:
+            return normalize_specifications(scopes)
+        normalized = (normalize_scope(target_type, scope) for scope in (scopes or []))
+        return frozenset(scope for scope in normalized if scope)
+
+
+rating_leaderboard = RatingLeaderboard()
+
+
+async def rebuild_rating_leaderboard():
+    """Периодическая пересборка: обновляет априорные средние и снимает дрейф инкрементальных правок"""
+    async with async_session_maker() as session:
+        await rating_leaderboard.rebuild(session)
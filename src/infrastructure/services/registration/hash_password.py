@@ -1,8 +1,48 @@
 import bcrypt
 import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional
+
+# Массовое хеширование (импорт пользователей) идет в пуле процессов, не занимая пул потоков event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
 
 async def hash_password(password) -> str:
     loop = asyncio.get_running_loop()
     salt = await loop.run_in_executor(None, bcrypt.gensalt)
     hashed_password = await loop.run_in_executor(None, bcrypt.hashpw, password.encode('utf-8'), salt)
     return hashed_password.decode('utf-8')
+
+
+def _hash_password_sync(password: str) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        # spawn: fork процесса с работающим event loop и потоками драйвера БД небезопасен
+        _process_pool = ProcessPoolExecutor(
+            max_workers=PASSWORD_HASH_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _process_pool
+
+
+async def hash_passwords(passwords: Iterable[str]) -> List[str]:
+    """Хеши пачки паролей параллельно в пуле процессов, порядок сохраняется"""
+    loop = asyncio.get_running_loop()
+    pool = _get_process_pool()
+    return list(await asyncio.gather(*(
+        loop.run_in_executor(pool, _hash_password_sync, password) for password in passwords
+    )))
+
+
+def shutdown_password_pool():
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
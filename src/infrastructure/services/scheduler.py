@@ -0,0 +1,40 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List
+
+logger = logging.getLogger(__name__)
+
+_tasks: List[asyncio.Task] = []
+
+
+async def _run_periodically(name: str, job: Callable[[], Awaitable], interval: float, initial_delay: bool):
+    if initial_delay:
+        await asyncio.sleep(interval)
+    while True:
+        try:
+            await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Ошибка одного запуска не должна останавливать расписание
+            logger.error(f"Periodic job {name} failed: {e}", exc_info=True)
+        await asyncio.sleep(interval)
+
+
+def schedule_periodic(
+        name: str,
+        job: Callable[[], Awaitable],
+        interval: float,
+        initial_delay: bool = False
+) -> asyncio.Task:
+    """initial_delay=True - первый запуск через interval, когда состояние уже собрано при старте"""
+    task = asyncio.create_task(_run_periodically(name, job, interval, initial_delay), name=name)
+    _tasks.append(task)
+    return task
+
+
+async def stop_periodic_jobs():
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
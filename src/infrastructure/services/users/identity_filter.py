@@ -0,0 +1,149 @@
+import asyncio
+import hashlib
+import logging
+import math
+import os
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.infrastructure.repository.database import async_session_maker
+from src.infrastructure.repository.schemas.user_orm import UserOrm
+
+USER_IDENTITY_FILTER_ERROR_RATE = float(os.getenv("USER_IDENTITY_FILTER_ERROR_RATE", 0.01))
+USER_IDENTITY_FILTER_REBUILD_INTERVAL = float(os.getenv("USER_IDENTITY_FILTER_REBUILD_INTERVAL", 300))
+# Запас емкости: фильтр пересобирается периодически, между пересборками пользователи прибывают
+MIN_FILTER_CAPACITY = 10000
+MAX_COUNTER = 255
+
+
+def normalize_identifier(value: str) -> str:
+    return value.strip().casefold()
+
+
+class CountingBloomFilter:
+    """Фильтр Блума со счетчиками вместо бит - поддерживает удаление.
+
+    Отрицательный ответ точный (для добавленных и не удаленных значений), положительный -
+    с вероятностью ложного срабатывания около error_rate при заполнении до capacity.
+    Счетчик, дошедший до MAX_COUNTER, больше не уменьшается.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(1, capacity)
+        self._size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._hashes = max(1, round(self._size / self.capacity * math.log(2)))
+        self._counters = bytearray(self._size)
+        self.count = 0
+
+    def _positions(self, value: str) -> List[int]:
+        # Двойное хеширование: k позиций из двух половин одного дайджеста
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self._size for i in range(self._hashes)]
+
+    def add(self, value: str):
+        for position in self._positions(value):
+            if self._counters[position] < MAX_COUNTER:
+                self._counters[position] += 1
+        self.count += 1
+
+    def remove(self, value: str):
+        positions = self._positions(value)
+        if not all(self._counters[position] for position in positions):
+            return
+        for position in positions:
+            if self._counters[position] < MAX_COUNTER:
+                self._counters[position] -= 1
+        self.count -= 1
+
+    def __contains__(self, value: str) -> bool:
+        return all(self._counters[position] for position in self._positions(value))
+
+
+class UserIdentityFilter:
+    """Никнеймы и email всех пользователей в фильтрах Блума для проверки занятости без БД.
+
+    Промах фильтра - значение свободно, попадание нужно подтвердить запросом к БД. Записи
+    через PostgresUserRepo обновляют фильтр сразу; пользователи, созданные другими
+    воркерами, попадают в него при периодической пересборке.
+    """
+
+    def __init__(self, error_rate: float = USER_IDENTITY_FILTER_ERROR_RATE):
+        self._error_rate = error_rate
+        self._nicknames: Optional[CountingBloomFilter] = None
+        self._emails: Optional[CountingBloomFilter] = None
+        # Добавления во время пересборки: снимок из БД мог быть прочитан до их коммита
+        self._added_during_rebuild: Optional[List[Tuple[Optional[str], Optional[str]]]] = None
+        self._lock = asyncio.Lock()
+        self._logger = logging.getLogger(__name__)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._nicknames is not None
+
+    async def ensure_loaded(self, session: AsyncSession):
+        if self.is_loaded:
+            return
+        async with self._lock:
+            if not self.is_loaded:
+                await self.rebuild(session)
+
+    async def rebuild(self, session: AsyncSession):
+        self._added_during_rebuild = []
+        try:
+            result = await session.execute(select(UserOrm.nickname, UserOrm.email))
+            rows = result.all()
+            capacity = max(MIN_FILTER_CAPACITY, len(rows) * 2)
+            nicknames = CountingBloomFilter(capacity, self._error_rate)
+            emails = CountingBloomFilter(capacity, self._error_rate)
+            for nickname, email in rows:
+                nicknames.add(normalize_identifier(nickname))
+                emails.add(normalize_identifier(email))
+            for nickname, email in self._added_during_rebuild:
+                if nickname is not None:
+                    nicknames.add(nickname)
+                if email is not None:
+                    emails.add(email)
+            self._nicknames, self._emails = nicknames, emails
+        finally:
+            self._added_during_rebuild = None
+        self._logger.info(f"User identity filter rebuilt: {len(rows)} users, capacity {capacity}")
+
+    def add(self, nickname: Optional[str] = None, email: Optional[str] = None):
+        if not self.is_loaded:
+            return
+        nickname = normalize_identifier(nickname) if nickname else None
+        email = normalize_identifier(email) if email else None
+        if nickname is not None:
+            self._nicknames.add(nickname)
+        if email is not None:
+            self._emails.add(email)
+        if self._added_during_rebuild is not None:
+            self._added_during_rebuild.append((nickname, email))
+
+    def remove(self, nickname: Optional[str] = None, email: Optional[str] = None):
+        # Удаление во время пересборки не повторяется: лишнее значение в фильтре дает лишь запрос к БД
+        if not self.is_loaded:
+            return
+        if nickname:
+            self._nicknames.remove(normalize_identifier(nickname))
+        if email:
+            self._emails.remove(normalize_identifier(email))
+
+    def might_contain_nickname(self, nickname: str) -> bool:
+        return not self.is_loaded or normalize_identifier(nickname) in self._nicknames
+
+    def might_contain_email(self, email: str) -> bool:
+        return not self.is_loaded or normalize_identifier(email) in self._emails
+
+
+user_identity_filter = UserIdentityFilter()
+
+
+async def rebuild_user_identity_filter():
+    """Периодическая пересборка: подхватывает чужих пользователей и подгоняет емкость под их число"""
+    async with async_session_maker() as session:
+        await user_identity_filter.rebuild(session)
@@ -0,0 +1,58 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Tuple
+
+from src.domain.entity.users.user import UserProfileCard
+
+PROFILE_CARD_CACHE_TTL = float(os.getenv("PROFILE_CARD_CACHE_TTL", 30))
+PROFILE_CARD_CACHE_SIZE = int(os.getenv("PROFILE_CARD_CACHE_SIZE", 10000))
+
+
+class ProfileCardCache:
+    """Публичные карточки пользователей в памяти процесса: LRU с ограниченным временем жизни.
+
+    Записи через репозитории этого воркера сбрасывают карточку сразу, изменения из других
+    воркеров видны не позже чем через ttl секунд.
+    """
+
+    def __init__(self, ttl: float = PROFILE_CARD_CACHE_TTL, max_size: int = PROFILE_CARD_CACHE_SIZE):
+        self._ttl = ttl
+        self._max_size = max_size
+        self._cards: "OrderedDict[int, Tuple[float, UserProfileCard]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._cards)
+
+    def get_many(self, user_ids: Iterable[int]) -> Tuple[Dict[int, UserProfileCard], List[int]]:
+        """(найденные карточки, id которых нет в кэше или они устарели)"""
+        now = time.monotonic()
+        found, missing = {}, []
+        for user_id in user_ids:
+            entry = self._cards.get(user_id)
+            if entry is None or entry[0] <= now:
+                self._cards.pop(user_id, None)
+                missing.append(user_id)
+                continue
+            self._cards.move_to_end(user_id)
+            found[user_id] = entry[1]
+        return found, missing
+
+    def put_many(self, cards: Iterable[UserProfileCard]):
+        if self._ttl <= 0 or self._max_size <= 0:
+            return
+        expires_at = time.monotonic() + self._ttl
+        for card in cards:
+            self._cards[card.id] = (expires_at, card)
+            self._cards.move_to_end(card.id)
+        while len(self._cards) > self._max_size:
+            self._cards.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        self._cards.pop(int(user_id), None)
+
+    def clear(self):
+        self._cards.clear()
+
+
+profile_card_cache = ProfileCardCache()
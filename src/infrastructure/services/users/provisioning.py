@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import AsyncIterable, Callable, Collection, Dict, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.entity.imports import ImportFormat
+from src.domain.entity.users.provisioning import (
+    ProvisionedUserResult, ProvisioningJob, ProvisioningJobStatus, UserProvisioningRow
+)
+from src.domain.entity.users.user import Role, UserInput
+from src.infrastructure.adapters.orm_entity_adapter import UserOrmEntityAdapter
+from src.infrastructure.repository.user.postgres_specialist_repo import PostgresSpecialistRepo
+from src.infrastructure.repository.user.postgres_user_repo import PostgresUserRepo
+from src.infrastructure.services.imports import error_message, parse_rows, validation_message, write_batch
+from src.infrastructure.services.matching.specification_index import SpecificationMatchIndex
+from src.infrastructure.services.ratings.leaderboard import RatingLeaderboard
+from src.infrastructure.services.registration.hash_password import hash_passwords
+from src.infrastructure.services.users.identity_filter import UserIdentityFilter
+
+USER_PROVISIONING_BATCH_SIZE = int(os.getenv("USER_PROVISIONING_BATCH_SIZE", 200))
+MAX_USER_PROVISIONING_BATCH_SIZE = 1000
+MAX_PROVISIONING_ROWS = int(os.getenv("MAX_PROVISIONING_ROWS", 10000))
+# Завершенные задачи хранятся столько секунд, чтобы клиент успел забрать результат
+PROVISIONING_JOB_TTL = float(os.getenv("PROVISIONING_JOB_TTL", 3600))
+
+logger = logging.getLogger(__name__)
+
+
+class ProvisioningJobRegistry:
+    """Задачи массового создания пользователей в памяти процесса.
+
+    Опрашивать задачу нужно у того же воркера, который ее принял.
+    """
+
+    def __init__(self, ttl: float = PROVISIONING_JOB_TTL):
+        self._ttl = timedelta(seconds=ttl)
+        self._jobs: Dict[str, ProvisioningJob] = {}
+        # Ссылки на задачи asyncio, иначе незавершенную задачу может собрать GC
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def create(self, owner_id: int) -> ProvisioningJob:
+        self._prune()
+        job = ProvisioningJob(id=uuid.uuid4().hex, owner_id=owner_id)
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[ProvisioningJob]:
+        return self._jobs.get(job_id)
+
+    def attach(self, job_id: str, task: asyncio.Task):
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    def _prune(self):
+        expired_before = datetime.utcnow() - self._ttl
+        for job_id in [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < expired_before
+        ]:
+            del self._jobs[job_id]
+
+
+provisioning_jobs = ProvisioningJobRegistry()
+
+
+class UserProvisioner:
+    """Массовое создание пользователей с профилями.
+
+    Файл разбирается и валидируется в запросе, запись идет в фоне батчами: занятость
+    никнеймов и email - один запрос на батч, пароли хешируются в пуле процессов, пользователи
+    и профили пишутся многострочными INSERT в одной транзакции на батч. Батч, упавший
+    целиком, повторяется построчно. Ошибка строки попадает в результат и не прерывает задачу.
+    """
+
+    def __init__(
+            self,
+            session_factory: Callable[[], AsyncSession],
+            registry: ProvisioningJobRegistry = provisioning_jobs,
+            identity_filter: Optional[UserIdentityFilter] = None,
+            matching_index: Optional[SpecificationMatchIndex] = None,
+            leaderboard: Optional[RatingLeaderboard] = None
+    ):
+        self._session_factory = session_factory
+        self._registry = registry
+        self._identity_filter = identity_filter
+        self._matching_index = matching_index
+        self._leaderboard = leaderboard
+
+    async def start(
+            self,
+            lines: AsyncIterable[str],
+            fmt: ImportFormat,
+            *,
+            owner_id: int,
+            allowed_roles: Collection[Role],
+            organization_id: Optional[int] = None,
+            batch_size: int = USER_PROVISIONING_BATCH_SIZE
+    ) -> ProvisioningJob:
+        """Разобрать файл и запустить задачу. organization_id задан - созданные специалисты
+        становятся сотрудниками этой организации. ValueError - файл больше MAX_PROVISIONING_ROWS.
+        """
+        rows: List[Tuple[int, UserProvisioningRow]] = []
+        errors: List[ProvisionedUserResult] = []
+        async for number, fields in parse_rows(lines, fmt, json_columns=()):
+            if number > MAX_PROVISIONING_ROWS:
+                raise ValueError(f"At most {MAX_PROVISIONING_ROWS} rows per file")
+            if isinstance(fields, str):
+                errors.append(ProvisionedUserResult(row=number, error=fields))
+                continue
+            try:
+                row = UserProvisioningRow(**fields)
+            except ValidationError as e:
+                errors.append(ProvisionedUserResult(
+                    row=number, nickname=fields.get('nickname'), error=validation_message(e)
+                ))
+                continue
+            if row.role not in allowed_roles:
+                errors.append(ProvisionedUserResult(
+                    row=number, nickname=row.nickname, error=f"Role {row.role.value} is not allowed"
+                ))
+                continue
+            rows.append((number, row))
+
+        job = self._registry.create(owner_id)
+        job.total = len(rows) + len(errors)
+        job.processed = job.failed = len(errors)
+        job.results = errors
+        task = asyncio.create_task(self._run(job, rows, organization_id, batch_size))
+        self._registry.attach(job.id, task)
+        return job
+
+    async def _run(
+            self,
+            job: ProvisioningJob,
+            rows: List[Tuple[int, UserProvisioningRow]],
+            organization_id: Optional[int],
+            batch_size: int
+    ):
+        job.status = ProvisioningJobStatus.RUNNING
+        seen_nicknames: Set[str] = set()
+        seen_emails: Set[str] = set()
+        try:
+            async with self._session_factory() as session:
+                user_repo = PostgresUserRepo(session, UserOrmEntityAdapter(), identity_filter=self._identity_filter)
+                specialist_repo = PostgresSpecialistRepo(
+                    session, UserOrmEntityAdapter(), matching_index=self._matching_index, leaderboard=self._leaderboard
+                )
+                for start in range(0, len(rows), batch_size):
+                    batch = rows[start:start + batch_size]
+                    results = await self._provision_batch(
+                        batch, user_repo, specialist_repo, organization_id, seen_nicknames, seen_emails
+                    )
+                    job.results.extend(results)
+                    job.processed += len(results)
+                    job.created += sum(1 for result in results if result.error is None)
+                    job.failed += sum(1 for result in results if result.error is not None)
+            job.results.sort(key=lambda result: result.row)
+            job.status = ProvisioningJobStatus.COMPLETED
+        except Exception as e:
+            logger.error(f"User provisioning job {job.id} failed: {e}", exc_info=True)
+            job.status = ProvisioningJobStatus.FAILED
+            job.error = error_message(e)
+        finally:
+            job.finished_at = datetime.utcnow()
+        logger.info(f"User provisioning job {job.id}: {job.created} created, {job.failed} failed")
+
+    @staticmethod
+    async def _provision_batch(
+            batch: List[Tuple[int, UserProvisioningRow]],
+            user_repo: PostgresUserRepo,
+            specialist_repo: PostgresSpecialistRepo,
+            organization_id: Optional[int],
+            seen_nicknames: Set[str],
+            seen_emails: Set[str]
+    ) -> List[ProvisionedUserResult]:
+        results: Dict[int, ProvisionedUserResult] = {}
+
+        def fail(number: int, row: UserProvisioningRow, message: str):
+            results[number] = ProvisionedUserResult(row=number, nickname=row.nickname, error=message)
+
+        taken_nicknames, taken_emails = await user_repo.find_taken_identities(
+            (row.nickname for _, row in batch), (row.email for _, row in batch)
+        )
+        candidates: List[Tuple[int, UserProvisioningRow]] = []
+        for number, row in batch:
+            if row.nickname in seen_nicknames:
+                fail(number, row, "Duplicate nickname in file")
+            elif row.email in seen_emails:
+                fail(number, row, "Duplicate email in file")
+            elif row.nickname in taken_nicknames:
+                fail(number, row, "Nickname already exists")
+            elif row.email in taken_emails:
+                fail(number, row, "Email already exists")
+            else:
+                candidates.append((number, row))
+            seen_nicknames.add(row.nickname)
+            seen_emails.add(row.email)
+
+        password_hashes = await hash_passwords(row.password for _, row in candidates)
+        rows_by_number = dict(candidates)
+        users = [
+            (
+                number,
+                (
+                    UserInput(**row.model_dump(include={
+                        'nickname', 'name', 'role', 'country', 'email', 'phone_number', 'photo_path'
+                    }), password_hash=password_hash),
+                    row.profile_data()
+                )
+            )
+            for (number, row), password_hash in zip(candidates, password_hashes)
+        ]
+
+        ids: Dict[str, int] = {}
+        for created in await write_batch(
+                users,
+                lambda chunk: user_repo.provision_users(chunk, organization_id),
+                lambda number, _, message: fail(number, rows_by_number[number], message)
+        ):
+            ids.update(created)
+
+        for number, row in candidates:
+            if row.nickname not in ids:
+                continue
+            results[number] = ProvisionedUserResult(row=number, nickname=row.nickname, user_id=ids[row.nickname])
+            if row.role == Role.SPECIALIST:
+                specialist_repo.index_specialist(ids[row.nickname], row.specifications)
+        return [results[number] for number in sorted(results)]
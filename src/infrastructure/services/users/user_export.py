@@ -0,0 +1,60 @@
+import csv
+import io
+import os
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.entity.imports import ImportFormat
+from src.domain.entity.users.admin.admin_entity import AdminUserFilter, AdminUserRow
+from src.infrastructure.adapters.orm_entity_adapter import AdminOrmEntityAdapter, UserOrmEntityAdapter
+from src.infrastructure.repository.user.postgres_admin_repo import PostgresAdminRepo
+
+# Выгрузка отдается кусками не меньше этого размера, а не строкой на чанк
+USER_EXPORT_FLUSH_BYTES = int(os.getenv("USER_EXPORT_FLUSH_BYTES", 64 * 1024))
+
+EXPORT_COLUMNS = tuple(AdminUserRow.model_fields)
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class UserExporter:
+    """Выгрузка пользователей для аудита: строки идут из серверного курсора прямо в ответ.
+
+    Ответ стримится уже после выхода зависимостей запроса, поэтому выгрузка открывает
+    свою сессию на время передачи.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession]):
+        self._session_factory = session_factory
+
+    async def stream(self, fmt: ImportFormat, filters: Optional[AdminUserFilter] = None) -> AsyncIterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        if fmt == ImportFormat.CSV:
+            writer.writerow(EXPORT_COLUMNS)
+
+        async with self._session_factory() as session:
+            repo = PostgresAdminRepo(session, UserOrmEntityAdapter(), AdminOrmEntityAdapter())
+            async for row in repo.stream_users(filters):
+                if fmt == ImportFormat.CSV:
+                    writer.writerow([_csv_value(getattr(row, column)) for column in EXPORT_COLUMNS])
+                else:
+                    buffer.write(row.model_dump_json())
+                    buffer.write("\n")
+                if buffer.tell() >= USER_EXPORT_FLUSH_BYTES:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
@@ -12,12 +12,34 @@ from src.presentation.routes.api.clinics.clinic_router import router as clinic_r
 from src.presentation.routes.api.orders.order_router import router as order_router
 from src.presentation.routes.api.responses.response_router import router as response_router
 from src.presentation.routes.api.reviews.reviews_router import router as reviews_router
+from src.presentation.routes.api.appointments.appointment_router import router as appointment_router
 from src.presentation.routes.api.users.user_router import router as user_router
 from src.presentation.routes.api.users.admin_router import router as admin_router
 from src.presentation.routes.api.users.organization_router import router as organization_router
 from src.presentation.routes.api.users.patient_router import router as patient_router
 from src.presentation.routes.api.users.specialist_router import router as specialist_router
-from src.infrastructure.repository.database import init_db
+from src.presentation.routes.api.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, AVERAGE_RATING_HEADER
+from src.infrastructure.repository.database import init_db, async_session_maker
+from src.infrastructure.services.matching.specification_index import (
+    specification_index, rebuild_specification_index, SPECIFICATION_INDEX_REBUILD_INTERVAL
+)
+from src.infrastructure.services.orders.order_expiry import expire_overdue_orders, ORDER_EXPIRY_INTERVAL
+from src.infrastructure.services.ratings.leaderboard import (
+    rating_leaderboard, rebuild_rating_leaderboard, LEADERBOARD_REBUILD_INTERVAL
+)
+from src.infrastructure.services.clinics.location_index import location_index
+from src.infrastructure.services.clinics.geo_index import clinic_geo_index
+from src.infrastructure.services.clinics.catalog import (
+    clinic_catalog, refresh_clinic_catalog, CLINIC_CATALOG_POLL_INTERVAL
+)
+from src.infrastructure.services.appointments.availability import (
+    availability_index, rebuild_availability_index, AVAILABILITY_REBUILD_INTERVAL
+)
+from src.infrastructure.services.users.identity_filter import (
+    user_identity_filter, rebuild_user_identity_filter, USER_IDENTITY_FILTER_REBUILD_INTERVAL
+)
+from src.infrastructure.services.registration.hash_password import shutdown_password_pool
+from src.infrastructure.services.scheduler import schedule_periodic, stop_periodic_jobs
 from pathlib import Path
 import sentry_sdk
 from sentry_sdk.integrations.fastapi import FastApiIntegration
@@ -45,6 +67,7 @@ app.include_router(clinic_router)
 app.include_router(order_router)
 app.include_router(response_router)
 app.include_router(reviews_router)
+app.include_router(appointment_router)
 app.include_router(user_router)
 app.include_router(admin_router)
 app.include_router(organization_router)
@@ -109,6 +132,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, AVERAGE_RATING_HEADER],
 )
 
 import os
@@ -119,6 +143,39 @@ app.add_middleware(RateLimitMiddleware)
 @app.on_event("startup")
 async def startup_event():
     await init_db()
+    async with async_session_maker() as session:
+        await specification_index.rebuild(session)
+        await rating_leaderboard.rebuild(session)
+        await location_index.rebuild(session)
+        await clinic_geo_index.rebuild(session)
+        await clinic_catalog.rebuild(session)
+        await availability_index.rebuild(session)
+        await user_identity_filter.rebuild(session)
+    if "PYTEST_CURRENT_TEST" not in os.environ:
+        schedule_periodic("order-expiry", expire_overdue_orders, ORDER_EXPIRY_INTERVAL)
+        schedule_periodic(
+            "specification-index-rebuild", rebuild_specification_index, SPECIFICATION_INDEX_REBUILD_INTERVAL,
+            initial_delay=True
+        )
+        schedule_periodic(
+            "leaderboard-rebuild", rebuild_rating_leaderboard, LEADERBOARD_REBUILD_INTERVAL, initial_delay=True
+        )
+        schedule_periodic(
+            "clinic-catalog-refresh", refresh_clinic_catalog, CLINIC_CATALOG_POLL_INTERVAL, initial_delay=True
+        )
+        schedule_periodic(
+            "availability-rebuild", rebuild_availability_index, AVAILABILITY_REBUILD_INTERVAL, initial_delay=True
+        )
+        schedule_periodic(
+            "user-identity-filter-rebuild", rebuild_user_identity_filter, USER_IDENTITY_FILTER_REBUILD_INTERVAL,
+            initial_delay=True
+        )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await stop_periodic_jobs()
+    shutdown_password_pool()
 
 
 @app.get("/")
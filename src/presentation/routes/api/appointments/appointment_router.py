@@ -0,0 +1,88 @@
+from fastapi import APIRouter, status, Depends, HTTPException, Query
+from src.dependencies import get_current_user, get_appointment_use_case
+from src.domain.entity.users.user import User
+from src.domain.entity.clinics.appointment import Appointment, AvailableSlot, clinic_local_now
+from src.infrastructure.services.appointments.availability import APPOINTMENT_HORIZON_DAYS
+from src.use_cases.repository.appointments_usecases import AppointmentUseCase
+from src.exceptions import SlotUnavailableError
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Optional
+
+router = APIRouter(prefix='/api/appointments', tags=['Appointments'])
+
+MAX_SLOTS = 200
+
+
+class AppointmentBookRequest(BaseModel):
+    clinic_id: int = Field(..., gt=0)
+    specialist_id: Optional[int] = Field(None, gt=0, description="Без специалиста - прием в клинике")
+    starts_at: datetime = Field(..., description="Начало слота (местное время клиники)")
+
+
+def _raise_for_error(result):
+    if isinstance(result, SlotUnavailableError):
+        raise HTTPException(status_code=409, detail=str(result))
+    if isinstance(result, PermissionError):
+        raise HTTPException(status_code=403, detail=str(result))
+    if isinstance(result, LookupError):
+        raise HTTPException(status_code=404, detail=str(result))
+    if isinstance(result, ValueError):
+        raise HTTPException(status_code=400, detail=str(result))
+    if isinstance(result, Exception):
+        raise HTTPException(status_code=500, detail=str(result))
+    return result
+
+
+@router.get("/slots", response_model=List[AvailableSlot])
+async def get_free_slots(
+        clinic_id: int = Query(..., gt=0),
+        specialist_id: Optional[int] = Query(None, gt=0),
+        after: Optional[datetime] = Query(None, description="По умолчанию - текущее время клиник (CLINIC_TIMEZONE)"),
+        days: int = Query(7, ge=1, le=APPOINTMENT_HORIZON_DAYS),
+        limit: Optional[int] = Query(None, ge=1, le=MAX_SLOTS),
+        use_case: AppointmentUseCase = Depends(get_appointment_use_case)
+):
+    return _raise_for_error(
+        await use_case.get_free_slots(clinic_id, specialist_id, after or clinic_local_now(), days, limit)
+    )
+
+
+@router.get("/next", response_model=List[AvailableSlot])
+async def get_next_free_slots(
+        location: str = Query(..., min_length=2),
+        after: Optional[datetime] = Query(None, description="По умолчанию - текущее время клиник (CLINIC_TIMEZONE)"),
+        limit: int = Query(20, ge=1, le=MAX_SLOTS),
+        use_case: AppointmentUseCase = Depends(get_appointment_use_case)
+):
+    """Ближайшие свободные слоты в любой клинике города"""
+    return _raise_for_error(await use_case.get_next_free_slots(location, after or clinic_local_now(), limit))
+
+
+@router.get("/my", response_model=List[Appointment])
+async def get_my_appointments(
+        upcoming_only: bool = Query(True),
+        current_user: User = Depends(get_current_user),
+        use_case: AppointmentUseCase = Depends(get_appointment_use_case)
+):
+    return _raise_for_error(await use_case.get_my_appointments(current_user, upcoming_only))
+
+
+@router.post("/", response_model=Appointment, status_code=status.HTTP_201_CREATED)
+async def book_appointment(
+        request: AppointmentBookRequest,
+        current_user: User = Depends(get_current_user),
+        use_case: AppointmentUseCase = Depends(get_appointment_use_case)
+):
+    return _raise_for_error(
+        await use_case.book(current_user, request.clinic_id, request.specialist_id, request.starts_at)
+    )
+
+
+@router.post("/{appointment_id}/cancel", response_model=Appointment)
+async def cancel_appointment(
+        appointment_id: int,
+        current_user: User = Depends(get_current_user),
+        use_case: AppointmentUseCase = Depends(get_appointment_use_case)
+):
+    return _raise_for_error(await use_case.cancel(current_user, appointment_id))
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, status, Depends, HTTPException, Request
+from fastapi import APIRouter, status, Depends, HTTPException, Request, Query
 from src.domain.entity.users.user import User
 from src.domain.entity.users.specialist.specialist import Specialist
 from src.domain.entity.users.patient.patient import Patient
 from src.domain.entity.users.organization.organization import Organization
 from src.domain.entity.users.admin.admin_entity import Admin
-from src.dependencies import get_registration_use_case, get_login_use_case, get_current_user_optional, get_admin_repository
+from src.dependencies import (
+    get_registration_use_case, get_login_use_case, get_current_user_optional, get_admin_repository, get_user_repository
+)
+from src.domain.interfaces.user.user_repositiry import IUserRepository
 from src.use_cases.repository.users_usecases import RegistrationUseCase, LoginUseCase
 from src.infrastructure.repository.user.postgres_admin_repo import PostgresAdminRepo
 from pydantic import BaseModel
@@ -54,6 +57,11 @@ class AdminRegisterData(BaseRegisterData):
     is_superadmin: bool = False
 
 
+class AvailabilityResponse(BaseModel):
+    nickname: Optional[bool] = None
+    email: Optional[bool] = None
+
+
 # Объединенный тип для ответа
 UserResponse = Union[User, Specialist, Patient, Organization, Admin]
 
@@ -168,3 +176,21 @@ async def login(
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.get('/availability', response_model=AvailabilityResponse, status_code=status.HTTP_200_OK)
+async def check_availability(
+        nickname: Optional[str] = Query(None, min_length=1, max_length=100),
+        email: Optional[str] = Query(None, min_length=1, max_length=254),
+        user_repo: IUserRepository = Depends(get_user_repository)
+):
+    """Свободны ли никнейм и email (для формы регистрации); True - свободен, None - не проверялся"""
+    if nickname is None and email is None:
+        raise HTTPException(status_code=400, detail="nickname or email is required")
+    try:
+        return AvailabilityResponse(
+            nickname=await user_repo.is_nickname_available(nickname) if nickname is not None else None,
+            email=await user_repo.is_email_available(email) if email is not None else None
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
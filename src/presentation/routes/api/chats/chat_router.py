@@ -41,11 +41,14 @@ async def send_text_message(
         current_user: User = Depends(get_current_user),
         use_case: ChatUseCase = Depends(get_chats_use_case)
 ):
-    updated_chat = await use_case.send_text_message_to_recipient(
-        sender_id=current_user.id,
-        recipient_id=message_data.recipient_id,
-        text=message_data.text
-    )
+    try:
+        updated_chat = await use_case.send_text_message_to_recipient(
+            sender_id=current_user.id,
+            recipient_id=message_data.recipient_id,
+            text=message_data.text
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     if not updated_chat:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
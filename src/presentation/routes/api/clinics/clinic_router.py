@@ -1,13 +1,28 @@
-from fastapi import APIRouter, status, Depends, HTTPException, Query
+from fastapi import APIRouter, status, Depends, HTTPException, Query, Request, Response
 from src.dependencies import get_current_user, get_clinic_use_case
 from src.domain.entity.users.user import User
-from src.domain.entity.clinics.clinic_entity import Clinic
+from src.domain.entity.clinics.clinic_entity import Clinic, NearbyClinic
+from src.domain.entity.clinics.reviews import ReviewStats
+from src.domain.entity.clinics.appointment import clinic_local_now
+from src.domain.entity.clinics.clinic_import import ClinicImportReport
+from src.domain.entity.imports import ImportFormat
+from src.infrastructure.services.clinics.clinic_import import (
+    iter_lines, CLINIC_IMPORT_BATCH_SIZE, MAX_CLINIC_IMPORT_BATCH_SIZE
+)
 from src.use_cases.repository.clinics_usecases import ClinicUseCase
-from pydantic import BaseModel
+from src.domain.entity.pagination import PageRequest, MAX_PAGE_SIZE
+from src.exceptions import InvalidCursorError
+from src.presentation.routes.api.pagination import set_next_cursor
+from pydantic import BaseModel, Field
+from datetime import datetime
 from typing import List, Optional
 
 router = APIRouter(prefix='/api/clinics', tags=['Clinics'])
 
+MAX_NEARBY_RADIUS_KM = 200
+OPEN_AT_DESCRIPTION = "Открыта в указанное время: местное время клиник без UTC-смещения"
+OPEN_NOW_DESCRIPTION = "Открыта сейчас по времени клиник (CLINIC_TIMEZONE, по умолчанию - пояс сервера)"
+
 
 class ClinicCreateRequest(BaseModel):
     organization_id: int
@@ -16,6 +31,8 @@ class ClinicCreateRequest(BaseModel):
     address: str
     work_hours: Optional[dict] = None
     is_24_7: bool = False
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 
 class ClinicUpdateRequest(BaseModel):
@@ -25,10 +42,57 @@ class ClinicUpdateRequest(BaseModel):
     work_hours: Optional[dict] = None
     is_24_7: Optional[bool] = None
     is_active: Optional[bool] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 
 class ClinicResponse(Clinic):
-    pass
+    rating: Optional[ReviewStats] = None
+
+
+class NearbyClinicResponse(NearbyClinic):
+    rating: Optional[ReviewStats] = None
+
+
+async def _with_ratings(
+        use_case: ClinicUseCase,
+        clinics: List[Clinic],
+        response_model: type = ClinicResponse
+) -> list:
+    # Рейтинги всей страницы одним запросом к review_stats
+    ratings = await use_case.get_clinic_ratings([clinic.id for clinic in clinics])
+    if isinstance(ratings, Exception):
+        raise HTTPException(status_code=500, detail=str(ratings))
+    return [response_model(**clinic.model_dump(), rating=ratings.get(clinic.id)) for clinic in clinics]
+
+
+# Объявлен до /{clinic_id}, иначе "nearby" разбирается как идентификатор
+@router.get("/nearby", response_model=List[NearbyClinicResponse])
+async def get_nearest_clinics(
+        response: Response,
+        latitude: float = Query(..., ge=-90, le=90),
+        longitude: float = Query(..., ge=-180, le=180),
+        radius_km: float = Query(10, gt=0, le=MAX_NEARBY_RADIUS_KM),
+        is_24_7: Optional[bool] = Query(None),
+        open_now: bool = Query(False, description=OPEN_NOW_DESCRIPTION),
+        open_at: Optional[datetime] = Query(None, description=OPEN_AT_DESCRIPTION),
+        cursor: Optional[str] = Query(None),
+        page_size: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+        use_case: ClinicUseCase = Depends(get_clinic_use_case)
+):
+    clinics = await use_case.get_nearest_clinics(
+        latitude,
+        longitude,
+        radius_km,
+        is_24_7=is_24_7,
+        open_at=clinic_local_now() if open_now else open_at,
+        page=PageRequest(limit=page_size, cursor=cursor)
+    )
+    if isinstance(clinics, ValueError):
+        raise HTTPException(status_code=400, detail=str(clinics))
+    if isinstance(clinics, Exception):
+        raise HTTPException(status_code=500, detail=str(clinics))
+    return await _with_ratings(use_case, set_next_cursor(response, clinics), NearbyClinicResponse)
 
 
 @router.get("/{clinic_id}", response_model=ClinicResponse)
@@ -41,33 +105,48 @@ async def get_clinic(
         raise HTTPException(status_code=404, detail="Clinic not found")
     if isinstance(clinic, Exception):
         raise HTTPException(status_code=500, detail=str(clinic))
-    return clinic
+    rating = await use_case.get_clinic_rating(clinic_id)
+    if isinstance(rating, Exception):
+        raise HTTPException(status_code=500, detail=str(rating))
+    return ClinicResponse(**clinic.model_dump(), rating=rating)
 
 
 @router.get("/by-location/", response_model=List[ClinicResponse])
 async def get_clinics_by_location(
+        response: Response,
         location: str = Query(..., min_length=2),
-        page: int = Query(1, ge=1),
-        page_size: int = Query(10, ge=1, le=100),
+        open_now: bool = Query(False, description=OPEN_NOW_DESCRIPTION),
+        open_at: Optional[datetime] = Query(None, description=OPEN_AT_DESCRIPTION),
+        cursor: Optional[str] = Query(None),
+        page_size: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
         use_case: ClinicUseCase = Depends(get_clinic_use_case)
 ):
-    clinics = await use_case.get_clinics_by_location(location, page, page_size)
+    clinics = await use_case.get_clinics_by_location(
+        location,
+        PageRequest(limit=page_size, cursor=cursor),
+        open_at=clinic_local_now() if open_now else open_at
+    )
+    if isinstance(clinics, ValueError):
+        raise HTTPException(status_code=400, detail=str(clinics))
     if isinstance(clinics, Exception):
         raise HTTPException(status_code=500, detail=str(clinics))
-    return clinics
+    return await _with_ratings(use_case, set_next_cursor(response, clinics))
 
 
 @router.get("/by-organization/{organization_id}", response_model=List[ClinicResponse])
 async def get_clinics_by_organization(
         organization_id: int,
-        page: int = Query(1, ge=1),
-        page_size: int = Query(10, ge=1, le=100),
+        response: Response,
+        cursor: Optional[str] = Query(None),
+        page_size: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
         use_case: ClinicUseCase = Depends(get_clinic_use_case)
 ):
-    clinics = await use_case.get_clinics_by_organization(organization_id, page, page_size)
+    clinics = await use_case.get_clinics_by_organization(organization_id, PageRequest(limit=page_size, cursor=cursor))
+    if isinstance(clinics, InvalidCursorError):
+        raise HTTPException(status_code=400, detail=str(clinics))
     if isinstance(clinics, Exception):
         raise HTTPException(status_code=500, detail=str(clinics))
-    return clinics
+    return await _with_ratings(use_case, set_next_cursor(response, clinics))
 
 
 @router.post("/", response_model=ClinicResponse, status_code=status.HTTP_201_CREATED)
@@ -95,6 +174,31 @@ async def create_clinic(
     return clinic
 
 
+@router.post("/import", response_model=ClinicImportReport)
+async def import_clinics(
+        request: Request,
+        format: ImportFormat = Query(..., description="csv (с заголовком) или ndjson"),
+        batch_size: int = Query(CLINIC_IMPORT_BATCH_SIZE, ge=1, le=MAX_CLINIC_IMPORT_BATCH_SIZE),
+        current_user: User = Depends(get_current_user),
+        use_case: ClinicUseCase = Depends(get_clinic_use_case)
+):
+    """Пакетный импорт филиалов из тела запроса; upsert по (organization_id, name, address)"""
+    if current_user.role not in ["organization", "admin"]:
+        raise HTTPException(
+            status_code=403,
+            detail="Only organizations and admins can import clinics"
+        )
+
+    # Организация импортирует только свои клиники, админ указывает organization_id в каждой строке
+    organization_id = current_user.id if current_user.role == "organization" else None
+    report = await use_case.import_clinics(
+        iter_lines(request.stream()), format, organization_id=organization_id, batch_size=batch_size
+    )
+    if isinstance(report, Exception):
+        raise HTTPException(status_code=500, detail=str(report))
+    return report
+
+
 @router.put("/{clinic_id}", response_model=ClinicResponse)
 async def update_clinic(
         clinic_id: int,
@@ -1,11 +1,19 @@
-from fastapi import APIRouter, status, Depends, HTTPException, Query, Body, Request
-from src.dependencies import get_current_user, get_orders_use_case
+from fastapi import APIRouter, status, Depends, HTTPException, Query, Body, Request, Response
+from fastapi.responses import StreamingResponse
+from src.dependencies import get_current_user, get_orders_use_case, get_order_event_hub
+from src.infrastructure.services.events.order_events import OrderEventHub, OrderSubscription
 from src.domain.entity.users.user import User, Role
+from src.infrastructure.repository.schemas.order_orm import OrderCreatorRole
 from src.use_cases.repository.orders_usecases import OrderUseCase
-from src.domain.entity.orders.order import OrderStatus, OrderCreate
+from src.domain.entity.orders.order import OrderStatus, OrderCreate, OrderDetails
+from src.domain.entity.orders.response import ResponseStatus
+from src.domain.entity.pagination import PageRequest, MAX_PAGE_SIZE
+from src.exceptions import InvalidCursorError
+from src.presentation.routes.api.pagination import set_next_cursor
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
+import asyncio
 
 router = APIRouter(prefix='/api/orders', tags=['Orders'])
 
@@ -36,6 +44,35 @@ class OrderResponse(BaseModel):
     clinic_id: Optional[int] = None
 
 
+class OrderMatchResponse(OrderResponse):
+    score: float
+
+
+class SpecialistMatchResponse(BaseModel):
+    specialist_id: int
+    score: float
+
+
+async def _order_event_stream(
+        request: Request,
+        hub: OrderEventHub,
+        subscription: OrderSubscription,
+        heartbeat: float
+):
+    try:
+        yield ": connected\n\n"
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                # Комментарий держит соединение живым через прокси
+                yield ": keep-alive\n\n"
+                continue
+            yield event.to_sse()
+    finally:
+        hub.unsubscribe(subscription)
+
+
 @router.post("/", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 async def create_order(
         request: OrderCreateRequest,
@@ -69,19 +106,133 @@ async def create_order(
 
 @router.get("/", response_model=List[OrderResponse])
 async def get_my_orders(
+        response: Response,
+        current_user: User = Depends(get_current_user),
+        use_case: OrderUseCase = Depends(get_orders_use_case),
+        cursor: Optional[str] = Query(None),
+        page_size: int = Query(10, ge=1, le=MAX_PAGE_SIZE)
+):
+    try:
+        page = await use_case.get_orders_by_creator(
+            creator_id=current_user.id,
+            page=PageRequest(limit=page_size, cursor=cursor)
+        )
+        return set_next_cursor(response, page)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/stream")
+async def stream_orders(
+        request: Request,
+        current_user: User = Depends(get_current_user),
+        hub: OrderEventHub = Depends(get_order_event_hub),
+        specifications: Optional[List[str]] = Query(None),
+        heartbeat: float = Query(15.0, ge=1.0, le=60.0)
+):
+    if current_user.role not in [Role.ORGANIZATION, Role.SPECIALIST]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only organizations and specialists can subscribe to orders"
+        )
+
+    subscription = hub.subscribe(
+        current_user.id,
+        specifications or getattr(current_user, 'specifications', None) or []
+    )
+    return StreamingResponse(
+        _order_event_stream(request, hub, subscription, heartbeat),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/feed", response_model=List[OrderResponse])
+async def get_orders_feed(
+        http_response: Response,
         current_user: User = Depends(get_current_user),
         use_case: OrderUseCase = Depends(get_orders_use_case),
-        page: int = Query(1, ge=1),
-        page_size: int = Query(10, ge=1, le=100)
+        service_type: Optional[str] = Query(None),
+        specifications: Optional[List[str]] = Query(None),
+        date_from: Optional[datetime] = Query(None),
+        date_to: Optional[datetime] = Query(None),
+        creator_role: Optional[OrderCreatorRole] = Query(None),
+        cursor: Optional[str] = Query(None),
+        limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE)
 ):
+    if current_user.role not in [Role.ORGANIZATION, Role.SPECIALIST]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only organizations and specialists can browse the orders feed"
+        )
+
     try:
-        orders = await use_case.get_orders_by_creator(
-            creator_id=current_user.id
+        page = await use_case.get_orders_feed(
+            current_user.id,
+            service_type=service_type,
+            specifications=specifications,
+            date_from=date_from,
+            date_to=date_to,
+            creator_role=creator_role,
+            page=PageRequest(limit=limit, cursor=cursor)
         )
-        return orders
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    return [OrderResponse(**order.model_dump()) for order in set_next_cursor(http_response, page)]
+
+
+@router.get("/matching", response_model=List[OrderMatchResponse])
+async def get_matching_orders(
+        current_user: User = Depends(get_current_user),
+        use_case: OrderUseCase = Depends(get_orders_use_case),
+        limit: int = Query(20, ge=1, le=100)
+):
+    if current_user.role != Role.SPECIALIST:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only specialists can get matching orders"
+        )
+
+    try:
+        matches = await use_case.get_matching_orders(
+            specialist_id=current_user.id,
+            specifications=getattr(current_user, "specifications", []),
+            limit=limit
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return [
+        OrderMatchResponse(**order.model_dump(), score=round(score, 3))
+        for order, score in matches
+    ]
+
+
+@router.get("/{order_id}/matching-specialists", response_model=List[SpecialistMatchResponse])
+async def get_matching_specialists(
+        order_id: int,
+        current_user: User = Depends(get_current_user),
+        use_case: OrderUseCase = Depends(get_orders_use_case),
+        limit: int = Query(20, ge=1, le=100)
+):
+    order = await use_case.get_order(order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+
+    if order.creator_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    matches = await use_case.get_matching_specialists(order, limit=limit)
+    return [
+        SpecialistMatchResponse(specialist_id=specialist_id, score=round(score, 3))
+        for specialist_id, score in matches
+    ]
+
 
 @router.get("/{order_id}", response_model=OrderResponse)
 async def get_order(
@@ -110,6 +261,34 @@ async def get_order(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/{order_id}/details", response_model=OrderDetails)
+async def get_order_details(
+        order_id: int,
+        http_response: Response,
+        current_user: User = Depends(get_current_user),
+        use_case: OrderUseCase = Depends(get_orders_use_case),
+        response_status: Optional[ResponseStatus] = Query(None),
+        cursor: Optional[str] = Query(None),
+        page_size: int = Query(10, ge=1, le=MAX_PAGE_SIZE)
+):
+    """Отклики отдаются страницами, как в /api/responses/order/{order_id}: курсор следующей - в заголовке"""
+    try:
+        details = await use_case.get_order_details(
+            order_id, response_status=response_status, page=PageRequest(limit=page_size, cursor=cursor)
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not details:
+        raise HTTPException(status_code=404, detail="Order not found")
+    order, responses = details
+    if order.creator_id != current_user.id and order.status != OrderStatus.ACTIVE:
+        raise HTTPException(status_code=403, detail="Access denied")
+    return OrderDetails(order=order, responses=set_next_cursor(http_response, responses))
+
+
 @router.put("/{order_id}/status", status_code=status.HTTP_200_OK)
 async def update_order_status(
         order_id: int,
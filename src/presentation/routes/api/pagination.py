@@ -0,0 +1,13 @@
+from fastapi import Response
+from src.domain.entity.pagination import Page
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+AVERAGE_RATING_HEADER = "X-Average-Rating"
+
+
+def set_next_cursor(response: Response, page: Page) -> list:
+    """Списочные эндпоинты отдают массив, курсор следующей страницы - в заголовке"""
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, status, Depends, HTTPException, Query, Request
+from fastapi import Response as HTTPResponse
 from src.dependencies import get_current_user, get_responses_use_case, get_orders_use_case
 from src.domain.entity.users.user import User
 from src.domain.entity.users.user import Role
@@ -12,8 +13,11 @@ from datetime import datetime
 from src.exceptions import (
     ResponseNotFoundError,
     DuplicateResponseError,
-    InvalidResponseActionError
+    InvalidResponseActionError,
+    InvalidCursorError
 )
+from src.domain.entity.pagination import PageRequest, MAX_PAGE_SIZE
+from src.presentation.routes.api.pagination import set_next_cursor
 
 router = APIRouter(prefix='/api/responses', tags=['Responses'])
 
@@ -132,19 +136,20 @@ async def get_response(
 @router.get("/order/{order_id}", response_model=List[ResponseResponse])
 async def get_responses_for_order(
         order_id: int,
+        http_response: HTTPResponse,
         current_user: User = Depends(get_current_user),
         response_uc: ResponseUseCase = Depends(get_responses_use_case),
         status: Optional[ResponseStatus] = Query(None),
-        page: int = Query(1, ge=1),
-        page_size: int = Query(10, ge=1, le=100)
+        cursor: Optional[str] = Query(None),
+        page_size: int = Query(10, ge=1, le=MAX_PAGE_SIZE)
 ):
     try:
-        responses = await response_uc.get_order_responses(
+        page = await response_uc.get_order_responses(
             order_id=order_id,
             status=status,
-            page=page,
-            page_size=page_size
+            page=PageRequest(limit=page_size, cursor=cursor)
         )
+        responses = set_next_cursor(http_response, page)
 
         return [
             ResponseResponse(
@@ -158,6 +163,9 @@ async def get_responses_for_order(
                 updated_at=r.updated_at
             ) for r in responses
         ]
+    except InvalidCursorError as e:
+        # Параметр status перекрывает модуль fastapi.status
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -212,7 +220,7 @@ async def accept_response(
             status=ResponseStatus.PROPOSED
         )
 
-        for resp in other_responses:
+        for resp in other_responses.items:
             if resp.response_id != response_id:
                 await response_uc.update_response_status(
                     response_id=resp.response_id,
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, status, Depends, HTTPException, Query
-from src.dependencies import get_current_user, get_review_use_case
+from fastapi import APIRouter, status, Depends, HTTPException, Query, Response
+from src.dependencies import get_current_user, get_review_use_case, get_rating_leaderboard
 from src.domain.entity.users.user import User, Role
-from src.domain.entity.clinics.reviews import Review, ReviewTargetType
+from src.domain.entity.clinics.reviews import Review, ReviewTargetType, ReviewStats, ReviewSort, LeaderboardEntry
 from src.use_cases.repository.reviews_usecases import ReviewUseCases
+from src.domain.entity.pagination import PageRequest, MAX_PAGE_SIZE
+from src.exceptions import InvalidCursorError
+from src.presentation.routes.api.pagination import set_next_cursor, TOTAL_COUNT_HEADER, AVERAGE_RATING_HEADER
+from src.infrastructure.services.ratings.leaderboard import RatingLeaderboard
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
@@ -10,6 +14,8 @@ from enum import Enum
 
 router = APIRouter(prefix='/api/reviews', tags=['Reviews'])
 
+MAX_STATS_BATCH_SIZE = 500
+
 
 class ReviewTargetTypeEnum(str, Enum):
     specialist = "specialist"
@@ -42,6 +48,20 @@ class ReviewUpdateRequest(BaseModel):
     rate: int = Field(..., ge=1, le=10, description="Оценка от 1 до 10")
 
 
+class ReviewTargetRef(BaseModel):
+    target_type: ReviewTargetTypeEnum
+    target_id: int = Field(..., gt=0)
+
+
+class ReviewStatsBatchRequest(BaseModel):
+    targets: List[ReviewTargetRef] = Field(..., min_length=1, max_length=MAX_STATS_BATCH_SIZE)
+
+
+class LeaderboardPage(BaseModel):
+    items: List[LeaderboardEntry]
+    total: int
+
+
 class ReviewResponseRequest(BaseModel):
     response: str = Field(..., min_length=5, max_length=2000, description="Текст ответа")
 
@@ -59,7 +79,7 @@ async def create_review(
         target_type = ReviewTargetType(request.target_type.value)
 
         review = await use_case.create_review(
-            sender_id=current_user.id,
+            sender=current_user,
             order_id=request.order_id,
             target_id=request.target_id,
             target_type=target_type,
@@ -90,10 +110,12 @@ async def create_review(
 async def get_reviews_for_target(
         target_type: ReviewTargetTypeEnum,
         target_id: int,
+        response: Response,
         min_rating: Optional[int] = Query(None, ge=1, le=10),
         max_rating: Optional[int] = Query(None, ge=1, le=10),
-        page: int = Query(1, ge=1),
-        page_size: int = Query(10, ge=1, le=100),
+        sort: ReviewSort = Query(ReviewSort.NEWEST),
+        cursor: Optional[str] = Query(None),
+        page_size: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
         current_user: User = Depends(get_current_user),
         use_case: ReviewUseCases = Depends(get_review_use_case)
 ):
@@ -101,14 +123,20 @@ async def get_reviews_for_target(
         # Преобразуем enum в доменный тип
         domain_target_type = ReviewTargetType(target_type.value)
 
-        reviews = await use_case.get_reviews_for_target(
+        page = await use_case.get_reviews_for_target(
             target_id=target_id,
             target_type=domain_target_type,
             min_rating=min_rating,
             max_rating=max_rating,
-            page=page,
-            page_size=page_size
+            sort=sort,
+            page=PageRequest(limit=page_size, cursor=cursor)
         )
+        reviews = set_next_cursor(response, page)
+
+        # Итоги по фильтру берутся из review_stats (чтение по ключу), а не подсчетом отзывов
+        stats = (await use_case.get_review_stats(target_id, domain_target_type)).within(min_rating, max_rating)
+        response.headers[TOTAL_COUNT_HEADER] = str(stats.count)
+        response.headers[AVERAGE_RATING_HEADER] = str(stats.average)
 
         return [
             ReviewResponse(
@@ -124,6 +152,52 @@ async def get_reviews_for_target(
             )
             for review in reviews
         ]
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post("/stats/batch", response_model=List[ReviewStats])
+async def get_review_stats_batch(
+        request: ReviewStatsBatchRequest,
+        use_case: ReviewUseCases = Depends(get_review_use_case)
+):
+    try:
+        return await use_case.get_review_stats_batch([
+            (ReviewTargetType(target.target_type.value), target.target_id)
+            for target in request.targets
+        ])
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/leaderboard/{target_type}", response_model=LeaderboardPage)
+async def get_leaderboard(
+        target_type: ReviewTargetTypeEnum,
+        scope: str = Query(..., min_length=1, description="Город клиники или спецификация специалиста"),
+        offset: int = Query(0, ge=0),
+        page_size: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+        leaderboard: RatingLeaderboard = Depends(get_rating_leaderboard)
+):
+    domain_target_type = ReviewTargetType(target_type.value)
+    if domain_target_type not in RatingLeaderboard.SUPPORTED_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Leaderboard is available for clinics and specialists only"
+        )
+    items, total = leaderboard.top(domain_target_type, scope, offset=offset, limit=page_size)
+    return LeaderboardPage(items=items, total=total)
+
+
+@router.get("/stats/{target_type}/{target_id}", response_model=ReviewStats)
+async def get_review_stats(
+        target_type: ReviewTargetTypeEnum,
+        target_id: int,
+        use_case: ReviewUseCases = Depends(get_review_use_case)
+):
+    try:
+        return await use_case.get_review_stats(target_id, ReviewTargetType(target_type.value))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -280,5 +354,7 @@ async def get_user_reviews(
             )
             for review in reviews
         ]
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
\ No newline at end of file
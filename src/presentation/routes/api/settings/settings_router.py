@@ -3,7 +3,9 @@ from pydantic import BaseModel, Field
 from src.infrastructure.repository.schemas.user_orm import Role
 from src.use_cases.repository.users_usecases import SetSettingsUseCase
 from jose.exceptions import JWSError
-from src.dependencies import get_settings_use_case
+from src.dependencies import get_settings_use_case, get_user_repository
+from src.domain.interfaces.user.user_repositiry import IUserRepository
+from datetime import datetime
 from typing import Optional, List, Dict, Any
 import logging
 
@@ -32,6 +34,7 @@ async def update_user_settings(
         request: Request,
         update_data: UserSettingsUpdate,
         authorization: str = Header(..., alias="Authorization"),
+        user_repo: IUserRepository = Depends(get_user_repository),
         use_case: SetSettingsUseCase = Depends(get_settings_use_case)
 ):
     try:
@@ -41,10 +44,13 @@ async def update_user_settings(
                 detail="Invalid authentication scheme"
             )
         jwt_token = authorization.split(" ")[1]
+        user_id, expiration_time = await user_repo._decode_jwt_token(jwt_token)
+        if datetime.utcfromtimestamp(expiration_time) < datetime.utcnow():
+            raise ValueError("JWT token expired")
 
         update_dict = update_data.dict(exclude_unset=True, exclude_none=True)
 
-        await use_case.execute(update_dict, jwt_token)
+        await use_case.execute(update_dict, int(user_id))
 
         return {"message": "User settings updated successfully"}
     except HTTPException:
@@ -1,15 +1,29 @@
 import logging
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from src.domain.entity.users.user import User, Role
 from src.use_cases.repository.users_usecases import AdminUseCase
-from src.dependencies import get_current_user, get_admin_use_case
+from src.dependencies import get_current_user, get_admin_use_case, get_orders_use_case, get_user_exporter
+from src.use_cases.repository.orders_usecases import OrderUseCase
 from src.infrastructure.repository.schemas.user_orm import AdminActionsSchema
-from src.domain.entity.users.admin.admin_entity import Admin as AdminEntity
+from src.domain.entity.users.admin.admin_entity import (
+    Admin as AdminEntity, AdminUserFilter, AdminUserRow
+)
+from src.domain.entity.imports import ImportFormat
+from src.infrastructure.services.users.user_export import UserExporter
+from src.domain.entity.pagination import PageRequest, MAX_PAGE_SIZE
+from src.exceptions import InvalidCursorError
+from src.presentation.routes.api.pagination import set_next_cursor
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 logger = logging.getLogger(__name__)
 
+USER_ACTION_RESULTS = {
+    "block": "blocked", "unblock": "unblocked", "delete": "deleted", "verify": "verified", "unverify": "unverified"
+}
+
 def is_admin(user: User = Depends(get_current_user)) -> AdminEntity:
     if user.role != Role.ADMIN:
         raise HTTPException(
@@ -37,16 +51,34 @@ async def get_my_admin_profile(
         )
 
 
-@router.get("/users", response_model=List[User])
+def user_filters(
+    role: Optional[Role] = Query(None),
+    blocked: Optional[bool] = Query(None, description="true - только заблокированные, false - только активные"),
+    country: Optional[str] = Query(None, min_length=2),
+    created_from: Optional[datetime] = Query(None, description="Зарегистрированы не раньше"),
+    created_to: Optional[datetime] = Query(None, description="Зарегистрированы раньше"),
+    nickname_prefix: Optional[str] = Query(None, min_length=1, max_length=20)
+) -> AdminUserFilter:
+    return AdminUserFilter(
+        role=role, is_blocked=blocked, country=country,
+        created_from=created_from, created_to=created_to, nickname_prefix=nickname_prefix
+    )
+
+
+@router.get("/users", response_model=List[AdminUserRow])
 async def get_all_users(
-    page: int = 1,
-    page_size: int = 10,
+    response: Response,
+    cursor: Optional[str] = None,
+    page_size: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    filters: AdminUserFilter = Depends(user_filters),
     admin_user: AdminEntity = Depends(is_admin),
     admin_use_case: AdminUseCase = Depends(get_admin_use_case)
 ):
     try:
-        users = await admin_use_case.get_all_users(page=page, page_size=page_size)
-        return users
+        page = await admin_use_case.get_all_users(page=PageRequest(limit=page_size, cursor=cursor), filters=filters)
+        return set_next_cursor(response, page)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting users: {e}", exc_info=True)
         raise HTTPException(
@@ -55,6 +87,39 @@ async def get_all_users(
         )
 
 
+@router.get("/users/export")
+async def export_users(
+    format: ImportFormat = Query(ImportFormat.CSV, description="csv (с заголовком) или ndjson"),
+    filters: AdminUserFilter = Depends(user_filters),
+    admin_user: AdminEntity = Depends(is_admin),
+    exporter: UserExporter = Depends(get_user_exporter)
+):
+    """Выгрузка всех пользователей по фильтрам для аудита; строки пишутся по мере чтения из БД"""
+    media_type = "text/csv" if format == ImportFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        exporter.stream(format, filters),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="users.{format.value}"'}
+    )
+
+
+@router.post("/orders/expire")
+async def expire_overdue_orders(
+    batch_size: int = Query(500, ge=1, le=5000),
+    admin_user: AdminEntity = Depends(is_admin),
+    order_use_case: OrderUseCase = Depends(get_orders_use_case)
+):
+    try:
+        processed = await order_use_case.expire_overdue_orders(batch_size=batch_size)
+        return {"processed": processed}
+    except Exception as e:
+        logger.error(f"Error expiring overdue orders: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
 @router.post("/user-actions")
 async def user_actions(
     request: AdminActionsSchema,
@@ -75,10 +140,14 @@ async def user_actions(
             result = await admin_use_case.delete_user(request.user_id)
             if not result:
                 raise HTTPException(status_code=404, detail="User not found or action failed")
+        elif request.action in ("verify", "unverify"):
+            result = await admin_use_case.set_specialist_verified(request.user_id, request.action == "verify")
+            if not result:
+                raise HTTPException(status_code=404, detail="Specialist not found")
         else:
             raise HTTPException(status_code=400, detail="Invalid action specified")
 
-        return {"message": f"User {request.user_id} successfully {request.action}ed."}
+        return {"message": f"User {request.user_id} successfully {USER_ACTION_RESULTS[request.action]}."}
 
     except HTTPException as http_exc:
         raise http_exc
@@ -1,11 +1,62 @@
-from fastapi import APIRouter, status, Depends, HTTPException, Header
-from src.dependencies import get_specialist_repository, get_user_repository
-from src.domain.entity.users.specialist.specialist import Specialist
+from fastapi import APIRouter, status, Depends, HTTPException, Header, Query, Response
+from typing import List, Optional
+from src.dependencies import get_specialist_repository, get_user_repository, get_review_repository
+from src.domain.entity.users.specialist.specialist import Specialist, SpecialistDirectoryCard
+from src.domain.entity.pagination import PageRequest, MAX_PAGE_SIZE
+from src.exceptions import InvalidCursorError
+from src.presentation.routes.api.pagination import set_next_cursor
+from src.domain.entity.clinics.reviews import ReviewStats, ReviewTargetType
+from src.infrastructure.repository.clinics.postgres_reviews_repo import PostgresReviewRepo
 from src.infrastructure.repository.user.postgres_specialist_repo import PostgresSpecialistRepo
 from src.infrastructure.repository.user.postgres_user_repo import PostgresUserRepo
 
 router = APIRouter(prefix='/api/specialists', tags=['Specialists'])
 
+MAX_DIRECTORY_SPECIFICATIONS = 10
+
+
+class SpecialistCard(Specialist):
+    rating: Optional[ReviewStats] = None
+
+
+class SpecialistDirectoryItem(SpecialistDirectoryCard):
+    rating: Optional[ReviewStats] = None
+
+
+@router.get('/', response_model=List[SpecialistDirectoryItem])
+async def search_specialists(
+    response: Response,
+    specification: Optional[List[str]] = Query(None, description="Все перечисленные спецификации"),
+    min_experience: Optional[int] = Query(None, ge=0),
+    is_verified: Optional[bool] = Query(None, description="Проверенные администратором (действие verify)"),
+    country: Optional[str] = Query(None, min_length=2),
+    cursor: Optional[str] = Query(None),
+    page_size: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    specialist_repo: PostgresSpecialistRepo = Depends(get_specialist_repository),
+    review_repo: PostgresReviewRepo = Depends(get_review_repository)
+):
+    if specification and len(specification) > MAX_DIRECTORY_SPECIFICATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_DIRECTORY_SPECIFICATIONS} specifications")
+    try:
+        page = await specialist_repo.search_directory(
+            specifications=specification,
+            min_experience=min_experience,
+            is_verified=is_verified,
+            country=country,
+            page=PageRequest(limit=page_size, cursor=cursor)
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Рейтинги всей страницы одним запросом к review_stats
+    ratings = await review_repo.get_review_stats_batch(
+        (ReviewTargetType.SPECIALIST, card.id) for card in page.items
+    )
+    return [
+        SpecialistDirectoryItem(**card.model_dump(), rating=ratings.get((ReviewTargetType.SPECIALIST, card.id)))
+        for card in set_next_cursor(response, page)
+    ]
+
+
 @router.get('/me', response_model=Specialist)
 async def get_my_spec(
     org_repo: PostgresSpecialistRepo = Depends(get_specialist_repository),
@@ -31,12 +82,14 @@ async def get_my_spec(
         raise HTTPException(status_code=404, detail="Specialist not found")
     return specialist
 
-@router.get('/{specialist_id}', response_model=Specialist)
+@router.get('/{specialist_id}', response_model=SpecialistCard)
 async def get_specialist_by_id(
     specialist_id: int,
-    specialist_repo: PostgresSpecialistRepo = Depends(get_specialist_repository)
+    specialist_repo: PostgresSpecialistRepo = Depends(get_specialist_repository),
+    review_repo: PostgresReviewRepo = Depends(get_review_repository)
 ):
     specialist = await specialist_repo.get_specialist_profile(specialist_id)
     if not specialist:
         raise HTTPException(status_code=404, detail="Specialist not found")
-    return specialist
\ No newline at end of file
+    rating = await review_repo.get_review_stats(ReviewTargetType.SPECIALIST, specialist_id)
+    return SpecialistCard(**specialist.model_dump(), rating=rating)
\ No newline at end of file
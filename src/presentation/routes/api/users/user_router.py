@@ -1,12 +1,91 @@
-from fastapi import APIRouter, status, Depends, HTTPException
+from fastapi import APIRouter, status, Depends, HTTPException, Query, Request
 from src.domain.interfaces.user.user_repositiry import IUserRepository
-from src.dependencies import get_user_repository
-from src.domain.entity.users.user import User
+from src.dependencies import get_user_repository, get_current_user, get_user_provisioner
+from src.domain.entity.users.user import Role, User, UserProfileCard
+from src.domain.entity.users.provisioning import ProvisioningJob
+from src.domain.entity.imports import ImportFormat
+from src.infrastructure.services.imports import iter_lines
+from src.infrastructure.services.users.provisioning import (
+    UserProvisioner, provisioning_jobs, USER_PROVISIONING_BATCH_SIZE, MAX_USER_PROVISIONING_BATCH_SIZE
+)
+from typing import List
 import logging
 
 router = APIRouter(prefix='/api/user')
 logger = logging.getLogger(__name__)
 
+MAX_BATCH_USER_IDS = 200
+
+
+@router.get('/batch', response_model=List[UserProfileCard])
+async def get_users_batch(
+    ids: str = Query(..., description=f"ID пользователей через запятую, не больше {MAX_BATCH_USER_IDS}"),
+    user_repo: IUserRepository = Depends(get_user_repository)
+):
+    """Публичные карточки пользователей для списков; порядок - как в запросе, несуществующие id пропускаются"""
+    try:
+        user_ids = list(dict.fromkeys(int(part) for part in ids.split(',') if part.strip()))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids must be comma-separated integers")
+    if not user_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids must not be empty")
+    if len(user_ids) > MAX_BATCH_USER_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_USER_IDS} ids per request"
+        )
+
+    try:
+        cards = await user_repo.get_profile_cards_by_ids(user_ids)
+    except Exception as e:
+        logger.error(f"Error getting users batch: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+    return [cards[user_id] for user_id in user_ids if user_id in cards]
+
+
+@router.post('/provision', response_model=ProvisioningJob, status_code=status.HTTP_202_ACCEPTED)
+async def provision_users(
+    request: Request,
+    format: ImportFormat = Query(..., description="csv (с заголовком) или ndjson"),
+    batch_size: int = Query(USER_PROVISIONING_BATCH_SIZE, ge=1, le=MAX_USER_PROVISIONING_BATCH_SIZE),
+    current_user: User = Depends(get_current_user),
+    provisioner: UserProvisioner = Depends(get_user_provisioner)
+):
+    """Массовое создание пользователей из тела запроса; результат - задача для опроса по id"""
+    if current_user.role not in ["organization", "admin"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only organizations and admins can provision users"
+        )
+
+    # Организация заводит своих специалистов (становятся ее сотрудниками) и пациентов
+    if current_user.role == "organization":
+        allowed_roles, organization_id = (Role.SPECIALIST, Role.PATIENT), current_user.id
+    else:
+        allowed_roles, organization_id = (Role.SPECIALIST, Role.PATIENT, Role.ORGANIZATION), None
+    try:
+        return await provisioner.start(
+            iter_lines(request.stream()), format, owner_id=current_user.id, allowed_roles=allowed_roles,
+            organization_id=organization_id, batch_size=batch_size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get('/provision/{job_id}', response_model=ProvisioningJob)
+async def get_provisioning_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    job = provisioning_jobs.get(job_id)
+    if job is None or (job.owner_id != current_user.id and current_user.role != "admin"):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Provisioning job not found")
+    return job
+
+
 @router.get('/{user_id}', response_model=User)
 async def get_user(
     user_id: int,
@@ -82,4 +82,100 @@ async def test_admin_actions(client: AsyncClient, admin_data: dict, patient_data
 
     logger.info("Successfully retrieved and validated statistics.")
 
-    logger.info("--- Test test_admin_actions finished successfully ---")
\ No newline at end of file
+    logger.info("--- Test test_admin_actions finished successfully ---")
+
+@pytest.mark.asyncio
+async def test_admin_user_listing_and_export(client: AsyncClient, patient_data: dict, first_admin: dict):
+    import csv
+    import io
+    import json
+    import uuid
+
+    headers = {"Authorization": f"Bearer {first_admin['token']}"}
+    prefix = f"adm{uuid.uuid4().hex[:6]}"
+    user_ids = []
+    for index in range(3):
+        response = await client.post("/api/auth/reg", json={
+            **patient_data,
+            "nickname": f"{prefix}_{index}",
+            "email": f"{prefix}_{index}@test.com"
+        })
+        assert response.status_code == 201, response.text
+        user_ids.append(response.json()["id"])
+    response = await client.post("/api/admin/user-actions", json={
+        "user_id": user_ids[1], "action": "block", "reason": "Audit"
+    }, headers=headers)
+    assert response.status_code == 200, response.text
+
+    # Keyset-страницы по фильтру префикса никнейма
+    seen, cursor = [], None
+    while True:
+        params = {"nickname_prefix": prefix, "page_size": 2, "role": "patient"}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get("/api/admin/users", params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        seen.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert [user["id"] for user in seen] == user_ids
+    assert [user["is_blocked"] for user in seen] == [False, True, False]
+    assert seen[1]["blocked_reason"] == "Audit"
+
+    response = await client.get(
+        "/api/admin/users", params={"nickname_prefix": prefix, "blocked": "false"}, headers=headers
+    )
+    assert [user["id"] for user in response.json()] == [user_ids[0], user_ids[2]]
+    response = await client.get("/api/admin/users", params={"nickname_prefix": prefix, "role": "admin"}, headers=headers)
+    assert response.json() == []
+
+    response = await client.get(
+        "/api/admin/users/export", params={"format": "csv", "nickname_prefix": prefix}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [int(row["id"]) for row in rows] == user_ids
+    assert rows[1]["is_blocked"] == "True"
+    assert rows[0]["email"] == f"{prefix}_0@test.com"
+
+    response = await client.get(
+        "/api/admin/users/export", params={"format": "ndjson", "nickname_prefix": prefix, "blocked": "true"},
+        headers=headers
+    )
+    assert response.status_code == 200, response.text
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["id"] for line in lines] == [user_ids[1]]
+
+    patient_login = await client.post("/api/auth/login", json={
+        "nickname": f"{prefix}_0", "password": patient_data["password"]
+    })
+    patient_headers = {"Authorization": f"Bearer {patient_login.json()['access_token']}"}
+    assert (await client.get("/api/admin/users/export", headers=patient_headers)).status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_admin_delete_user_updates_process_indexes(client: AsyncClient, specialist_data: dict, first_admin: dict):
+    from src.infrastructure.services.matching.specification_index import specification_index
+    from src.infrastructure.services.users.identity_filter import user_identity_filter
+
+    headers = {"Authorization": f"Bearer {first_admin['token']}"}
+    response = await client.post("/api/auth/reg", json=specialist_data)
+    assert response.status_code == 201, response.text
+    specialist_id = response.json()["id"]
+    assert specification_index.get_specialist_specifications(specialist_id) == {"cardiology", "surgery"}
+    assert user_identity_filter.might_contain_nickname(specialist_data["nickname"])
+    # Карточка попадает в кэш процесса
+    response = await client.get("/api/user/batch", params={"ids": str(specialist_id)})
+    assert [card["id"] for card in response.json()] == [specialist_id]
+
+    response = await client.post("/api/admin/user-actions", json={
+        "user_id": specialist_id, "action": "delete"
+    }, headers=headers)
+    assert response.status_code == 200, response.text
+    assert specification_index.get_specialist_specifications(specialist_id) == frozenset()
+    assert not user_identity_filter.might_contain_nickname(specialist_data["nickname"])
+    assert not user_identity_filter.might_contain_email(specialist_data["email"])
+    response = await client.get("/api/user/batch", params={"ids": str(specialist_id)})
+    assert response.json() == []
@@ -0,0 +1,122 @@
+import pytest
+from httpx import AsyncClient
+from datetime import date, datetime, timedelta
+import uuid
+
+
+async def _login(client: AsyncClient, data: dict) -> dict:
+    registration = await client.post("/api/auth/reg", json=data)
+    assert registration.status_code == 201, f"Registration failed: {registration.text}"
+    login = await client.post("/api/auth/login", json={
+        "nickname": data["nickname"],
+        "password": data["password"]
+    })
+    return {"id": registration.json()["id"], "headers": {"Authorization": f"Bearer {login.json()['access_token']}"}}
+
+
+@pytest.mark.asyncio
+async def test_book_and_cancel_appointment(
+        client: AsyncClient, db_session, organization_data: dict, patient_data: dict, specialist_data: dict
+):
+    from src.infrastructure.services.appointments.availability import availability_index
+
+    organization = await _login(client, organization_data)
+    patient = await _login(client, patient_data)
+
+    location = f"Slot City {uuid.uuid4().hex[:8]}"
+    hours = {"open": "09:00", "close": "11:00"}
+    response = await client.post("/api/clinics/", json={
+        "organization_id": organization["id"],
+        "name": "Slot Clinic",
+        "location": location,
+        "address": "1 Slot Street",
+        "work_hours": {day: hours for day in ("mon", "tue", "wed", "thu", "fri", "sat", "sun")},
+        "is_24_7": False
+    }, headers=organization["headers"])
+    assert response.status_code == 201, response.text
+    clinic_id = response.json()["id"]
+
+    day = date.today() + timedelta(days=7)
+    after = datetime.combine(day, datetime.min.time()).isoformat()
+    slots_params = {"clinic_id": clinic_id, "after": after, "days": 1}
+    slots = await client.get("/api/appointments/slots", params=slots_params)
+    assert slots.status_code == 200, slots.text
+    assert [slot["starts_at"][11:16] for slot in slots.json()] == ["09:00", "09:30", "10:00", "10:30"]
+    unknown = await client.get("/api/appointments/slots", params={**slots_params, "clinic_id": 10 ** 9})
+    assert unknown.status_code == 404, unknown.text
+
+    starts_at = f"{day.isoformat()}T09:00:00"
+    booking = await client.post("/api/appointments/", json={"clinic_id": clinic_id, "starts_at": starts_at},
+                                headers=patient["headers"])
+    assert booking.status_code == 201, booking.text
+    appointment = booking.json()
+    assert appointment["status"] == "booked"
+
+    # Повторная запись на занятый слот; даже с устаревшим индексом слотов ее отсекает уникальный индекс БД
+    duplicate = await client.post("/api/appointments/", json={"clinic_id": clinic_id, "starts_at": starts_at},
+                                  headers=patient["headers"])
+    assert duplicate.status_code == 409
+    availability_index.release(clinic_id, None, datetime.fromisoformat(starts_at))
+    raced = await client.post("/api/appointments/", json={"clinic_id": clinic_id, "starts_at": starts_at},
+                              headers=patient["headers"])
+    assert raced.status_code == 409
+
+    misaligned = await client.post("/api/appointments/", json={
+        "clinic_id": clinic_id, "starts_at": f"{day.isoformat()}T09:15:00"
+    }, headers=patient["headers"])
+    assert misaligned.status_code == 400
+    closed = await client.post("/api/appointments/", json={
+        "clinic_id": clinic_id, "starts_at": f"{day.isoformat()}T12:00:00"
+    }, headers=patient["headers"])
+    assert closed.status_code == 409
+    not_patient = await client.post("/api/appointments/", json={
+        "clinic_id": clinic_id, "starts_at": f"{day.isoformat()}T09:30:00"
+    }, headers=organization["headers"])
+    assert not_patient.status_code == 403
+
+    slots = await client.get("/api/appointments/slots", params=slots_params)
+    assert [slot["starts_at"][11:16] for slot in slots.json()] == ["09:30", "10:00", "10:30"]
+    upcoming = await client.get("/api/appointments/next", params={"location": location, "after": after, "limit": 2})
+    assert [(slot["clinic_id"], slot["starts_at"][11:16]) for slot in upcoming.json()] == [
+        (clinic_id, "09:30"), (clinic_id, "10:00")
+    ]
+
+    my = await client.get("/api/appointments/my", headers=patient["headers"])
+    assert [item["id"] for item in my.json()] == [appointment["id"]]
+
+    cancelled = await client.post(f"/api/appointments/{appointment['id']}/cancel", headers=organization["headers"])
+    assert cancelled.status_code == 200, cancelled.text
+    assert cancelled.json()["status"] == "cancelled"
+    slots = await client.get("/api/appointments/slots", params=slots_params)
+    assert len(slots.json()) == 4
+    rebooked = await client.post("/api/appointments/", json={"clinic_id": clinic_id, "starts_at": starts_at},
+                                 headers=patient["headers"])
+    assert rebooked.status_code == 201, rebooked.text
+
+    # Время со смещением UTC не переводится в местное время клиники
+    aware = await client.post("/api/appointments/", json={
+        "clinic_id": clinic_id, "starts_at": f"{day.isoformat()}T09:30:00Z"
+    }, headers=patient["headers"])
+    assert aware.status_code == 400, aware.text
+
+    # Специалист должен существовать и быть сотрудником организации клиники
+    unknown = await client.post("/api/appointments/", json={
+        "clinic_id": clinic_id, "specialist_id": 10 ** 9, "starts_at": f"{day.isoformat()}T10:00:00"
+    }, headers=patient["headers"])
+    assert unknown.status_code == 404, unknown.text
+    specialist = await _login(client, specialist_data)
+    stranger = await client.post("/api/appointments/", json={
+        "clinic_id": clinic_id, "specialist_id": specialist["id"], "starts_at": f"{day.isoformat()}T10:00:00"
+    }, headers=patient["headers"])
+    assert stranger.status_code == 400, stranger.text
+
+    from sqlalchemy import update
+    from src.infrastructure.repository.schemas.user_orm import OrganizationOrm
+    await db_session.execute(
+        update(OrganizationOrm).where(OrganizationOrm.user_id == organization["id"]).values(members=[specialist["id"]])
+    )
+    await db_session.commit()
+    staff = await client.post("/api/appointments/", json={
+        "clinic_id": clinic_id, "specialist_id": specialist["id"], "starts_at": f"{day.isoformat()}T10:00:00"
+    }, headers=patient["headers"])
+    assert staff.status_code == 201, staff.text
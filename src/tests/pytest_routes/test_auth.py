@@ -90,6 +90,22 @@ async def test_duplicate_nickname(client: AsyncClient, patient_data: dict):
     assert "Nickname already exists" in response2.text
 
 
+@pytest.mark.asyncio
+async def test_duplicate_email_rolls_back_profile(client: AsyncClient, db_session: AsyncSession, specialist_data: dict):
+    response = await client.post("/api/auth/reg", json=specialist_data)
+    assert response.status_code == 201, response.text
+    assert response.json()["specifications"] == ["Cardiology", "Surgery"]
+
+    # Дубликат email ловит уникальность при вставке; пользователь и профиль не остаются наполовину
+    duplicate_data = specialist_data.copy()
+    duplicate_data["nickname"] = specialist_data["nickname"] + "d"
+    response = await client.post("/api/auth/reg", json=duplicate_data)
+    assert response.status_code == 400
+    assert "Email already exists" in response.text
+    orphan = await db_session.execute(select(UserOrm).where(UserOrm.nickname == duplicate_data["nickname"]))
+    assert orphan.scalar_one_or_none() is None
+
+
 @pytest.mark.asyncio
 async def test_invalid_data(client: AsyncClient):
     response = await client.post("/api/auth/reg", json={
@@ -177,3 +193,39 @@ async def test_login(client: AsyncClient):
 
 
 
+
+
+@pytest.mark.asyncio
+async def test_check_availability(client: AsyncClient, patient_data: dict):
+    response = await client.get("/api/auth/availability", params={
+        "nickname": patient_data["nickname"], "email": patient_data["email"]
+    })
+    assert response.status_code == 200, response.text
+    assert response.json() == {"nickname": True, "email": True}
+
+    response = await client.post("/api/auth/reg", json=patient_data)
+    assert response.status_code == 201, f"Registration failed: {response.text}"
+
+    # Регистрация сразу попадает в фильтр, занятость подтверждается запросом к БД
+    response = await client.get("/api/auth/availability", params={
+        "nickname": patient_data["nickname"], "email": patient_data["email"].upper()
+    })
+    assert response.json() == {"nickname": False, "email": True}
+    response = await client.get("/api/auth/availability", params={"email": patient_data["email"]})
+    assert response.json() == {"nickname": None, "email": False}
+
+    # Смена никнейма освобождает старый
+    login = await client.post("/api/auth/login", json={
+        "nickname": patient_data["nickname"],
+        "password": patient_data["password"]
+    })
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    new_nickname = patient_data["nickname"] + "x"
+    response = await client.put("/api/settings", json={"nickname": new_nickname}, headers=headers)
+    assert response.status_code == 200, response.text
+    response = await client.get("/api/auth/availability", params={"nickname": patient_data["nickname"]})
+    assert response.json()["nickname"] is True
+    response = await client.get("/api/auth/availability", params={"nickname": new_nickname})
+    assert response.json()["nickname"] is False
+
+    assert (await client.get("/api/auth/availability")).status_code == 400
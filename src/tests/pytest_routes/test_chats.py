@@ -40,6 +40,12 @@ async def test_chat_flow(client: AsyncClient, patient_data: dict, specialist_dat
     token_patient = login_patient.json()["access_token"]
     headers_patient = {"Authorization": f"Bearer {token_patient}"}
 
+    # Несуществующему получателю чат не создается
+    missing_resp = await client.post(
+        "/api/chat/send-text", json={"recipient_id": specialist["id"] + 1000, "text": "Hello?"}, headers=headers_patient
+    )
+    assert missing_resp.status_code == 404, missing_resp.text
+
     # Шаг 4: Отправка сообщения пациентом специалисту
     logger.info("Step 4: Patient sends a message to specialist...")
     message_data = {"recipient_id": specialist["id"], "text": "Hello, doctor!"}
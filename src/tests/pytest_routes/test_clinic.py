@@ -3,6 +3,10 @@ from httpx import AsyncClient
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 import logging
+import uuid
+import json
+import tempfile
+from pathlib import Path
 from src.infrastructure.repository.schemas.clinic_orm import ClinicOrm
 
 logger = logging.getLogger(__name__)
@@ -154,4 +158,309 @@ async def test_delete_clinic(client: AsyncClient, db_session: AsyncSession, orga
     # Проверяем, что клиника удалена
     result = await db_session.execute(select(ClinicOrm).where(ClinicOrm.id == clinic['id']))
     clinic_db = result.scalars().first()
-    assert clinic_db is None
\ No newline at end of file
+    assert clinic_db is None
+
+@pytest.mark.asyncio
+async def test_search_clinics_by_location(client: AsyncClient, organization_data: dict):
+    org_reg = await client.post("/api/auth/reg", json=organization_data)
+    assert org_reg.status_code == 201, f"Organization registration failed: {org_reg.text}"
+    org_data = org_reg.json()
+
+    login = await client.post("/api/auth/login", json={
+        "nickname": organization_data["nickname"],
+        "password": organization_data["password"]
+    })
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    suffix = uuid.uuid4().hex[:8]
+    created = {}
+    for location in (f"Old Zelenograd {suffix}", f"Zelenograd {suffix}"):
+        response = await client.post("/api/clinics/", json={
+            "organization_id": org_data["id"],
+            "name": "Search Clinic",
+            "location": location,
+            "address": "1 Search St",
+            "work_hours": {},
+            "is_24_7": False
+        }, headers=headers)
+        assert response.status_code == 201, response.text
+        created[location] = response.json()["id"]
+
+    # Точное совпадение выше совпадения с начала слова, страницы связаны курсором
+    first = await client.get("/api/clinics/by-location/", params={"location": f"ZELENOGRAD {suffix}", "page_size": 1})
+    assert [clinic["id"] for clinic in first.json()] == [created[f"Zelenograd {suffix}"]]
+    second = await client.get("/api/clinics/by-location/", params={
+        "location": f"ZELENOGRAD {suffix}", "page_size": 1, "cursor": first.headers["X-Next-Cursor"]
+    })
+    assert [clinic["id"] for clinic in second.json()] == [created[f"Old Zelenograd {suffix}"]]
+
+    # Опечатка в названии города
+    typo = await client.get("/api/clinics/by-location/", params={"location": f"Zelenogard {suffix}"})
+    assert created[f"Zelenograd {suffix}"] in [clinic["id"] for clinic in typo.json()]
+
+    missing = await client.get("/api/clinics/by-location/", params={"location": f"Nowhere {suffix}"})
+    assert missing.status_code == 200
+    assert missing.json() == []
+
+
+@pytest.mark.asyncio
+async def test_backfill_location_normalized(client: AsyncClient, db_session: AsyncSession, organization_data: dict):
+    from sqlalchemy import update
+    from src.commands.backfill_location_normalized import backfill_location_normalized, ensure_column
+    from src.infrastructure.services.clinics.catalog import clinic_catalog
+
+    org_reg = await client.post("/api/auth/reg", json=organization_data)
+    assert org_reg.status_code == 201, org_reg.text
+    clinic = ClinicOrm(organization_id=org_reg.json()["id"], name="Legacy Clinic", location="Ёлкино, центр", address="1 Old St", work_hours={}, is_24_7=False)
+    db_session.add(clinic)
+    await db_session.commit()
+    # Строка из базы, созданной до появления колонки
+    await db_session.execute(update(ClinicOrm).where(ClinicOrm.id == clinic.id).values(location_normalized=None))
+    await db_session.commit()
+
+    assert await ensure_column(db_session) is False
+    version = await clinic_catalog.read_version(db_session)
+    assert await backfill_location_normalized(db_session, batch_size=1) >= 1
+    assert await clinic_catalog.read_version(db_session) > version
+    normalized = (await db_session.execute(
+        select(ClinicOrm.location_normalized).where(ClinicOrm.id == clinic.id)
+    )).scalar_one()
+    assert normalized == "елкино центр"
+    # Повторный запуск ничего не трогает
+    assert await backfill_location_normalized(db_session) == 0
+
+
+@pytest.mark.asyncio
+async def test_nearest_clinics(client: AsyncClient, db_session: AsyncSession, organization_data: dict):
+    from src.commands.geocode_clinics import backfill_coordinates, load_fixture
+    from src.infrastructure.services.clinics.catalog import clinic_catalog
+
+    org_reg = await client.post("/api/auth/reg", json=organization_data)
+    assert org_reg.status_code == 201, f"Organization registration failed: {org_reg.text}"
+    org_data = org_reg.json()
+
+    login = await client.post("/api/auth/login", json={
+        "nickname": organization_data["nickname"],
+        "password": organization_data["password"]
+    })
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    # Точка поиска где-то в океане, чтобы не пересекаться с клиниками других тестов
+    center_lat, center_lon = -40.0 - int(uuid.uuid4().hex[:2], 16) / 100, -120.0
+    created = {}
+    weekday_hours = {"monday": {"open": "09:00", "close": "18:00", "break_start": "13:00", "break_end": "14:00"}}
+    for name, offset, is_24_7 in (("near", 0.01, False), ("middle", 0.03, True), ("far", 0.05, False), ("out", 2.0, False)):
+        response = await client.post("/api/clinics/", json={
+            "organization_id": org_data["id"],
+            "name": f"Geo Clinic {name}",
+            "location": "Geo City",
+            "address": "1 Geo St",
+            "work_hours": weekday_hours if name == "far" else {},
+            "is_24_7": is_24_7,
+            "latitude": center_lat + offset,
+            "longitude": center_lon
+        }, headers=headers)
+        assert response.status_code == 201, response.text
+        created[name] = response.json()["id"]
+
+    params = {"latitude": center_lat, "longitude": center_lon, "radius_km": 10, "page_size": 2}
+    first = await client.get("/api/clinics/nearby", params=params)
+    assert first.status_code == 200, first.text
+    assert [clinic["id"] for clinic in first.json()] == [created["near"], created["middle"]]
+    assert first.json()[0]["distance_km"] < first.json()[1]["distance_km"]
+
+    second = await client.get("/api/clinics/nearby", params={**params, "cursor": first.headers["X-Next-Cursor"]})
+    assert [clinic["id"] for clinic in second.json()] == [created["far"]]
+    assert "X-Next-Cursor" not in second.headers
+
+    round_the_clock = await client.get("/api/clinics/nearby", params={**params, "is_24_7": True})
+    assert [clinic["id"] for clinic in round_the_clock.json()] == [created["middle"]]
+
+    # Без часов работы открыта только круглосуточная; график "far" - пн 9-18 с перерывом 13-14
+    monday_morning = await client.get("/api/clinics/nearby", params={**params, "open_at": "2026-10-19T10:15:00"})
+    assert [clinic["id"] for clinic in monday_morning.json()] == [created["middle"], created["far"]]
+    monday_break = await client.get("/api/clinics/nearby", params={**params, "open_at": "2026-10-19T13:30:00"})
+    assert [clinic["id"] for clinic in monday_break.json()] == [created["middle"]]
+    tuesday = await client.get("/api/clinics/nearby", params={**params, "open_at": "2026-10-20T10:15:00"})
+    assert [clinic["id"] for clinic in tuesday.json()] == [created["middle"]]
+
+    # Смена графика пересобирает битовую карту
+    update = await client.put(f"/api/clinics/{created['near']}", json={"is_24_7": True}, headers=headers)
+    assert update.status_code == 200, update.text
+    monday_break = await client.get("/api/clinics/nearby", params={**params, "open_at": "2026-10-19T13:30:00"})
+    assert [clinic["id"] for clinic in monday_break.json()] == [created["near"], created["middle"]]
+
+    # Тот же фильтр в поиске по городу (снимок каталога)
+    by_location = await client.get("/api/clinics/by-location/", params={
+        "location": "Geo City", "open_at": "2026-10-19T13:30:00"
+    })
+    assert by_location.status_code == 200, by_location.text
+    assert [clinic["id"] for clinic in by_location.json() if clinic["id"] in created.values()] == [
+        created["near"], created["middle"]
+    ]
+    # Время с UTC-смещением однозначно не переводится в местное время клиник
+    aware = await client.get("/api/clinics/by-location/", params={
+        "location": "Geo City", "open_at": "2026-10-19T13:30:00+03:00"
+    })
+    assert aware.status_code == 400, aware.text
+    aware = await client.get("/api/clinics/nearby", params={**params, "open_at": "2026-10-19T13:30:00+03:00"})
+    assert aware.status_code == 400, aware.text
+    assert (await client.get("/api/clinics/nearby", params={**params, "open_now": True})).status_code == 200
+
+    # Заполнение координат по локальному справочнику
+    suffix = uuid.uuid4().hex[:8]
+    clinic = ClinicOrm(
+        organization_id=org_data["id"],
+        name="Geocoded Clinic",
+        location=f"Geo Town {suffix}",
+        address="7 Fixture Ave.",
+        work_hours={},
+        is_24_7=False
+    )
+    db_session.add(clinic)
+    await db_session.commit()
+
+    fixture_path = Path(tempfile.mkdtemp()) / "geocoding.json"
+    fixture_path.write_text(json.dumps({f"geo town {suffix}, 7 fixture ave": [55.75, 37.61]}))
+    version = await clinic_catalog.read_version(db_session)
+    updated, _ = await backfill_coordinates(db_session, load_fixture(fixture_path), batch_size=2)
+    assert updated >= 1
+    # Бэкфилл увеличивает версию каталога - воркеры перечитают снимок и геоиндекс
+    assert await clinic_catalog.read_version(db_session) > version
+
+    await db_session.refresh(clinic)
+    assert (clinic.latitude, clinic.longitude) == (55.75, 37.61)
+
+
+@pytest.mark.asyncio
+async def test_clinic_catalog_snapshot(client: AsyncClient, db_session: AsyncSession, organization_data: dict):
+    from src.infrastructure.repository.schemas.clinic_orm import CatalogVersionOrm
+    from src.infrastructure.services.clinics.catalog import clinic_catalog
+
+    org_reg = await client.post("/api/auth/reg", json=organization_data)
+    assert org_reg.status_code == 201, f"Organization registration failed: {org_reg.text}"
+    org_data = org_reg.json()
+
+    login = await client.post("/api/auth/login", json={
+        "nickname": organization_data["nickname"],
+        "password": organization_data["password"]
+    })
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    suffix = uuid.uuid4().hex[:8]
+    location = f"Catalog City {suffix}"
+    ids = []
+    for i in range(3):
+        response = await client.post("/api/clinics/", json={
+            "organization_id": org_data["id"],
+            "name": f"Catalog Clinic {i}",
+            "location": location,
+            "address": f"{i} Catalog St",
+            "work_hours": {},
+            "is_24_7": False
+        }, headers=headers)
+        assert response.status_code == 201, response.text
+        ids.append(response.json()["id"])
+
+    # Каждая запись увеличивает версию каталога в БД, снимок процесса идет с ней вровень
+    version = (await db_session.execute(
+        select(CatalogVersionOrm.version).where(CatalogVersionOrm.name == "clinics")
+    )).scalar_one()
+    assert clinic_catalog.version == version
+
+    first = await client.get(f"/api/clinics/by-organization/{org_data['id']}", params={"page_size": 2})
+    assert [clinic["id"] for clinic in first.json()] == ids[:2]
+    second = await client.get(f"/api/clinics/by-organization/{org_data['id']}", params={
+        "page_size": 2, "cursor": first.headers["X-Next-Cursor"]
+    })
+    assert [clinic["id"] for clinic in second.json()] == ids[2:]
+    assert "X-Next-Cursor" not in second.headers
+
+    # Неактивная клиника пропадает из поиска по городу, но доступна по id и в списке организации
+    response = await client.put(f"/api/clinics/{ids[0]}", json={"is_active": False}, headers=headers)
+    assert response.status_code == 200, response.text
+    by_location = await client.get("/api/clinics/by-location/", params={"location": location})
+    assert [clinic["id"] for clinic in by_location.json()] == ids[1:]
+    assert (await client.get(f"/api/clinics/{ids[0]}")).json()["is_active"] is False
+
+    # Запись в обход репозитория (другой воркер) видна после сверки версии
+    clinic_orm = await db_session.get(ClinicOrm, ids[1])
+    clinic_orm.name = "Renamed Elsewhere"
+    version_orm = await db_session.get(CatalogVersionOrm, "clinics")
+    version_orm.version += 1
+    await db_session.commit()
+    assert (await client.get(f"/api/clinics/{ids[1]}")).json()["name"] == "Catalog Clinic 1"
+    # Своя запись видит пропуск версии: до сверки поиск по городу идет в БД
+    response = await client.put(f"/api/clinics/{ids[2]}", json={"name": "Catalog Clinic 2b"}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert clinic_catalog.is_current is False
+    by_location = await client.get("/api/clinics/by-location/", params={"location": location})
+    assert [clinic["name"] for clinic in by_location.json()] == ["Renamed Elsewhere", "Catalog Clinic 2b"]
+    # Фильтр по графику в БД: ночью открыта только круглосуточная
+    response = await client.put(f"/api/clinics/{ids[2]}", json={"is_24_7": True}, headers=headers)
+    assert response.status_code == 200, response.text
+    open_params = {"location": location, "open_at": "2026-10-19T03:00:00"}
+    by_location = await client.get("/api/clinics/by-location/", params=open_params)
+    assert [clinic["id"] for clinic in by_location.json()] == [ids[2]]
+    assert await clinic_catalog.refresh(db_session) is True
+    by_location = await client.get("/api/clinics/by-location/", params=open_params)
+    assert [clinic["id"] for clinic in by_location.json()] == [ids[2]]
+    assert clinic_catalog.is_current is True
+    assert (await client.get(f"/api/clinics/{ids[1]}")).json()["name"] == "Renamed Elsewhere"
+    assert await clinic_catalog.refresh(db_session) is False
+
+
+@pytest.mark.asyncio
+async def test_import_clinics(client: AsyncClient, organization_data: dict):
+    org_reg = await client.post("/api/auth/reg", json=organization_data)
+    assert org_reg.status_code == 201, f"Organization registration failed: {org_reg.text}"
+    org_data = org_reg.json()
+
+    login = await client.post("/api/auth/login", json={
+        "nickname": organization_data["nickname"],
+        "password": organization_data["password"]
+    })
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    suffix = uuid.uuid4().hex[:8]
+    location = f"Import City {suffix}"
+    csv_body = "\n".join([
+        "name,location,address,work_hours,is_24_7",
+        f'Branch One,{location},1 Import Street,"{{""mon"": {{""open"": ""09:00"", ""close"": ""18:00""}}}}",false',
+        f"Branch Two,{location},2 Import Street,,true",
+        f"Broken,{location},x,,false",
+        f"Branch Two,{location},2 Import Street,,false",
+    ])
+    response = await client.post(
+        "/api/clinics/import", params={"format": "csv"}, content=csv_body.encode(), headers=headers
+    )
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert (report["created"], report["updated"], report["failed"]) == (2, 0, 2)
+    assert report["errors"][0]["row"] == 3
+    # Повтор ключа в файле не сливается с первой строкой
+    assert report["errors"][1] == {"row": 4, "error": "Duplicate clinic in file"}
+
+    by_location = await client.get("/api/clinics/by-location/", params={"location": location})
+    clinics = {clinic["name"]: clinic for clinic in by_location.json()}
+    assert set(clinics) == {"Branch One", "Branch Two"}
+    assert clinics["Branch Two"]["is_24_7"] is True
+
+    # Повторный импорт обновляет по ключу (organization_id, name, address); чужая организация - ошибка строки
+    ndjson_body = "\n".join(json.dumps(row) for row in [
+        {"name": "Branch One", "location": location, "address": "1 Import Street", "is_active": False},
+        {"name": "Branch Three", "location": location, "address": "3 Import Street"},
+        {"organization_id": org_data["id"] + 1000, "name": "Foreign", "location": location, "address": "4 Import Street"},
+    ])
+    response = await client.post(
+        "/api/clinics/import", params={"format": "ndjson", "batch_size": 1}, content=ndjson_body.encode(),
+        headers=headers
+    )
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert (report["created"], report["updated"], report["failed"]) == (1, 1, 1)
+
+    updated = await client.get(f"/api/clinics/{clinics['Branch One']['id']}")
+    assert updated.json()["is_active"] is False
+    by_location = await client.get("/api/clinics/by-location/", params={"location": location})
+    assert sorted(clinic["name"] for clinic in by_location.json()) == ["Branch Three", "Branch Two"]
@@ -114,4 +114,382 @@ async def test_update_order_status(client: AsyncClient, organization_data: dict)
     get_response = await client.get(f"/api/orders/{order['id']}", headers=headers_org)
     logger.info(f"Get order response: {get_response.status_code}, {get_response.text}")
     updated_order = get_response.json()
-    assert updated_order["status"] == "cancelled"
\ No newline at end of file
+    assert updated_order["status"] == "cancelled"
+
+@pytest.mark.asyncio
+async def test_orders_feed(client: AsyncClient, organization_data: dict, specialist_data: dict):
+    # Организация создает заказы, специалист просматривает ленту
+    await client.post("/api/auth/reg", json=organization_data)
+    login_org = await client.post("/api/auth/login", json={
+        "nickname": organization_data["nickname"],
+        "password": organization_data["password"]
+    })
+    headers_org = {"Authorization": f"Bearer {login_org.json()['access_token']}"}
+
+    await client.post("/api/auth/reg", json=specialist_data)
+    login_spec = await client.post("/api/auth/login", json={
+        "nickname": specialist_data["nickname"],
+        "password": specialist_data["password"]
+    })
+    headers_spec = {"Authorization": f"Bearer {login_spec.json()['access_token']}"}
+
+    service_type = f"Feed{organization_data['nickname'][-6:]}"
+    created = []
+    for specs in (["Cardiology"], ["Orthodontics"], ["Cardiology", "Surgery"]):
+        resp = await client.post("/api/orders/", json={
+            "service_type": service_type,
+            "description": "Order for the marketplace feed",
+            "preferred_date": (datetime.now() + timedelta(days=5)).isoformat(),
+            "specifications": specs
+        }, headers=headers_org)
+        assert resp.status_code == 201, resp.text
+        created.append(resp.json())
+
+    # Первая страница и продолжение по курсору
+    first = await client.get(
+        "/api/orders/feed",
+        params={"service_type": service_type, "limit": 2},
+        headers=headers_spec
+    )
+    assert first.status_code == 200, first.text
+    assert [o["id"] for o in first.json()] == [created[2]["id"], created[1]["id"]]
+    assert first.headers["X-Next-Cursor"]
+
+    second = await client.get(
+        "/api/orders/feed",
+        params={"service_type": service_type, "limit": 2, "cursor": first.headers["X-Next-Cursor"]},
+        headers=headers_spec
+    )
+    assert [o["id"] for o in second.json()] == [created[0]["id"]]
+    assert "X-Next-Cursor" not in second.headers
+
+    # Фильтр по пересечению спецификаций
+    by_specs = await client.get(
+        "/api/orders/feed",
+        params={"service_type": service_type, "specifications": ["Surgery", "Orthodontics"]},
+        headers=headers_spec
+    )
+    assert {o["id"] for o in by_specs.json()} == {created[1]["id"], created[2]["id"]}
+
+    # После отклика заказ пропадает из ленты
+    await client.post("/api/responses/", json={
+        "order_id": created[0]["id"],
+        "text": "I can take this order right away"
+    }, headers=headers_spec)
+    after_response = await client.get(
+        "/api/orders/feed",
+        params={"service_type": service_type},
+        headers=headers_spec
+    )
+    assert created[0]["id"] not in {o["id"] for o in after_response.json()}
+
+    # Создатель не видит собственные заказы в ленте
+    own = await client.get("/api/orders/feed", params={"service_type": service_type}, headers=headers_org)
+    assert own.json() == []
+
+    # Админ не создает заказы - такой фильтр отклоняется валидацией
+    by_admin = await client.get("/api/orders/feed", params={"creator_role": "admin"}, headers=headers_spec)
+    assert by_admin.status_code == 422
+    by_org = await client.get(
+        "/api/orders/feed", params={"service_type": service_type, "creator_role": "organization"}, headers=headers_spec
+    )
+    assert {o["id"] for o in by_org.json()} == {created[1]["id"], created[2]["id"]}
+
+
+@pytest.mark.asyncio
+async def test_specification_matching(client: AsyncClient, organization_data: dict, specialist_data: dict):
+    await client.post("/api/auth/reg", json=organization_data)
+    login_org = await client.post("/api/auth/login", json={
+        "nickname": organization_data["nickname"],
+        "password": organization_data["password"]
+    })
+    headers_org = {"Authorization": f"Bearer {login_org.json()['access_token']}"}
+
+    suffix = organization_data["nickname"][-6:]
+    specialist_data["specifications"] = [f"Implants{suffix}", f"Surgery{suffix}"]
+    spec_reg = await client.post("/api/auth/reg", json=specialist_data)
+    specialist = spec_reg.json()
+    login_spec = await client.post("/api/auth/login", json={
+        "nickname": specialist_data["nickname"],
+        "password": specialist_data["password"]
+    })
+    headers_spec = {"Authorization": f"Bearer {login_spec.json()['access_token']}"}
+
+    orders = []
+    for specs in ([f"Implants{suffix}"], [f"Implants{suffix}", f"Crowns{suffix}"], [f"Crowns{suffix}"]):
+        resp = await client.post("/api/orders/", json={
+            "service_type": "Matching",
+            "description": "Order for the matching engine",
+            "preferred_date": (datetime.now() + timedelta(days=5)).isoformat(),
+            "specifications": specs
+        }, headers=headers_org)
+        orders.append(resp.json())
+
+    matching = await client.get("/api/orders/matching", headers=headers_spec)
+    assert matching.status_code == 200, matching.text
+    scores = {o["id"]: o["score"] for o in matching.json()}
+    assert scores == {orders[0]["id"]: 1.0, orders[1]["id"]: 0.5}
+
+    # Закрытый заказ пропадает из выдачи
+    await client.put(f"/api/orders/{orders[0]['id']}/status", json={"status": "cancelled"}, headers=headers_org)
+    matching = await client.get("/api/orders/matching", headers=headers_spec)
+    assert [o["id"] for o in matching.json()] == [orders[1]["id"]]
+
+    specialists = await client.get(f"/api/orders/{orders[1]['id']}/matching-specialists", headers=headers_org)
+    assert specialists.status_code == 200, specialists.text
+    assert {"specialist_id": specialist["id"], "score": 0.5} in specialists.json()
+
+
+@pytest.mark.asyncio
+async def test_order_event_stream(client: AsyncClient, organization_data: dict, specialist_data: dict):
+    from src.infrastructure.services.events.order_events import order_event_hub
+
+    await client.post("/api/auth/reg", json=organization_data)
+    login_org = await client.post("/api/auth/login", json={
+        "nickname": organization_data["nickname"],
+        "password": organization_data["password"]
+    })
+    headers_org = {"Authorization": f"Bearer {login_org.json()['access_token']}"}
+
+    suffix = organization_data["nickname"][-6:]
+    spec_reg = await client.post("/api/auth/reg", json=specialist_data)
+    specialist = spec_reg.json()
+    login_spec = await client.post("/api/auth/login", json={
+        "nickname": specialist_data["nickname"],
+        "password": specialist_data["password"]
+    })
+    headers_spec = {"Authorization": f"Bearer {login_spec.json()['access_token']}"}
+
+    subscription = order_event_hub.subscribe(specialist["id"], [f"Veneers{suffix}"])
+    try:
+        for specs in ([f"Veneers{suffix}"], [f"Bleaching{suffix}"]):
+            await client.post("/api/orders/", json={
+                "service_type": "Stream",
+                "description": "Order for the event stream",
+                "preferred_date": (datetime.now() + timedelta(days=5)).isoformat(),
+                "specifications": specs
+            }, headers=headers_org)
+
+        # Доходит только заказ с пересекающейся спецификацией
+        assert subscription.queue.qsize() == 1
+        created = subscription.queue.get_nowait()
+        assert created.event == "order_created"
+        assert created.to_sse().startswith("event: order_created\ndata: ")
+
+        await client.post("/api/responses/", json={
+            "order_id": created.order_id,
+            "text": "Ready to take the veneers order"
+        }, headers=headers_spec)
+        await client.put(f"/api/orders/{created.order_id}/status", json={"status": "cancelled"}, headers=headers_org)
+
+        changed = subscription.queue.get_nowait()
+        assert changed.event == "order_status_changed"
+        assert changed.order_id == created.order_id
+        assert changed.data["status"] == "cancelled"
+    finally:
+        order_event_hub.unsubscribe(subscription)
+
+    assert not order_event_hub.has_subscribers
+
+
+@pytest.mark.asyncio
+async def test_expire_overdue_orders(client: AsyncClient, organization_data: dict, first_admin: dict):
+    await client.post("/api/auth/reg", json=organization_data)
+    login_org = await client.post("/api/auth/login", json={
+        "nickname": organization_data["nickname"],
+        "password": organization_data["password"]
+    })
+    headers_org = {"Authorization": f"Bearer {login_org.json()['access_token']}"}
+
+    orders = []
+    for days in (-3, -1, 5):
+        resp = await client.post("/api/orders/", json={
+            "service_type": "Expiry",
+            "description": "Order for the expiry sweeper",
+            "preferred_date": (datetime.now() + timedelta(days=days)).isoformat()
+        }, headers=headers_org)
+        orders.append(resp.json())
+
+    forbidden = await client.post("/api/admin/orders/expire", headers=headers_org)
+    assert forbidden.status_code == 403
+
+    headers_admin = {"Authorization": f"Bearer {first_admin['token']}"}
+    # Маленькая пачка проверяет, что обработка идет порциями до конца
+    expire = await client.post("/api/admin/orders/expire", params={"batch_size": 1}, headers=headers_admin)
+    assert expire.status_code == 200, expire.text
+    assert expire.json()["processed"] >= 2
+
+    statuses = [
+        (await client.get(f"/api/orders/{order['id']}", headers=headers_org)).json()["status"]
+        for order in orders
+    ]
+    assert statuses == ["inactive", "inactive", "active"]
+
+    again = await client.post("/api/admin/orders/expire", headers=headers_admin)
+    assert again.json() == {"processed": 0}
+
+
+@pytest.mark.asyncio
+async def test_order_details(client: AsyncClient, organization_data: dict, specialist_data: dict):
+    await client.post("/api/auth/reg", json=organization_data)
+    login_org = await client.post("/api/auth/login", json={
+        "nickname": organization_data["nickname"],
+        "password": organization_data["password"]
+    })
+    headers_org = {"Authorization": f"Bearer {login_org.json()['access_token']}"}
+
+    spec_reg = await client.post("/api/auth/reg", json=specialist_data)
+    specialist = spec_reg.json()
+    login_spec = await client.post("/api/auth/login", json={
+        "nickname": specialist_data["nickname"],
+        "password": specialist_data["password"]
+    })
+    headers_spec = {"Authorization": f"Bearer {login_spec.json()['access_token']}"}
+
+    order = (await client.post("/api/orders/", json={
+        "service_type": "Details",
+        "description": "Order for the details view",
+        "preferred_date": (datetime.now() + timedelta(days=5)).isoformat()
+    }, headers=headers_org)).json()
+
+    await client.post("/api/responses/", json={
+        "order_id": order["id"],
+        "text": "I would like to take this order"
+    }, headers=headers_spec)
+
+    details = await client.get(f"/api/orders/{order['id']}/details", headers=headers_org)
+    assert details.status_code == 200, details.text
+    body = details.json()
+    assert body["order"]["id"] == order["id"]
+    assert len(body["responses"]) == 1
+    responser = body["responses"][0]["responser"]
+    assert responser["id"] == specialist["id"]
+    assert responser["nickname"] == specialist_data["nickname"]
+    assert responser["specifications"] == specialist_data["specifications"]
+
+    # Отклики отдаются страницами, курсор следующей - в заголовке
+    other_data = {**specialist_data, "nickname": f"{specialist_data['nickname'][:12]}_2", "email": f"2{specialist_data['email']}"}
+    other = (await client.post("/api/auth/reg", json=other_data)).json()
+    login_other = await client.post("/api/auth/login", json={
+        "nickname": other_data["nickname"],
+        "password": other_data["password"]
+    })
+    await client.post("/api/responses/", json={
+        "order_id": order["id"],
+        "text": "I can take this order too"
+    }, headers={"Authorization": f"Bearer {login_other.json()['access_token']}"})
+
+    first = await client.get(f"/api/orders/{order['id']}/details", params={"page_size": 1}, headers=headers_org)
+    assert first.status_code == 200, first.text
+    assert len(first.json()["responses"]) == 1
+    cursor = first.headers["X-Next-Cursor"]
+    second = await client.get(
+        f"/api/orders/{order['id']}/details", params={"page_size": 1, "cursor": cursor}, headers=headers_org
+    )
+    assert "X-Next-Cursor" not in second.headers
+    responders = {page.json()["responses"][0]["responser"]["id"] for page in (first, second)}
+    assert responders == {specialist["id"], other["id"]}
+    bad_cursor = await client.get(f"/api/orders/{order['id']}/details", params={"cursor": "junk"}, headers=headers_org)
+    assert bad_cursor.status_code == 400
+
+    filtered = await client.get(
+        f"/api/orders/{order['id']}/details",
+        params={"response_status": "taken"},
+        headers=headers_org
+    )
+    assert filtered.json()["responses"] == []
+
+    missing = await client.get("/api/orders/999999/details", headers=headers_org)
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_my_orders_cursor_pagination(client: AsyncClient, organization_data: dict):
+    await client.post("/api/auth/reg", json=organization_data)
+    login_org = await client.post("/api/auth/login", json={
+        "nickname": organization_data["nickname"],
+        "password": organization_data["password"]
+    })
+    headers_org = {"Authorization": f"Bearer {login_org.json()['access_token']}"}
+
+    created = []
+    for _ in range(3):
+        resp = await client.post("/api/orders/", json={
+            "service_type": "Paging",
+            "description": "Order for cursor pagination",
+            "preferred_date": (datetime.now() + timedelta(days=5)).isoformat()
+        }, headers=headers_org)
+        created.append(resp.json()["id"])
+
+    first = await client.get("/api/orders/", params={"page_size": 2}, headers=headers_org)
+    assert first.status_code == 200, first.text
+    assert [o["id"] for o in first.json()] == created[:0:-1]
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = await client.get("/api/orders/", params={"page_size": 2, "cursor": cursor}, headers=headers_org)
+    assert [o["id"] for o in second.json()] == [created[0]]
+    assert "X-Next-Cursor" not in second.headers
+
+    # Подделанный курсор отклоняется
+    body, signature = cursor.split(".")
+    tampered = await client.get(
+        "/api/orders/",
+        params={"cursor": f"{body}.{signature[::-1]}"},
+        headers=headers_org
+    )
+    assert tampered.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_entity_loaders_batch_and_memoize(client: AsyncClient, db_session, organization_data: dict):
+    import asyncio
+    from sqlalchemy import event
+    from src.infrastructure.repository.loaders import EntityLoaders
+
+    org_reg = await client.post("/api/auth/reg", json=organization_data)
+    assert org_reg.status_code == 201, f"Organization registration failed: {org_reg.text}"
+    login = await client.post("/api/auth/login", json={
+        "nickname": organization_data["nickname"],
+        "password": organization_data["password"]
+    })
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    order_ids = []
+    for i in range(3):
+        response = await client.post("/api/orders/", json={
+            "service_type": "Consultation",
+            "description": f"Loader order {i}",
+            "preferred_date": (datetime.now() + timedelta(days=3)).isoformat(),
+        }, headers=headers)
+        assert response.status_code == 201, response.text
+        order_ids.append(response.json()["id"])
+
+    statements = []
+
+    def count_orders_selects(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM orders" in statement:
+            statements.append(statement)
+
+    sync_engine = db_session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", count_orders_selects)
+    try:
+        loaders = EntityLoaders(db_session)
+        # load() из одного тика склеиваются в один IN-запрос, отсутствующий id - None
+        orders = await asyncio.gather(*(loaders.orders.load(order_id) for order_id in order_ids + [10 ** 9]))
+        assert [order.id for order in orders[:3]] == order_ids
+        assert orders[3] is None
+        assert len(statements) == 1
+
+        # Повтор в том же запросе берется из памяти, сброшенный ключ читается заново
+        assert (await loaders.orders.load(order_ids[0])) is orders[0]
+        assert len(statements) == 1
+        loaders.orders.clear(order_ids[0])
+        assert (await loaders.orders.load(order_ids[0])).id == order_ids[0]
+        assert len(statements) == 2
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", count_orders_selects)
+
+    # Чтение через API идет через загрузчики и отдает тот же заказ
+    response = await client.get(f"/api/orders/{order_ids[1]}", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["id"] == order_ids[1]
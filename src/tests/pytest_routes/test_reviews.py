@@ -295,6 +295,7 @@ async def test_respond_to_review(
 @pytest.mark.asyncio
 async def test_get_reviews_for_target(
         client: AsyncClient,
+        db_session,
         patient_data: dict,
         organization_data: dict
 ):
@@ -381,6 +382,53 @@ async def test_get_reviews_for_target(
     assert all(review["target_type"] == "clinic" for review in reviews)
     assert all(review["target_id"] == clinic["id"] for review in reviews)
 
+    # Пакетный запрос рейтингов сохраняет порядок и возвращает нули для целей без отзывов
+    batch = await client.post("/api/reviews/stats/batch", json={"targets": [
+        {"target_type": "specialist", "target_id": creator["id"]},
+        {"target_type": "clinic", "target_id": clinic["id"]}
+    ]})
+    assert batch.status_code == 200, batch.text
+    assert [(item["target_type"], item["count"]) for item in batch.json()] == [("specialist", 0), ("clinic", 1)]
+    assert batch.json()[1]["average"] == 8.0
+
+    listing = await client.get(f"/api/clinics/by-organization/{org['id']}")
+    assert listing.json()[0]["rating"]["count"] == 1
+
+    # Второй отзыв по тому же заказу - от специалиста
+    await client.post("/api/reviews/", json={**review_data, "text": "Long waiting times", "rate": 3}, headers=creator_headers)
+
+    # Повтор по тому же заказу и цели отсекает уникальный индекс
+    duplicate = await client.post("/api/reviews/", json=review_data, headers=headers)
+    assert duplicate.status_code == 400
+    assert duplicate.json()["detail"] == "Review already exists for this order and target"
+
+    # Команда для старых баз идемпотентна: на этой схеме ограничение уже есть, дубликатов нет
+    from src.commands.dedupe_reviews import dedupe_reviews
+    assert await dedupe_reviews(db_session) == (0, False)
+
+    url = f"/api/reviews/target/clinic/{clinic['id']}"
+    lowest = await client.get(url, params={"sort": "lowest", "page_size": 1}, headers=headers)
+    assert [review["rate"] for review in lowest.json()] == [3]
+    assert lowest.headers["X-Total-Count"] == "2"
+    assert lowest.headers["X-Average-Rating"] == "5.5"
+
+    cursor = lowest.headers["X-Next-Cursor"]
+    rest = await client.get(url, params={"sort": "lowest", "page_size": 1, "cursor": cursor}, headers=headers)
+    assert [review["rate"] for review in rest.json()] == [8]
+
+    # Курсор привязан к направлению сортировки
+    mismatched = await client.get(url, params={"sort": "highest", "cursor": cursor}, headers=headers)
+    assert mismatched.status_code == 400
+
+    highest = await client.get(url, params={"sort": "highest", "min_rating": 5}, headers=headers)
+    assert [review["rate"] for review in highest.json()] == [8]
+    assert highest.headers["X-Total-Count"] == "1"
+    assert highest.headers["X-Average-Rating"] == "8.0"
+
+    with_response = await client.get(url, params={"sort": "with_response_first"}, headers=headers)
+    assert with_response.status_code == 200
+    assert len(with_response.json()) == 2
+
 
 @pytest.mark.asyncio
 async def test_update_and_delete_review(
@@ -416,7 +464,7 @@ async def test_update_and_delete_review(
     clinic_data = {
         "organization_id": org["id"],
         "name": "Test Clinic",
-        "location": "Test City",
+        "location": f"Leaderboard City {uuid.uuid4().hex[:8]}",
         "address": "123 Test St"
     }
     clinic_resp = await client.post("/api/clinics/", json=clinic_data, headers=org_headers)
@@ -463,6 +511,22 @@ async def test_update_and_delete_review(
     review_resp = await client.post("/api/reviews/", json=review_data, headers=headers)
     review = review_resp.json()
 
+    stats = (await client.get(f"/api/reviews/stats/clinic/{clinic['id']}")).json()
+    assert stats["count"] == 1
+    assert stats["histogram"]["7"] == 1
+
+    leaderboard = (await client.get(
+        "/api/reviews/leaderboard/clinic", params={"scope": clinic_data["location"].upper()}
+    )).json()
+    assert leaderboard["total"] == 1
+    # Город нормализуется так же, как в поиске клиник по локации
+    leaderboard = (await client.get(
+        "/api/reviews/leaderboard/clinic", params={"scope": f"  {clinic_data['location'].replace(' ', ', ')}. "}
+    )).json()
+    assert leaderboard["total"] == 1
+    assert leaderboard["items"][0]["target_id"] == clinic["id"]
+    assert leaderboard["items"][0]["rank"] == 1
+
     # Обновляем отзыв (от имени пациента)
     update_data = {
         "text": "Updated review text",
@@ -479,6 +543,13 @@ async def test_update_and_delete_review(
     assert updated_review["text"] == "Updated review text"
     assert updated_review["rate"] == 8
 
+    # Агрегат сдвигается вместе с оценкой и виден в карточке клиники
+    clinic_card = (await client.get(f"/api/clinics/{clinic['id']}")).json()
+    assert clinic_card["rating"]["count"] == 1
+    assert clinic_card["rating"]["average"] == 8.0
+    assert clinic_card["rating"]["histogram"]["7"] == 0
+    assert clinic_card["rating"]["histogram"]["8"] == 1
+
     # Удаляем отзыв (от имени пациента)
     delete_resp = await client.delete(
         f"/api/reviews/{review['id']}",
@@ -486,6 +557,18 @@ async def test_update_and_delete_review(
     )
     assert delete_resp.status_code == 204
 
+    stats = (await client.get(f"/api/reviews/stats/clinic/{clinic['id']}")).json()
+    assert stats["count"] == 0
+    assert stats["average"] == 0.0
+
+    leaderboard = (await client.get(
+        "/api/reviews/leaderboard/clinic", params={"scope": clinic_data["location"]}
+    )).json()
+    assert leaderboard["total"] == 0
+
+    unsupported = await client.get("/api/reviews/leaderboard/organization", params={"scope": "any"})
+    assert unsupported.status_code == 400
+
     # Проверяем, что отзыв удален
     get_resp = await client.get(f"/api/reviews/{review['id']}", headers=headers)
     print(get_resp.json())
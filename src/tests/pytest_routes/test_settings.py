@@ -164,6 +164,57 @@ async def test_update_specialist_settings(client: AsyncClient, specialist_data:
     assert user_data["qualification"] == "PhD"
 
 
+
+@pytest.mark.asyncio
+async def test_update_settings_single_transaction(client: AsyncClient, db_session, specialist_data: dict):
+    from sqlalchemy import event
+
+    response = await client.post("/api/auth/reg", json=specialist_data)
+    assert response.status_code == 201
+    user_id = response.json()["id"]
+    login_response = await client.post("/api/auth/login", json={
+        "nickname": specialist_data["nickname"],
+        "password": specialist_data["password"]
+    })
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+    updates, commits = [], []
+
+    def count_updates(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE"):
+            updates.append(statement.split()[1])
+
+    def count_commits(conn):
+        commits.append(conn)
+
+    sync_engine = db_session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", count_updates)
+    event.listen(sync_engine, "commit", count_commits)
+    try:
+        suffix = specialist_data["nickname"][-6:]
+        response = await client.put("/api/settings", json={
+            "name": "Patched Name",
+            "country": "Patchland",
+            "phone_number": "+1987654321",
+            "specifications": [f"Orthodontics{suffix}"],
+            "qualification": "PhD"
+        }, headers=headers)
+        assert response.status_code == 200, response.text
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", count_updates)
+        event.remove(sync_engine, "commit", count_commits)
+    # Один UPDATE на таблицу и один commit на все изменения
+    assert sorted(updates) == ["specialists", "users"]
+    assert len(commits) == 1
+
+    user_data = (await client.get(f"/api/specialists/{user_id}")).json()
+    assert user_data["name"] == "Patched Name"
+    assert user_data["specifications"] == [f"Orthodontics{suffix}"]
+    assert user_data["qualification"] == "PhD"
+    response = await client.get("/api/specialists/", params={"specification": f"Orthodontics{suffix}"})
+    assert [card["id"] for card in response.json()] == [user_id]
+
+
 # Тест обновления ролевых данных (организация)
 @pytest.mark.asyncio
 async def test_update_organization_settings(client: AsyncClient, organization_data: dict):
@@ -29,3 +29,67 @@ async def test_specialist_profile(client: AsyncClient, specialist_data: dict):
     profile = response.json()
     assert profile["id"] == specialist["id"]
     assert profile["qualification"] == specialist_data["qualification"]
+
+
+@pytest.mark.asyncio
+async def test_specialist_directory(client: AsyncClient, specialist_data: dict, first_admin: dict):
+    import uuid
+
+    suffix = uuid.uuid4().hex[:6]
+    implants, surgery = f"Implants {suffix}", f"Surgery {suffix}"
+    ids = []
+    for index, (specifications, experience) in enumerate([([implants, surgery], 5), ([implants.upper()], 12)]):
+        data = {
+            **specialist_data,
+            "nickname": f"dir_{index}_{suffix}",
+            "email": f"directory_{index}_{suffix}@test.com",
+            "specifications": specifications,
+            "experience_years": experience
+        }
+        registration = await client.post("/api/auth/reg", json=data)
+        assert registration.status_code == 201, registration.text
+        ids.append(registration.json()["id"])
+
+    # Спецификации сравниваются без учета регистра; карточки - только поля списка и рейтинг
+    both = await client.get("/api/specialists/", params={"specification": implants})
+    assert both.status_code == 200, both.text
+    assert [card["id"] for card in both.json()] == ids
+    assert set(both.json()[0]) == {
+        "id", "nickname", "name", "photo_path", "country", "specifications",
+        "qualification", "experience_years", "is_verified", "rating"
+    }
+    assert both.json()[0]["rating"]["count"] == 0
+
+    all_of = await client.get("/api/specialists/", params=[("specification", implants), ("specification", surgery)])
+    assert [card["id"] for card in all_of.json()] == ids[:1]
+
+    experienced = await client.get("/api/specialists/", params={"specification": implants, "min_experience": 10})
+    assert [card["id"] for card in experienced.json()] == ids[1:]
+
+    verified = await client.get("/api/specialists/", params={"specification": implants, "is_verified": True})
+    assert verified.json() == []
+    # Отметку проверки ставит администратор
+    admin_headers = {"Authorization": f"Bearer {first_admin['token']}"}
+    response = await client.post("/api/admin/user-actions", json={
+        "user_id": ids[1], "action": "verify"
+    }, headers=admin_headers)
+    assert response.status_code == 200, response.text
+    verified = await client.get("/api/specialists/", params={"specification": implants, "is_verified": True})
+    assert [card["id"] for card in verified.json()] == ids[1:]
+    response = await client.post("/api/admin/user-actions", json={
+        "user_id": 10 ** 9, "action": "verify"
+    }, headers=admin_headers)
+    assert response.status_code == 404, response.text
+
+    first = await client.get("/api/specialists/", params={
+        "specification": implants, "country": specialist_data["country"].lower(), "page_size": 1
+    })
+    assert [card["id"] for card in first.json()] == ids[:1]
+    second = await client.get("/api/specialists/", params={
+        "specification": implants, "country": specialist_data["country"], "page_size": 1,
+        "cursor": first.headers["X-Next-Cursor"]
+    })
+    assert [card["id"] for card in second.json()] == ids[1:]
+
+    broken = await client.get("/api/specialists/", params={"specification": implants, "cursor": "broken"})
+    assert broken.status_code == 400
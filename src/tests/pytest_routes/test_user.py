@@ -0,0 +1,123 @@
+import pytest
+from httpx import AsyncClient
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.asyncio
+async def test_get_users_batch(client: AsyncClient, patient_data: dict, specialist_data: dict):
+    patient_reg = await client.post("/api/auth/reg", json=patient_data)
+    assert patient_reg.status_code == 201, f"Patient registration failed: {patient_reg.text}"
+    patient_id = patient_reg.json()["id"]
+    specialist_reg = await client.post("/api/auth/reg", json=specialist_data)
+    assert specialist_reg.status_code == 201, f"Specialist registration failed: {specialist_reg.text}"
+    specialist_id = specialist_reg.json()["id"]
+
+    # Порядок как в запросе, повторы схлопываются, несуществующие id пропускаются
+    response = await client.get("/api/user/batch", params={"ids": f"{specialist_id},{10 ** 9},{patient_id},{specialist_id}"})
+    assert response.status_code == 200, response.text
+    cards = response.json()
+    assert [card["id"] for card in cards] == [specialist_id, patient_id]
+    assert cards[0]["role"] == "specialist"
+    assert cards[0]["specifications"] == ["Cardiology", "Surgery"]
+    assert cards[0]["city"] is None
+    assert cards[1]["role"] == "patient"
+    assert cards[1]["city"] == "Test City"
+    assert "email" not in cards[1]
+
+    # Изменение профиля сбрасывает закэшированную карточку
+    login = await client.post("/api/auth/login", json={
+        "nickname": patient_data["nickname"],
+        "password": patient_data["password"]
+    })
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    response = await client.put("/api/settings", json={"city": "Batch City", "name": "Batch Patient"}, headers=headers)
+    assert response.status_code == 200, response.text
+    response = await client.get("/api/user/batch", params={"ids": str(patient_id)})
+    assert response.json()[0]["city"] == "Batch City"
+    assert response.json()[0]["name"] == "Batch Patient"
+
+    assert (await client.get("/api/user/batch", params={"ids": "1,abc"})).status_code == 400
+    assert (await client.get("/api/user/batch", params={"ids": ","})).status_code == 400
+    too_many = ",".join(str(i) for i in range(1, 202))
+    assert (await client.get("/api/user/batch", params={"ids": too_many})).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_provision_users(client: AsyncClient, db_session, organization_data: dict, patient_data: dict):
+    import asyncio
+    import json
+    import uuid
+    from sqlalchemy import select
+    from src.infrastructure.repository.schemas.user_orm import OrganizationOrm
+
+    org_reg = await client.post("/api/auth/reg", json=organization_data)
+    assert org_reg.status_code == 201, org_reg.text
+    org_id = org_reg.json()["id"]
+    assert (await client.post("/api/auth/reg", json=patient_data)).status_code == 201
+    login = await client.post("/api/auth/login", json={
+        "nickname": organization_data["nickname"],
+        "password": organization_data["password"]
+    })
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    suffix = uuid.uuid4().hex[:6]
+    base = {"name": "Bulk User", "password": "SecurePass123!", "country": "Testland", "phone_number": "+1234567890"}
+    rows = [
+        {**base, "nickname": f"bulk_spec1_{suffix}", "email": f"bulk_spec1_{suffix}@test.com",
+         "role": "specialist", "specifications": ["Cardiology"], "qualification": "MD"},
+        {**base, "nickname": f"bulk_spec2_{suffix}", "email": f"bulk_spec2_{suffix}@test.com",
+         "role": "specialist", "specifications": ["Surgery", "Cardiology"]},
+        {**base, "nickname": f"bulk_pat_{suffix}", "email": f"bulk_pat_{suffix}@test.com",
+         "role": "patient", "city": "Bulk City"},
+        {**base, "nickname": patient_data["nickname"], "email": f"bulk_dup_{suffix}@test.com",
+         "role": "patient", "city": "Bulk City"},
+        {**base, "nickname": f"bulk_org_{suffix}", "email": f"bulk_org_{suffix}@test.com",
+         "role": "organization", "locations": ["Somewhere"]},
+        {**base, "nickname": f"bulk_bad_{suffix}", "email": "not-an-email", "role": "patient", "city": "X"},
+    ]
+    body = "\n".join(json.dumps(row) for row in rows) + "\n{broken"
+    response = await client.post(
+        "/api/user/provision", params={"format": "ndjson", "batch_size": 2}, content=body, headers=headers
+    )
+    assert response.status_code == 202, response.text
+    job = response.json()
+    assert job["total"] == 7
+
+    for _ in range(200):
+        response = await client.get(f"/api/user/provision/{job['id']}", headers=headers)
+        assert response.status_code == 200, response.text
+        job = response.json()
+        if job["status"] in ("completed", "failed"):
+            break
+        await asyncio.sleep(0.05)
+    assert job["status"] == "completed", job
+    assert (job["processed"], job["created"], job["failed"]) == (7, 3, 4)
+    results = {result["row"]: result for result in job["results"]}
+    assert [results[row]["error"] is None for row in range(1, 8)] == [True, True, True, False, False, False, False]
+    assert results[4]["error"] == "Nickname already exists"
+    assert "not allowed" in results[5]["error"]
+    assert "email" in results[6]["error"]
+    assert "Invalid ndjson row" in results[7]["error"]
+
+    login = await client.post("/api/auth/login", json={"nickname": rows[0]["nickname"], "password": base["password"]})
+    assert login.status_code == 200, login.text
+    members = (await db_session.execute(
+        select(OrganizationOrm.members).where(OrganizationOrm.user_id == org_id)
+    )).scalar_one()
+    assert sorted(members) == sorted([results[1]["user_id"], results[2]["user_id"]])
+    response = await client.get("/api/user/batch", params={"ids": str(results[3]["user_id"])})
+    assert response.json()[0]["city"] == "Bulk City"
+
+    # Чужую задачу не видно, пациент не может создавать пользователей
+    login = await client.post("/api/auth/login", json={
+        "nickname": patient_data["nickname"],
+        "password": patient_data["password"]
+    })
+    patient_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    assert (await client.get(f"/api/user/provision/{job['id']}", headers=patient_headers)).status_code == 404
+    response = await client.post(
+        "/api/user/provision", params={"format": "ndjson"}, content=body, headers=patient_headers
+    )
+    assert response.status_code == 403
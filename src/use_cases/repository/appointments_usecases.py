@@ -0,0 +1,123 @@
+from src.domain.entity.clinics.appointment import (
+    Appointment, AppointmentStatus, clinic_local_now, require_local_time, slot_index
+)
+from src.domain.entity.users.user import Role, User
+from src.domain.interfaces.clinics.appointments_repository import IAppointmentsRepository
+from src.domain.interfaces.clinics.clinics_repository import IClinicsRepository
+from src.domain.interfaces.user.user_repositiry import IUserRepository
+from src.infrastructure.services.appointments.availability import AvailabilityIndex
+from src.exceptions import SlotUnavailableError
+from datetime import datetime, timedelta
+from typing import Optional
+import logging
+
+
+class AppointmentUseCase:
+    def __init__(
+            self,
+            appointment_repo: IAppointmentsRepository,
+            clinic_repo: IClinicsRepository,
+            availability: AvailabilityIndex,
+            user_repo: IUserRepository
+    ):
+        self._appointment_repo = appointment_repo
+        self._clinic_repo = clinic_repo
+        self._user_repo = user_repo
+        self._availability = availability
+        self._logger = logging.getLogger(__name__)
+
+    async def book(self, patient: User, clinic_id: int, specialist_id: Optional[int], starts_at: datetime):
+        """Запись пациента на слот. Индекс свободных слотов отсекает заведомо занятые и нерабочие слоты,
+        окончательно двойную запись исключает уникальный индекс при вставке
+        """
+        try:
+            if patient.role != Role.PATIENT:
+                raise PermissionError("Only patients can book appointments")
+            require_local_time(starts_at, "starts_at")
+            slot_minutes = self._availability.slot_minutes
+            if slot_index(starts_at, slot_minutes) is None:
+                raise ValueError(f"Appointments start on a {slot_minutes}-minute boundary")
+            if starts_at < clinic_local_now():
+                raise ValueError("Cannot book a slot in the past")
+
+            clinic = await self._clinic_repo.get_clinic(clinic_id)
+            if clinic is None:
+                raise LookupError("Clinic not found")
+            if specialist_id is not None:
+                await self._check_specialist(clinic.organization_id, specialist_id)
+            if not self._availability.is_free(clinic_id, specialist_id, starts_at):
+                raise SlotUnavailableError()
+
+            return await self._appointment_repo.book(Appointment(
+                clinic_id=clinic_id,
+                specialist_id=specialist_id,
+                patient_id=patient.id,
+                starts_at=starts_at,
+                ends_at=starts_at + timedelta(minutes=slot_minutes),
+                status=AppointmentStatus.BOOKED
+            ))
+        except Exception as e:
+            self._logger.error(f"Error booking appointment: {e}")
+            return e
+
+    async def _check_specialist(self, organization_id: int, specialist_id: int):
+        """Специалист существует и работает в организации, которой принадлежит клиника"""
+        users = await self._user_repo.get_by_ids([organization_id, specialist_id])
+        specialist = users.get(specialist_id)
+        if specialist is None or specialist.role != Role.SPECIALIST:
+            raise LookupError("Specialist not found")
+        organization = users.get(organization_id)
+        if organization is None or specialist_id not in (getattr(organization, 'members', None) or []):
+            raise ValueError("Specialist does not work at this clinic")
+
+    async def cancel(self, user: User, appointment_id: int):
+        """Отменить может пациент, организация-владелец клиники или админ"""
+        try:
+            appointment = await self._appointment_repo.get_appointment(appointment_id)
+            if appointment is None:
+                raise LookupError("Appointment not found")
+            if user.role == Role.ORGANIZATION:
+                clinic = await self._clinic_repo.get_clinic(appointment.clinic_id)
+                allowed = clinic is not None and clinic.organization_id == user.id
+            else:
+                allowed = user.role == Role.ADMIN or user.id == appointment.patient_id
+            if not allowed:
+                raise PermissionError("You can only cancel your own appointments")
+            return await self._appointment_repo.cancel(appointment_id)
+        except Exception as e:
+            self._logger.error(f"Error cancelling appointment: {e}")
+            return e
+
+    async def get_my_appointments(self, user: User, upcoming_only: bool = True):
+        try:
+            return await self._appointment_repo.get_patient_appointments(user.id, upcoming_only)
+        except Exception as e:
+            self._logger.error(f"Error getting appointments: {e}")
+            return e
+
+    async def get_free_slots(
+            self,
+            clinic_id: int,
+            specialist_id: Optional[int],
+            after: datetime,
+            days: int,
+            limit: Optional[int] = None
+    ):
+        try:
+            require_local_time(after, "after")
+            # Пустой список - клиника есть, но свободных слотов нет; неизвестная клиника - 404
+            if await self._clinic_repo.get_clinic(clinic_id) is None:
+                raise LookupError("Clinic not found")
+            return self._availability.free_slots(clinic_id, specialist_id, after, days, limit)
+        except Exception as e:
+            self._logger.error(f"Error getting free slots: {e}")
+            return e
+
+    async def get_next_free_slots(self, location: str, after: datetime, limit: int):
+        try:
+            require_local_time(after, "after")
+            clinic_ids = self._availability.location_clinic_ids(location)
+            return self._availability.next_free_slots(clinic_ids, after, limit)
+        except Exception as e:
+            self._logger.error(f"Error getting next free slots: {e}")
+            return e
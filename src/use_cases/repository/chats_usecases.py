@@ -4,6 +4,7 @@ from datetime import datetime
 
 from src.infrastructure.adapters.orm_entity_adapter import UserOrmEntityAdapter
 from src.domain.interfaces.chats.chats_repository import IChatsRepository
+from src.domain.interfaces.user.user_repositiry import IUserRepository
 from src.domain.entity.chats.chat_entity import TextMessage, Chat, Message
 
 
@@ -11,13 +12,20 @@ class ChatUseCase:
     def __init__(
             self,
             chats_repo: IChatsRepository,
-            adapter: UserOrmEntityAdapter
+            adapter: UserOrmEntityAdapter,
+            user_repo: IUserRepository
     ):
         self._chat_repo = chats_repo
         self._adapter = adapter
+        self._user_repo = user_repo
         self._logger = logging.getLogger(__name__)
 
     async def send_text_message_to_recipient(self, sender_id: int, recipient_id: int, text: str) -> Optional[Chat]:
+        """LookupError - получателя нет. Участники читаются одним пакетом, отправитель уже в памяти запроса"""
+        participants = await self._user_repo.get_by_ids([sender_id, recipient_id])
+        if recipient_id not in participants:
+            raise LookupError("Recipient not found")
+
         try:
             self._logger.info(f"UC: Starting message send from {sender_id} to {recipient_id}")
 
@@ -1,5 +1,13 @@
 from src.infrastructure.adapters.orm_entity_adapter import ClinicOrmEntityAdapter
 from src.domain.interfaces.clinics.clinics_repository import IClinicsRepository
+from src.domain.interfaces.clinics.reviews_repository import IReviewRepository
+from src.domain.entity.clinics.reviews import ReviewTargetType
+from src.domain.entity.clinics.appointment import require_local_time
+from src.domain.entity.imports import ImportFormat
+from src.infrastructure.services.clinics.clinic_import import import_clinics, CLINIC_IMPORT_BATCH_SIZE
+from src.domain.entity.pagination import PageRequest
+from datetime import datetime
+from typing import AsyncIterable, List, Optional
 import logging
 
 
@@ -7,10 +15,12 @@ class ClinicUseCase:
     def __init__(
             self,
             clinic_repo: IClinicsRepository,
-            adapter: ClinicOrmEntityAdapter
+            adapter: ClinicOrmEntityAdapter,
+            review_repo: Optional[IReviewRepository] = None
     ):
         self._clinic_repo = clinic_repo
         self._adapter = adapter
+        self._review_repo = review_repo
         self._logger = logging.getLogger(__name__)
 
     async def get_clinic(self, clinic_id: int):
@@ -20,26 +30,59 @@ class ClinicUseCase:
             self._logger.error(f"Error getting clinic: {e}")
             return e
 
-    async def get_clinics_by_location(self, location: str, page: int = 1, page_size: int = 10):
+    async def get_clinic_rating(self, clinic_id: int):
         try:
-            offset = (page - 1) * page_size
-            return self._clinic_repo.get_clinics_by_location(
-                location,
-                limit=page_size,
-                offset=offset
+            return await self._review_repo.get_review_stats(ReviewTargetType.CLINIC, clinic_id)
+        except Exception as e:
+            self._logger.error(f"Error getting clinic rating: {e}")
+            return e
+
+    async def get_clinic_ratings(self, clinic_ids: List[int]):
+        try:
+            stats = await self._review_repo.get_review_stats_batch(
+                (ReviewTargetType.CLINIC, clinic_id) for clinic_id in clinic_ids
             )
+            return {target_id: item for (_, target_id), item in stats.items()}
+        except Exception as e:
+            self._logger.error(f"Error getting clinic ratings: {e}")
+            return e
+
+    async def get_clinics_by_location(
+            self,
+            location: str,
+            page: Optional[PageRequest] = None,
+            open_at: Optional[datetime] = None
+    ):
+        try:
+            if open_at is not None:
+                require_local_time(open_at, "open_at")
+            return await self._clinic_repo.get_clinics_by_location(location, page, open_at=open_at)
         except Exception as e:
             self._logger.error(f"Error getting clinics by location: {e}")
             return e
 
-    async def get_clinics_by_organization(self, organization_id: int, page: int = 1, page_size: int = 10):
+    async def get_nearest_clinics(
+            self,
+            latitude: float,
+            longitude: float,
+            radius_km: float,
+            is_24_7: Optional[bool] = None,
+            open_at: Optional[datetime] = None,
+            page: Optional[PageRequest] = None
+    ):
         try:
-            offset = (page - 1) * page_size
-            return await self._clinic_repo.get_clinics_by_organization(
-                organization_id,
-                limit=page_size,
-                offset=offset
+            if open_at is not None:
+                require_local_time(open_at, "open_at")
+            return await self._clinic_repo.get_nearest_clinics(
+                latitude, longitude, radius_km, is_24_7=is_24_7, open_at=open_at, page=page
             )
+        except Exception as e:
+            self._logger.error(f"Error getting nearest clinics: {e}")
+            return e
+
+    async def get_clinics_by_organization(self, organization_id: int, page: Optional[PageRequest] = None):
+        try:
+            return await self._clinic_repo.get_clinics_by_organization(organization_id, page)
         except Exception as e:
             self._logger.error(f"Error getting clinics by organization: {e}")
             return e
@@ -51,6 +94,21 @@ class ClinicUseCase:
             self._logger.error(f"Error creating clinic: {e}")
             return e
 
+    async def import_clinics(
+            self,
+            lines: AsyncIterable[str],
+            fmt: ImportFormat,
+            organization_id: Optional[int] = None,
+            batch_size: int = CLINIC_IMPORT_BATCH_SIZE
+    ):
+        try:
+            return await import_clinics(
+                self._clinic_repo, lines, fmt, organization_id=organization_id, batch_size=batch_size
+            )
+        except Exception as e:
+            self._logger.error(f"Error importing clinics: {e}")
+            return e
+
     async def update_clinic(self, clinic_id: int, update_data: dict):
         try:
             return await self._clinic_repo.update_clinic(clinic_id, update_data)
@@ -1,15 +1,29 @@
 from src.domain.interfaces.orders.orders_repository import IOrdersRepository
-from src.domain.entity.orders.order import Order, OrderStatus, OrderCreate
+from src.domain.entity.orders.order import Order, OrderStatus, OrderCreate, OrderResponseDetails
+from src.domain.entity.orders.response import ResponseStatus
+from src.domain.entity.pagination import Page, PageRequest
 from src.domain.entity.users.user import Role
+from src.infrastructure.repository.schemas.order_orm import OrderCreatorRole
+from src.domain.interfaces.orders.responses_repository import IResponseRepository
+from src.domain.interfaces.user.user_repositiry import IUserRepository
+from src.infrastructure.services.matching.specification_index import SpecificationMatchIndex
 import logging
-from typing import List, Optional
+from datetime import datetime
+from collections import defaultdict
+from typing import List, Optional, Tuple
 
 class OrderUseCase:
     def __init__(
             self,
             orders_repo: IOrdersRepository,
+            matching_index: Optional[SpecificationMatchIndex] = None,
+            response_repo: Optional[IResponseRepository] = None,
+            user_repo: Optional[IUserRepository] = None
     ):
         self._order_repo = orders_repo
+        self._matching_index = matching_index
+        self._response_repo = response_repo
+        self._user_repo = user_repo
         self._logger = logging.getLogger(__name__)
 
     async def create_order(self, order_data: OrderCreate) -> Order:
@@ -26,9 +40,40 @@ class OrderUseCase:
             self._logger.error(f"Error getting order: {e}", exc_info=True)
             raise
 
-    async def get_orders_by_creator(self, creator_id: int) -> List[Order]:
+    async def get_order_details(
+        self,
+        order_id: int,
+        response_status: Optional[ResponseStatus] = None,
+        page: Optional[PageRequest] = None
+    ) -> Optional[Tuple[Order, Page[OrderResponseDetails]]]:
+        """Заказ и одна страница откликов с карточками откликнувшихся; без page - первая страница"""
+        try:
+            order = await self._order_repo.get_order(order_id)
+            if not order:
+                return None
+
+            responses = await self._response_repo.get_order_responses(
+                order_id, status=response_status, page=page or PageRequest()
+            )
+            responders_by_role = defaultdict(set)
+            for response in responses.items:
+                responders_by_role[Role(response.role.value)].add(response.responser_id)
+            profiles = await self._user_repo.get_profile_cards(responders_by_role) if responses.items else {}
+
+            return order, Page(
+                items=[
+                    OrderResponseDetails(**response.model_dump(), responser=profiles.get(response.responser_id))
+                    for response in responses.items
+                ],
+                next_cursor=responses.next_cursor
+            )
+        except Exception as e:
+            self._logger.error(f"Error getting order details: {e}", exc_info=True)
+            raise
+
+    async def get_orders_by_creator(self, creator_id: int, page: Optional[PageRequest] = None) -> Page[Order]:
         try:
-            return await self._order_repo.get_orders_by_creator(creator_id)
+            return await self._order_repo.get_orders_by_creator(creator_id, page)
         except Exception as e:
             self._logger.error(f"Error getting orders by creator: {e}", exc_info=True)
             raise
@@ -37,16 +82,15 @@ class OrderUseCase:
         self,
         user_id: int,
         role: Role,
-        page: int = 1,
-        page_size: int = 10
-    ) -> List[Order]:
+        page: Optional[PageRequest] = None
+    ) -> Page[Order]:
         try:
             if role == Role.PATIENT:
-                return await self._order_repo.get_orders_for_patient(user_id)
+                return await self._order_repo.get_orders_for_patient(user_id, page)
             elif role == Role.SPECIALIST:
-                return await self._order_repo.get_orders_for_specialist(user_id)
+                return await self._order_repo.get_orders_for_specialist(user_id, page)
             elif role == Role.ORGANIZATION:
-                return await self._order_repo.get_orders_for_clinic(user_id)
+                return await self._order_repo.get_orders_for_clinic(user_id, page)
             else:
                 raise ValueError(f"Invalid role for order access: {role}")
         except Exception as e:
@@ -60,6 +104,22 @@ class OrderUseCase:
             self._logger.error(f"Error updating order status: {e}", exc_info=True)
             raise
 
+    async def expire_overdue_orders(self, now: Optional[datetime] = None, batch_size: int = 500) -> int:
+        try:
+            now = now or datetime.utcnow()
+            processed = 0
+            while True:
+                expired = await self._order_repo.expire_overdue_orders(now, batch_size)
+                processed += len(expired)
+                if len(expired) < batch_size:
+                    break
+            if processed:
+                self._logger.info(f"Expired {processed} overdue orders")
+            return processed
+        except Exception as e:
+            self._logger.error(f"Error expiring overdue orders: {e}", exc_info=True)
+            raise
+
     async def update_order_responses_count(self, order_id: int, increment: int = 1) -> bool:
         try:
             return await self._order_repo.update_order_responses_count(order_id, increment)
@@ -86,4 +146,65 @@ class OrderUseCase:
             return await self._order_repo.get_orders_by_status(status)
         except Exception as e:
             self._logger.error(f"Error getting orders by status: {e}", exc_info=True)
-            raise
\ No newline at end of file
+            raise
+
+    async def get_orders_feed(
+        self,
+        viewer_id: int,
+        *,
+        service_type: Optional[str] = None,
+        specifications: Optional[List[str]] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        creator_role: Optional[OrderCreatorRole] = None,
+        page: Optional[PageRequest] = None
+    ) -> Page[Order]:
+        try:
+            return await self._order_repo.get_active_orders_feed(
+                viewer_id,
+                service_type=service_type,
+                specifications=specifications,
+                date_from=date_from,
+                date_to=date_to,
+                creator_role=creator_role,
+                page=page or PageRequest()
+            )
+        except Exception as e:
+            self._logger.error(f"Error getting orders feed: {e}", exc_info=True)
+            raise
+
+    async def get_matching_orders(
+        self,
+        specialist_id: int,
+        specifications: List[str],
+        limit: int = 20
+    ) -> List[Tuple[Order, float]]:
+        try:
+            matches = self._matching_index.match_orders(
+                specifications,
+                limit=limit,
+                exclude_creator=specialist_id
+            )
+            orders = {
+                order.id: order
+                for order in await self._order_repo.get_orders_by_ids([order_id for order_id, _ in matches])
+            }
+            return [
+                (orders[order_id], score)
+                for order_id, score in matches
+                if order_id in orders and orders[order_id].status == OrderStatus.ACTIVE
+            ]
+        except Exception as e:
+            self._logger.error(f"Error matching orders: {e}", exc_info=True)
+            raise
+
+    async def get_matching_specialists(self, order: Order, limit: int = 20) -> List[Tuple[int, float]]:
+        try:
+            return self._matching_index.match_specialists(
+                order.specifications,
+                limit=limit,
+                exclude={order.creator_id}
+            )
+        except Exception as e:
+            self._logger.error(f"Error matching specialists: {e}", exc_info=True)
+            raise
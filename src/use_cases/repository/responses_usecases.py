@@ -1,5 +1,6 @@
 from src.domain.interfaces.orders.responses_repository import IResponseRepository
 from src.domain.entity.orders.response import Response, ResponseStatus, ResponseCreate
+from src.domain.entity.pagination import Page, PageRequest
 from typing import List, Optional
 import logging
 from src.domain.entity.users.user import Role
@@ -30,11 +31,10 @@ class ResponseUseCase:
         self,
         order_id: int,
         status: Optional[ResponseStatus] = None,
-        page: int = 1,
-        page_size: int = 10
-    ) -> List[Response]:
+        page: Optional[PageRequest] = None
+    ) -> Page[Response]:
         try:
-            return await self._response_repo.get_order_responses(order_id, status)
+            return await self._response_repo.get_order_responses(order_id, status, page)
         except Exception as e:
             self._logger.error(f"Error getting order responses: {e}", exc_info=True)
             raise
@@ -44,11 +44,10 @@ class ResponseUseCase:
         user_id: int,
         role: Optional[Role] = None,
         status: Optional[ResponseStatus] = None,
-        page: int = 1,
-        page_size: int = 10
-    ) -> List[Response]:
+        page: Optional[PageRequest] = None
+    ) -> Page[Response]:
         try:
-            return await self._response_repo.get_user_responses(user_id, role, status)
+            return await self._response_repo.get_user_responses(user_id, role, status, page)
         except Exception as e:
             self._logger.error(f"Error getting user responses: {e}", exc_info=True)
             raise
@@ -1,12 +1,13 @@
-from src.domain.entity.clinics.reviews import Review, ReviewTargetType
+from src.domain.entity.clinics.reviews import Review, ReviewTargetType, ReviewStats, ReviewSort
 from src.domain.interfaces.clinics.reviews_repository import IReviewRepository
 from src.domain.interfaces.orders.orders_repository import IOrdersRepository
 from src.domain.interfaces.user.user_repositiry import IUserRepository
 from src.domain.interfaces.clinics.clinics_repository import IClinicsRepository
-from src.domain.entity.users.user import Role
+from src.domain.entity.users.user import Role, User
+from src.domain.entity.pagination import Page, PageRequest
 from datetime import datetime
 import logging
-from typing import Optional
+from typing import List, Optional, Tuple
 from src.domain.entity.orders.order import OrderStatus
 
 
@@ -26,28 +27,18 @@ class ReviewUseCases:
 
     async def create_review(
             self,
-            sender_id: int,
+            sender: User,
             order_id: int,
             target_id: int,
             target_type: ReviewTargetType,
             text: str,
             rate: int
     ) -> Review:
-        try:
-            sender = await self._user_repo.get_by_id(sender_id)
-            if not sender:
-                raise ValueError("Sender not found")
-
-            order = await self._order_repo.get_order(order_id)
-            if not order:
-                raise ValueError("Order not found")
-
-            if order.status == OrderStatus.ACTIVE:
-                raise ValueError("Reviews can only be created for inactive orders")
-
-            if await self._review_repo.has_review_for_order(order_id, sender_id, target_id):
-                raise ValueError("Review already exists for this order and target")
+        """sender - пользователь, уже загруженный при аутентификации; повторно из БД он не читается.
 
+        Уникальность (order_id, sender_id, target_id) гарантирует индекс, а не предварительная проверка.
+        """
+        try:
             if sender.role == Role.PATIENT:
                 if target_type not in {
                     ReviewTargetType.SPECIALIST,
@@ -64,8 +55,16 @@ class ReviewUseCases:
                 if target_type != ReviewTargetType.SPECIALIST:
                     raise ValueError("Organizations can only review specialists")
 
+            # Единственный запрос до вставки
+            order_status = await self._order_repo.get_order_status(order_id)
+            if order_status is None:
+                raise ValueError("Order not found")
+
+            if order_status == OrderStatus.ACTIVE:
+                raise ValueError("Reviews can only be created for inactive orders")
+
             review = Review(
-                sender_id=sender_id,
+                sender_id=sender.id,
                 order_id=order_id,
                 target_id=target_id,
                 target_type=target_type,
@@ -87,16 +86,17 @@ class ReviewUseCases:
             target_type: ReviewTargetType,
             min_rating: Optional[int] = None,
             max_rating: Optional[int] = None,
-            page: int = 1,
-            page_size: int = 10
-    ) -> list[Review]:
+            sort: ReviewSort = ReviewSort.NEWEST,
+            page: Optional[PageRequest] = None
+    ) -> Page[Review]:
         try:
-            offset = (page - 1) * page_size
             return await self._review_repo.get_reviews_for_target(
                 target_id,
                 target_type,
                 min_rating=min_rating,
-                max_rating=max_rating
+                max_rating=max_rating,
+                sort=sort,
+                page=page
             )
         except Exception as e:
             self._logger.error(f"Error getting reviews for target: {e}", exc_info=True)
@@ -170,17 +170,34 @@ class ReviewUseCases:
             target_type: ReviewTargetType
     ) -> float:
         try:
-            reviews = await self._review_repo.get_reviews_for_target(
-                target_id,
-                target_type
-            )
+            stats = await self._review_repo.get_review_stats(target_type, target_id)
+            return stats.average
+        except Exception as e:
+            self._logger.error(f"Error calculating average rating: {e}", exc_info=True)
+            raise
 
-            if not reviews:
-                return 0.0
+    async def get_review_stats(self, target_id: int, target_type: ReviewTargetType) -> ReviewStats:
+        try:
+            return await self._review_repo.get_review_stats(target_type, target_id)
+        except Exception as e:
+            self._logger.error(f"Error getting review stats: {e}", exc_info=True)
+            raise
 
-            total = sum(review.rate for review in reviews)
-            return round(total / len(reviews), 1)
+    async def get_review_stats_batch(
+            self,
+            targets: List[Tuple[ReviewTargetType, int]]
+    ) -> List[ReviewStats]:
+        try:
+            stats = await self._review_repo.get_review_stats_batch(targets)
+            # Порядок ответа повторяет порядок запроса
+            return [stats[(target_type, target_id)] for target_type, target_id in targets]
+        except Exception as e:
+            self._logger.error(f"Error getting review stats batch: {e}", exc_info=True)
+            raise
 
+    async def rebuild_review_stats(self) -> int:
+        try:
+            return await self._review_repo.rebuild_review_stats()
         except Exception as e:
-            self._logger.error(f"Error calculating average rating: {e}", exc_info=True)
+            self._logger.error(f"Error rebuilding review stats: {e}", exc_info=True)
             raise
@@ -7,10 +7,11 @@ from src.domain.entity.users.user import UserInput, User, Role as UserRole, User
 from src.domain.entity.users.specialist.specialist import Specialist
 from src.domain.entity.users.patient.patient import Patient
 from src.domain.entity.users.organization.organization import Organization
-from src.domain.entity.users.admin.admin_entity import Admin, AdminRoles
+from src.domain.entity.users.admin.admin_entity import Admin, AdminRoles, AdminUserFilter
 from src.infrastructure.adapters.orm_entity_adapter import UserOrmEntityAdapter
 from src.domain.interfaces.user.user_repositiry import SettingsUserData
-from typing import Dict, Union
+from src.domain.entity.pagination import Page, PageRequest
+from typing import Dict, Optional, Union
 import logging
 from pydantic import ValidationError
 
@@ -60,27 +61,14 @@ class RegistrationUseCase:
                 password_hash="",
             )
 
-            if await self._user_repo.check_nickname_exists(user_input.nickname):
-                raise ValueError("Nickname already exists")
-
-            if await self._user_repo.check_email_exists(user_input.email):
-                raise ValueError("Email already exists")
-
             hashed_password = await self._hash_password(user_input.password)
             user_input.password_hash = hashed_password
 
-            base_user = await self._user_repo.create(user_input)
-
-            role_str = str(input_data.get('role', 'patient')).lower()
-            if role_str == 'specialist':
-                return await self._create_specialist_profile(base_user.id, input_data)
-            elif role_str == 'patient':
-                return await self._create_patient_profile(base_user.id, input_data)
-            elif role_str == 'organization':
-                return await self._create_organization_profile(base_user.id, input_data)
-            elif role_str == 'admin':
-                return await self._create_admin_profile(base_user.id, input_data)
-            return base_user
+            # Пользователь и профиль - одна транзакция; дубликаты ловит уникальность в БД
+            user = await self._user_repo.create_with_profile(user_input, input_data)
+            if isinstance(user, Specialist):
+                self._specialist_repo.index_specialist(user.id, user.specifications)
+            return user
 
         except ValidationError as e:
             self._logger.error(f"Validation error: {e}")
@@ -90,34 +78,6 @@ class RegistrationUseCase:
             await self._user_repo.session.rollback()
             raise
 
-    async def _create_specialist_profile(self, user_id: int, data: Dict) -> Specialist:
-        return await self._specialist_repo.create_specialist_profile(
-            user_id=user_id,
-            specifications=data['specifications'],
-            qualification=data['qualification'],
-            experience=data.get('experience_years', 0)
-        )
-
-    async def _create_patient_profile(self, user_id: int, data: Dict) -> Patient:
-        return await self._patient_repo.create_patient_profile(
-            user_id=user_id,
-            city=data['city']
-        )
-
-    async def _create_organization_profile(self, user_id: int, data: Dict) -> Organization:
-        return await self._org_repo.create_organization_profile(
-            user_id=user_id,
-            locations=data['locations']
-        )
-
-    async def _create_admin_profile(self, user_id: int, data: Dict) -> Admin:
-        """Создание профиля администратора"""
-        return await self._admin_repo.create_admin_profile(
-            user_id=user_id,
-            admin_role=data['admin_role'],
-            is_superadmin=data.get('is_superadmin', False)
-        )
-
     async def _hash_password(self, password: str) -> str:
         from src.infrastructure.services.registration.hash_password import hash_password
         return await hash_password(password)
@@ -210,32 +170,51 @@ class SetSettingsUseCase:
         self._adapter = adapter
         self._logger = logging.getLogger(__name__)
 
-    async def execute(self, update_data: Dict, jwt_token: str) -> str:
-        import datetime
-        try:
-            user_id, expiration_time = await self._user_repo._decode_jwt_token(jwt_token)
-            time = datetime.datetime.utcfromtimestamp(expiration_time)
-            if time < datetime.datetime.utcnow():
-                raise ValueError("JWT token expired")
+    # Поля профиля, которые может менять каждая роль
+    PROFILE_FIELDS = {
+        UserRole.PATIENT: ('city',),
+        UserRole.SPECIALIST: ('specifications', 'qualification'),
+        UserRole.ORGANIZATION: ('locations',),
+        UserRole.ADMIN: ('admin_role', 'is_superadmin'),
+    }
+    BASE_FIELDS = ('nickname', 'email', 'name', 'photo_path', 'country', 'phone_number')
+
+    async def execute(self, update_data: Dict, user_id: int) -> str:
+        """Все изменения настроек - одной транзакцией; уникальность никнейма и email проверяет БД.
 
-            current_user = await self._user_repo.get_by_id(user_id)
-            if not current_user:
+        user_id - пользователь, уже аутентифицированный в роутере.
+        """
+        try:
+            state = await self._user_repo.get_settings_state(user_id)
+            if not state:
                 raise ValueError("User not found")
+            role = UserRole(state['role'])
 
             admin_fields = {'admin_role', 'is_superadmin'}
             if any(field in update_data for field in admin_fields):
-                if current_user.role != 'admin':
+                if role != UserRole.ADMIN:
                     raise ValueError("Only admins can update admin fields")
-
-                admin_profile = await self._admin_repo.get_admin_profile(user_id)
-                if not admin_profile:
+                if state['admin_role'] is None:
                     raise ValueError("Admin profile not found")
+                self._check_admin_fields(update_data, state['admin_role'])
 
-                self._check_admin_fields(update_data, admin_profile.admin_role)
-
-            await self._update_base_fields(user_id, update_data, current_user)
+            user_fields = {
+                field: update_data[field] for field in self.BASE_FIELDS
+                if field in update_data and update_data[field] != state.get(field)
+            }
+            if 'password' in update_data:
+                user_fields['password_hash'] = await self._hash_password(update_data['password'])
+            profile_fields = {
+                field: update_data[field] for field in self.PROFILE_FIELDS.get(role, ()) if field in update_data
+            }
 
-            await self._update_role_profile(user_id, update_data, current_user.role)
+            if user_fields or profile_fields:
+                await self._user_repo.patch_settings(
+                    user_id, role, user_fields, profile_fields,
+                    previous={'nickname': state['nickname'], 'email': state['email']}
+                )
+            if role == UserRole.SPECIALIST and 'specifications' in profile_fields:
+                self._specialist_repo.index_specialist(user_id, profile_fields['specifications'])
 
             return "Settings updated successfully"
         except ValidationError as e:
@@ -246,78 +225,6 @@ class SetSettingsUseCase:
             await self._user_repo.session.rollback()
             raise
 
-    async def _update_base_fields(
-            self,
-            user_id: int,
-            update_data: Dict,
-            current_user: User
-    ):
-        base_fields = {}
-
-        if 'nickname' in update_data and update_data['nickname'] != current_user.nickname:
-            if await self._user_repo.check_nickname_exists(update_data['nickname']):
-                raise ValueError("Nickname already exists")
-            base_fields['nickname'] = update_data['nickname']
-
-        if 'email' in update_data and update_data['email'] != current_user.email:
-            if await self._user_repo.check_email_exists(update_data['email']):
-                raise ValueError("Email already exists")
-            base_fields['email'] = update_data['email']
-
-        if 'password' in update_data:
-            hashed_password = await self._hash_password(update_data['password'])
-            base_fields['password_hash'] = hashed_password
-
-        for field in ['name', 'photo_path', 'country', 'phone_number']:
-            if field in update_data:
-                base_fields[field] = update_data[field]
-
-        if base_fields:
-            await self._user_repo.update(user_id, base_fields)
-
-    async def _update_role_profile(
-            self,
-            user_id: int,
-            update_data: Dict,
-            role: str
-    ):
-        role = role.lower()
-
-        if role == "patient" and 'city' in update_data:
-            await self._patient_repo.update_city(user_id, update_data['city'])
-
-        elif role == "specialist":
-            if 'specifications' in update_data:
-                await self._specialist_repo.update_specialization(
-                    user_id,
-                    update_data['specifications']
-                )
-            if 'qualification' in update_data:
-                await self._specialist_repo.add_qualification(
-                    user_id,
-                    update_data['qualification']
-                )
-
-        elif role == "organization" and 'locations' in update_data:
-            await self._org_repo.update_locations(
-                user_id,
-                update_data['locations']
-            )
-
-        elif role == "admin":
-            new_role = update_data.get('admin_role')
-            is_superadmin = update_data.get('is_superadmin')
-            if new_role or is_superadmin is not None:
-                current_profile = await self._admin_repo.get_admin_profile(user_id)
-                if not current_profile:
-                    raise ValueError(f"Admin profile not found")
-
-                await self._admin_repo.update_admin_privileges(
-                    user_id,
-                    new_role or current_profile.admin_role,
-                    is_superadmin if is_superadmin is not None else current_profile.is_superadmin
-                )
-
     async def _hash_password(self, password: str) -> str:
         from src.infrastructure.services.registration.hash_password import hash_password
         return await hash_password(password)
@@ -339,8 +246,8 @@ class AdminUseCase:
     async def get_admin_profile(self, user_id: int) -> Admin:
         return await self._admin_repo.get_admin_profile(user_id)
 
-    async def get_all_users(self, page: int, page_size: int) -> list[User]:
-        return await self._admin_repo.get_all_users(page=page, page_size=page_size)
+    async def get_all_users(self, page: Optional[PageRequest] = None, filters: Optional[AdminUserFilter] = None) -> Page:
+        return await self._admin_repo.get_all_users(page=page, filters=filters)
 
     async def block_user(self, user_id: int, reason: str):
         return await self._admin_repo.block_user(user_id=user_id, reason=reason)
@@ -351,5 +258,8 @@ class AdminUseCase:
     async def delete_user(self, user_id: int):
         return await self._admin_repo.delete_user(user_id=user_id)
 
+    async def set_specialist_verified(self, user_id: int, is_verified: bool):
+        return await self._admin_repo.set_specialist_verified(user_id=user_id, is_verified=is_verified)
+
     async def get_statisctics(self):
         return await self._admin_repo.get_statisctics()